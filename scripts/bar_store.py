@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Per-symbol bar store for the Databento 5-minute provider
+
+Keeps an append-only 1-minute OHLCV series per symbol together with the
+time range it covers, so repeated dashboard refreshes only fetch the
+missing head/tail from timeseries.get_range:
+- Range queries served from memory when already covered
+- Least-recently-used symbols and oldest bars evicted past the size limits
+- Series persisted locally and reloaded on start-up
+- Hit, bytes-fetched and estimated API cost counters
+"""
+
+import os
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple, Any
+
+import pandas as pd
+
+from data_aggregation import aggregate_1min_to_5min
+
+logger = logging.getLogger(__name__)
+
+# Size of one DBN ohlcv-1m record, used when the response doesn't report bytes
+OHLCV_RECORD_SIZE = 56
+
+# fetch(symbol, start, end) -> (1-minute DataFrame, bytes transferred)
+FetchFunction = Callable[[str, datetime, datetime], Tuple[pd.DataFrame, int]]
+
+
+class SymbolSeries:
+    """1-minute bars for one symbol covering [start, end)"""
+
+    __slots__ = ('bars', 'start', 'end')
+
+    def __init__(self, bars: pd.DataFrame, start: pd.Timestamp, end: pd.Timestamp):
+        self.bars = bars
+        self.start = start
+        self.end = end
+
+    def merge(self, bars: pd.DataFrame, start: pd.Timestamp, end: pd.Timestamp):
+        """Add fetched bars for an adjacent range; newer rows win"""
+        if not bars.empty:
+            combined = pd.concat([self.bars, bars]) if not self.bars.empty else bars
+            if not combined.index.is_monotonic_increasing or combined.index.has_duplicates:
+                combined = combined[~combined.index.duplicated(keep='last')].sort_index()
+            self.bars = combined
+        self.start = min(self.start, start)
+        self.end = max(self.end, end)
+
+    def trim(self, max_bars: int):
+        """Drop the oldest bars beyond max_bars, shrinking the covered range"""
+        if len(self.bars) > max_bars:
+            self.bars = self.bars.iloc[-max_bars:]
+            self.start = self.bars.index[0]
+
+
+class FiveMinuteBarStore:
+    """
+    Event-time keyed 5-minute bar cache
+
+    Bars are keyed by symbol and exchange timestamp, never by request
+    window, so a refresh whose window slid forward reuses everything but
+    the new tail.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = "outputs/bar_cache",
+                 max_symbols: int = 8, max_bars_per_symbol: int = 20160,
+                 cost_per_gb: float = 0.0):
+        """
+        Args:
+            cache_dir: Directory for persisted series (None keeps memory only)
+            max_symbols: Symbols kept before the least recently used is evicted
+            max_bars_per_symbol: 1-minute bars kept per symbol (default 14 days)
+            cost_per_gb: Databento price per GB, for the estimated cost counter
+        """
+        self.cache_dir = cache_dir
+        self.max_symbols = max_symbols
+        self.max_bars_per_symbol = max_bars_per_symbol
+        self.cost_per_gb = cost_per_gb
+        self._series: "OrderedDict[str, SymbolSeries]" = OrderedDict()
+
+        self.stats = {
+            'cache_hits': 0,
+            'partial_hits': 0,
+            'misses': 0,
+            'api_requests': 0,
+            'bars_fetched': 0,
+            'bytes_fetched': 0,
+            'estimated_cost_usd': 0.0,
+            'evictions': 0
+        }
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, symbol: str) -> str:
+        return os.path.join(self.cache_dir, f"{symbol.replace('/', '_')}.pkl")
+
+    def _load(self, symbol: str) -> Optional[SymbolSeries]:
+        """Series from memory, else from disk"""
+        series = self._series.get(symbol)
+        if series is not None:
+            self._series.move_to_end(symbol)
+            return series
+
+        if not self.cache_dir or not os.path.exists(self._path(symbol)):
+            return None
+        try:
+            saved = pd.read_pickle(self._path(symbol))
+            series = SymbolSeries(saved['bars'], saved['start'], saved['end'])
+        except Exception as e:
+            logger.warning(f"Discarding unreadable bar cache for {symbol}: {e}")
+            return None
+        self._remember(symbol, series)
+        return series
+
+    def _remember(self, symbol: str, series: SymbolSeries):
+        self._series[symbol] = series
+        self._series.move_to_end(symbol)
+        while len(self._series) > self.max_symbols:
+            evicted, _ = self._series.popitem(last=False)
+            self.stats['evictions'] += 1
+            logger.debug(f"Evicted bar cache for {evicted}")
+
+    def _save(self, symbol: str, series: SymbolSeries):
+        if not self.cache_dir:
+            return
+        try:
+            pd.to_pickle({'bars': series.bars, 'start': series.start, 'end': series.end},
+                         self._path(symbol))
+        except Exception as e:
+            logger.warning(f"Failed to persist bar cache for {symbol}: {e}")
+
+    def _fetch(self, fetch: FetchFunction, symbol: str, start: pd.Timestamp,
+               end: pd.Timestamp) -> pd.DataFrame:
+        bars, nbytes = fetch(symbol, start.to_pydatetime(), end.to_pydatetime())
+        nbytes = nbytes if nbytes is not None else len(bars) * OHLCV_RECORD_SIZE
+        self.stats['api_requests'] += 1
+        self.stats['bars_fetched'] += len(bars)
+        self.stats['bytes_fetched'] += nbytes
+        self.stats['estimated_cost_usd'] += nbytes / 1e9 * self.cost_per_gb
+        return bars
+
+    def get_1min_bars(self, symbol: str, start: datetime, end: datetime,
+                      fetch: FetchFunction) -> pd.DataFrame:
+        """
+        1-minute bars in [start, end), fetching only ranges not yet covered
+
+        A request that doesn't touch the cached range replaces it rather
+        than leaving a gap in the series.
+        """
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        series = self._load(symbol)
+
+        if series is not None and series.start <= start and end <= series.end:
+            self.stats['cache_hits'] += 1
+        elif series is not None and start <= series.end and end >= series.start:
+            self.stats['partial_hits'] += 1
+            if start < series.start:
+                series.merge(self._fetch(fetch, symbol, start, series.start), start, series.start)
+            if end > series.end:
+                series.merge(self._fetch(fetch, symbol, series.end, end), series.end, end)
+            series.trim(self.max_bars_per_symbol)
+            self._save(symbol, series)
+        else:
+            self.stats['misses'] += 1
+            bars = self._fetch(fetch, symbol, start, end)
+            series = SymbolSeries(bars.sort_index(), start, end)
+            series.trim(self.max_bars_per_symbol)
+            self._remember(symbol, series)
+            self._save(symbol, series)
+
+        bars = series.bars
+        if bars.empty:
+            return bars
+        index = bars.index
+        return bars.iloc[index.searchsorted(start):index.searchsorted(end)]
+
+    def get_5min_bars(self, symbol: str, start: datetime, end: datetime,
+                      fetch: FetchFunction) -> pd.DataFrame:
+        """5-minute bars aggregated from the cached 1-minute series"""
+        bars = self.get_1min_bars(symbol, start, end, fetch)
+        if bars.empty:
+            return pd.DataFrame()
+        return aggregate_1min_to_5min(bars)
+
+    def latest_5min_bars(self, symbol: str, hours_back: float) -> Optional[pd.DataFrame]:
+        """Most recent cached bars for a symbol without calling the API"""
+        series = self._load(symbol)
+        if series is None or series.bars.empty:
+            return None
+        bars = series.bars
+        tail = bars[bars.index >= bars.index[-1] - pd.Timedelta(hours=hours_back)]
+        return aggregate_1min_to_5min(tail)
+
+    def clear(self, remove_files: bool = False):
+        """Drop cached series (and their files when remove_files is set)"""
+        if remove_files and self.cache_dir:
+            for symbol in list(self._series):
+                if os.path.exists(self._path(symbol)):
+                    os.remove(self._path(symbol))
+        self._series.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        requests = self.stats['cache_hits'] + self.stats['partial_hits'] + self.stats['misses']
+        return dict(self.stats,
+                    symbols_cached=len(self._series),
+                    bars_cached=sum(len(s.bars) for s in self._series.values()),
+                    hit_rate=self.stats['cache_hits'] / requests if requests else 0.0)
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Streaming chart feed for the Dash IFD dashboard
+
+Keeps server-side bar and IFD marker buffers per chart view and turns
+each refresh into a small revisioned diff, so a browser that already has
+the figure receives only new candles, changed candles and changed IFD
+marker traces (applied with dash.Patch) instead of the whole figure:
+- One shared refresh per view per interval, however many tabs are open
+- Per-client cursor = last revision the client has applied
+- Full figure only on first load, view change or structural change
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+import pytz
+
+logger = logging.getLogger(__name__)
+
+EASTERN = pytz.timezone('US/Eastern')
+CANDLE_FIELDS = ('open', 'high', 'low', 'close')
+UP_COLOR = '#00FF00'
+DOWN_COLOR = '#FF0000'
+
+# Trace layout shared with NQDashAppIFD._create_chart
+CANDLE_TRACE = 0
+VOLUME_TRACE = 1
+FIRST_MARKER_TRACE = 2
+
+
+def build_ifd_marker_groups(df_display: pd.DataFrame, ifd_signals, config_data) -> Dict[str, Dict[str, list]]:
+    """
+    IFD marker points grouped by action, in sorted action order
+
+    Each signal is placed against the first bar within five minutes of its
+    window timestamp (located with a binary search) above the bar for buys
+    and below it otherwise. Actions with no placeable signals are omitted.
+    """
+    ifd_config = (config_data or {}).get('indicators', {}).get('ifd_v3', {})
+    if not ifd_signals or df_display.empty or not ifd_config.get('show_signals', True):
+        return {}
+
+    min_confidence = ifd_config.get('min_confidence_display', 0.7)
+    marker_sizes = ifd_config.get('marker_sizes', {
+        'EXTREME': 20,
+        'VERY_HIGH': 16,
+        'HIGH': 12,
+        'MODERATE': 8
+    })
+
+    index = df_display.index
+    highs = df_display['high'].to_numpy()
+    lows = df_display['low'].to_numpy()
+    window = pd.Timedelta(seconds=300)
+    groups: Dict[str, Dict[str, list]] = {}
+
+    for signal in ifd_signals:
+        if signal.max_confidence < min_confidence:
+            continue
+
+        signal_time = signal.window_timestamp
+        position = index.searchsorted(pd.Timestamp(signal_time) - window, side='right')
+        if position >= len(index) or index[position] - pd.Timestamp(signal_time) >= window:
+            continue
+
+        action = signal.dominant_action
+        high, low = highs[position], lows[position]
+        if action in ("STRONG_BUY", "BUY"):
+            price_level = high + (high - low) * 0.1
+        else:
+            price_level = low - (high - low) * 0.1
+
+        hover_text = (
+            f"IFD Signal<br>"
+            f"Action: {action}<br>"
+            f"Confidence: {signal.max_confidence:.1%}<br>"
+            f"Strength: {signal.window_strength}<br>"
+            f"Signals: {signal.signal_count}<br>"
+            f"Time: {signal_time.strftime('%H:%M')}"
+        )
+
+        group = groups.setdefault(action, {'timestamps': [], 'prices': [], 'hover_texts': [], 'sizes': []})
+        group['timestamps'].append(signal_time)
+        group['prices'].append(float(price_level))
+        group['hover_texts'].append(hover_text)
+        group['sizes'].append(marker_sizes.get(signal.window_strength, 8))
+
+    return {action: groups[action] for action in sorted(groups)}
+
+
+def candle_columns(df: pd.DataFrame) -> Dict[str, list]:
+    """Per-trace column lists for bars (UTC index), with Eastern display times"""
+    x = [ts.to_pydatetime() for ts in df.index.tz_convert(EASTERN)]
+    columns = {'x': x}
+    for field in CANDLE_FIELDS:
+        columns[field] = df[field].tolist()
+    columns['volume'] = df['volume'].tolist()
+    columns['color'] = [DOWN_COLOR if c < o else UP_COLOR for c, o in zip(columns['close'], columns['open'])]
+    return columns
+
+
+def patch_chart(target, update: Dict[str, Any], marker_actions: List[str]):
+    """
+    Apply a ChartFeed.updates_since() diff to a figure
+
+    ``target`` is a dash.Patch() or a plain figure dict; both support the
+    item assignment, deletion and extend operations used here.
+    """
+    data = target['data']
+    candles, volume = data[CANDLE_TRACE], data[VOLUME_TRACE]
+
+    for _ in range(update['trim']):
+        for field in ('x',) + CANDLE_FIELDS:
+            del candles[field][0]
+        del volume['x'][0]
+        del volume['y'][0]
+        del volume['marker']['color'][0]
+
+    for position, row in update['changed']:
+        for field in CANDLE_FIELDS:
+            candles[field][position] = row[field]
+        volume['y'][position] = row['volume']
+        volume['marker']['color'][position] = row['color']
+
+    appended = update['appended']
+    if appended['x']:
+        candles['x'].extend(appended['x'])
+        for field in CANDLE_FIELDS:
+            candles[field].extend(appended[field])
+        volume['x'].extend(appended['x'])
+        volume['y'].extend(appended['volume'])
+        volume['marker']['color'].extend(appended['color'])
+
+    for action, group in update['markers'].items():
+        trace = data[FIRST_MARKER_TRACE + marker_actions.index(action)]
+        trace['x'] = group['timestamps']
+        trace['y'] = group['prices']
+        trace['hovertext'] = group['hover_texts']
+        trace['marker']['size'] = group['sizes']
+    return target
+
+
+class ChartFeed:
+    """
+    Revisioned bar and IFD marker buffer for one chart view
+
+    Every bar remembers the revision it first appeared in and the revision
+    it last changed in; trimmed bars are logged so a client's front-trim
+    count can be derived from its cursor alone.
+    """
+
+    def __init__(self, trim_log_size: int = 5000):
+        self.bars = pd.DataFrame()
+        self.signals: list = []
+        self.config_data: Optional[Dict[str, Any]] = None
+        self.revision = 0
+        self.reset_revision = 0  # Cursors older than this need a full figure
+        self.marker_groups: Dict[str, Dict[str, list]] = {}
+        self._bar_revisions: Dict[pd.Timestamp, List[int]] = {}  # ts -> [first_rev, last_rev]
+        self._marker_revisions: Dict[str, int] = {}
+        self._trim_log: deque = deque(maxlen=trim_log_size)  # (trim_rev, first_rev)
+        self._horizon = 0  # Oldest cursor the trim log can still serve
+
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refreshed_at = float('-inf')
+
+        self.stats = {'refreshes': 0, 'shared_refreshes': 0, 'full_updates': 0,
+                      'incremental_updates': 0, 'bars_sent': 0}
+
+    @property
+    def marker_actions(self) -> List[str]:
+        return list(self.marker_groups)
+
+    def refresh(self, loader: Callable[[], Tuple[pd.DataFrame, list]],
+                config_data: Optional[Dict[str, Any]], max_age: float) -> bool:
+        """
+        Reload from ``loader`` unless another viewer refreshed within max_age
+
+        Concurrent callers wait for the in-flight refresh and reuse it.
+        Returns True when this call did the reload.
+        """
+        with self._refresh_lock:
+            if time.monotonic() - self._refreshed_at < max_age:
+                self.stats['shared_refreshes'] += 1
+                return False
+            df, signals = loader()
+            self.apply(df, signals, config_data)
+            self._refreshed_at = time.monotonic()
+            self.stats['refreshes'] += 1
+            return True
+
+    def apply(self, df: pd.DataFrame, signals, config_data: Optional[Dict[str, Any]]):
+        """Diff a freshly loaded window against the buffer and bump the revision"""
+        with self._lock:
+            revision = self.revision + 1
+            changed = False
+            old = self.bars
+            df = df.sort_index() if not df.index.is_monotonic_increasing else df
+
+            if old.empty or df.empty:
+                structural = not (old.empty and df.empty)
+                trimmed = []
+            else:
+                kept = old.index[old.index.isin(df.index)]
+                trimmed = old.index[~old.index.isin(df.index)]
+                new = df.index[~df.index.isin(old.index)]
+                # Only front trims and tail appends can be patched in place
+                structural = (
+                    (len(trimmed) and len(kept) and trimmed.max() > kept.min()) or
+                    (len(new) and new.min() < old.index.max())
+                )
+
+            if structural:
+                self._bar_revisions = {ts: [revision, revision] for ts in df.index}
+                self._trim_log.clear()
+                self.reset_revision = revision
+                changed = True
+            else:
+                for ts in trimmed:
+                    first, _ = self._bar_revisions.pop(ts)
+                    if len(self._trim_log) == self._trim_log.maxlen:
+                        self._horizon = self._trim_log[0][0]
+                    self._trim_log.append((revision, first))
+                    changed = True
+
+                common = df.index[df.index.isin(old.index)]
+                if len(common):
+                    columns = list(CANDLE_FIELDS) + ['volume']
+                    differs = (old.loc[common, columns] != df.loc[common, columns]).any(axis=1)
+                    for ts in common[differs.to_numpy()]:
+                        self._bar_revisions[ts][1] = revision
+                        changed = True
+                for ts in df.index:
+                    if ts not in self._bar_revisions:
+                        self._bar_revisions[ts] = [revision, revision]
+                        changed = True
+
+            groups = build_ifd_marker_groups(
+                df.tz_convert(EASTERN) if not df.empty else df, signals, config_data)
+            if list(groups) != list(self.marker_groups):
+                self.reset_revision = revision
+                self._marker_revisions = {action: revision for action in groups}
+                changed = True
+            else:
+                for action, group in groups.items():
+                    if group != self.marker_groups[action]:
+                        self._marker_revisions[action] = revision
+                        changed = True
+
+            self.bars = df
+            self.signals = list(signals or [])
+            self.config_data = config_data
+            self.marker_groups = groups
+            if changed:
+                self.revision = revision
+
+    def updates_since(self, cursor: Optional[int]) -> Optional[Dict[str, Any]]:
+        """
+        Diff for a client at ``cursor``, or None when it needs a full figure
+
+        Positions in ``changed`` index the client's arrays after ``trim``
+        bars have been removed from the front.
+        """
+        with self._lock:
+            if cursor is None or cursor < self.reset_revision or cursor < self._horizon \
+                    or cursor > self.revision:
+                self.stats['full_updates'] += 1
+                self.stats['bars_sent'] += len(self.bars)
+                return None
+
+            trim = sum(1 for trim_rev, first in self._trim_log if trim_rev > cursor and first <= cursor)
+            changed_positions, appended_from = [], len(self.bars)
+            for position, ts in enumerate(self.bars.index):
+                first, last = self._bar_revisions[ts]
+                if first > cursor:
+                    appended_from = position
+                    break
+                if last > cursor:
+                    changed_positions.append(position)
+
+            columns = candle_columns(self.bars.iloc[changed_positions]) if changed_positions else None
+            changed = [(position, {key: values[i] for key, values in columns.items()})
+                       for i, position in enumerate(changed_positions)]
+            appended = candle_columns(self.bars.iloc[appended_from:])
+            markers = {action: self.marker_groups[action]
+                       for action, rev in self._marker_revisions.items() if rev > cursor}
+
+            self.stats['incremental_updates'] += 1
+            self.stats['bars_sent'] += len(changed) + len(appended['x'])
+            return {'revision': self.revision, 'trim': trim, 'changed': changed,
+                    'appended': appended, 'markers': markers}
+
+
+class ChartFeedRegistry:
+    """Shared ChartFeeds keyed by view (symbol, hours, IFD config)"""
+
+    def __init__(self):
+        self._feeds: Dict[Tuple, ChartFeed] = {}
+        self._lock = threading.Lock()
+
+    def get(self, *view) -> ChartFeed:
+        with self._lock:
+            feed = self._feeds.get(view)
+            if feed is None:
+                feed = self._feeds[view] = ChartFeed()
+            return feed
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {repr(view): dict(feed.stats, revision=feed.revision)
+                    for view, feed in self._feeds.items()}
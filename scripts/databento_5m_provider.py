@@ -11,8 +11,9 @@ from datetime import datetime, timedelta
 from typing import Optional, Dict, List, Tuple
 import logging
 import pytz
-from data_aggregation import aggregate_1min_to_5min, MinuteToFiveMinuteAggregator
+from data_aggregation import MinuteToFiveMinuteAggregator
 from databento_auth import ensure_trading_safe_databento_client, DatabentoCriticalAuthError
+from bar_store import FiveMinuteBarStore
 import sys
 sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
 from utils.timezone_utils import (
@@ -33,7 +34,8 @@ logger = logging.getLogger(__name__)
 class Databento5MinuteProvider:
     """Provides 5-minute OHLCV bars using Databento 1-minute data"""
 
-    def __init__(self, api_key: Optional[str] = None, enable_ifd_signals: bool = True):
+    def __init__(self, api_key: Optional[str] = None, enable_ifd_signals: bool = True,
+                 bar_store: Optional[FiveMinuteBarStore] = None):
         """
         Initialize the provider with BULLETPROOF authentication
 
@@ -43,6 +45,7 @@ class Databento5MinuteProvider:
         Args:
             api_key: Optional API key (will use env if not provided)
             enable_ifd_signals: Whether to enable IFD signal integration
+            bar_store: Bar cache (defaults to a persisted FiveMinuteBarStore)
         """
         logger.info("🔐 Initializing TRADING-SAFE Databento provider...")
 
@@ -60,7 +63,7 @@ class Databento5MinuteProvider:
 
         self.live_client = None
         self.aggregator = MinuteToFiveMinuteAggregator()
-        self._cache = {}  # Simple in-memory cache
+        self.bar_store = bar_store or FiveMinuteBarStore()  # Event-time keyed bar cache
         self._live_data_buffer = []  # Buffer for live streaming data
         self._is_streaming = False
 
@@ -118,31 +121,14 @@ class Databento5MinuteProvider:
             if start is None or (end - start).total_seconds() / 3600 != hours_back:
                 start = end - timedelta(hours=hours_back)
 
-        # Check cache first
-        cache_key = f"{symbol}_{start.isoformat()}_{end.isoformat()}"
-        if cache_key in self._cache:
-            logger.info(f"Returning cached data for {symbol}")
-            return self._cache[cache_key]
-
         # Implement retry logic for data availability errors
         retry_count = 0
         max_retries = 3
 
         while retry_count <= max_retries:
             try:
-                logger.info(f"Fetching 1-minute bars for {symbol} from {start} to {end}")
-
-                # Fetch 1-minute data
-                data = self.client.timeseries.get_range(
-                    dataset="GLBX.MDP3",
-                    symbols=[symbol],
-                    schema="ohlcv-1m",
-                    start=start,
-                    end=end
-                )
-
-                # Convert to DataFrame
-                df_1min = data.to_df()
+                # Only the part of the range not already cached is fetched
+                df_5min = self.bar_store.get_5min_bars(symbol, start, end, self._fetch_1min_range)
                 break  # Success, exit retry loop
 
             except Exception as e:
@@ -178,9 +164,9 @@ class Databento5MinuteProvider:
 
                     raise
 
-        # Process the fetched data (df_1min should be defined from the while loop)
+        # Process the fetched data (df_5min should be defined from the while loop)
         try:
-            if df_1min.empty:
+            if df_5min.empty:
                 logger.warning(f"No data returned for {symbol}")
 
                 # Try cached data before returning empty
@@ -191,26 +177,11 @@ class Databento5MinuteProvider:
 
                 return pd.DataFrame()
 
-            # Ensure proper column names
-            df_1min = df_1min.rename(columns={
-                'open': 'open',
-                'high': 'high',
-                'low': 'low',
-                'close': 'close',
-                'volume': 'volume'
-            })
-
-            # Aggregate to 5-minute bars
-            df_5min = aggregate_1min_to_5min(df_1min)
-
-            # Cache the result
-            self._cache[cache_key] = df_5min
-
-            logger.info(f"Aggregated {len(df_1min)} 1-min bars to {len(df_5min)} 5-min bars")
+            logger.info(f"Returning {len(df_5min)} 5-min bars for {symbol}")
             return df_5min
 
         except NameError:
-            # df_1min was never defined (all retries failed)
+            # df_5min was never defined (all retries failed)
             logger.error("All data fetch attempts failed")
 
             # Try cached data as final fallback
@@ -230,6 +201,18 @@ class Databento5MinuteProvider:
                 f"Fix the data connection before resuming trading."
             )
 
+    def _fetch_1min_range(self, symbol: str, start: datetime, end: datetime) -> Tuple[pd.DataFrame, int]:
+        """Fetch 1-minute bars for [start, end) and the bytes transferred"""
+        logger.info(f"Fetching 1-minute bars for {symbol} from {start} to {end}")
+        data = self.client.timeseries.get_range(
+            dataset="GLBX.MDP3",
+            symbols=[symbol],
+            schema="ohlcv-1m",
+            start=start,
+            end=end
+        )
+        return data.to_df(), getattr(data, 'nbytes', None)
+
     # 🚫 REMOVED DANGEROUS DEMO DATA GENERATION
     # Demo data fallback was REMOVED for trading safety
     # Using fake data could cause financial losses
@@ -393,9 +376,13 @@ class Databento5MinuteProvider:
 
     def clear_cache(self):
         """Clear the data cache"""
-        self._cache.clear()
+        self.bar_store.clear(remove_files=True)
         logger.info("Cache cleared")
 
+    def get_cache_stats(self) -> Dict[str, any]:
+        """Bar cache hits, bytes fetched and estimated API cost"""
+        return self.bar_store.get_stats()
+
     def get_cached_data_fallback(self, symbol: str, hours_back: float) -> Optional[pd.DataFrame]:
         """
         Try to find any cached data that might be useful as a fallback
@@ -407,18 +394,12 @@ class Databento5MinuteProvider:
         Returns:
             DataFrame if cached data found, None otherwise
         """
-        # Look for any cache entries for this symbol
-        symbol_caches = [(k, v) for k, v in self._cache.items() if k.startswith(f"{symbol}_")]
-
-        if not symbol_caches:
+        cached = self.bar_store.latest_5min_bars(symbol, hours_back)
+        if cached is None or cached.empty:
             return None
 
-        # Sort by recency (assuming cache keys have timestamps)
-        symbol_caches.sort(key=lambda x: x[0], reverse=True)
-
-        # Return the most recent cached data
         logger.warning(f"Using cached data as fallback for {symbol}")
-        return symbol_caches[0][1]
+        return cached
 
     # ============================================================================
     # IFD Signal Integration Methods
@@ -11,7 +11,7 @@ sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
 
 import json
 import dash
-from dash import dcc, html, Input, Output, callback, State
+from dash import dcc, html, Input, Output, callback, State, Patch, no_update, callback_context
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
@@ -26,6 +26,7 @@ import time
 import pytz
 
 from databento_5m_provider import Databento5MinuteProvider
+from chart_stream import ChartFeedRegistry, build_ifd_marker_groups, candle_columns, patch_chart
 
 # Import timezone utilities for proper futures market hours
 sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'utils'))
@@ -72,6 +73,9 @@ class NQDashAppIFD:
         # Initialize data provider with IFD support
         self.data_provider = Databento5MinuteProvider(enable_ifd_signals=IFD_AVAILABLE)
 
+        # Shared per-view bar/signal buffers: one refresh per interval for all tabs
+        self.chart_feeds = ChartFeedRegistry()
+
         # Start live streaming in a separate thread
         import threading
         self.streaming_thread = threading.Thread(
@@ -259,7 +263,10 @@ class NQDashAppIFD:
             ),
 
             # Store for configuration data
-            dcc.Store(id='config-store')
+            dcc.Store(id='config-store'),
+
+            # Per-client cursor: chart view and last feed revision applied
+            dcc.Store(id='chart-cursor')
 
         ], style={'backgroundColor': '#1E1E1E', 'minHeight': '100vh', 'padding': '20px'})
 
@@ -357,15 +364,17 @@ class NQDashAppIFD:
             [Output('live-chart', 'figure'),
              Output('last-update-time', 'children'),
              Output('price-display', 'children'),
-             Output('statistics-display', 'children')],
+             Output('statistics-display', 'children'),
+             Output('chart-cursor', 'data')],
             [Input('interval-component', 'n_intervals'),
              Input('symbol-input', 'value'),
              Input('hours-dropdown', 'value'),
              Input('reset-button', 'n_clicks'),
              Input('ifd-config-dropdown', 'value')],
-            [State('config-store', 'data')]
+            [State('config-store', 'data'),
+             State('chart-cursor', 'data')]
         )
-        def update_chart(n_intervals, symbol, hours, reset_clicks, ifd_config_name, config_data):
+        def update_chart(n_intervals, symbol, hours, reset_clicks, ifd_config_name, config_data, cursor):
             """Update the chart with latest data and IFD signals"""
             try:
                 # Update instance variables
@@ -375,26 +384,30 @@ class NQDashAppIFD:
                 # Calculate number of bars needed
                 bars_needed = (self.hours * 60) // 5
 
-                # Get data based on whether IFD is enabled
-                current_time = datetime.now(pytz.UTC)
-
                 # Check if IFD is enabled from dropdown
-                ifd_enabled = ifd_config_name and ifd_config_name != 'default'
-
-                if ifd_enabled:
-                    # Get data with IFD signals
-                    df, ifd_signals = self.data_provider.get_latest_bars_with_ifd(
-                        symbol=self.symbol,
-                        count=bars_needed
-                    )
-                    logger.info(f"Retrieved {len(df)} bars and {len(ifd_signals)} IFD signals")
-                else:
+                ifd_enabled = bool(ifd_config_name and ifd_config_name != 'default')
+                view = [self.symbol, self.hours, ifd_config_name or 'default']
+
+                def load():
+                    if ifd_enabled:
+                        # Get data with IFD signals
+                        df, ifd_signals = self.data_provider.get_latest_bars_with_ifd(
+                            symbol=self.symbol,
+                            count=bars_needed
+                        )
+                        logger.info(f"Retrieved {len(df)} bars and {len(ifd_signals)} IFD signals")
+                        return df, ifd_signals
                     # Get regular OHLCV data
-                    df = self.data_provider.get_latest_bars(
+                    return self.data_provider.get_latest_bars(
                         symbol=self.symbol,
                         count=bars_needed
-                    )
-                    ifd_signals = []
+                    ), []
+
+                # Viewers of the same chart share one refresh per half interval
+                feed = self.chart_feeds.get(*view)
+                feed.refresh(load, config_data if ifd_enabled else None,
+                             max_age=self.update_interval / 2000)
+                df, ifd_signals = feed.bars, feed.signals
 
                 if df.empty:
                     # Create demo mode chart
@@ -412,10 +425,22 @@ class NQDashAppIFD:
                     else:
                         status_msg = "Markets Closed - Showing Sample Data"
 
-                    return fig, format_eastern_display(), "Demo Mode", status_msg
+                    return fig, format_eastern_display(), "Demo Mode", status_msg, None
 
-                # Create chart
-                fig = self._create_chart(df, ifd_signals, config_data)
+                # Only interval ticks on an unchanged view can be patched
+                triggered = [t['prop_id'] for t in callback_context.triggered]
+                incremental = (cursor and cursor.get('view') == view and
+                               triggered == ['interval-component.n_intervals'])
+                update = feed.updates_since(cursor['revision']) if incremental else None
+
+                if update is None:
+                    # Create chart
+                    fig = self._create_chart(df, ifd_signals, feed.config_data)
+                elif update['trim'] or update['changed'] or update['appended']['x'] or update['markers']:
+                    fig = patch_chart(Patch(), update, cursor['actions'])
+                else:
+                    fig = no_update
+                new_cursor = {'view': view, 'revision': feed.revision, 'actions': feed.marker_actions}
 
                 # Update status
                 last_price = df['close'].iloc[-1]
@@ -428,13 +453,13 @@ class NQDashAppIFD:
                 if ifd_signals:
                     stats_display += f" | IFD Signals: {len(ifd_signals)}"
 
-                return fig, format_eastern_display(), price_display, stats_display
+                return fig, format_eastern_display(), price_display, stats_display, new_cursor
 
             except Exception as e:
                 logger.error(f"Error updating chart: {e}")
                 # Create demo chart on error
                 fig, _ = self._create_demo_chart_with_data()
-                return fig, format_eastern_display(), "Error", f"Chart update failed: {str(e)}"
+                return fig, format_eastern_display(), "Error", f"Chart update failed: {str(e)}", None
 
     def _create_chart(self, df, ifd_signals=None, config_data=None):
         """Create plotly chart with optional IFD overlay"""
@@ -452,13 +477,16 @@ class NQDashAppIFD:
             row_heights=[0.7, 0.3]
         )
 
+        # Plain lists (not typed arrays) so incremental patches can extend them
+        columns = candle_columns(df)
+
         # Add candlestick chart
         candlestick = go.Candlestick(
-            x=df_display.index,
-            open=df_display['open'],
-            high=df_display['high'],
-            low=df_display['low'],
-            close=df_display['close'],
+            x=columns['x'],
+            open=columns['open'],
+            high=columns['high'],
+            low=columns['low'],
+            close=columns['close'],
             name='Price',
             increasing_line_color='#00FF00',
             decreasing_line_color='#FF0000'
@@ -466,14 +494,11 @@ class NQDashAppIFD:
         fig.add_trace(candlestick, row=1, col=1)
 
         # Add volume bars
-        colors = ['#FF0000' if close < open else '#00FF00'
-                 for close, open in zip(df_display['close'], df_display['open'])]
-
         volume_bars = go.Bar(
-            x=df_display.index,
-            y=df_display['volume'],
+            x=columns['x'],
+            y=columns['volume'],
             name='Volume',
-            marker_color=colors,
+            marker_color=columns['color'],
             opacity=0.7
         )
         fig.add_trace(volume_bars, row=2, col=1)
@@ -534,68 +559,14 @@ class NQDashAppIFD:
                 return
 
             # Configuration settings
-            min_confidence = ifd_config.get('min_confidence_display', 0.7)
             signal_colors = ifd_config.get('signal_colors', {
                 'STRONG_BUY': '#00FF00',
                 'BUY': '#32CD32',
                 'MONITOR': '#FFA500',
                 'IGNORE': '#808080'
             })
-            marker_sizes = ifd_config.get('marker_sizes', {
-                'EXTREME': 20,
-                'VERY_HIGH': 16,
-                'HIGH': 12,
-                'MODERATE': 8
-            })
-
-            # Process signals for display
-            signal_groups = {}
-
-            for signal in ifd_signals:
-                if signal.max_confidence < min_confidence:
-                    continue
-
-                action = signal.dominant_action
-                if action not in signal_groups:
-                    signal_groups[action] = {
-                        'timestamps': [],
-                        'prices': [],
-                        'hover_texts': [],
-                        'sizes': []
-                    }
-
-                # Find matching OHLCV bar for price placement
-                signal_time = signal.window_timestamp
-                matching_bar = None
-                for idx, bar_time in enumerate(df_display.index):
-                    if abs((bar_time.to_pydatetime() - signal_time).total_seconds()) < 300:
-                        matching_bar = df_display.iloc[idx]
-                        break
-
-                if matching_bar is not None:
-                    # Position signal relative to candlestick
-                    if action in ["STRONG_BUY", "BUY"]:
-                        price_level = matching_bar['high'] + (matching_bar['high'] - matching_bar['low']) * 0.1
-                    else:
-                        price_level = matching_bar['low'] - (matching_bar['high'] - matching_bar['low']) * 0.1
-
-                    # Create hover text
-                    hover_text = (
-                        f"IFD Signal<br>"
-                        f"Action: {action}<br>"
-                        f"Confidence: {signal.max_confidence:.1%}<br>"
-                        f"Strength: {signal.window_strength}<br>"
-                        f"Signals: {signal.signal_count}<br>"
-                        f"Time: {signal_time.strftime('%H:%M')}"
-                    )
-
-                    signal_groups[action]['timestamps'].append(signal_time)
-                    signal_groups[action]['prices'].append(price_level)
-                    signal_groups[action]['hover_texts'].append(hover_text)
-
-                    # Determine marker size
-                    size = marker_sizes.get(signal.window_strength, 8)
-                    signal_groups[action]['sizes'].append(size)
+            # Process signals for display (sorted by action, matching ChartFeed)
+            signal_groups = build_ifd_marker_groups(df_display, ifd_signals, config_data)
 
             # Add trace for each signal action type
             for action, group_data in signal_groups.items():
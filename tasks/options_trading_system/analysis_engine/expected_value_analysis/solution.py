@@ -16,6 +16,13 @@ parent_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__f
 sys.path.insert(0, parent_dir)
 from data_ingestion.integration import run_data_ingestion
 
+# Vectorized EV engine requires NumPy; fall back to the scalar loop without it
+try:
+    from .ev_engine import VectorizedEVEngine
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
 
 # Configuration from your actual algorithm
 WEIGHTS = {
@@ -78,12 +85,18 @@ class ExpectedValueAnalyzer:
         self.max_risk = config.get("max_risk", MAX_RISK)
         self.min_risk_reward = config.get("min_risk_reward", MIN_RISK_REWARD)
 
+        # Vectorized engine (default when NumPy is installed) and optional top-K cut
+        self.top_k = config.get("top_k")
+        self.engine = None
+        if NUMPY_AVAILABLE and config.get("use_vectorized_engine", True):
+            self.engine = VectorizedEVEngine(self.weights, self.max_risk, self.min_risk_reward)
+
         self.data = None
         self.analysis_results = None
 
-    def load_normalized_data(self, data_config: Dict[str, Any]) -> Dict[str, Any]:
-        """Load normalized data from data ingestion pipeline"""
-        pipeline_result = run_data_ingestion(data_config)
+    def load_normalized_data(self, data_config: Dict[str, Any], snapshot=None) -> Dict[str, Any]:
+        """Load normalized data from a shared MarketSnapshot or the data ingestion pipeline"""
+        pipeline_result = snapshot.pipeline_result if snapshot is not None else run_data_ingestion(data_config)
 
         if pipeline_result["pipeline_status"] != "success":
             raise ValueError("Data ingestion pipeline failed")
@@ -228,9 +241,41 @@ class ExpectedValueAnalyzer:
 
         return probability
 
-    def calculate_ev_combinations(self, current_price: float,
-                                 strikes: List[OptionsStrike]) -> List[TradeSetup]:
-        """Calculate EV for all valid TP/SL combinations (from your algorithm)"""
+    def calculate_ev_combinations(self, current_price: float, strikes: List[OptionsStrike],
+                                 top_k: Optional[int] = None) -> List[TradeSetup]:
+        """
+        Calculate EV for all valid TP/SL combinations (from your algorithm)
+
+        Args:
+            current_price: Current underlying price
+            strikes: Options chain as OptionsStrike objects
+            top_k: Only materialize the K best setups (None returns all)
+
+        Returns:
+            TradeSetups sorted by EV descending
+        """
+        if self.engine is not None:
+            combos = self.engine.score(current_price, strikes)
+            return self._materialize_setups(combos, self.engine.rank(combos, top_k=top_k))
+
+        setups = self._calculate_ev_combinations_scalar(current_price, strikes)
+        return setups[:top_k] if top_k is not None else setups
+
+    def _materialize_setups(self, combos, indices) -> List[TradeSetup]:
+        """Build TradeSetup objects for ranked engine indices only"""
+        return [
+            TradeSetup(
+                float(combos.tp[i]), float(combos.sl[i]),
+                'long' if combos.is_long[i] else 'short',
+                float(combos.probability[i]), float(combos.reward[i]),
+                float(combos.risk[i]), float(combos.ev[i])
+            )
+            for i in indices
+        ]
+
+    def _calculate_ev_combinations_scalar(self, current_price: float,
+                                          strikes: List[OptionsStrike]) -> List[TradeSetup]:
+        """Reference O(S³) loop, used when NumPy is unavailable"""
 
         setups = []
 
@@ -330,20 +375,36 @@ class ExpectedValueAnalyzer:
 
         return report_data
 
-    def analyze_expected_value(self, data_config: Dict[str, Any]) -> Dict[str, Any]:
+    def analyze_expected_value(self, data_config: Dict[str, Any], snapshot=None) -> Dict[str, Any]:
         """Run complete expected value analysis using your algorithm"""
 
         # Load data
-        data = self.load_normalized_data(data_config)
+        data = self.load_normalized_data(data_config, snapshot)
 
         # Convert to OptionsStrike format
         strikes = self.convert_to_options_strikes(data["contracts"])
 
-        # Calculate EV for all combinations
-        all_setups = self.calculate_ev_combinations(data["underlying_price"], strikes)
+        if self.engine is not None:
+            # Score every combination as arrays, then materialize only quality setups
+            combos = self.engine.score(data["underlying_price"], strikes)
+            quality_mask = self.engine.quality_mask(combos, self.min_ev, self.min_probability)
+            ranked = self.engine.rank(combos, mask=quality_mask)
+            quality_setups = self._materialize_setups(
+                combos, ranked[:self.top_k] if self.top_k is not None else ranked)
+            setups_generated = combos.count
+            quality_count = len(ranked)
+            avg_probability = sum(combos.probability[ranked].tolist()) / quality_count if quality_count else 0
+        else:
+            # Calculate EV for all combinations
+            all_setups = self.calculate_ev_combinations(data["underlying_price"], strikes)
 
-        # Filter quality setups
-        quality_setups = self.filter_quality_setups(all_setups)
+            # Filter quality setups
+            quality_setups = self.filter_quality_setups(all_setups)
+            setups_generated = len(all_setups)
+            quality_count = len(quality_setups)
+            avg_probability = sum(s.probability for s in quality_setups) / quality_count if quality_count else 0
+            if self.top_k is not None:
+                quality_setups = quality_setups[:self.top_k]
 
         # Generate trading report
         trading_report = self.generate_trading_report(data["underlying_price"], quality_setups)
@@ -357,8 +418,8 @@ class ExpectedValueAnalyzer:
             "analysis_config": self.config,
             "strikes_analyzed": len(strikes),
             "contracts_analyzed": len(data["contracts"]),
-            "setups_generated": len(all_setups),
-            "quality_setups": len(quality_setups),
+            "setups_generated": setups_generated,
+            "quality_setups": quality_count,
             "trading_report": trading_report,
             "top_setups": [
                 {
@@ -375,10 +436,10 @@ class ExpectedValueAnalyzer:
             ],
             "metrics": {
                 "total_strikes": len(strikes),
-                "valid_combinations": len(all_setups),
-                "quality_ratio": len(quality_setups) / len(all_setups) if all_setups else 0,
+                "valid_combinations": setups_generated,
+                "quality_ratio": quality_count / setups_generated if setups_generated else 0,
                 "best_ev": quality_setups[0].ev if quality_setups else 0,
-                "avg_probability": sum(s.probability for s in quality_setups) / len(quality_setups) if quality_setups else 0
+                "avg_probability": avg_probability
             }
         }
 
@@ -386,16 +447,18 @@ class ExpectedValueAnalyzer:
 
 
 # Module-level function for easy integration
-def analyze_expected_value(data_config: Dict[str, Any], analysis_config: Dict[str, Any]) -> Dict[str, Any]:
+def analyze_expected_value(data_config: Dict[str, Any], analysis_config: Dict[str, Any],
+                           snapshot=None) -> Dict[str, Any]:
     """
     Analyze expected value using your actual NQ EV algorithm
 
     Args:
         data_config: Configuration for data sources
         analysis_config: Configuration for EV analysis
+        snapshot: Optional shared MarketSnapshot (skips data ingestion)
 
     Returns:
         Dict with analysis results
     """
     analyzer = ExpectedValueAnalyzer(analysis_config)
-    return analyzer.analyze_expected_value(data_config)
+    return analyzer.analyze_expected_value(data_config, snapshot)
@@ -0,0 +1,223 @@
+"""
+IFD v3.0 Baseline Context Cache
+
+Bounded cache for per-(strike, option_type) baseline contexts:
+- LRU eviction at a fixed capacity
+- Stale-while-revalidate: an expired or invalidated entry is still served
+  while one background thread recomputes it
+- Refreshes for the same key are coalesced, so a burst of invalidations
+  costs at most one recompute in flight plus one queued behind it
+- Optional minimum refresh interval per key: an entry invalidated soon
+  after it was loaded keeps being served as a hit until the interval ends
+- Hit/miss/refresh counters and refresh latency for monitoring
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry:
+    __slots__ = ('value', 'loaded_at', 'stale')
+
+    def __init__(self, value: Any, loaded_at: float):
+        self.value = value
+        self.loaded_at = loaded_at
+        self.stale = False
+
+
+class BaselineContextCache:
+    """
+    Thread-safe LRU cache with background stale-while-revalidate refresh
+
+    Args:
+        compute: Builds the value for a key (called off the lock)
+        capacity: Maximum number of cached keys
+        ttl_seconds: Age after which an entry is served stale and refreshed
+        background_refresh: Refresh stale entries on a worker thread; when
+            False, stale entries are recomputed synchronously
+        min_refresh_seconds: Invalidations within this long of an entry's
+            load are deferred until it has passed (0 refreshes at once)
+        refresh: Builds the value on the background thread (defaults to compute)
+    """
+
+    def __init__(self, compute: Callable[[Hashable], Any], capacity: int = 4096,
+                 ttl_seconds: float = 3600.0, background_refresh: bool = True,
+                 min_refresh_seconds: float = 0.0,
+                 refresh: Optional[Callable[[Hashable], Any]] = None):
+        self.compute = compute
+        self.refresh = refresh or compute
+        self.capacity = max(1, capacity)
+        self.ttl_seconds = ttl_seconds
+        self.background_refresh = background_refresh
+        self.min_refresh_seconds = min_refresh_seconds
+
+        self._entries: 'OrderedDict[Hashable, _Entry]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing = set()  # Keys with a refresh in flight
+        self._requeue = set()  # Keys invalidated again while refreshing
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._closed = False
+
+        self.stats = {
+            'hits': 0, 'stale_hits': 0, 'misses': 0, 'refreshes': 0, 'refresh_errors': 0,
+            'invalidations': 0, 'deferred_refreshes': 0, 'evictions': 0,
+            'refresh_ms_total': 0.0, 'refresh_ms_max': 0.0
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Cached value or None on a miss (never computes)
+
+        A stale value is returned as-is and a refresh is scheduled, unless
+        the entry is younger than min_refresh_seconds.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            age = time.monotonic() - entry.loaded_at
+            if age < self.ttl_seconds and (not entry.stale or age < self.min_refresh_seconds):
+                if entry.stale:
+                    self.stats['deferred_refreshes'] += 1
+                self.stats['hits'] += 1
+                return entry.value
+            self.stats['stale_hits'] += 1
+            value = entry.value
+
+        if self.background_refresh and not self._closed:
+            self._schedule_refresh(key)
+            return value
+        return self._refresh(key)
+
+    def get_or_compute(self, key: Hashable) -> Any:
+        """Cached value, computing it synchronously on a miss"""
+        value = self.get(key)
+        if value is None:
+            value = self._refresh(key)
+        return value
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            self._store(key, value)
+
+    def _store(self, key: Hashable, value: Any):
+        self._entries[key] = _Entry(value, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def invalidate(self, key: Hashable):
+        """Mark a key stale; the next get() serves it and triggers a refresh"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry.stale = True
+            self.stats['invalidations'] += 1
+            if key in self._refreshing:
+                # The refresh in flight may have read the data before this change
+                self._requeue.add(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _refresh(self, key: Hashable, compute: Optional[Callable[[Hashable], Any]] = None) -> Any:
+        started = time.perf_counter()
+        try:
+            value = (compute or self.compute)(key)
+        except Exception:
+            with self._lock:
+                self.stats['refresh_errors'] += 1
+            raise
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._store(key, value)
+            self.stats['refreshes'] += 1
+            self.stats['refresh_ms_total'] += elapsed_ms
+            self.stats['refresh_ms_max'] = max(self.stats['refresh_ms_max'], elapsed_ms)
+        return value
+
+    def _schedule_refresh(self, key: Hashable):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='baseline-refresh')
+            executor = self._executor
+        try:
+            executor.submit(self._background_refresh, key)
+        except RuntimeError:  # Shut down concurrently
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _background_refresh(self, key: Hashable):
+        while True:
+            try:
+                self._refresh(key, self.refresh)
+            except Exception as e:
+                logger.error(f"Baseline refresh for {key} failed: {e}")
+            with self._lock:
+                if key in self._requeue and key in self._entries and not self._closed:
+                    self._requeue.discard(key)
+                    self._entries[key].stale = True
+                    if self.min_refresh_seconds <= 0:
+                        continue
+                    # Debounced: the next get() after the interval refreshes it
+                self._requeue.discard(key)
+                self._refreshing.discard(key)
+                return
+
+    def wait_for_refreshes(self, timeout: float = 5.0) -> bool:
+        """Block until no refresh is in flight (tests and shutdown)"""
+        deadline = time.monotonic() + timeout
+        while self._refreshing:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.001)
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            size = len(self._entries)
+        lookups = stats['hits'] + stats['stale_hits'] + stats['misses']
+        return {
+            'size': size,
+            'capacity': self.capacity,
+            'hits': stats['hits'],
+            'stale_hits': stats['stale_hits'],
+            'misses': stats['misses'],
+            'hit_rate': (stats['hits'] + stats['stale_hits']) / lookups if lookups else 0.0,
+            'invalidations': stats['invalidations'],
+            'deferred_refreshes': stats['deferred_refreshes'],
+            'evictions': stats['evictions'],
+            'refreshes': stats['refreshes'],
+            'refresh_errors': stats['refresh_errors'],
+            'avg_refresh_ms': stats['refresh_ms_total'] / stats['refreshes'] if stats['refreshes'] else 0.0,
+            'max_refresh_ms': stats['refresh_ms_max']
+        }
+
+    def close(self):
+        """Stop the refresh thread; later stale reads recompute synchronously"""
+        with self._lock:
+            self._closed = True
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
@@ -12,9 +12,8 @@ import logging
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from utils.timezone_utils import get_eastern_time, get_utc_time
-import sqlite3
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from collections import defaultdict
+from collections import defaultdict, deque
 import threading
 
 from .solution import (
@@ -36,8 +35,8 @@ class OptimizedBaselineManager(HistoricalBaselineManager):
         # Extract db_path from config or use default
         db_path = config.get('db_path', 'outputs/ifd_v3_baselines.db')
         lookback_days = config.get('lookback_days', 20)
-        super().__init__(db_path, lookback_days)
-        self._cache_lock = threading.Lock()
+        super().__init__(db_path, lookback_days, write_behind=config.get('write_behind_history', True),
+                         min_refresh_seconds=config.get('baseline_min_refresh_seconds', 5.0))
         self._batch_cache = {}
 
     def batch_get_baseline_contexts(self, strikes_and_types: List[Tuple[float, str]]) -> Dict[str, BaselineContext]:
@@ -53,17 +52,12 @@ class OptimizedBaselineManager(HistoricalBaselineManager):
         results = {}
         uncached_keys = []
 
-        # Check cache first
-        with self._cache_lock:
-            for strike, option_type in strikes_and_types:
-                cache_key = f"{strike}_{option_type}"
-
-                if cache_key in self.baseline_cache:
-                    cached_data, cache_time = self.baseline_cache[cache_key]
-                    if get_eastern_time() - cache_time < self.cache_expiry:
-                        results[cache_key] = cached_data
-                        continue
-
+        # Check cache first (stale entries are served and refreshed in the background)
+        for strike, option_type in strikes_and_types:
+            cached = self.baseline_cache.get((strike, option_type))
+            if cached is not None:
+                results[f"{strike}_{option_type}"] = cached
+            else:
                 uncached_keys.append((strike, option_type))
 
         # Batch calculate uncached baselines
@@ -71,11 +65,9 @@ class OptimizedBaselineManager(HistoricalBaselineManager):
             batch_baselines = self._batch_calculate_baseline_stats(uncached_keys)
 
             # Update cache and results
-            with self._cache_lock:
-                for (strike, option_type), baseline in batch_baselines.items():
-                    cache_key = f"{strike}_{option_type}"
-                    self.baseline_cache[cache_key] = (baseline, get_eastern_time())
-                    results[cache_key] = baseline
+            for (strike, option_type), baseline in batch_baselines.items():
+                self.baseline_cache.put((strike, option_type), baseline)
+                results[f"{strike}_{option_type}"] = baseline
 
         return results
 
@@ -86,7 +78,7 @@ class OptimizedBaselineManager(HistoricalBaselineManager):
         results = {}
         cutoff_date = (get_eastern_time() - timedelta(days=self.lookback_days)).strftime('%Y-%m-%d')
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             # Build query for all strikes
             placeholders = []
             params = []
@@ -202,31 +194,31 @@ class OptimizedBaselineManager(HistoricalBaselineManager):
         if not pressure_metrics_list:
             return
 
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-
-            data_to_insert = []
-            for pm in pressure_metrics_list:
-                date_str = pm.time_window.strftime('%Y-%m-%d')
-                total_volume = pm.bid_volume + pm.ask_volume
-
-                data_to_insert.append((
-                    pm.strike,
-                    pm.option_type,
-                    date_str,
-                    pm.pressure_ratio,
-                    total_volume,
-                    pm.confidence,
-                    get_eastern_time().isoformat()
-                ))
-
-            cursor.executemany("""
-                INSERT OR REPLACE INTO historical_pressure
-                (strike, option_type, date, pressure_ratio, volume_total, confidence, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, data_to_insert)
-
-            conn.commit()
+        data_to_insert = []
+        for pm in pressure_metrics_list:
+            date_str = pm.time_window.strftime('%Y-%m-%d')
+            total_volume = pm.bid_volume + pm.ask_volume
+
+            data_to_insert.append((
+                pm.strike,
+                pm.option_type,
+                date_str,
+                pm.pressure_ratio,
+                total_volume,
+                pm.confidence,
+                get_eastern_time().isoformat()
+            ))
+
+        if self.write_behind:
+            self.store.executemany_async(self.HISTORY_UPSERT_SQL, data_to_insert)
+        else:
+            with self.store.connection() as conn:
+                cursor = conn.cursor()
+                cursor.executemany(self.HISTORY_UPSERT_SQL, data_to_insert)
+                conn.commit()
+
+        for pm in pressure_metrics_list:
+            self.baseline_cache.invalidate((pm.strike, pm.option_type))
 
 
 class OptimizedIFDv3Analyzer(IFDv3Analyzer):
@@ -250,6 +242,7 @@ class OptimizedIFDv3Analyzer(IFDv3Analyzer):
         self.max_workers = config.get('max_workers', 4)
 
         # Initialize tracking
+        self.stage_latencies = {stage: deque(maxlen=self.LATENCY_SAMPLES) for stage in self.LATENCY_STAGES}
         self.recent_signals = []
         self.total_signals = 0
         self.total_events = 0
@@ -372,6 +365,7 @@ def run_optimized_ifd_v3_analysis(pressure_data: List[PressureMetrics], config:
     Returns:
         Analysis results with institutional signals
     """
+    analyzer = None
     try:
         # Add optimization config if not present
         if 'max_workers' not in config:
@@ -409,3 +403,8 @@ def run_optimized_ifd_v3_analysis(pressure_data: List[PressureMetrics], config:
             'signals_generated': 0,
             'signal_rate': 0.0
         }
+
+    finally:
+        # Commit write-behind history before the analyzer is dropped
+        if analyzer is not None:
+            analyzer.close()
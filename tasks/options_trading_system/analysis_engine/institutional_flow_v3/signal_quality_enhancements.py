@@ -20,6 +20,7 @@ from .solution import (
     PressureMetrics, InstitutionalSignalV3, BaselineContext,
     PressureAnalysis, MarketMakingAnalysis
 )
+from .strike_index import strike_bounds
 
 logger = logging.getLogger(__name__)
 
@@ -60,6 +61,7 @@ class SignalQualityEnhancer:
 
         # OPTIMIZATION: Cache for fast strike lookups
         self._sorted_signals_cache = []
+        self._sorted_strikes_cache = []
         self._cache_needs_refresh = True
 
     def enhance_signal_quality(self,
@@ -215,6 +217,7 @@ class SignalQualityEnhancer:
         if not hasattr(self, '_sorted_signals_cache') or self._cache_needs_refresh:
             # Sort signals by strike for binary search O(n log n) once per batch
             self._sorted_signals_cache = sorted(nearby_signals, key=lambda s: s.strike)
+            self._sorted_strikes_cache = [s.strike for s in self._sorted_signals_cache]
             self._cache_needs_refresh = False
 
         sorted_signals = self._sorted_signals_cache
@@ -222,14 +225,13 @@ class SignalQualityEnhancer:
         target_direction = signal.expected_direction
         strike_range = 50  # 50 points range
 
-        # Binary search for lower bound (target_strike - 50)
-        left = self._binary_search_lower_bound(sorted_signals, target_strike - strike_range)
-        # Binary search for upper bound (target_strike + 50)
-        right = self._binary_search_upper_bound(sorted_signals, target_strike + strike_range)
+        # Binary search for [target_strike - 50, target_strike + 50]
+        left, right = strike_bounds(self._sorted_strikes_cache, target_strike - strike_range,
+                                    target_strike + strike_range)
 
         # Filter candidates in the strike range
         coordinated_signals = []
-        for i in range(left, min(right + 1, len(sorted_signals))):
+        for i in range(left, right):
             other_signal = sorted_signals[i]
             if (other_signal.strike != target_strike and
                 other_signal.expected_direction == target_direction):
@@ -237,28 +239,6 @@ class SignalQualityEnhancer:
 
         return coordinated_signals
 
-    def _binary_search_lower_bound(self, sorted_signals: List[InstitutionalSignalV3], target: float) -> int:
-        """Binary search for lower bound - O(log n)"""
-        left, right = 0, len(sorted_signals)
-        while left < right:
-            mid = (left + right) // 2
-            if sorted_signals[mid].strike < target:
-                left = mid + 1
-            else:
-                right = mid
-        return left
-
-    def _binary_search_upper_bound(self, sorted_signals: List[InstitutionalSignalV3], target: float) -> int:
-        """Binary search for upper bound - O(log n)"""
-        left, right = 0, len(sorted_signals)
-        while left < right:
-            mid = (left + right) // 2
-            if sorted_signals[mid].strike <= target:
-                left = mid + 1
-            else:
-                right = mid
-        return left - 1
-
     def _calculate_baseline_strength(self, baseline_context: BaselineContext) -> float:
         """
         Calculate strength of baseline anomaly
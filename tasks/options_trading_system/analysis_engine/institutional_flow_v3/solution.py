@@ -24,10 +24,11 @@ Architecture Integration:
 import os
 import sys
 import json
+import time
 import logging
-import sqlite3
 from datetime import datetime, timedelta, timezone
 from utils.timezone_utils import get_eastern_time, get_utc_time
+from utils.sqlite_store import get_store
 from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
 from dataclasses import dataclass, asdict
@@ -43,6 +44,13 @@ sys.path.insert(0, parent_dir)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+try:
+    from .baseline_cache import BaselineContextCache
+    from .strike_index import StrikeCoordinationIndex
+except ImportError:
+    from baseline_cache import BaselineContextCache
+    from strike_index import StrikeCoordinationIndex
+
 # Import MBO pressure metrics from Phase 1
 try:
     from data_ingestion.databento_api.solution import PressureMetrics, MBODatabase
@@ -175,21 +183,39 @@ class HistoricalBaselineManager:
     - Provide confidence metrics for baseline quality
     """
 
-    def __init__(self, db_path: str, lookback_days: int = 20):
+    def __init__(self, db_path: str, lookback_days: int = 20, write_behind: bool = False,
+                 cache_capacity: int = 4096, background_refresh: bool = True,
+                 min_refresh_seconds: float = 5.0):
         """
         Initialize baseline manager
 
         Args:
             db_path: Path to SQLite database for baselines
             lookback_days: Number of days for baseline calculation
+            write_behind: Queue history updates for the store's background
+                batched writer instead of committing each one inline
+            cache_capacity: Maximum (strike, option_type) baselines cached
+            background_refresh: Recompute expired or invalidated baselines
+                on a background thread while serving the previous one
+            min_refresh_seconds: Minimum time between recomputes of one
+                baseline; new rows inside it are picked up by the next one
         """
         self.db_path = db_path
         self.lookback_days = lookback_days
+        self.write_behind = write_behind
+        self.store = get_store(self.db_path)
         self._init_database()
 
-        # Cache for recent calculations
-        self.baseline_cache = {}
+        # LRU cache of recent calculations keyed by (strike, option_type)
         self.cache_expiry = timedelta(hours=1)
+        self.baseline_cache = BaselineContextCache(
+            lambda key: self._calculate_baseline_stats(*key),
+            capacity=cache_capacity,
+            ttl_seconds=self.cache_expiry.total_seconds(),
+            background_refresh=background_refresh,
+            min_refresh_seconds=min_refresh_seconds,
+            refresh=lambda key: self._calculate_baseline_stats(*key, hurry_writes=False)
+        )
 
     def _init_database(self):
         """Initialize baseline database schema"""
@@ -198,7 +224,7 @@ class HistoricalBaselineManager:
         if db_dir and not os.path.exists(db_dir):
             os.makedirs(db_dir, exist_ok=True)
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
 
             # Historical pressure data table
@@ -238,32 +264,54 @@ class HistoricalBaselineManager:
 
             conn.commit()
 
+    HISTORY_UPSERT_SQL = """
+        INSERT OR REPLACE INTO historical_pressure
+        (strike, option_type, date, pressure_ratio, volume_total, confidence, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """
+
     def update_historical_data(self, pressure_metrics: PressureMetrics):
         """
         Update historical pressure data with new metrics
 
+        With write_behind the row is queued and committed by the store's
+        writer thread in size/time-bounded batches. The queue is FIFO, so
+        the last update for a (strike, option_type, date) always wins, and
+        any read through the store flushes queued rows first.
+
         Args:
             pressure_metrics: New pressure metrics to add to history
         """
         date_str = pressure_metrics.time_window.strftime('%Y-%m-%d')
         total_volume = pressure_metrics.bid_volume + pressure_metrics.ask_volume
+        row = (
+            pressure_metrics.strike,
+            pressure_metrics.option_type,
+            date_str,
+            pressure_metrics.pressure_ratio,
+            total_volume,
+            pressure_metrics.confidence,
+            datetime.now(timezone.utc).isoformat()
+        )
 
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT OR REPLACE INTO historical_pressure
-                (strike, option_type, date, pressure_ratio, volume_total, confidence, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
-                pressure_metrics.strike,
-                pressure_metrics.option_type,
-                date_str,
-                pressure_metrics.pressure_ratio,
-                total_volume,
-                pressure_metrics.confidence,
-                datetime.now(timezone.utc).isoformat()
-            ))
-            conn.commit()
+        if self.write_behind:
+            self.store.execute_async(self.HISTORY_UPSERT_SQL, row)
+        else:
+            with self.store.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(self.HISTORY_UPSERT_SQL, row)
+                conn.commit()
+
+        self.baseline_cache.invalidate((pressure_metrics.strike, pressure_metrics.option_type))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until queued history updates are committed"""
+        return self.store.flush(timeout)
+
+    def close(self):
+        """Commit queued history updates and stop background baseline refreshes"""
+        self.baseline_cache.close()
+        self.store.flush()
 
     def get_baseline_context(self, strike: float, option_type: str) -> BaselineContext:
         """
@@ -275,29 +323,26 @@ class HistoricalBaselineManager:
 
         Returns:
             BaselineContext with statistical analysis
-        """
-        cache_key = f"{strike}_{option_type}"
-
-        # Check cache first
-        if cache_key in self.baseline_cache:
-            cached_data, cache_time = self.baseline_cache[cache_key]
-            if get_eastern_time() - cache_time < self.cache_expiry:
-                return cached_data
-
-        # Calculate baseline from database
-        baseline = self._calculate_baseline_stats(strike, option_type)
 
-        # Cache result
-        self.baseline_cache[cache_key] = (baseline, get_eastern_time())
+        Only a cache miss computes on the calling thread; an expired or
+        invalidated baseline is returned while it is refreshed.
+        """
+        return self.baseline_cache.get_or_compute((strike, option_type))
 
-        return baseline
+    def _calculate_baseline_stats(self, strike: float, option_type: str,
+                                  hurry_writes: bool = True) -> BaselineContext:
+        """
+        Calculate baseline statistics from historical data
 
-    def _calculate_baseline_stats(self, strike: float, option_type: str) -> BaselineContext:
-        """Calculate baseline statistics from historical data"""
+        Background refreshes pass hurry_writes=False: they wait for the
+        store's next batched commit instead of forcing queued rows out early.
+        """
         # Get recent historical data
         cutoff_date = (get_eastern_time() - timedelta(days=self.lookback_days)).strftime('%Y-%m-%d')
 
-        with sqlite3.connect(self.db_path) as conn:
+        if not hurry_writes:
+            self.store.flush(hurry=False)
+        with self.store.connection(flush=hurry_writes) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT pressure_ratio, volume_total, confidence
@@ -333,13 +378,14 @@ class HistoricalBaselineManager:
         mean_pressure = statistics.mean(pressure_ratios)
         std_pressure = statistics.stdev(pressure_ratios) if len(pressure_ratios) > 1 else 0.5
 
-        # Percentiles
+        # Percentiles (one quantile pass for all cut points)
+        try:
+            cut_points = statistics.quantiles(pressure_ratios, n=100)
+        except statistics.StatisticsError:
+            cut_points = []
         percentiles = {}
         for p in [10, 25, 50, 75, 90, 95, 99]:
-            try:
-                percentiles[p] = statistics.quantiles(pressure_ratios, n=100)[p-1]
-            except (IndexError, statistics.StatisticsError):
-                percentiles[p] = mean_pressure
+            percentiles[p] = cut_points[p-1] if len(cut_points) >= p else mean_pressure
 
         # Data quality assessment
         expected_days = min(self.lookback_days, (get_eastern_time() - get_eastern_time().replace(day=1)).days)
@@ -430,6 +476,13 @@ class PressureRatioAnalyzer:
         # Recent pressure history for trend analysis
         self.pressure_history = defaultdict(lambda: deque(maxlen=self.lookback_windows))
 
+        # Latest windows per strike for cross-strike coordination
+        self.neutral_coordination = 0.6  # Score when no neighbor has recent directional flow
+        self.strike_index = StrikeCoordinationIndex(
+            span=config.get('coordination_strikes', 4),
+            max_age_seconds=config.get('coordination_max_age_seconds', 300)
+        )
+
     def analyze_pressure_signal(self, metrics: PressureMetrics) -> PressureAnalysis:
         """
         Analyze pressure metrics for institutional activity indicators
@@ -523,14 +576,25 @@ class PressureRatioAnalyzer:
 
     def _calculate_cluster_coordination(self, metrics: PressureMetrics) -> float:
         """
-        Calculate coordination with nearby strikes (simplified for now)
+        Calculate coordination with nearby strikes
+
+        Records the window in the strike index, then scores how many of
+        the +/-N neighboring strikes (same expiration and option type)
+        show recent pressure on the same side, weighted by their volume.
 
         Returns:
             Coordination score 0-1 (1 = highest coordination)
         """
-        # Future enhancement: Cross-strike coordination analysis for Phase 5
-        # For now, return moderate coordination as placeholder
-        return 0.6
+        expiration = getattr(metrics, 'expiration', None)
+        timestamp = metrics.time_window.timestamp()
+        self.strike_index.update(metrics.strike, metrics.option_type, timestamp, metrics.dominant_side,
+                                 metrics.bid_volume + metrics.ask_volume, expiration)
+
+        coordination = self.strike_index.coordination(metrics.strike, metrics.option_type, timestamp,
+                                                      metrics.dominant_side, expiration)
+        if not coordination.active_neighbors or metrics.dominant_side not in ('BUY', 'SELL'):
+            return self.neutral_coordination
+        return coordination.score(self.strike_index.span)
 
     def _calculate_volume_concentration(self, metrics: PressureMetrics) -> float:
         """
@@ -858,6 +922,10 @@ class IFDv3Engine:
     - Provide pipeline integration interface
     """
 
+    # Stages timed in analyze_pressure_event and samples kept per stage
+    LATENCY_STAGES = ('history_update', 'baseline', 'analysis', 'total')
+    LATENCY_SAMPLES = 10000
+
     def __init__(self, config: Dict[str, Any]):
         """
         Initialize IFD v3.0 engine
@@ -869,7 +937,10 @@ class IFDv3Engine:
 
         # Initialize component managers
         baseline_db_path = config.get('baseline_db_path', 'outputs/ifd_v3_baselines.db')
-        self.baseline_manager = HistoricalBaselineManager(baseline_db_path)
+        self.baseline_manager = HistoricalBaselineManager(
+            baseline_db_path, write_behind=config.get('write_behind_history', True),
+            min_refresh_seconds=config.get('baseline_min_refresh_seconds', 5.0)
+        )
 
         self.pressure_analyzer = PressureRatioAnalyzer(config.get('pressure_analysis', {}))
         self.market_making_detector = MarketMakingDetector(config.get('market_making_detection', {}))
@@ -878,8 +949,16 @@ class IFDv3Engine:
         # Analysis results storage
         self.recent_signals = deque(maxlen=100)
 
+        # Per-stage latency of recent analyze_pressure_event calls (ms)
+        self.stage_latencies = {stage: deque(maxlen=self.LATENCY_SAMPLES) for stage in self.LATENCY_STAGES}
+
         logger.info("IFD v3.0 Engine initialized successfully")
 
+    def _record_latency(self, stage: str, started: float) -> float:
+        now = time.perf_counter()
+        self.stage_latencies[stage].append((now - started) * 1000)
+        return now
+
     def analyze_pressure_event(self, pressure_metrics: PressureMetrics) -> Optional[InstitutionalSignalV3]:
         """
         Main analysis pipeline for MBO pressure events
@@ -890,9 +969,11 @@ class IFDv3Engine:
         Returns:
             InstitutionalSignalV3 if signal detected, None otherwise
         """
+        started = stage_started = time.perf_counter()
         try:
             # Update historical baselines
             self.baseline_manager.update_historical_data(pressure_metrics)
+            stage_started = self._record_latency('history_update', stage_started)
 
             # Get baseline context
             baseline_context = self.baseline_manager.get_baseline_context(
@@ -903,6 +984,7 @@ class IFDv3Engine:
             baseline_context = self.baseline_manager.calculate_pressure_context(
                 pressure_metrics.pressure_ratio, baseline_context
             )
+            stage_started = self._record_latency('baseline', stage_started)
 
             # Analyze pressure patterns
             pressure_analysis = self.pressure_analyzer.analyze_pressure_signal(pressure_metrics)
@@ -914,6 +996,7 @@ class IFDv3Engine:
             raw_conf, baseline_conf, mm_penalty, coord_bonus, final_conf = self.confidence_scorer.calculate_confidence(
                 pressure_analysis, baseline_context, market_making_analysis
             )
+            self._record_latency('analysis', stage_started)
 
             # Check if signal meets minimum criteria
             min_confidence = self.config.get('min_final_confidence', 0.7)
@@ -939,6 +1022,31 @@ class IFDv3Engine:
             logger.error(f"Error in IFD v3.0 analysis: {e}")
             return None
 
+        finally:
+            self._record_latency('total', started)
+
+    def get_latency_stats(self) -> Dict[str, Dict[str, float]]:
+        """p50/p95/p99/max (ms) per analyze_pressure_event stage over recent events"""
+        stats = {}
+        for stage, samples in self.stage_latencies.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            last = len(ordered) - 1
+            stats[stage] = {
+                'count': len(ordered),
+                'mean_ms': sum(ordered) / len(ordered),
+                'p50_ms': ordered[int(last * 0.50)],
+                'p95_ms': ordered[int(last * 0.95)],
+                'p99_ms': ordered[int(last * 0.99)],
+                'max_ms': ordered[last]
+            }
+        return stats
+
+    def close(self):
+        """Commit any queued history updates and stop baseline refreshes"""
+        self.baseline_manager.close()
+
     def _create_institutional_signal(self,
                                    pressure_metrics: PressureMetrics,
                                    baseline_context: BaselineContext,
@@ -1018,12 +1126,14 @@ class IFDv3Engine:
 
     def get_analysis_summary(self) -> Dict[str, Any]:
         """Get summary of recent analysis activity"""
+        baseline_cache = self.baseline_manager.baseline_cache.get_stats()
         if not self.recent_signals:
             return {
                 'total_signals': 0,
                 'avg_confidence': 0.0,
                 'signal_distribution': {},
-                'recent_activity': []
+                'recent_activity': [],
+                'baseline_cache': baseline_cache
             }
 
         signals = list(self.recent_signals)
@@ -1051,7 +1161,8 @@ class IFDv3Engine:
             'total_signals': len(signals),
             'avg_confidence': avg_confidence,
             'signal_distribution': signal_distribution,
-            'recent_activity': recent_activity
+            'recent_activity': recent_activity,
+            'baseline_cache': baseline_cache
         }
 
 # Pipeline Integration Functions
@@ -1098,6 +1209,7 @@ def run_ifd_v3_analysis(pressure_data: List[PressureMetrics], config: Dict[str,
     Returns:
         Analysis results with institutional signals
     """
+    analyzer = None
     try:
         # Initialize analyzer
         analyzer = create_ifd_v3_analyzer(config)
@@ -1133,6 +1245,11 @@ def run_ifd_v3_analysis(pressure_data: List[PressureMetrics], config: Dict[str,
             'signal_rate': 0.0
         }
 
+    finally:
+        # Commit write-behind history before the analyzer is dropped
+        if analyzer is not None:
+            analyzer.close()
+
 # Example usage and testing
 if __name__ == "__main__":
     # Example configuration
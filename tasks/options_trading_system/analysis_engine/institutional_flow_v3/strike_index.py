@@ -0,0 +1,144 @@
+"""
+IFD v3.0 Cross-Strike Coordination Index
+
+Latest pressure windows per strike, kept in strike order per
+(expiration, option_type) book so neighbor queries are a binary search
+plus a walk over the k neighbors (O(log n + k)):
+- Each strike holds only its most recent window
+- Directional agreement and volume-weighted coordination are computed
+  over the +/-N listed strikes around the event's strike
+- Windows older than max_age_seconds relative to the event are ignored,
+  and books idle that long (e.g. expired expirations) are dropped
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+# Direction of a window's dominant side
+SIDE_SIGN = {'BUY': 1, 'SELL': -1}
+
+
+def strike_bounds(strikes: Sequence[float], low: float, high: float) -> Tuple[int, int]:
+    """[first, stop) slice of an ascending strike list with low <= strike <= high"""
+    return bisect_left(strikes, low), bisect_right(strikes, high)
+
+
+class StrikeCoordination:
+    """Neighbor activity around one strike"""
+
+    __slots__ = ('neighbors', 'active_neighbors', 'directional_agreement', 'volume_weighted_agreement')
+
+    def __init__(self, neighbors: int, active_neighbors: int,
+                 directional_agreement: float, volume_weighted_agreement: float):
+        self.neighbors = neighbors  # Listed strikes in range (excluding the event's own)
+        self.active_neighbors = active_neighbors  # Of those, with a recent directional window
+        self.directional_agreement = directional_agreement  # Share agreeing with the event (0-1)
+        self.volume_weighted_agreement = volume_weighted_agreement  # Same, weighted by volume (0-1)
+
+    def score(self, span: int) -> float:
+        """Coordination 0-1: volume-weighted agreement scaled by neighbor breadth"""
+        breadth = self.active_neighbors / max(2 * span, 1)
+        return self.volume_weighted_agreement * (0.5 + 0.5 * breadth)
+
+
+class _Book:
+    """Strikes of one (expiration, option_type), ascending, with their latest windows"""
+
+    __slots__ = ('strikes', 'windows', 'last_update')
+
+    def __init__(self):
+        self.strikes: List[float] = []
+        self.windows: Dict[float, Tuple[float, int, float]] = {}
+        self.last_update = float('-inf')
+
+
+class StrikeCoordinationIndex:
+    """
+    Sorted-by-strike index of the latest pressure windows
+
+    Args:
+        span: Listed strikes on each side of the event considered neighbors
+        max_age_seconds: Neighbor windows older than this (relative to the
+            queried event) are not counted; books without an update for
+            this long (relative to the newest window) are dropped
+    """
+
+    def __init__(self, span: int = 4, max_age_seconds: float = 300.0):
+        self.span = span
+        self.max_age_seconds = max_age_seconds
+        self._books: Dict[Tuple[Hashable, str], _Book] = {}
+        self._next_prune = float('-inf')
+
+    def __len__(self) -> int:
+        return sum(len(book.strikes) for book in self._books.values())
+
+    def update(self, strike: float, option_type: str, timestamp: float, side: str, volume: float,
+               expiration: Optional[Hashable] = None):
+        """Record a pressure window (timestamp in epoch seconds)"""
+        if timestamp >= self._next_prune:
+            # At most one sweep per max_age_seconds of stream time
+            self.prune(timestamp)
+            self._next_prune = timestamp + self.max_age_seconds
+
+        book = self._books.get((expiration, option_type))
+        if book is None:
+            book = self._books[(expiration, option_type)] = _Book()
+        if strike not in book.windows:
+            insort(book.strikes, strike)
+        book.windows[strike] = (timestamp, SIDE_SIGN.get(side, 0), volume)
+        book.last_update = max(book.last_update, timestamp)
+
+    def prune(self, timestamp: float) -> int:
+        """Drop books with no window newer than max_age_seconds before timestamp; returns books dropped"""
+        oldest = timestamp - self.max_age_seconds
+        idle = [key for key, book in self._books.items() if book.last_update < oldest]
+        for key in idle:
+            del self._books[key]
+        return len(idle)
+
+    def drop_expiration(self, expiration: Hashable) -> int:
+        """Drop both books of an expired expiration; returns books dropped"""
+        expired = [key for key in self._books if key[0] == expiration]
+        for key in expired:
+            del self._books[key]
+        return len(expired)
+
+    def neighbors(self, strike: float, option_type: str,
+                  expiration: Optional[Hashable] = None) -> List[Tuple[float, Any]]:
+        """(strike, latest window) for the +/-span listed strikes around strike"""
+        book = self._books.get((expiration, option_type))
+        if book is None:
+            return []
+        strikes = book.strikes
+        first, stop = strike_bounds(strikes, strike, strike)
+        result = []
+        for i in range(max(first - self.span, 0), min(stop + self.span, len(strikes))):
+            if first <= i < stop:
+                continue
+            result.append((strikes[i], book.windows[strikes[i]]))
+        return result
+
+    def coordination(self, strike: float, option_type: str, timestamp: float, side: str,
+                     expiration: Optional[Hashable] = None) -> StrikeCoordination:
+        """Agreement of recent neighbor windows with an event on `side` at `strike`"""
+        direction = SIDE_SIGN.get(side, 0)
+        oldest = timestamp - self.max_age_seconds
+        neighbors = self.neighbors(strike, option_type, expiration)
+
+        active = agreeing = 0
+        volume_total = volume_signed = 0.0
+        for _, (window_time, sign, volume) in neighbors:
+            if window_time < oldest or sign == 0:
+                continue
+            active += 1
+            volume_total += volume
+            if sign == direction:
+                agreeing += 1
+                volume_signed += volume
+            else:
+                volume_signed -= volume
+
+        if not active or not direction:
+            return StrikeCoordination(len(neighbors), active, 0.0, 0.0)
+        weighted = (volume_signed / volume_total + 1.0) / 2.0 if volume_total else agreeing / active
+        return StrikeCoordination(len(neighbors), active, agreeing / active, weighted)
@@ -354,7 +354,7 @@ class AnalysisEngine:
         self.config = config
         self.analysis_results = {}
 
-    def run_nq_ev_analysis(self, data_config: Dict[str, Any]) -> Dict[str, Any]:
+    def run_nq_ev_analysis(self, data_config: Dict[str, Any], snapshot=None) -> Dict[str, Any]:
         """Run your actual NQ Options Expected Value analysis"""
         print("  Running NQ Options EV Analysis (Your Algorithm)...")
 
@@ -373,7 +373,7 @@ class AnalysisEngine:
         })
 
         try:
-            result = analyze_expected_value(data_config, ev_config)
+            result = analyze_expected_value(data_config, ev_config, snapshot=snapshot)
             print(f"    ✓ NQ EV Analysis: {result['quality_setups']} quality setups found")
 
             if result.get("trading_report", {}).get("execution_recommendation"):
@@ -393,7 +393,7 @@ class AnalysisEngine:
                 "timestamp": get_eastern_time().isoformat()
             }
 
-    def run_risk_analysis(self, data_config: Dict[str, Any]) -> Dict[str, Any]:
+    def run_risk_analysis(self, data_config: Dict[str, Any], snapshot=None) -> Dict[str, Any]:
         """Run risk analysis (institutional positioning)"""
         print("  Running Risk Analysis...")
 
@@ -405,7 +405,7 @@ class AnalysisEngine:
         })
 
         try:
-            result = run_risk_analysis(data_config, risk_config)
+            result = run_risk_analysis(data_config, risk_config, snapshot=snapshot)
 
             if result["status"] == "success":
                 print(f"    ✓ Risk Analysis: {result['metrics']['total_positions_at_risk']} positions at risk, "
@@ -430,7 +430,7 @@ class AnalysisEngine:
                 "timestamp": get_eastern_time().isoformat()
             }
 
-    def run_volume_shock_analysis(self, data_config: Dict[str, Any]) -> Dict[str, Any]:
+    def run_volume_shock_analysis(self, data_config: Dict[str, Any], snapshot=None) -> Dict[str, Any]:
         """Run volume shock analysis (The Egg Rush Strategy)"""
         print("  Running Volume Shock Analysis (Front-Running Market Makers)...")
 
@@ -444,7 +444,7 @@ class AnalysisEngine:
         })
 
         try:
-            result = analyze_volume_shocks(data_config, volume_shock_config)
+            result = analyze_volume_shocks(data_config, volume_shock_config, snapshot=snapshot)
 
             if result["status"] == "success":
                 alerts = result.get("alerts", [])
@@ -478,7 +478,7 @@ class AnalysisEngine:
                 "timestamp": get_eastern_time().isoformat()
             }
 
-    def run_dead_simple_analysis(self, data_config: Dict[str, Any]) -> Dict[str, Any]:
+    def run_dead_simple_analysis(self, data_config: Dict[str, Any], snapshot=None) -> Dict[str, Any]:
         """Run DEAD Simple institutional flow detection"""
         print("  Running DEAD Simple Analysis (Following Institutional Money)...")
 
@@ -496,12 +496,15 @@ class AnalysisEngine:
         })
 
         try:
-            # Import data ingestion pipeline (following pattern of other analyses)
-            from data_ingestion.integration import run_data_ingestion
+            if snapshot is not None:
+                pipeline_result = snapshot.pipeline_result
+            else:
+                # Import data ingestion pipeline (following pattern of other analyses)
+                from data_ingestion.integration import run_data_ingestion
 
-            # Load normalized data like other analyses do
-            print("    Fetching options data via data ingestion pipeline...")
-            pipeline_result = run_data_ingestion(data_config)
+                # Load normalized data like other analyses do
+                print("    Fetching options data via data ingestion pipeline...")
+                pipeline_result = run_data_ingestion(data_config)
 
             if pipeline_result["pipeline_status"] != "success":
                 print("    ✗ Data ingestion pipeline failed")
@@ -624,7 +627,7 @@ class AnalysisEngine:
 
         return options_data
 
-    def run_ifd_v3_analysis(self, data_config: Dict[str, Any]) -> Dict[str, Any]:
+    def run_ifd_v3_analysis(self, data_config: Dict[str, Any], snapshot=None) -> Dict[str, Any]:
         """Run IFD v3.0 Institutional Flow Detection with MBO streaming integration"""
         print("  Running IFD v3.0 Analysis (Enhanced Institutional Flow Detection)...")
 
@@ -672,7 +675,10 @@ class AnalysisEngine:
                 monitor.checkpoint(request_id, LatencyComponent.DATA_INGESTION)
             else:
                 try:
-                    pipeline_result = run_data_ingestion(data_config)
+                    if snapshot is not None:
+                        pipeline_result = snapshot.pipeline_result
+                    else:
+                        pipeline_result = run_data_ingestion(data_config)
                     monitor.checkpoint(request_id, LatencyComponent.DATA_INGESTION)
 
                     if pipeline_result["pipeline_status"] != "success":
@@ -1220,6 +1226,24 @@ class AnalysisEngine:
         print(f"    ✓ Synthesis complete: {len(primary_recommendations)} NQ EV recommendations prioritized")
         return synthesis
 
+    def _load_market_snapshot(self, data_config: Dict[str, Any]):
+        """
+        Load the shared MarketSnapshot for this cycle
+
+        Returns None on failure so each analysis falls back to its own
+        ingestion path and failure handling.
+        """
+        try:
+            from data_ingestion.integration import load_market_snapshot
+
+            snapshot = load_market_snapshot(data_config)
+            print(f"  ✓ Market snapshot loaded once: {len(snapshot.contracts)} contracts "
+                  f"in {snapshot.load_seconds:.2f}s ({snapshot.content_hash[:12]})")
+            return snapshot
+        except Exception as e:
+            print(f"  ⚠ Shared market snapshot unavailable ({str(e)}), analyses will load individually")
+            return None
+
     def run_full_analysis(self, data_config: Dict[str, Any]) -> Dict[str, Any]:
         """Run complete analysis engine with NQ EV, Risk Analysis, Volume Shock, DEAD Simple, and IFD v3.0"""
         print("EXECUTING ANALYSIS ENGINE (NQ EV + Risk + Volume Shock + DEAD Simple + IFD v3.0)")
@@ -1227,17 +1251,20 @@ class AnalysisEngine:
 
         start_time = get_eastern_time()
 
+        # Load market data once and share the snapshot with every analysis
+        snapshot = self._load_market_snapshot(data_config)
+
         # Run all analyses in parallel for speed
         print("  Running all analyses simultaneously...")
 
         with ThreadPoolExecutor(max_workers=5) as executor:
             # Submit all analyses to run concurrently
             futures = {
-                executor.submit(self.run_nq_ev_analysis, data_config): "expected_value",
-                executor.submit(self.run_risk_analysis, data_config): "risk",
-                executor.submit(self.run_volume_shock_analysis, data_config): "volume_shock",
-                executor.submit(self.run_dead_simple_analysis, data_config): "dead_simple",
-                executor.submit(self.run_ifd_v3_analysis, data_config): "institutional_flow_v3"
+                executor.submit(self.run_nq_ev_analysis, data_config, snapshot): "expected_value",
+                executor.submit(self.run_risk_analysis, data_config, snapshot): "risk",
+                executor.submit(self.run_volume_shock_analysis, data_config, snapshot): "volume_shock",
+                executor.submit(self.run_dead_simple_analysis, data_config, snapshot): "dead_simple",
+                executor.submit(self.run_ifd_v3_analysis, data_config, snapshot): "institutional_flow_v3"
             }
 
             # Collect results as they complete
@@ -1269,6 +1296,11 @@ class AnalysisEngine:
             "execution_time_seconds": execution_time,
             "primary_algorithm": "nq_ev_analysis",
             "analysis_config": self.config,
+            "data_snapshot": {
+                "content_hash": snapshot.content_hash,
+                "load_seconds": snapshot.load_seconds,
+                "contracts": len(snapshot.contracts)
+            } if snapshot is not None else None,
             "individual_results": self.analysis_results,
             "synthesis": synthesis,
             "status": "success",
@@ -275,7 +275,7 @@ class AdaptiveIFDIntegration:
         logger.info("Adaptive IFD system stopped")
 
     def get_current_ifd_analyzer(self) -> Optional[IFDv3Engine]:
-        """Get IFD analyzer with current adaptive configuration"""
+        """Get IFD analyzer with current adaptive configuration (the caller must close() it)"""
         if not IFD_AVAILABLE:
             logger.warning("IFD v3.0 not available")
             return None
@@ -564,6 +564,7 @@ if __name__ == "__main__":
         analyzer = integration.get_current_ifd_analyzer()
         if analyzer:
             print("✓ IFD analyzer created with adaptive configuration")
+            analyzer.close()
 
         # Show system status
         status = integration.get_system_status()
@@ -20,11 +20,11 @@ Key Features:
 import os
 import json
 import logging
-import sqlite3
 import threading
 import time
 from datetime import datetime, timedelta, timezone
 from utils.timezone_utils import get_eastern_time, get_utc_time
+from utils.sqlite_store import get_store
 from typing import Dict, List, Any, Optional, Tuple, Callable
 from dataclasses import dataclass, asdict
 from collections import defaultdict, deque
@@ -129,11 +129,12 @@ class AdaptiveThresholdDatabase:
     def __init__(self, db_path: str = "outputs/adaptive_thresholds.db"):
         self.db_path = db_path
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.store = get_store(self.db_path)
         self._init_database()
 
     def _init_database(self):
         """Initialize database schema"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
 
             # Threshold configurations table
@@ -210,7 +211,7 @@ class AdaptiveThresholdDatabase:
 
     def save_threshold_config(self, config: ThresholdConfig):
         """Save threshold configuration"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT OR REPLACE INTO threshold_configs
@@ -229,7 +230,7 @@ class AdaptiveThresholdDatabase:
 
     def load_threshold_config(self, name: str) -> Optional[ThresholdConfig]:
         """Load threshold configuration by name"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT name, current_value, min_value, max_value, adjustment_step, sensitivity
@@ -243,7 +244,7 @@ class AdaptiveThresholdDatabase:
 
     def save_performance_snapshot(self, snapshot: PerformanceSnapshot):
         """Save performance snapshot"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO performance_snapshots
@@ -268,7 +269,7 @@ class AdaptiveThresholdDatabase:
         """Get recent performance snapshots"""
         since = datetime.now(timezone.utc) - timedelta(hours=hours)
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT timestamp, accuracy, cost_per_signal, roi, win_loss_ratio,
@@ -303,7 +304,7 @@ class AdaptiveThresholdDatabase:
     def record_threshold_adjustment(self, threshold_name: str, old_value: float,
                                   new_value: float, reason: str):
         """Record threshold adjustment"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO threshold_adjustments
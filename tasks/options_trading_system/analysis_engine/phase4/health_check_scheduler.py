@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Single-Thread Health Check Scheduler
+
+Runs periodic health checks for any number of components on one asyncio
+event loop:
+- Hashed timing wheel of due checks (O(1) schedule and cancel)
+- Concurrency limit on checks in flight
+- Jittered intervals and a spread-out first round, so components with the
+  same interval do not all fire on the same tick
+- Results handed over as they complete and persisted in batches
+"""
+
+import math
+import time
+import random
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TimingWheel:
+    """
+    Hashed timing wheel
+
+    Time is cut into ticks and each tick maps to one of `slots` buckets.
+    Entries further out than one rotation stay in their bucket until their
+    own tick comes around, so the wheel span does not limit intervals.
+    """
+
+    def __init__(self, tick: float = 0.25, slots: int = 512, start: Optional[float] = None):
+        self.tick = tick
+        self.slots = slots
+        self._buckets: List[List[Tuple[int, Any]]] = [[] for _ in range(slots)]
+        self._next_tick = int((time.monotonic() if start is None else start) // tick)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def schedule(self, item: Any, due: float):
+        """Add an item due at `due` (same clock as advance); past times fire on the next advance"""
+        due_tick = max(int(math.ceil(due / self.tick)), self._next_tick)
+        self._buckets[due_tick % self.slots].append((due_tick, item))
+        self._size += 1
+
+    def advance(self, now: float) -> List[Any]:
+        """Items due at or before `now`, in due order"""
+        target = int(now // self.tick)
+        due = []
+        while self._next_tick <= target:
+            index = self._next_tick % self.slots
+            bucket = self._buckets[index]
+            if bucket:
+                keep = []
+                for entry in bucket:
+                    if entry[0] <= self._next_tick:
+                        due.append(entry[1])
+                    else:
+                        keep.append(entry)
+                self._buckets[index] = keep
+                self._size -= len(bucket) - len(keep)
+            self._next_tick += 1
+        return due
+
+
+class HealthCheckScheduler:
+    """
+    Asyncio scheduler for periodic health checks
+
+    Components are any objects with ``component_id`` and ``check_interval``
+    (seconds). Each one is checked, then rescheduled ``check_interval``
+    (plus jitter) after its check finishes, so a slow component never has
+    two checks in flight.
+
+    Args:
+        check: Coroutine function component -> result
+        on_result: Called on the scheduler thread with (component_id, result)
+        persist: Called on the scheduler thread with a batch of results
+        max_concurrent_checks: Checks allowed in flight at once
+        jitter: Fraction of the interval to randomize each reschedule by
+        tick: Timing wheel resolution in seconds
+        persist_interval: Seconds between persisted batches
+        persist_batch_size: Results that trigger an early persist
+    """
+
+    def __init__(self, check: Callable[[Any], Awaitable[Any]],
+                 on_result: Optional[Callable[[str, Any], None]] = None,
+                 persist: Optional[Callable[[List[Any]], None]] = None,
+                 max_concurrent_checks: int = 50, jitter: float = 0.1, tick: float = 0.25,
+                 persist_interval: float = 5.0, persist_batch_size: int = 500,
+                 on_start: Optional[Callable[[], Awaitable[None]]] = None,
+                 on_stop: Optional[Callable[[], Awaitable[None]]] = None):
+        self.check = check
+        self.on_result = on_result
+        self.persist = persist
+        self.max_concurrent_checks = max_concurrent_checks
+        self.jitter = jitter
+        self.tick = tick
+        self.persist_interval = persist_interval
+        self.persist_batch_size = persist_batch_size
+        self.on_start = on_start
+        self.on_stop = on_stop
+
+        self.components: Dict[str, Any] = {}
+        self._generations: Dict[str, int] = {}
+        self._wheel: Optional[TimingWheel] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._pending_results: List[Any] = []
+        self._last_persist = 0.0
+        self._random = random.Random()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+        self._stopping = False
+
+        self.checks_started = 0
+        self.checks_completed = 0
+        self.check_errors = 0
+        self.max_in_flight = 0
+        self.results_persisted = 0
+
+    # Lifecycle
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the scheduler thread and its event loop"""
+        if self.running:
+            return
+        self._stopping = False
+        self._started.clear()
+        self._thread = threading.Thread(target=self._thread_main, daemon=True, name="UptimeScheduler")
+        self._thread.start()
+        self._started.wait()
+
+    def stop(self, timeout: float = 10.0):
+        """Let in-flight checks finish, persist their results and stop the loop"""
+        if not self.running:
+            return
+        self._loop.call_soon_threadsafe(self._request_stop)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _request_stop(self):
+        self._stopping = True
+
+    def _thread_main(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self._run())
+        finally:
+            self._loop.close()
+            self._loop = None
+
+    # Components
+
+    def add_component(self, component: Any):
+        """Add or replace a component (safe from any thread)"""
+        self._call(self._add, component)
+
+    def remove_component(self, component_id: str):
+        """Stop checking a component (safe from any thread)"""
+        self._call(self._remove, component_id)
+
+    def _call(self, function: Callable, *args):
+        loop = self._loop
+        if loop is not None and self.running:
+            loop.call_soon_threadsafe(function, *args)
+        else:
+            function(*args)
+
+    def _add(self, component: Any):
+        component_id = component.component_id
+        self.components[component_id] = component
+        generation = self._generations.get(component_id, 0) + 1
+        self._generations[component_id] = generation
+        if self._wheel is not None:
+            # Spread first checks over one interval instead of firing all at once
+            first = self._loop.time() + self._random.uniform(0, component.check_interval)
+            self._wheel.schedule((component_id, generation), first)
+
+    def _remove(self, component_id: str):
+        self.components.pop(component_id, None)
+        # Pending wheel entries carry the old generation and are skipped when due
+        self._generations[component_id] = self._generations.get(component_id, 0) + 1
+
+    # Loop
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        self._wheel = TimingWheel(self.tick, start=loop.time())
+        self._semaphore = asyncio.Semaphore(self.max_concurrent_checks)
+        self._last_persist = loop.time()
+        if self.on_start:
+            await self.on_start()
+        for component in list(self.components.values()):
+            self._add(component)
+        self._started.set()
+        logger.info(f"Health check scheduler started with {len(self.components)} components")
+
+        try:
+            while not self._stopping:
+                now = loop.time()
+                for component_id, generation in self._wheel.advance(now):
+                    if self._generations.get(component_id) == generation:
+                        task = loop.create_task(self._run_check(component_id, generation))
+                        self._tasks.add(task)
+                        task.add_done_callback(self._tasks.discard)
+
+                if (self._pending_results and
+                        (now - self._last_persist >= self.persist_interval or
+                         len(self._pending_results) >= self.persist_batch_size)):
+                    self._persist()
+                await asyncio.sleep(self.tick)
+
+            if self._tasks:
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+        finally:
+            self._persist()
+            if self.on_stop:
+                await self.on_stop()
+            self._wheel = None
+            logger.info("Health check scheduler stopped")
+
+    async def _run_check(self, component_id: str, generation: int):
+        component = self.components.get(component_id)
+        if component is None:
+            return
+        async with self._semaphore:
+            self.checks_started += 1
+            self.max_in_flight = max(self.max_in_flight, self.checks_started - self.checks_completed)
+            try:
+                result = await self.check(component)
+            except Exception as e:
+                result = None
+                self.check_errors += 1
+                logger.error(f"Health check failed for {component_id}: {e}")
+            finally:
+                self.checks_completed += 1
+
+        if result is not None:
+            self._pending_results.append(result)
+            if self.on_result:
+                try:
+                    self.on_result(component_id, result)
+                except Exception as e:
+                    self.check_errors += 1
+                    logger.error(f"Result handler failed for {component_id}: {e}")
+
+        if not self._stopping and self._generations.get(component_id) == generation:
+            interval = component.check_interval
+            delay = interval * (1 + self._random.uniform(-self.jitter, self.jitter))
+            self._wheel.schedule((component_id, generation), asyncio.get_running_loop().time() + delay)
+
+    def _persist(self):
+        if self._loop is not None:
+            self._last_persist = self._loop.time()
+        if not self._pending_results:
+            return
+        batch, self._pending_results = self._pending_results, []
+        if self.persist:
+            try:
+                self.persist(batch)
+                self.results_persisted += len(batch)
+            except Exception as e:
+                logger.error(f"Failed to persist {len(batch)} health check results: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'components': len(self.components),
+            'checks_started': self.checks_started,
+            'checks_completed': self.checks_completed,
+            'checks_in_flight': self.checks_started - self.checks_completed,
+            'max_in_flight': self.max_in_flight,
+            'check_errors': self.check_errors,
+            'results_persisted': self.results_persisted,
+            'results_pending': len(self._pending_results)
+        }
@@ -23,9 +23,9 @@ Cost Management:
 """
 
 import os
+import sys
 import json
 import logging
-import sqlite3
 import threading
 import time
 from datetime import datetime, timedelta, timezone
@@ -36,6 +36,10 @@ from enum import Enum
 import hashlib
 import statistics
 
+# Shared SQLite storage layer lives in the repository-level utils package
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', '..'))
+from utils.sqlite_store import get_store
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -480,11 +484,12 @@ class DownloadCostDatabase:
     def __init__(self, db_path: str = "outputs/historical_download_costs.db"):
         self.db_path = db_path
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.store = get_store(self.db_path)
         self._init_database()
 
     def _init_database(self):
         """Initialize database schema"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
 
             # Download requests table
@@ -589,7 +594,7 @@ class DownloadCostDatabase:
 
     def save_download_request(self, request: DownloadRequest):
         """Save download request"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT OR REPLACE INTO download_requests
@@ -615,7 +620,7 @@ class DownloadCostDatabase:
 
     def save_cost_estimate(self, estimate: CostEstimate):
         """Save cost estimate"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT OR REPLACE INTO cost_estimates
@@ -639,7 +644,7 @@ class DownloadCostDatabase:
         """Get monthly download cost summary"""
         month_key = f"{year:04d}-{month:02d}"
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
 
             # Get existing summary
@@ -12,6 +12,8 @@ Key Features:
 - Latency trend analysis and statistics
 - Performance degradation detection
 - Latency SLA compliance monitoring
+- Rolling 1m/5m/1h latency histograms per component, snapshotted to
+  SQLite once a minute so reports never re-scan raw measurements
 
 Monitoring Points:
 1. Data Ingestion Latency: Raw data to processed events
@@ -21,11 +23,12 @@ Monitoring Points:
 """
 
 import os
+import sys
 import json
 import logging
-import sqlite3
 import threading
 import time
+import zlib
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Any, Optional, Callable, NamedTuple, Tuple
 from dataclasses import dataclass, asdict
@@ -34,6 +37,14 @@ from enum import Enum
 import statistics
 import numpy as np
 
+# Shared SQLite storage layer lives in the repository-level utils package
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', '..'))
+from utils.sqlite_store import get_store
+
+# Log-linear latency histogram shared with the MBO replay harness
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from data_ingestion.streaming_stats import LatencyHistogram
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -145,6 +156,71 @@ class LatencyStatistics:
     recommendations: List[str]
 
 
+# Rolling windows served from memory, in minutes
+HISTOGRAM_WINDOWS = {'1m': 1, '5m': 5, '1h': 60}
+
+SECONDS_PER_MINUTE = 60
+
+
+def encode_histogram(histogram: LatencyHistogram) -> bytes:
+    """Compact blob for a histogram snapshot (zlib-compressed JSON state)"""
+    return zlib.compress(json.dumps(histogram.to_state(), separators=(',', ':')).encode('ascii'))
+
+
+def decode_histogram(blob: bytes) -> LatencyHistogram:
+    return LatencyHistogram.from_state(json.loads(zlib.decompress(blob)))
+
+
+class RollingLatencyHistogram:
+    """
+    Latency histograms for one component over a rolling hour
+
+    Samples are recorded as microseconds into one LatencyHistogram per
+    wall-clock minute, held in a ring of 60 slots. Recording is O(1) and
+    a window (1m, 5m, 1h) merges at most 60 fixed-size histograms, so
+    percentiles cost the same at 10 or 10 million samples per hour.
+    """
+
+    def __init__(self, slots: int = 60):
+        self.slots = slots
+        self._histograms = [LatencyHistogram() for _ in range(slots)]
+        self._minutes = [-1] * slots
+        self.snapshot_minute = -1  # Newest minute already persisted
+
+    @staticmethod
+    def minute_of(now: Optional[float] = None) -> int:
+        return int((time.time() if now is None else now) // SECONDS_PER_MINUTE)
+
+    def record(self, latency_ms: float, now: Optional[float] = None):
+        minute = self.minute_of(now)
+        slot = minute % self.slots
+        histogram = self._histograms[slot]
+        if self._minutes[slot] != minute:
+            histogram.reset()
+            self._minutes[slot] = minute
+        histogram.record(int(latency_ms * 1000))
+
+    def minutes(self, first_minute: int, last_minute: int) -> List[Tuple[int, LatencyHistogram]]:
+        """(minute, histogram) for non-empty minutes still in the ring, oldest first"""
+        first_minute = max(first_minute, last_minute - self.slots + 1)
+        found = []
+        for minute in range(first_minute, last_minute + 1):
+            slot = minute % self.slots
+            if self._minutes[slot] == minute and self._histograms[slot].count:
+                found.append((minute, self._histograms[slot]))
+        return found
+
+    def window(self, minutes: int, now: Optional[float] = None) -> Tuple[LatencyHistogram, List[float]]:
+        """Merged histogram of the last `minutes` minutes and the per-minute means (ms)"""
+        current = self.minute_of(now)
+        merged = LatencyHistogram()
+        means = []
+        for _, histogram in self.minutes(current - minutes + 1, current):
+            merged.merge(histogram)
+            means.append(histogram.mean / 1000)
+        return merged, means
+
+
 class LatencyTracker:
     """Tracks latency for individual requests through the system"""
 
@@ -286,11 +362,12 @@ class LatencyDatabase:
     def __init__(self, db_path: str = "outputs/latency_monitoring.db"):
         self.db_path = db_path
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.store = get_store(self.db_path)
         self._init_database()
 
     def _init_database(self):
         """Initialize database schema"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
 
             # Latency measurements table
@@ -371,6 +448,19 @@ class LatencyDatabase:
                 )
             """)
 
+            # Per-minute latency histogram snapshots (compressed blobs)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS latency_histogram_snapshots (
+                    component TEXT NOT NULL,
+                    minute INTEGER NOT NULL,  -- Minutes since the epoch
+                    period_start TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    histogram BLOB NOT NULL,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (component, minute)
+                )
+            """)
+
             # Create indexes
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_measurements_timestamp ON latency_measurements(timestamp)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_measurements_component ON latency_measurements(component)")
@@ -381,29 +471,26 @@ class LatencyDatabase:
             conn.commit()
 
     def store_measurement(self, measurement: LatencyMeasurement):
-        """Store latency measurement"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT OR REPLACE INTO latency_measurements
-                (measurement_id, timestamp, component, latency_ms, request_id,
-                 session_id, data_size, metadata)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                measurement.measurement_id,
-                measurement.timestamp.isoformat(),
-                measurement.component.value,
-                measurement.latency_ms,
-                measurement.request_id,
-                measurement.session_id,
-                measurement.data_size,
-                json.dumps(measurement.metadata) if measurement.metadata else None
-            ))
-            conn.commit()
+        """Queue latency measurement for the batched background writer"""
+        self.store.execute_async("""
+            INSERT OR REPLACE INTO latency_measurements
+            (measurement_id, timestamp, component, latency_ms, request_id,
+             session_id, data_size, metadata)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            measurement.measurement_id,
+            measurement.timestamp.isoformat(),
+            measurement.component.value,
+            measurement.latency_ms,
+            measurement.request_id,
+            measurement.session_id,
+            measurement.data_size,
+            json.dumps(measurement.metadata) if measurement.metadata else None
+        ))
 
     def store_alert(self, alert: LatencyAlert):
         """Store latency alert"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT OR REPLACE INTO latency_alerts
@@ -433,7 +520,7 @@ class LatencyDatabase:
         """Get recent measurements for a component"""
         since = datetime.now(timezone.utc) - timedelta(hours=hours)
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT measurement_id, timestamp, component, latency_ms, request_id,
@@ -461,6 +548,38 @@ class LatencyDatabase:
 
             return measurements
 
+    def store_histogram_snapshots(self, snapshots: List[Tuple[LatencyComponent, int, LatencyHistogram]]):
+        """Store (component, minute, histogram) snapshots; re-snapshotting a minute replaces it"""
+        if not snapshots:
+            return
+        with self.store.connection() as conn:
+            conn.executemany("""
+                INSERT OR REPLACE INTO latency_histogram_snapshots
+                (component, minute, period_start, count, histogram)
+                VALUES (?, ?, ?, ?, ?)
+            """, [(
+                component.value,
+                minute,
+                datetime.fromtimestamp(minute * SECONDS_PER_MINUTE, tz=timezone.utc).isoformat(),
+                histogram.count,
+                encode_histogram(histogram)
+            ) for component, minute, histogram in snapshots])
+            conn.commit()
+
+    def get_histogram_snapshots(self, component: LatencyComponent, first_minute: int,
+                                last_minute: int) -> List[Tuple[int, LatencyHistogram]]:
+        """(minute, histogram) snapshots for a component, oldest first"""
+        with self.store.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT minute, histogram
+                FROM latency_histogram_snapshots
+                WHERE component = ? AND minute >= ? AND minute <= ?
+                ORDER BY minute
+            """, (component.value, first_minute, last_minute))
+
+            return [(row[0], decode_histogram(row[1])) for row in cursor.fetchall()]
+
 
 class LatencyAnalyzer:
     """Analyzes latency trends and generates statistics"""
@@ -572,6 +691,107 @@ class LatencyAnalyzer:
             recommendations=recommendations
         )
 
+    def analyze_histogram(self, component: LatencyComponent, histogram: LatencyHistogram,
+                          minute_means: List[float], period_start: datetime,
+                          period_end: datetime) -> LatencyStatistics:
+        """
+        Analyze latency for a component from a merged histogram
+
+        Args:
+            component: Component the histogram belongs to
+            histogram: Latencies in microseconds
+            minute_means: Mean latency (ms) of each minute, oldest first,
+                used for trend analysis
+            period_start: Start of the period covered
+            period_end: End of the period covered
+
+        Returns:
+            LatencyStatistics with analysis results
+        """
+        if not histogram.count:
+            empty_stats = self.analyze_component_latency([])
+            empty_stats.component = component
+            return empty_stats
+
+        count = histogram.count
+        mean_latency = histogram.mean / 1000
+        median_latency, p95, p99 = (value / 1000 for value in histogram.percentiles((50, 95, 99)))
+
+        target_latency = self.thresholds[LatencyThreshold.TARGET]
+        measurements_under_target = histogram.count_at_or_below(int(target_latency * 1000))
+        sla_compliance = (measurements_under_target / count) * 100
+
+        trend_direction, trend_confidence = self._analyze_trend(minute_means)
+        performance_grade = self._calculate_performance_grade(mean_latency, p95, sla_compliance)
+        recommendations = self._generate_recommendations(
+            component, mean_latency, p95, sla_compliance, trend_direction
+        )
+
+        return LatencyStatistics(
+            component=component,
+            period_start=period_start,
+            period_end=period_end,
+            count=count,
+            mean=mean_latency,
+            median=median_latency,
+            p95=p95,
+            p99=p99,
+            min_latency=histogram.min / 1000,
+            max_latency=histogram.max / 1000,
+            std_dev=histogram.std() / 1000,
+            target_latency=target_latency,
+            measurements_under_target=measurements_under_target,
+            sla_compliance_percentage=sla_compliance,
+            trend_direction=trend_direction,
+            trend_confidence=trend_confidence,
+            performance_grade=performance_grade,
+            recommendations=recommendations
+        )
+
+    def check_histogram_breaches(self, component: LatencyComponent, recent: LatencyHistogram,
+                                 minute_means: List[float]) -> List[LatencyAlert]:
+        """
+        Check the recent window of a component for threshold breaches
+
+        Args:
+            component: Component being checked
+            recent: Histogram of the recent window (microseconds)
+            minute_means: Mean latency (ms) of each minute in the window
+
+        Returns:
+            Alerts for every threshold the recent mean exceeds
+        """
+        if recent.count < 10:  # Need minimum measurements
+            return []
+
+        alerts = []
+        avg_recent_latency = recent.mean / 1000
+        trend = self._analyze_trend(minute_means)[0]
+
+        for threshold_type, threshold_value in self.thresholds.items():
+            if avg_recent_latency > threshold_value:
+                # Breach duration in consecutive minutes above threshold
+                breach_duration = 0.0
+                for minute_mean in reversed(minute_means):
+                    if minute_mean <= threshold_value:
+                        break
+                    breach_duration += 1.0
+
+                alerts.append(LatencyAlert(
+                    alert_id=f"{component.value}_{threshold_type.value}_{int(time.time())}",
+                    timestamp=datetime.now(timezone.utc),
+                    component=component,
+                    threshold=threshold_type,
+                    current_latency=avg_recent_latency,
+                    threshold_value=threshold_value,
+                    breach_duration=breach_duration,
+                    recent_measurements=minute_means[-10:],
+                    trend=trend,
+                    severity=self._determine_severity(avg_recent_latency, threshold_value, threshold_type)
+                ))
+
+        return alerts
+
     def check_threshold_breaches(self, measurements: List[LatencyMeasurement]) -> List[LatencyAlert]:
         """Check for threshold breaches and generate alerts"""
 
@@ -790,6 +1010,7 @@ class LatencyMonitor:
     - Threshold monitoring and alerting
     - Performance analysis and reporting
     - SLA compliance monitoring
+    - Rolling per-component latency histograms with SQLite snapshots
     - Integration with other monitoring systems
     """
 
@@ -805,6 +1026,12 @@ class LatencyMonitor:
         self.analyzer = LatencyAnalyzer(config.get('analysis', {}))
         self.tracker = LatencyTracker()
 
+        # Rolling latency histograms (O(1) per sample, queried without the database)
+        self.histograms = {component: RollingLatencyHistogram() for component in LatencyComponent}
+        self.histogram_lock = threading.Lock()
+        self.store_raw_measurements = config.get('store_raw_measurements', True)
+        self.monitoring_interval = config.get('monitoring_interval', 60)
+
         # Monitoring state
         self.monitoring_active = False
         self.monitor_thread = None
@@ -845,6 +1072,9 @@ class LatencyMonitor:
         self.monitoring_active = False
         if self.monitor_thread and self.monitor_thread.is_alive():
             self.monitor_thread.join(timeout=5)
+        # Persist histograms (including the open minute) and queued measurements
+        self.snapshot_histograms(include_open=True)
+        self.database.store.flush()
         logger.info("Latency monitoring stopped")
 
     def track_request(self, request_id: str, metadata: Optional[Dict] = None) -> str:
@@ -854,6 +1084,7 @@ class LatencyMonitor:
     def checkpoint(self, request_id: str, component: LatencyComponent) -> float:
         """Record a component checkpoint"""
         latency = self.tracker.checkpoint(request_id, component)
+        self.record_latency(component, latency)
 
         # Store measurement immediately for real-time monitoring
         measurement = LatencyMeasurement(
@@ -864,7 +1095,8 @@ class LatencyMonitor:
             request_id=request_id
         )
 
-        self.database.store_measurement(measurement)
+        if self.store_raw_measurements:
+            self.database.store_measurement(measurement)
 
         # Check for immediate threshold breaches
         self._check_immediate_breach(measurement)
@@ -875,12 +1107,113 @@ class LatencyMonitor:
         """Finish tracking a request"""
         measurements = self.tracker.finish_request(request_id)
 
-        # Store all measurements
+        # Component latencies were recorded at their checkpoints
         for measurement in measurements:
-            self.database.store_measurement(measurement)
+            if measurement.component == LatencyComponent.END_TO_END:
+                self.record_latency(LatencyComponent.END_TO_END, measurement.latency_ms)
+
+        # Store all measurements
+        if self.store_raw_measurements:
+            for measurement in measurements:
+                self.database.store_measurement(measurement)
 
         return measurements
 
+    def record_latency(self, component: LatencyComponent, latency_ms: float,
+                       now: Optional[float] = None):
+        """Record a latency sample into the component's rolling histogram"""
+        with self.histogram_lock:
+            self.histograms[component].record(latency_ms, now)
+
+    def get_latency_percentiles(self, component: LatencyComponent, window: str = '5m',
+                                now: Optional[float] = None) -> Dict[str, float]:
+        """
+        Percentiles over a rolling window, served from memory
+
+        Args:
+            component: Component to query
+            window: '1m', '5m' or '1h'
+
+        Returns:
+            count, mean, p50, p95, p99 and max latency in milliseconds
+        """
+        with self.histogram_lock:
+            histogram, _ = self.histograms[component].window(HISTOGRAM_WINDOWS[window], now)
+        p50, p95, p99 = histogram.percentiles((50, 95, 99))
+        return {
+            'window': window,
+            'count': histogram.count,
+            'mean': histogram.mean / 1000,
+            'p50': p50 / 1000,
+            'p95': p95 / 1000,
+            'p99': p99 / 1000,
+            'max': histogram.max / 1000
+        }
+
+    def snapshot_histograms(self, include_open: bool = False, now: Optional[float] = None) -> int:
+        """
+        Persist minutes not yet snapshotted to SQLite
+
+        Closed minutes are written once; with include_open the current
+        minute is written too and replaced by a later snapshot.
+
+        Returns:
+            Number of minute snapshots written
+        """
+        current = RollingLatencyHistogram.minute_of(now)
+        snapshots = []
+        with self.histogram_lock:
+            for component, rolling in self.histograms.items():
+                last_minute = current if include_open else current - 1
+                for minute, histogram in rolling.minutes(rolling.snapshot_minute + 1, last_minute):
+                    snapshots.append((component, minute, LatencyHistogram.from_state(histogram.to_state())))
+                rolling.snapshot_minute = max(rolling.snapshot_minute, current - 1)
+
+        self.database.store_histogram_snapshots(snapshots)
+        return len(snapshots)
+
+    def _minute_histograms(self, component: LatencyComponent, hours: float, use_snapshots: bool = False,
+                           now: Optional[float] = None) -> List[Tuple[int, LatencyHistogram]]:
+        """
+        Per-minute histograms covering the last `hours`, oldest first
+
+        Windows that fit in the in-memory ring are served from memory unless
+        use_snapshots is set; otherwise snapshots are read and the minutes
+        not yet persisted are added from memory.
+        """
+        current = RollingLatencyHistogram.minute_of(now)
+        first_minute = current - max(int(hours * 60), 1) + 1
+        rolling = self.histograms[component]
+
+        if not use_snapshots and current - first_minute < rolling.slots:
+            with self.histogram_lock:
+                return rolling.minutes(first_minute, current)
+
+        by_minute = dict(self.database.get_histogram_snapshots(component, first_minute, current))
+        with self.histogram_lock:
+            unsaved = rolling.minutes(max(first_minute, rolling.snapshot_minute + 1), current)
+            by_minute.update((minute, LatencyHistogram.from_state(histogram.to_state()))
+                             for minute, histogram in unsaved)
+        return sorted(by_minute.items())
+
+    def _histogram_statistics(self, component: LatencyComponent, hours: float, use_snapshots: bool = False,
+                              now: Optional[float] = None) -> LatencyStatistics:
+        minutes = self._minute_histograms(component, hours, use_snapshots, now)
+        merged = LatencyHistogram()
+        for _, histogram in minutes:
+            merged.merge(histogram)
+
+        if minutes:
+            period_start = datetime.fromtimestamp(minutes[0][0] * SECONDS_PER_MINUTE, tz=timezone.utc)
+            period_end = datetime.fromtimestamp((minutes[-1][0] + 1) * SECONDS_PER_MINUTE, tz=timezone.utc)
+        else:
+            period_start = period_end = datetime.now(timezone.utc)
+
+        return self.analyzer.analyze_histogram(
+            component, merged, [histogram.mean / 1000 for _, histogram in minutes],
+            period_start, period_end
+        )
+
     def get_component_statistics(self, component: LatencyComponent,
                                 hours: int = 1, force_refresh: bool = False) -> LatencyStatistics:
         """Get statistics for a component"""
@@ -892,11 +1225,8 @@ class LatencyMonitor:
                 if age < self.cache_expiry:
                     return self.stats_cache[component]
 
-        # Get recent measurements
-        measurements = self.database.get_recent_measurements(component, hours)
-
-        # Analyze
-        statistics = self.analyzer.analyze_component_latency(measurements)
+        # Analyze rolling histograms (snapshots for periods beyond the last hour)
+        statistics = self._histogram_statistics(component, hours)
 
         # Cache results
         self.stats_cache[component] = statistics
@@ -959,27 +1289,35 @@ class LatencyMonitor:
 
         while self.monitoring_active:
             try:
-                # Analyze recent performance for each component
+                # Persist closed minutes
+                self.snapshot_histograms()
+
+                # Check the last five minutes of each component
                 for component in LatencyComponent:
                     try:
-                        measurements = self.database.get_recent_measurements(component, hours=1)
+                        with self.histogram_lock:
+                            recent, minute_means = self.histograms[component].window(HISTOGRAM_WINDOWS['5m'])
 
-                        if len(measurements) >= 10:  # Need minimum measurements
-                            # Check for threshold breaches
-                            alerts = self.analyzer.check_threshold_breaches(measurements)
+                        alerts = self.analyzer.check_histogram_breaches(component, recent, minute_means)
 
-                            for alert in alerts:
-                                self._handle_alert(alert)
+                        for alert in alerts:
+                            self._handle_alert(alert)
 
                     except Exception as e:
                         logger.error(f"Error monitoring component {component.value}: {e}")
 
                 # Sleep until next monitoring cycle
-                time.sleep(60)  # Check every minute
+                self._sleep(self.monitoring_interval)
 
             except Exception as e:
                 logger.error(f"Monitoring loop error: {e}")
-                time.sleep(30)  # Short sleep on error
+                self._sleep(30)  # Short sleep on error
+
+    def _sleep(self, seconds: float):
+        """Sleep in short steps so stop_monitoring is not held up"""
+        deadline = time.time() + seconds
+        while self.monitoring_active and time.time() < deadline:
+            time.sleep(min(1.0, deadline - time.time()))
 
     def _check_immediate_breach(self, measurement: LatencyMeasurement):
         """Check for immediate threshold breach"""
@@ -1032,7 +1370,10 @@ class LatencyMonitor:
         return False
 
     def generate_performance_report(self, hours: int = 24) -> Dict[str, Any]:
-        """Generate comprehensive performance report"""
+        """Generate comprehensive performance report from histogram snapshots"""
+
+        # Make every closed minute available to the snapshot reader
+        self.snapshot_histograms()
 
         report = {
             'report_timestamp': datetime.now(timezone.utc).isoformat(),
@@ -1047,7 +1388,9 @@ class LatencyMonitor:
         # Analyze each component
         for component in LatencyComponent:
             try:
-                stats = self.get_component_statistics(component, hours, force_refresh=True)
+                stats = self._histogram_statistics(component, hours, use_snapshots=True)
+                self.stats_cache[component] = stats
+                self.last_cache_update[component] = datetime.now(timezone.utc)
 
                 report['components'][component.value] = asdict(stats)
                 all_stats.append(stats)
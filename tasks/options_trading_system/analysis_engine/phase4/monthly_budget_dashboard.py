@@ -12,10 +12,10 @@ This module provides comprehensive budget visualization and monitoring:
 
 import os
 import json
-import sqlite3
 import logging
 from datetime import datetime, timedelta, timezone
 from utils.timezone_utils import get_eastern_time, get_utc_time
+from utils.sqlite_store import get_store
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
 from collections import defaultdict
@@ -84,11 +84,12 @@ class BudgetDatabase:
     def __init__(self, db_path: str = "outputs/budget_tracking.db"):
         self.db_path = db_path
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.store = get_store(self.db_path)
         self._init_database()
 
     def _init_database(self):
         """Initialize database schema"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
 
             # Daily budget tracking
@@ -165,7 +166,7 @@ class BudgetDatabase:
 
     def update_daily_costs(self, date: str, cost_breakdown: Dict[str, float]):
         """Update daily cost breakdown"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
 
             # Calculate totals
@@ -195,7 +196,7 @@ class BudgetDatabase:
         if not PLOTTING_AVAILABLE:
             return None
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             query = """
                 SELECT * FROM daily_budget
                 WHERE date >= ? AND date <= ?
@@ -205,7 +206,7 @@ class BudgetDatabase:
 
     def record_budget_alert(self, alert: BudgetAlert):
         """Record budget alert"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
 
             cursor.execute("""
@@ -703,7 +704,7 @@ class MonthlyBudgetDashboard:
         today = now.strftime('%Y-%m-%d')
 
         # Get basic monthly totals from database
-        with sqlite3.connect(self.database.db_path) as conn:
+        with self.database.store.connection() as conn:
             cursor = conn.cursor()
 
             cursor.execute("""
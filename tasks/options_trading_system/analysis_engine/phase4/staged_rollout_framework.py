@@ -24,12 +24,12 @@ Rollout Stages:
 import os
 import json
 import logging
-import sqlite3
 import threading
 import time
 import random
 from datetime import datetime, timedelta, timezone
 from utils.timezone_utils import get_eastern_time, get_utc_time
+from utils.sqlite_store import get_store
 from typing import Dict, List, Any, Optional, Tuple, Callable, Union
 from dataclasses import dataclass, asdict
 from collections import defaultdict, deque
@@ -456,11 +456,12 @@ class RolloutDatabase:
     def __init__(self, db_path: str = "outputs/staged_rollouts.db"):
         self.db_path = db_path
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.store = get_store(self.db_path)
         self._init_database()
 
     def _init_database(self):
         """Initialize database schema"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
 
             # Rollout configurations
@@ -574,7 +575,7 @@ class RolloutDatabase:
 
     def save_rollout_configuration(self, rollout_id: str, config: RolloutConfiguration):
         """Save rollout configuration"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT OR REPLACE INTO rollout_configs
@@ -592,7 +593,7 @@ class RolloutDatabase:
 
     def save_rollout_state(self, state: RolloutState):
         """Save current rollout state"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT OR REPLACE INTO rollout_states
@@ -614,7 +615,7 @@ class RolloutDatabase:
 
     def record_performance_metrics(self, rollout_id: str, metrics: PerformanceMetrics):
         """Record performance metrics"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO performance_metrics
@@ -634,7 +635,7 @@ class RolloutDatabase:
 
     def record_validation_test(self, rollout_id: str, test: ValidationTest):
         """Record validation test results"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO validation_tests
@@ -10,8 +10,8 @@ This module tracks the specific success metrics outlined in the Phase 4 requirem
 """
 
 import os
+import sys
 import json
-import sqlite3
 import logging
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Any, Optional, Tuple
@@ -20,6 +20,10 @@ from enum import Enum
 from collections import defaultdict, deque
 import numpy as np
 
+# Shared SQLite storage layer lives in the repository-level utils package
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', '..'))
+from utils.sqlite_store import get_store
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -139,11 +143,12 @@ class MetricsDatabase:
         """Initialize metrics database"""
         self.db_path = db_path
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.store = get_store(self.db_path)
         self._init_database()
 
     def _init_database(self):
         """Initialize database schema"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
 
             # Signal metrics table
@@ -234,7 +239,7 @@ class MetricsDatabase:
 
     def store_signal_metrics(self, metrics: SignalMetrics):
         """Store signal performance metrics"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
 
             cursor.execute("""
@@ -271,7 +276,7 @@ class MetricsDatabase:
     def get_signals(self, start_date: datetime, end_date: datetime,
                    algorithm_version: Optional[AlgorithmVersion] = None) -> List[SignalMetrics]:
         """Get signals for a time period"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
 
             query = """
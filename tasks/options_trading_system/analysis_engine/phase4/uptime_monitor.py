@@ -12,6 +12,8 @@ Key Features:
 - Automated alerting for availability issues
 - Historical uptime analysis and trending
 - Incident categorization and root cause tracking
+- Single-thread asyncio scheduler with non-blocking HTTP/TCP/ping probes,
+  so hundreds of components do not need hundreds of threads
 
 SLA Target: 99.9% uptime
 - Allowed downtime: 8.76 hours/year, 43.2 minutes/month, 10.1 minutes/week
@@ -20,9 +22,10 @@ SLA Target: 99.9% uptime
 """
 
 import os
+import sys
 import json
+import asyncio
 import logging
-import sqlite3
 import threading
 import time
 import requests
@@ -35,10 +38,27 @@ from enum import Enum
 import statistics
 import subprocess
 
+# Shared SQLite storage layer lives in the repository-level utils package
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', '..'))
+from utils.sqlite_store import get_store
+
+try:
+    from .health_check_scheduler import HealthCheckScheduler
+except ImportError:
+    from health_check_scheduler import HealthCheckScheduler
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Non-blocking HTTP probes (falls back to the blocking checker on a worker thread)
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+    logger.warning("aiohttp not available - HTTP health checks will use worker threads")
+
 
 class ComponentType(Enum):
     """Types of system components to monitor"""
@@ -256,7 +276,12 @@ class HealthChecker:
                 error_message=str(e)
             )
 
-        # Apply response time threshold
+        return self.apply_response_time_threshold(component_config, result)
+
+    @staticmethod
+    def apply_response_time_threshold(component_config: ComponentConfig,
+                                      result: HealthCheckResult) -> HealthCheckResult:
+        """Mark a successful but slow check as degraded"""
         if (result.success and component_config.max_response_time and
             result.response_time > component_config.max_response_time):
             result.status = ComponentStatus.DEGRADED
@@ -501,17 +526,166 @@ class HealthChecker:
             )
 
 
+class AsyncHealthChecker:
+    """
+    Non-blocking health checks for the asyncio scheduler
+
+    HTTP (through aiohttp when installed), TCP and ping probes run on the
+    event loop; file and function checks, and HTTP without aiohttp, go to
+    the blocking HealthChecker on worker threads. Results match the
+    blocking checker's.
+    """
+
+    def __init__(self, health_checker: HealthChecker, max_connections: int = 50):
+        self.health_checker = health_checker
+        self.max_connections = max_connections
+        self.session = None
+
+    async def open(self):
+        """Create the shared HTTP session (must run on the scheduler loop)"""
+        if AIOHTTP_AVAILABLE and self.session is None:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections)
+            )
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def check_component(self, component_config: ComponentConfig) -> HealthCheckResult:
+        """Async counterpart of HealthChecker.check_component"""
+        method = component_config.check_method
+        start_time = time.time()
+
+        try:
+            if method == "http" and self.session is not None:
+                result = await self._check_http(component_config)
+            elif method == "tcp":
+                result = await self._check_tcp(component_config)
+            elif method == "ping":
+                result = await self._check_ping(component_config)
+            else:
+                return await asyncio.get_running_loop().run_in_executor(
+                    None, self.health_checker.check_component, component_config
+                )
+
+        except Exception as e:
+            result = self._result(component_config, ComponentStatus.DOWN, time.time() - start_time,
+                                  False, error_message=str(e))
+
+        return HealthChecker.apply_response_time_threshold(component_config, result)
+
+    @staticmethod
+    def _result(config: ComponentConfig, status: ComponentStatus, response_time: float,
+                success: bool, **details) -> HealthCheckResult:
+        return HealthCheckResult(
+            component_id=config.component_id,
+            timestamp=datetime.now(timezone.utc),
+            status=status,
+            response_time=response_time,
+            check_method=config.check_method,
+            success=success,
+            **details
+        )
+
+    async def _check_http(self, config: ComponentConfig) -> HealthCheckResult:
+        """Check HTTP endpoint"""
+
+        start_time = time.time()
+
+        try:
+            async with self.session.get(config.check_target,
+                                        timeout=aiohttp.ClientTimeout(total=config.timeout),
+                                        allow_redirects=True) as response:
+                content = await response.read()
+            response_time = time.time() - start_time
+
+            success = True
+            error_message = None
+
+            if config.expected_response_code and response.status != config.expected_response_code:
+                success = False
+                error_message = f"Expected {config.expected_response_code}, got {response.status}"
+
+            if success and config.expected_response_text:
+                if config.expected_response_text not in content.decode(response.charset or 'utf-8', 'replace'):
+                    success = False
+                    error_message = f"Expected text '{config.expected_response_text}' not found"
+
+            return self._result(config, ComponentStatus.UP if success else ComponentStatus.DOWN,
+                                response_time, success, error_message=error_message,
+                                response_code=response.status, response_size=len(content))
+
+        except asyncio.TimeoutError:
+            return self._result(config, ComponentStatus.DOWN, time.time() - start_time, False,
+                                error_message=f"Timeout after {config.timeout}s")
+
+        except aiohttp.ClientError as e:
+            return self._result(config, ComponentStatus.DOWN, time.time() - start_time, False,
+                                error_message=str(e))
+
+    async def _check_tcp(self, config: ComponentConfig) -> HealthCheckResult:
+        """Check TCP port connectivity"""
+
+        start_time = time.time()
+
+        if ':' in config.check_target:
+            host, port = config.check_target.split(':', 1)
+            port = int(port)
+        else:
+            host = config.check_target
+            port = 80  # Default port
+
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), config.timeout)
+            response_time = time.time() - start_time
+            writer.close()
+            success = True
+        except (OSError, asyncio.TimeoutError):
+            response_time = time.time() - start_time
+            success = False
+
+        return self._result(config, ComponentStatus.UP if success else ComponentStatus.DOWN,
+                            response_time, success,
+                            error_message=None if success else f"Connection failed to {host}:{port}")
+
+    async def _check_ping(self, config: ComponentConfig) -> HealthCheckResult:
+        """Check host connectivity via ping"""
+
+        start_time = time.time()
+
+        process = await asyncio.create_subprocess_exec(
+            'ping', '-c', '1', '-W', str(config.timeout * 1000), config.check_target,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            _, stderr = await asyncio.wait_for(process.communicate(), config.timeout + 1)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            return self._result(config, ComponentStatus.DOWN, time.time() - start_time, False,
+                                error_message=f"Ping timeout after {config.timeout}s")
+
+        success = (process.returncode == 0)
+        return self._result(config, ComponentStatus.UP if success else ComponentStatus.DOWN,
+                            time.time() - start_time, success,
+                            error_message=None if success else stderr.decode(errors='replace').strip())
+
+
 class UptimeDatabase:
     """Database for storing uptime monitoring data"""
 
     def __init__(self, db_path: str = "outputs/uptime_monitoring.db"):
         self.db_path = db_path
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.store = get_store(self.db_path)
         self._init_database()
 
     def _init_database(self):
         """Initialize database schema"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
 
             # Component configurations
@@ -633,7 +807,7 @@ class UptimeDatabase:
 
     def save_component_config(self, config: ComponentConfig):
         """Save component configuration"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT OR REPLACE INTO components
@@ -650,25 +824,36 @@ class UptimeDatabase:
             conn.commit()
 
     def store_health_check(self, result: HealthCheckResult):
-        """Store health check result"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO health_checks
-                (component_id, timestamp, status, response_time, check_method, success,
-                 error_message, response_code, response_size, metadata)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                result.component_id, result.timestamp.isoformat(), result.status.value,
-                result.response_time, result.check_method, result.success,
-                result.error_message, result.response_code, result.response_size,
-                json.dumps(result.metadata) if result.metadata else None
-            ))
-            conn.commit()
+        """Queue health check result for the batched background writer"""
+        self.store.execute_async("""
+            INSERT INTO health_checks
+            (component_id, timestamp, status, response_time, check_method, success,
+             error_message, response_code, response_size, metadata)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            result.component_id, result.timestamp.isoformat(), result.status.value,
+            result.response_time, result.check_method, result.success,
+            result.error_message, result.response_code, result.response_size,
+            json.dumps(result.metadata) if result.metadata else None
+        ))
+
+    def store_health_checks(self, results: List[HealthCheckResult]):
+        """Queue a batch of health check results as one write"""
+        self.store.executemany_async("""
+            INSERT INTO health_checks
+            (component_id, timestamp, status, response_time, check_method, success,
+             error_message, response_code, response_size, metadata)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [(
+            result.component_id, result.timestamp.isoformat(), result.status.value,
+            result.response_time, result.check_method, result.success,
+            result.error_message, result.response_code, result.response_size,
+            json.dumps(result.metadata) if result.metadata else None
+        ) for result in results])
 
     def store_incident(self, incident: DowntimeIncident):
         """Store downtime incident"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT OR REPLACE INTO incidents
@@ -693,7 +878,7 @@ class UptimeDatabase:
         """Get recent health checks for a component"""
         since = datetime.now(timezone.utc) - timedelta(hours=hours)
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT component_id, timestamp, status, response_time, check_method,
@@ -911,6 +1096,9 @@ class UptimeMonitor:
     - SLA compliance monitoring and reporting
     - Automated alerting for downtime events
     - Historical uptime analysis and trending
+
+    Every component is checked by one HealthCheckScheduler thread; status
+    changes, incidents and callbacks run on that thread.
     """
 
     def __init__(self, config: Dict[str, Any]):
@@ -931,7 +1119,22 @@ class UptimeMonitor:
 
         # Monitoring state
         self.monitoring_active = False
-        self.monitor_threads: Dict[str, threading.Thread] = {}
+        scheduler_config = config.get('scheduler', {})
+        self.async_checker = AsyncHealthChecker(
+            self.health_checker, scheduler_config.get('max_concurrent_checks', 50)
+        )
+        self.scheduler = HealthCheckScheduler(
+            check=self.async_checker.check_component,
+            on_result=self._update_component_status,
+            persist=self.database.store_health_checks,
+            max_concurrent_checks=scheduler_config.get('max_concurrent_checks', 50),
+            jitter=scheduler_config.get('jitter', 0.1),
+            tick=scheduler_config.get('tick', 0.25),
+            persist_interval=scheduler_config.get('persist_interval', 5.0),
+            persist_batch_size=scheduler_config.get('persist_batch_size', 500),
+            on_start=self.async_checker.open,
+            on_stop=self.async_checker.close
+        )
 
         # Incident tracking
         self.active_incidents: Dict[str, DowntimeIncident] = {}
@@ -961,6 +1164,9 @@ class UptimeMonitor:
         # Save to database
         self.database.save_component_config(config)
 
+        if self.monitoring_active:
+            self.scheduler.add_component(config)
+
         logger.info(f"Added component for monitoring: {config.name} ({config.component_id})")
 
     def remove_component(self, component_id: str):
@@ -973,6 +1179,8 @@ class UptimeMonitor:
                 self.last_status_change.pop(component_id, None)
                 self.consecutive_failures.pop(component_id, None)
 
+        self.scheduler.remove_component(component_id)
+
         logger.info(f"Removed component from monitoring: {component_id}")
 
     def start_monitoring(self):
@@ -984,17 +1192,11 @@ class UptimeMonitor:
 
         self.monitoring_active = True
 
-        # Start monitoring thread for each component
+        # One scheduler thread checks every component
         with self.component_lock:
-            for component_id, config in self.components.items():
-                thread = threading.Thread(
-                    target=self._monitor_component,
-                    args=(component_id, config),
-                    daemon=True,
-                    name=f"UptimeMonitor-{component_id}"
-                )
-                thread.start()
-                self.monitor_threads[component_id] = thread
+            for config in self.components.values():
+                self.scheduler.add_component(config)
+        self.scheduler.start()
 
         logger.info(f"Started uptime monitoring for {len(self.components)} components")
 
@@ -1003,39 +1205,21 @@ class UptimeMonitor:
 
         self.monitoring_active = False
 
-        # Wait for monitor threads to finish
-        for thread in self.monitor_threads.values():
-            if thread.is_alive():
-                thread.join(timeout=5)
+        # In-flight checks finish and their results are queued before the scheduler exits
+        self.scheduler.stop()
 
-        self.monitor_threads.clear()
+        # Persist queued health checks before returning
+        self.database.store.flush()
 
         logger.info("Stopped uptime monitoring")
 
-    def _monitor_component(self, component_id: str, config: ComponentConfig):
-        """Monitor individual component"""
-
-        while self.monitoring_active:
-            try:
-                # Perform health check
-                result = self.health_checker.check_component(config)
-
-                # Store result
-                self.database.store_health_check(result)
-
-                # Update component status
-                self._update_component_status(component_id, result)
-
-                # Sleep until next check
-                time.sleep(config.check_interval)
-
-            except Exception as e:
-                logger.error(f"Error monitoring component {component_id}: {e}")
-                time.sleep(30)  # Short sleep on error
-
     def _update_component_status(self, component_id: str, result: HealthCheckResult):
         """Update component status and handle state changes"""
 
+        config = self.components.get(component_id)
+        if config is None:  # Removed while its check was in flight
+            return
+
         previous_status = self.component_status.get(component_id, ComponentStatus.UNKNOWN)
         current_status = result.status
 
@@ -1058,8 +1242,6 @@ class UptimeMonitor:
                 self._handle_component_up(component_id, result)
 
         # Check for incident creation/resolution
-        config = self.components[component_id]
-
         if (current_status == ComponentStatus.DOWN and
             self.consecutive_failures[component_id] >= config.alert_after_failures):
             self._create_incident_if_needed(component_id, result)
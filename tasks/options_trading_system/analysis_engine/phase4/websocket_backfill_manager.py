@@ -23,9 +23,9 @@ Connection Gap Handling:
 """
 
 import os
+import sys
 import json
 import logging
-import sqlite3
 import threading
 import time
 import queue
@@ -36,6 +36,10 @@ from collections import defaultdict, deque
 from enum import Enum
 import asyncio
 
+# Shared SQLite storage layer lives in the repository-level utils package
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', '..'))
+from utils.sqlite_store import get_store
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -302,11 +306,12 @@ class BackfillDatabase:
     def __init__(self, db_path: str = "outputs/websocket_backfill.db"):
         self.db_path = db_path
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.store = get_store(self.db_path)
         self._init_database()
 
     def _init_database(self):
         """Initialize database schema"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
 
             # Connection events table
@@ -400,7 +405,7 @@ class BackfillDatabase:
 
     def store_connection_event(self, event: ConnectionEvent):
         """Store connection event"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT OR REPLACE INTO connection_events
@@ -419,7 +424,7 @@ class BackfillDatabase:
 
     def store_connection_gap(self, gap: ConnectionGap):
         """Store connection gap"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT OR REPLACE INTO connection_gaps
@@ -439,7 +444,7 @@ class BackfillDatabase:
 
     def store_backfill_request(self, request: BackfillRequest):
         """Store backfill request"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT OR REPLACE INTO backfill_requests
@@ -464,7 +469,7 @@ class BackfillDatabase:
 
     def get_open_gaps(self, symbol: Optional[str] = None) -> List[ConnectionGap]:
         """Get open (unclosed) connection gaps"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
 
             if symbol:
@@ -503,7 +508,7 @@ class BackfillDatabase:
 
     def get_pending_backfill_requests(self) -> List[BackfillRequest]:
         """Get pending backfill requests"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT * FROM backfill_requests
@@ -76,12 +76,13 @@ class RiskAnalyzer:
 
         return 21376.75  # Default fallback
 
-    def analyze_risk(self, data_config: Dict[str, Any]) -> Dict[str, Any]:
+    def analyze_risk(self, data_config: Dict[str, Any], snapshot=None) -> Dict[str, Any]:
         """
         Perform comprehensive options risk analysis
 
         Args:
             data_config: Configuration with normalized data
+            snapshot: Optional shared MarketSnapshot (skips data ingestion)
 
         Returns:
             Dict with risk analysis results
@@ -95,6 +96,10 @@ class RiskAnalyzer:
                 normalized_data = data_config["normalized_data"]
                 contracts = normalized_data.get("contracts", [])
                 underlying_price = normalized_data.get("underlying_price", 0)
+            elif snapshot is not None:
+                # Shared snapshot loaded once per analysis cycle
+                contracts = snapshot.contracts
+                underlying_price = self._estimate_underlying_price(contracts)
             else:
                 # Load data using data ingestion pipeline (production scenario)
                 sys.path.insert(0, os.path.join(project_root, 'tasks', 'options_trading_system'))
@@ -284,13 +289,15 @@ class RiskAnalyzer:
             }
 
 
-def run_risk_analysis(data_config: Dict[str, Any], analysis_config: Dict[str, Any] = None) -> Dict[str, Any]:
+def run_risk_analysis(data_config: Dict[str, Any], analysis_config: Dict[str, Any] = None,
+                      snapshot=None) -> Dict[str, Any]:
     """
     Run options risk analysis
 
     Args:
         data_config: Configuration with normalized data
         analysis_config: Risk analysis configuration
+        snapshot: Optional shared MarketSnapshot (skips data ingestion)
 
     Returns:
         Dict with risk analysis results
@@ -304,7 +311,7 @@ def run_risk_analysis(data_config: Dict[str, Any], analysis_config: Dict[str, An
         }
 
     analyzer = RiskAnalyzer(analysis_config)
-    return analyzer.analyze_risk(data_config)
+    return analyzer.analyze_risk(data_config, snapshot)
 
 
 if __name__ == "__main__":
@@ -17,10 +17,11 @@ Features:
 import json
 import os
 import sqlite3
+import logging
 from datetime import datetime, timedelta
 from utils.timezone_utils import get_eastern_time, get_utc_time
 from typing import Dict, Any, List, Optional, Tuple, Union
-from dataclasses import dataclass, asdict, field
+from dataclasses import dataclass, asdict, field, replace
 from enum import Enum
 import pandas as pd
 import numpy as np
@@ -28,6 +29,19 @@ from concurrent.futures import ProcessPoolExecutor, as_completed
 import warnings
 warnings.filterwarnings('ignore')
 
+logger = logging.getLogger(__name__)
+
+try:
+    from .walk_forward_optimizer import WalkForwardOptimizer
+    from .monte_carlo import simulate_trade_paths, summarize_simulations, max_drawdowns
+    from .options_replay import OptionsHistory, OptionsSnapshot
+    from .options_history_store import OptionsHistoryStore
+except ImportError:
+    from walk_forward_optimizer import WalkForwardOptimizer
+    from monte_carlo import simulate_trade_paths, summarize_simulations, max_drawdowns
+    from options_replay import OptionsHistory, OptionsSnapshot
+    from options_history_store import OptionsHistoryStore
+
 
 class MarketRegime(Enum):
     """Market regime classification"""
@@ -69,6 +83,8 @@ class BacktestConfig:
     # Optimization
     walk_forward_windows: int = 12
     optimization_metric: str = "sharpe_ratio"
+    optimization_workers: Optional[int] = None  # None = all cores, 1 = inline
+    halving_eta: int = 3  # 1 = exhaustive grid search
 
 
 @dataclass
@@ -152,59 +168,131 @@ class BacktestResults:
 class HistoricalDataLoader:
     """Load and prepare historical market data"""
 
-    def __init__(self, data_dir: str = "data/historical"):
+    # Wall-clock zone of the synthetic chain's 9:00-16:00 bars
+    SESSION_TZ = 'US/Eastern'
+
+    def __init__(self, data_dir: str = "data/historical", fill_missing_days: bool = False):
+        """
+        Args:
+            data_dir: Root of the on-disk options history store
+            fill_missing_days: Fill trading days missing from a partly
+                ingested window with synthetic data instead of leaving the gap
+        """
         self.data_dir = data_dir
         self.cache = {}
+        self.store = OptionsHistoryStore(data_dir)
+        self.fill_missing_days = fill_missing_days
+        self.missing_days: Dict[str, List[str]] = {}  # Symbol -> trading days absent from its last load
 
     def load_options_data(self, symbol: str, start_date: datetime,
-                         end_date: datetime) -> pd.DataFrame:
+                         end_date: datetime,
+                         strike_range: Optional[Tuple[float, float]] = None,
+                         option_types: Optional[List[str]] = None) -> pd.DataFrame:
         """
         Load historical options data
 
+        Reads the day partitions of the on-disk history store when it holds
+        the symbol for this window, otherwise generates synthetic data.
+        Trading days missing inside a partly ingested window are logged and
+        recorded in missing_days; only with fill_missing_days are they
+        filled with synthetic data.
+
         Returns DataFrame with columns:
         - timestamp, symbol, strike, option_type, bid, ask, last, volume, open_interest
         """
-        # In production, this would load from database or files
-        # For now, generate synthetic data for testing
+        if not self.store.has_data(symbol, start_date, end_date):
+            self.missing_days.pop(symbol, None)
+            return self._filter_options(self._synthetic_options_data(symbol, start_date, end_date),
+                                        strike_range, option_types).reset_index(drop=True)
+
+        data = self.store.load(symbol, start_date, end_date,
+                               strike_range=strike_range, option_types=option_types)
+        missing = self.missing_days[symbol] = self.store.missing_days(symbol, start_date, end_date)
+        if not missing:
+            return data
+
+        action = "filling with synthetic data" if self.fill_missing_days else "returning stored days only"
+        logger.warning(f"Options history for {symbol} is missing {len(missing)} trading day(s) between "
+                       f"{pd.Timestamp(start_date).date()} and {pd.Timestamp(end_date).date()}; "
+                       f"{action}: {', '.join(missing)}")
+        if not self.fill_missing_days:
+            return data
+        return self._fill_missing_days(data, symbol, missing, start_date, end_date, strike_range, option_types)
+
+    def _fill_missing_days(self, data: pd.DataFrame, symbol: str, missing: List[str],
+                           start_date: datetime, end_date: datetime,
+                           strike_range: Optional[Tuple[float, float]],
+                           option_types: Optional[List[str]]) -> pd.DataFrame:
+        """Synthetic rows for missing days, built in session time and converted to the history's zone"""
+        tz = data['timestamp'].dt.tz
+
+        def session_time(value: datetime) -> pd.Timestamp:
+            ts = pd.Timestamp(value)
+            if ts.tzinfo is None and tz is not None:
+                ts = ts.tz_localize(tz)  # Naive bounds mean the history's zone, as in the store
+            return ts.tz_convert(self.SESSION_TZ).tz_localize(None) if ts.tzinfo is not None else ts
+
+        first, last = session_time(start_date), session_time(end_date)
+        fills = []
+        for day in missing:
+            day_start = pd.Timestamp(day)
+            fill = self._synthetic_options_data(
+                symbol, max(day_start, first), min(day_start + pd.Timedelta(days=1) - pd.Timedelta(1, 'ns'), last))
+            fills.append(self._filter_options(fill, strike_range, option_types))
+        filled = pd.concat(fills, ignore_index=True)
+        if tz is not None:
+            filled['timestamp'] = filled['timestamp'].dt.tz_localize(self.SESSION_TZ).dt.tz_convert(tz)
+        data = pd.concat([data, filled[data.columns]], ignore_index=True)
+        return data.sort_values(['timestamp', 'strike', 'option_type'], kind='mergesort').reset_index(drop=True)
 
-        dates = pd.date_range(start_date, end_date, freq='5T')
+    @staticmethod
+    def _filter_options(data: pd.DataFrame, strike_range: Optional[Tuple[float, float]],
+                        option_types: Optional[List[str]]) -> pd.DataFrame:
+        if strike_range is not None:
+            data = data[data['strike'].between(*strike_range)]
+        if option_types is not None:
+            data = data[data['option_type'].isin([t.upper() for t in option_types])]
+        return data
+
+    def _synthetic_options_data(self, symbol: str, start_date: datetime,
+                                end_date: datetime) -> pd.DataFrame:
+        """Synthetic chain for testing: one row per (5-min bar, strike, type)"""
+        dates = pd.date_range(start_date, end_date, freq='5min')
         dates = dates[dates.dayofweek < 5]  # Weekdays only
         dates = dates[(dates.hour >= 9) & (dates.hour < 16)]  # Market hours
 
         # Generate strikes around 21350 (NQ example)
         strikes = np.arange(21000, 21700, 25)
-
-        data_rows = []
-        for date in dates:
-            base_price = 21350 + np.sin(date.hour) * 50  # Synthetic intraday movement
-
-            for strike in strikes:
-                for opt_type in ['CALL', 'PUT']:
-                    # Synthetic option pricing
-                    intrinsic = max(0, base_price - strike) if opt_type == 'CALL' else max(0, strike - base_price)
-                    time_value = abs(base_price - strike) * 0.01 + np.random.uniform(1, 5)
-
-                    bid = intrinsic + time_value - 0.5
-                    ask = intrinsic + time_value + 0.5
-                    last = (bid + ask) / 2
-
-                    volume = np.random.poisson(100) if abs(base_price - strike) < 100 else np.random.poisson(20)
-                    open_interest = np.random.randint(100, 5000)
-
-                    data_rows.append({
-                        'timestamp': date,
-                        'symbol': symbol,
-                        'strike': strike,
-                        'option_type': opt_type,
-                        'bid': bid,
-                        'ask': ask,
-                        'last': last,
-                        'volume': volume,
-                        'open_interest': open_interest,
-                        'underlying_price': base_price
-                    })
-
-        return pd.DataFrame(data_rows)
+        per_date = len(strikes) * 2
+        rows = len(dates) * per_date
+
+        base_price = np.repeat(21350 + np.sin(dates.hour.to_numpy()) * 50, per_date)  # Synthetic intraday movement
+        strike = np.tile(np.repeat(strikes, 2), len(dates))
+        opt_type = np.tile(np.array(['CALL', 'PUT'], dtype=object), len(dates) * len(strikes))
+
+        # Synthetic option pricing
+        intrinsic = np.where(opt_type == 'CALL', np.maximum(0, base_price - strike),
+                             np.maximum(0, strike - base_price))
+        time_value = np.abs(base_price - strike) * 0.01 + np.random.uniform(1, 5, rows)
+        bid = intrinsic + time_value - 0.5
+        ask = intrinsic + time_value + 0.5
+
+        near_money = np.abs(base_price - strike) < 100
+        volume = np.where(near_money, np.random.poisson(100, rows), np.random.poisson(20, rows))
+        open_interest = np.random.randint(100, 5000, rows)
+
+        return pd.DataFrame({
+            'timestamp': np.repeat(dates, per_date),
+            'symbol': symbol,
+            'strike': strike,
+            'option_type': opt_type,
+            'bid': bid,
+            'ask': ask,
+            'last': (bid + ask) / 2,
+            'volume': volume,
+            'open_interest': open_interest,
+            'underlying_price': base_price
+        })
 
     def load_market_data(self, start_date: datetime, end_date: datetime) -> pd.DataFrame:
         """Load market indicators (VIX, volume, etc.)"""
@@ -305,13 +393,6 @@ class HistoricalBacktester:
         print(f"   Period: {config.start_date.date()} to {config.end_date.date()}")
         print(f"   Capital: ${config.initial_capital:,.0f}")
 
-        # Initialize results
-        results = BacktestResults(
-            backtest_id=backtest_id,
-            algorithm_version=algorithm_version,
-            config=config
-        )
-
         # Load historical data
         options_data = self.data_loader.load_options_data(
             "NQM25", config.start_date, config.end_date
@@ -320,6 +401,35 @@ class HistoricalBacktester:
             config.start_date, config.end_date
         )
 
+        results = self.simulate(algorithm_version, config, options_data, market_data,
+                                progress_callback, backtest_id=backtest_id)
+
+        # Save results
+        self._save_results(results)
+
+        print(f"✅ Backtest completed: {backtest_id}")
+        self._print_summary(results)
+
+        return results
+
+    def simulate(self, algorithm_version: str, config: BacktestConfig,
+                 options_data: Union[pd.DataFrame, OptionsHistory], market_data: pd.DataFrame,
+                 progress_callback: Optional[callable] = None,
+                 backtest_id: Optional[str] = None) -> BacktestResults:
+        """
+        Replay already-loaded data through the strategy
+
+        Deterministic for a given data set and does no I/O, so the parameter
+        optimizer can call it from worker processes on shared frames.
+        options_data may be an OptionsHistory already indexed by the caller.
+        """
+        # Initialize results
+        results = BacktestResults(
+            backtest_id=backtest_id or f"backtest_{algorithm_version}",
+            algorithm_version=algorithm_version,
+            config=config
+        )
+
         # Initialize portfolio
         portfolio = {
             'capital': config.initial_capital,
@@ -328,21 +438,28 @@ class HistoricalBacktester:
             'peak_equity': config.initial_capital
         }
 
-        # Group data by day for processing
-        daily_groups = options_data.groupby(options_data['timestamp'].dt.date)
-        total_days = len(daily_groups)
+        # Walk-forward windows can fall entirely on a weekend
+        if options_data.empty:
+            return results
 
-        for day_num, (date, day_data) in enumerate(daily_groups):
+        # Index the history once; snapshots are array slices from here on
+        history = options_data if isinstance(options_data, OptionsHistory) else OptionsHistory(options_data)
+        total_days = len(set(history.snapshot_dates))
+        market_tz = market_data['date'].dt.tz if not market_data.empty else None
+
+        for day_num, (date, snapshots) in enumerate(history.days()):
             if progress_callback:
                 progress_callback(day_num / total_days)
 
             # Detect market regime
             current_regime = self.regime_detector.detect_regime(
-                market_data[market_data['date'] <= pd.Timestamp(date)]
+                market_data[market_data['date'] <= pd.Timestamp(date, tz=market_tz)]
             )
 
             # Process intraday data
-            for timestamp, snapshot in day_data.groupby('timestamp'):
+            for snapshot in snapshots:
+                timestamp = snapshot.timestamp
+
                 # Generate signals using algorithm
                 signals = self._generate_signals(
                     algorithm_version, snapshot, portfolio, current_regime
@@ -378,33 +495,19 @@ class HistoricalBacktester:
         # Calculate final metrics
         self._calculate_metrics(results, portfolio)
 
-        # Save results
-        self._save_results(results)
-
-        print(f"✅ Backtest completed: {backtest_id}")
-        self._print_summary(results)
-
         return results
 
-    def _generate_signals(self, algorithm_version: str, market_snapshot: pd.DataFrame,
+    def _generate_signals(self, algorithm_version: str, snapshot: OptionsSnapshot,
                          portfolio: Dict[str, Any], regime: MarketRegime) -> List[Dict[str, Any]]:
         """Generate trading signals based on algorithm logic"""
         signals = []
-
-        # Get high volume/OI options
-        active_options = market_snapshot[
-            (market_snapshot['volume'] > 100) &
-            (market_snapshot['open_interest'] > 500)
-        ].copy()
+        history = snapshot.history
+        max_new_positions = portfolio.get('max_positions', 10) - len(portfolio['positions'])
 
         if algorithm_version == "v1.0":
-            # Dead Simple v1.0 logic
-            active_options['vol_oi_ratio'] = active_options['volume'] / active_options['open_interest']
-
-            # Find extreme vol/OI ratios
-            extreme_signals = active_options[active_options['vol_oi_ratio'] > 10]
-
-            for _, opt in extreme_signals.iterrows():
+            # Dead Simple v1.0 logic: extreme vol/OI ratios among high volume/OI options
+            for row in snapshot.active_rows(10)[:max_new_positions]:
+                opt = history.row_values(row)
                 confidence = min(opt['vol_oi_ratio'] / 50, 1.0)  # Scale confidence
 
                 signals.append({
@@ -419,8 +522,6 @@ class HistoricalBacktester:
 
         elif algorithm_version == "v3.0":
             # Enhanced IFD v3.0 logic with market regime awareness
-            active_options['vol_oi_ratio'] = active_options['volume'] / active_options['open_interest']
-
             # Adjust thresholds based on market regime
             if regime in [MarketRegime.BEAR_VOLATILE, MarketRegime.CRASH]:
                 vol_threshold = 5  # Lower threshold in volatile markets
@@ -428,9 +529,9 @@ class HistoricalBacktester:
                 vol_threshold = 10
 
             # Find institutional flow signals
-            institutional_signals = active_options[active_options['vol_oi_ratio'] > vol_threshold]
+            for row in snapshot.active_rows(vol_threshold)[:max_new_positions]:
+                opt = history.row_values(row)
 
-            for _, opt in institutional_signals.iterrows():
                 # v3.0 considers direction based on option type and market regime
                 if regime in [MarketRegime.BEAR_QUIET, MarketRegime.BEAR_VOLATILE]:
                     # In bear markets, puts are more likely to be directional
@@ -453,9 +554,8 @@ class HistoricalBacktester:
                     'signal_strength': opt['vol_oi_ratio'] * (1.2 if regime != MarketRegime.SIDEWAYS else 1.0)
                 })
 
-        # Filter for position limits
-        max_new_positions = portfolio.get('max_positions', 10) - len(portfolio['positions'])
-        return signals[:max_new_positions]
+        # Position limits are applied to the candidate rows above
+        return signals
 
     def _execute_trade(self, signal: Dict[str, Any], portfolio: Dict[str, Any],
                       config: BacktestConfig, timestamp: datetime,
@@ -543,24 +643,18 @@ class HistoricalBacktester:
 
         return max(0, min(contracts, 10))  # Cap at 10 contracts
 
-    def _update_positions(self, portfolio: Dict[str, Any], market_snapshot: pd.DataFrame,
+    def _update_positions(self, portfolio: Dict[str, Any], market_snapshot: OptionsSnapshot,
                          timestamp: datetime, config: BacktestConfig):
         """Update existing positions with current prices"""
         positions_to_close = []
 
         for position_key, trade in portfolio['positions'].items():
             # Find current price
-            current_data = market_snapshot[
-                (market_snapshot['symbol'] == trade.symbol) &
-                (market_snapshot['strike'] == trade.strike) &
-                (market_snapshot['option_type'] == trade.option_type)
-            ]
+            current_price = market_snapshot.last_price(trade.symbol, trade.strike, trade.option_type)
 
-            if current_data.empty:
+            if current_price is None:
                 continue
 
-            current_price = current_data.iloc[0]['last']
-
             # Check exit conditions
             exit_reason = None
 
@@ -598,21 +692,15 @@ class HistoricalBacktester:
         for position_key in positions_to_close:
             del portfolio['positions'][position_key]
 
-    def _calculate_equity(self, portfolio: Dict[str, Any], market_snapshot: pd.DataFrame) -> float:
+    def _calculate_equity(self, portfolio: Dict[str, Any], market_snapshot: OptionsSnapshot) -> float:
         """Calculate total portfolio equity"""
         equity = portfolio['capital']
 
         for trade in portfolio['positions'].values():
             # Find current price
-            current_data = market_snapshot[
-                (market_snapshot['symbol'] == trade.symbol) &
-                (market_snapshot['strike'] == trade.strike) &
-                (market_snapshot['option_type'] == trade.option_type)
-            ]
-
-            if not current_data.empty:
-                current_price = current_data.iloc[0]['last']
+            current_price = market_snapshot.last_price(trade.symbol, trade.strike, trade.option_type)
 
+            if current_price is not None:
                 if trade.side == "LONG":
                     position_value = current_price * trade.quantity * 100
                 else:
@@ -710,7 +798,7 @@ class HistoricalBacktester:
 
         # Monthly returns
         monthly_returns = equity_curve.groupby(
-            pd.Grouper(key='timestamp', freq='M')
+            equity_curve['timestamp'].dt.to_period('M').dt.to_timestamp(how='end').dt.normalize()
         )['returns'].apply(lambda x: (1 + x).prod() - 1)
 
         results.monthly_returns = {
@@ -753,6 +841,10 @@ class HistoricalBacktester:
         """
         Run walk-forward optimization
 
+        In-sample searches run across config.optimization_workers processes
+        with successive halving; each finished window is checkpointed in
+        output_dir so a rerun with the same arguments resumes.
+
         Args:
             algorithm_version: Algorithm to optimize
             config: Base configuration
@@ -763,63 +855,18 @@ class HistoricalBacktester:
         """
         print(f"🔧 Starting walk-forward optimization for {algorithm_version}")
 
-        results = {
-            'algorithm': algorithm_version,
-            'windows': [],
-            'best_parameters': None,
-            'out_of_sample_performance': []
-        }
-
-        # Calculate window size
-        total_days = (config.end_date - config.start_date).days
-        window_size = total_days // config.walk_forward_windows
-
-        for window in range(config.walk_forward_windows - 1):
-            # Define in-sample and out-of-sample periods
-            in_sample_start = config.start_date + timedelta(days=window * window_size)
-            in_sample_end = in_sample_start + timedelta(days=window_size * 2 // 3)
-            out_sample_start = in_sample_end
-            out_sample_end = out_sample_start + timedelta(days=window_size // 3)
-
-            print(f"\nWindow {window + 1}:")
-            print(f"  In-sample: {in_sample_start.date()} to {in_sample_end.date()}")
-            print(f"  Out-sample: {out_sample_start.date()} to {out_sample_end.date()}")
-
-            # Optimize on in-sample data
-            best_params = self._optimize_parameters(
-                algorithm_version,
-                in_sample_start,
-                in_sample_end,
-                parameter_grid,
-                config
-            )
-
-            # Test on out-of-sample data
-            test_config = BacktestConfig(
-                start_date=out_sample_start,
-                end_date=out_sample_end,
-                initial_capital=config.initial_capital,
-                **best_params
-            )
-
-            test_results = self.run_backtest(algorithm_version, test_config)
-
-            results['windows'].append({
-                'window': window + 1,
-                'best_parameters': best_params,
-                'in_sample_period': f"{in_sample_start.date()} to {in_sample_end.date()}",
-                'out_sample_period': f"{out_sample_start.date()} to {out_sample_end.date()}",
-                'out_sample_sharpe': test_results.sharpe_ratio,
-                'out_sample_return': test_results.total_return
-            })
-
-            results['out_of_sample_performance'].append(test_results.sharpe_ratio)
+        with WalkForwardOptimizer(self, workers=config.optimization_workers,
+                                  eta=config.halving_eta) as optimizer:
+            results = optimizer.run(algorithm_version, config, parameter_grid)
 
         # Average out-of-sample performance
         avg_oos_sharpe = np.mean(results['out_of_sample_performance'])
+        stats = results['optimization_stats']
 
         print(f"\n✅ Walk-forward optimization complete")
         print(f"Average out-of-sample Sharpe: {avg_oos_sharpe:.2f}")
+        print(f"Optimizer: {stats['evaluations']} evaluations on {stats['workers']} workers, "
+              f"{stats['speedup']:.1f}x speedup ({stats['windows_resumed']} windows resumed)")
 
         return results
 
@@ -827,39 +874,21 @@ class HistoricalBacktester:
                            end_date: datetime, parameter_grid: Dict[str, List[Any]],
                            base_config: BacktestConfig) -> Dict[str, Any]:
         """Optimize parameters on in-sample data"""
-        best_sharpe = -float('inf')
-        best_params = {}
-
-        # Generate parameter combinations
-        from itertools import product
-
-        param_names = list(parameter_grid.keys())
-        param_values = [parameter_grid[name] for name in param_names]
-
-        for values in product(*param_values):
-            params = dict(zip(param_names, values))
-
-            # Create test configuration
-            test_config = BacktestConfig(
-                start_date=start_date,
-                end_date=end_date,
-                initial_capital=base_config.initial_capital,
-                **params
-            )
-
-            # Run backtest
-            results = self.run_backtest(algorithm_version, test_config)
-
-            # Check if better
-            if results.sharpe_ratio > best_sharpe:
-                best_sharpe = results.sharpe_ratio
-                best_params = params
-
+        options_data = self.data_loader.load_options_data("NQM25", start_date, end_date)
+        market_data = self.data_loader.load_market_data(start_date, end_date)
+        config = replace(base_config, start_date=start_date, end_date=end_date)
+
+        with WalkForwardOptimizer(self, workers=base_config.optimization_workers,
+                                  eta=base_config.halving_eta) as optimizer:
+            best_params, _ = optimizer.optimize(
+                algorithm_version, config, parameter_grid, options_data, market_data)
         return best_params
 
     def run_monte_carlo_simulation(self, algorithm_version: str,
                                   config: BacktestConfig,
-                                  num_simulations: int = 1000) -> Dict[str, Any]:
+                                  num_simulations: int = 1000,
+                                  seed: Optional[int] = None,
+                                  workers: int = 1) -> Dict[str, Any]:
         """
         Run Monte Carlo simulation for risk analysis
 
@@ -867,6 +896,8 @@ class HistoricalBacktester:
             algorithm_version: Algorithm to test
             config: Backtest configuration
             num_simulations: Number of simulations
+            seed: Seed for reproducible paths (same result for any worker count)
+            workers: Processes generating path chunks
 
         Returns:
             Simulation results
@@ -886,42 +917,11 @@ class HistoricalBacktester:
         if not trade_returns:
             return {"error": "No completed trades"}
 
-        # Run simulations
-        simulation_results = []
-
-        for sim in range(num_simulations):
-            if sim % 100 == 0:
-                print(f"  Simulation {sim}/{num_simulations}")
-
-            # Bootstrap sample trades
-            num_trades = len(trade_returns)
-            sampled_returns = np.random.choice(trade_returns, size=num_trades, replace=True)
-
-            # Calculate metrics
-            total_return = np.sum(sampled_returns)
-            max_drawdown = self._calculate_max_drawdown_from_returns(sampled_returns)
-
-            simulation_results.append({
-                'total_return': total_return,
-                'max_drawdown': max_drawdown,
-                'num_trades': num_trades
-            })
-
-        # Calculate statistics
-        returns = [r['total_return'] for r in simulation_results]
-        drawdowns = [r['max_drawdown'] for r in simulation_results]
-
-        mc_results = {
-            'num_simulations': num_simulations,
-            'return_mean': np.mean(returns),
-            'return_std': np.std(returns),
-            'return_5th_percentile': np.percentile(returns, 5),
-            'return_95th_percentile': np.percentile(returns, 95),
-            'drawdown_mean': np.mean(drawdowns),
-            'drawdown_95th_percentile': np.percentile(drawdowns, 95),
-            'probability_of_loss': len([r for r in returns if r < 0]) / num_simulations,
-            'probability_of_50pct_drawdown': len([d for d in drawdowns if d < -0.5]) / num_simulations
-        }
+        # Run simulations as resampled (paths x trades) batches
+        returns, drawdowns = simulate_trade_paths(
+            trade_returns, num_simulations, seed=seed, workers=workers
+        )
+        mc_results = summarize_simulations(returns, drawdowns)
 
         print(f"\n📊 Monte Carlo Results:")
         print(f"  Expected Return: {mc_results['return_mean']:.1%}")
@@ -933,23 +933,9 @@ class HistoricalBacktester:
 
     def _calculate_max_drawdown_from_returns(self, returns: List[float]) -> float:
         """Calculate maximum drawdown from a series of returns"""
-        equity = [1.0]
-
-        for ret in returns:
-            equity.append(equity[-1] * (1 + ret))
-
-        peak = equity[0]
-        max_dd = 0
-
-        for value in equity:
-            if value > peak:
-                peak = value
-
-            dd = (value - peak) / peak
-            if dd < max_dd:
-                max_dd = dd
-
-        return max_dd
+        if len(returns) == 0:
+            return 0
+        return float(max_drawdowns(np.asarray(returns, dtype=float)[np.newaxis, :])[0])
 
     def compare_algorithms(self, algorithms: List[str], config: BacktestConfig) -> Dict[str, Any]:
         """
@@ -1025,11 +1011,15 @@ class HistoricalBacktester:
         # Convert to dict for JSON serialization
         results_dict = asdict(results)
 
-        # Convert datetime objects to strings
+        # Convert datetime, enum and numpy values to JSON types
         def convert_dates(obj):
             if isinstance(obj, datetime):
                 return obj.isoformat()
-            return obj
+            if isinstance(obj, Enum):
+                return obj.value
+            if isinstance(obj, np.generic):
+                return obj.item()
+            return str(obj)
 
         results_dict = json.loads(json.dumps(results_dict, default=convert_dates))
 
@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+Partitioned On-Disk Options History Store
+
+Options snapshots in HistoricalDataLoader's schema, stored as one
+directory per symbol and trading day under data/historical:
+
+    <root>/<symbol>/<YYYY-MM-DD>/meta.json
+    <root>/<symbol>/<YYYY-MM-DD>/<CALL|PUT>/<column>.npy
+
+- Each option-type partition is sorted by (strike, timestamp), so a
+  strike range is a contiguous slice found by binary search
+- Columns are memory-mapped; only the requested window, strikes, types
+  and columns are ever read
+- Per-day strike bounds in meta.json skip whole days without opening
+  any array
+- Gaps are reported against the exchange trading calendar, so weekends
+  and exchange holidays never count as missing
+- Ingestion from saved Barchart chain JSON and Databento quote/trade
+  exports (see main() for the command line)
+
+Usage:
+    python options_history_store.py barchart --symbol NQM25 saved_chain.json
+    python options_history_store.py databento --symbol NQM25 cbbo_export.csv
+"""
+
+import os
+import re
+import json
+import shutil
+import logging
+import argparse
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.holiday import (
+    AbstractHolidayCalendar, Holiday, GoodFriday, USMartinLutherKingJr, USPresidentsDay,
+    USMemorialDay, USLaborDay, USThanksgivingDay, nearest_workday, sunday_to_monday
+)
+
+logger = logging.getLogger(__name__)
+
+OPTION_TYPES = ('CALL', 'PUT')
+KEY_COLUMNS = ('timestamp', 'strike', 'option_type')
+# Stored per partition; symbol and option_type come from the directory names
+VALUE_COLUMNS = {
+    'timestamp': 'int64',  # ns since epoch (UTC when the history is tz-aware)
+    'strike': 'float64',
+    'bid': 'float64',
+    'ask': 'float64',
+    'last': 'float64',
+    'volume': 'int64',
+    'open_interest': 'int64',
+    'underlying_price': 'float64'
+}
+OUTPUT_COLUMNS = ['timestamp', 'symbol', 'strike', 'option_type', 'bid', 'ask', 'last',
+                  'volume', 'open_interest', 'underlying_price']
+
+
+class ExchangeHolidayCalendar(AbstractHolidayCalendar):
+    """Full-day closures of the US equity index (NQ) options markets; early closes still trade"""
+
+    rules = [
+        Holiday('New Years Day', month=1, day=1, observance=sunday_to_monday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday('Juneteenth', month=6, day=19, start_date='2022-06-19', observance=nearest_workday),
+        Holiday('Independence Day', month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday('Christmas Day', month=12, day=25, observance=nearest_workday)
+    ]
+
+
+def trading_days(start_date: datetime, end_date: datetime) -> List[str]:
+    """Exchange trading days (YYYY-MM-DD) from start_date's date through end_date's"""
+    first, last = pd.Timestamp(pd.Timestamp(start_date).date()), pd.Timestamp(pd.Timestamp(end_date).date())
+    holidays = ExchangeHolidayCalendar().holidays(first, last)
+    return list(pd.bdate_range(first, last, freq='C', holidays=holidays).strftime('%Y-%m-%d'))
+
+
+def _timestamp_ns(value: Any, tz: Optional[str]) -> int:
+    """Epoch ns of a bound, expressed in the stored history's time zone"""
+    ts = pd.Timestamp(value)
+    if tz is None and ts.tzinfo is not None:
+        ts = ts.tz_localize(None)
+    elif tz is not None and ts.tzinfo is None:
+        ts = ts.tz_localize(tz)
+    return int(ts.value)
+
+
+def _timestamps_to_ns(timestamps: pd.Series) -> Tuple[np.ndarray, Optional[str]]:
+    timestamps = pd.to_datetime(timestamps)
+    tz = str(timestamps.dt.tz) if timestamps.dt.tz is not None else None
+    if tz:
+        timestamps = timestamps.dt.tz_convert('UTC').dt.tz_localize(None)
+    return timestamps.to_numpy().astype('datetime64[ns]').view(np.int64), tz
+
+
+class OptionsHistoryStore:
+    """
+    Day-partitioned columnar options history
+
+    Writes replace or merge whole day partitions atomically (a partition
+    is written beside the old one and swapped in with a rename).
+    """
+
+    def __init__(self, root: str = "data/historical"):
+        self.root = root
+
+    def _day_dir(self, symbol: str, day: str) -> str:
+        return os.path.join(self.root, symbol.replace('/', '_'), day)
+
+    def days(self, symbol: str) -> List[str]:
+        """Stored trading days for a symbol, oldest first"""
+        symbol_dir = os.path.join(self.root, symbol.replace('/', '_'))
+        if not os.path.isdir(symbol_dir):
+            return []
+        return sorted(d for d in os.listdir(symbol_dir)
+                      if re.fullmatch(r'\d{4}-\d{2}-\d{2}', d) and
+                      os.path.exists(os.path.join(symbol_dir, d, 'meta.json')))
+
+    def _days_in_window(self, symbol: str, start_date: datetime, end_date: datetime) -> List[str]:
+        first, last = pd.Timestamp(start_date).strftime('%Y-%m-%d'), pd.Timestamp(end_date).strftime('%Y-%m-%d')
+        return [day for day in self.days(symbol) if first <= day <= last]
+
+    def has_data(self, symbol: str, start_date: datetime, end_date: datetime) -> bool:
+        """True if any day of the window is stored (see missing_days for gaps)"""
+        return bool(self._days_in_window(symbol, start_date, end_date))
+
+    def missing_days(self, symbol: str, start_date: datetime, end_date: datetime) -> List[str]:
+        """Exchange trading days in the window with no stored partition"""
+        stored = set(self._days_in_window(symbol, start_date, end_date))
+        return [day for day in trading_days(start_date, end_date) if day not in stored]
+
+    def _read_meta(self, symbol: str, day: str) -> Dict[str, Any]:
+        with open(os.path.join(self._day_dir(symbol, day), 'meta.json')) as f:
+            return json.load(f)
+
+    def write(self, df: pd.DataFrame, merge: bool = True) -> Dict[str, int]:
+        """
+        Store snapshots (HistoricalDataLoader schema), one partition per symbol/day
+
+        With merge, rows already stored for a day are kept unless the new
+        data has the same (timestamp, strike, option_type); otherwise the
+        day is replaced. Returns rows written per day.
+        """
+        if df.empty:
+            return {}
+        df = df.copy()
+        df['timestamp'] = pd.to_datetime(df['timestamp'])
+        df['option_type'] = df['option_type'].str.upper()
+        written = {}
+
+        for (symbol, day), day_frame in df.groupby([df['symbol'], df['timestamp'].dt.strftime('%Y-%m-%d')]):
+            if merge and os.path.exists(os.path.join(self._day_dir(symbol, day), 'meta.json')):
+                day_start = pd.Timestamp(day)
+                existing = self.load(symbol, day_start, day_start + pd.Timedelta(days=1) - pd.Timedelta(1, 'ns'))
+                day_frame = pd.concat([existing, day_frame], ignore_index=True)
+                day_frame = day_frame.drop_duplicates(list(KEY_COLUMNS), keep='last')
+            self._write_day(symbol, day, day_frame)
+            written[f"{symbol}/{day}"] = len(day_frame)
+        return written
+
+    def _write_day(self, symbol: str, day: str, df: pd.DataFrame):
+        target = self._day_dir(symbol, day)
+        staging, retired = f"{target}.tmp", f"{target}.old"
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+
+        timestamps, tz = _timestamps_to_ns(df['timestamp'])
+        meta = {'symbol': symbol, 'day': day, 'tz': tz, 'rows': {},
+                'strike_min': float(df['strike'].min()), 'strike_max': float(df['strike'].max()),
+                'columns': VALUE_COLUMNS}
+
+        for option_type in OPTION_TYPES:
+            mask = (df['option_type'] == option_type).to_numpy()
+            if not mask.any():
+                continue
+            part = df[mask]
+            part_ts = timestamps[mask]
+            order = np.lexsort((part_ts, part['strike'].to_numpy()))
+            os.makedirs(os.path.join(staging, option_type))
+            for column, dtype in VALUE_COLUMNS.items():
+                if column == 'timestamp':
+                    values = part_ts
+                elif dtype == 'int64':
+                    values = pd.to_numeric(part[column], errors='coerce').fillna(0).to_numpy().astype(dtype)
+                else:
+                    values = part[column].to_numpy().astype(dtype)
+                np.save(os.path.join(staging, option_type, f"{column}.npy"), values[order])
+            meta['rows'][option_type] = int(mask.sum())
+
+        with open(os.path.join(staging, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+
+        shutil.rmtree(retired, ignore_errors=True)
+        if os.path.exists(target):
+            os.rename(target, retired)
+        os.rename(staging, target)
+        shutil.rmtree(retired, ignore_errors=True)
+
+    def load(self, symbol: str, start_date: datetime, end_date: datetime,
+             strike_range: Optional[Tuple[float, float]] = None,
+             option_types: Optional[Sequence[str]] = None,
+             columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Snapshots in [start_date, end_date], ordered by (timestamp, strike, option_type)
+
+        Args:
+            strike_range: Inclusive (low, high) strikes to read
+            option_types: Subset of ('CALL', 'PUT')
+            columns: Value columns to read (timestamp, symbol, strike and
+                option_type are always returned)
+        """
+        wanted_types = [t.upper() for t in (option_types or OPTION_TYPES)]
+        value_columns = [c for c in VALUE_COLUMNS if columns is None or c in columns or c in KEY_COLUMNS]
+        low, high = strike_range if strike_range else (-np.inf, np.inf)
+        pieces = []
+
+        for day in self._days_in_window(symbol, start_date, end_date):
+            meta = self._read_meta(symbol, day)
+            if meta['strike_max'] < low or meta['strike_min'] > high:
+                continue
+            start_ns = _timestamp_ns(start_date, meta['tz'])
+            end_ns = _timestamp_ns(end_date, meta['tz'])
+            day_dir = self._day_dir(symbol, day)
+
+            for option_type in wanted_types:
+                if option_type not in meta['rows']:
+                    continue
+                part_dir = os.path.join(day_dir, option_type)
+                strikes = np.load(os.path.join(part_dir, 'strike.npy'), mmap_mode='r')
+                first, last = np.searchsorted(strikes, low, 'left'), np.searchsorted(strikes, high, 'right')
+                if first >= last:
+                    continue
+                timestamps = np.load(os.path.join(part_dir, 'timestamp.npy'), mmap_mode='r')[first:last]
+                rows = (timestamps >= start_ns) & (timestamps <= end_ns)
+
+                piece = {'timestamp': np.asarray(timestamps[rows]), 'tz': meta['tz']}
+                for column in value_columns:
+                    if column != 'timestamp':
+                        values = np.load(os.path.join(part_dir, f"{column}.npy"), mmap_mode='r')[first:last]
+                        piece[column] = np.asarray(values[rows])
+                piece['option_type'] = option_type
+                if len(piece['timestamp']):
+                    pieces.append(piece)
+
+        return self._assemble(symbol, pieces, value_columns)
+
+    @staticmethod
+    def _assemble(symbol: str, pieces: List[Dict[str, Any]], value_columns: List[str]) -> pd.DataFrame:
+        output = [c for c in OUTPUT_COLUMNS if c in value_columns or c in ('symbol', 'option_type')]
+        if not pieces:
+            return pd.DataFrame(columns=output)
+
+        timestamps = np.concatenate([p['timestamp'] for p in pieces])
+        type_codes = np.concatenate([np.full(len(p['timestamp']), OPTION_TYPES.index(p['option_type']))
+                                     for p in pieces])
+        data = {c: np.concatenate([p[c] for p in pieces]) for c in value_columns if c != 'timestamp'}
+        order = np.lexsort((type_codes, data['strike'], timestamps))
+        option_type = np.asarray(OPTION_TYPES, dtype=object)[type_codes]
+
+        ts = pd.to_datetime(timestamps[order])
+        zones = {p['tz'] for p in pieces}
+        if len(zones) > 1 and None in zones:
+            raise ValueError(f"{symbol} history mixes naive and tz-aware days {sorted(map(str, zones))}; "
+                             f"re-ingest the naive days with a timezone")
+        # Aware days are stored as UTC ns, so differing zones only change the display zone
+        tz = zones.pop() if len(zones) == 1 else 'UTC'
+        frame = {'timestamp': ts.tz_localize('UTC').tz_convert(tz) if tz else ts,
+                 'symbol': np.full(len(order), symbol, dtype=object),
+                 'option_type': option_type[order]}
+        frame.update({c: values[order] for c, values in data.items()})
+        return pd.DataFrame(frame)[output]
+
+
+def _number(value: Any, default: float = 0.0) -> float:
+    """Barchart numbers may arrive as strings with thousands separators or N/A"""
+    if value is None:
+        return default
+    if isinstance(value, str):
+        value = value.replace(',', '').strip()
+        try:
+            return float(value)
+        except ValueError:
+            return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def barchart_snapshot_frame(data: Dict[str, Any], timestamp: datetime, symbol: str,
+                            underlying_price: Optional[float] = None) -> pd.DataFrame:
+    """One saved Barchart options chain (as BarchartSavedDataLoader reads it) as store rows"""
+    rows = []
+    for side, option_type in (('Call', 'CALL'), ('Put', 'PUT')):
+        for contract in data.get('data', {}).get(side, []):
+            raw = contract.get('raw', contract)
+            strike = _number(raw.get('strike'))
+            if strike <= 0:
+                continue
+            last = _number(raw.get('lastPrice'))
+            rows.append({
+                'timestamp': pd.Timestamp(timestamp),
+                'symbol': symbol,
+                'strike': strike,
+                'option_type': option_type,
+                'bid': _number(raw.get('bidPrice'), last),
+                'ask': _number(raw.get('askPrice'), last),
+                'last': last,
+                'volume': int(_number(raw.get('volume'))),
+                'open_interest': int(_number(raw.get('openInterest'))),
+                'underlying_price': underlying_price if underlying_price is not None else np.nan
+            })
+    return pd.DataFrame(rows, columns=OUTPUT_COLUMNS)
+
+
+# Databento CME option symbols, e.g. "NQM5 C21000"
+DATABENTO_OPTION_SYMBOL = re.compile(r'^(?P<root>\S+)\s+(?P<type>[CP])(?P<strike>\d+(?:\.\d+)?)$')
+
+
+def databento_snapshot_frame(records: pd.DataFrame, symbol: str, frequency: str = '5min',
+                             underlying_price: Optional[float] = None) -> pd.DataFrame:
+    """
+    Databento quote/trade records (DBNStore.to_df() of cbbo, mbp-1 or tbbo) as snapshots
+
+    Records are bucketed per contract into `frequency` snapshots: last
+    bid/ask quote, last trade price and summed trade size as volume.
+    Open interest is taken from an ``open_interest`` column if the export
+    was joined with the statistics schema, else 0.
+    """
+    records = records.reset_index() if 'ts_event' not in records.columns else records
+    parsed = records['symbol'].astype(str).str.extract(DATABENTO_OPTION_SYMBOL)
+    records = records.assign(strike=parsed['strike'].astype(float),
+                             option_type=parsed['type'].map({'C': 'CALL', 'P': 'PUT'}))
+    records = records.dropna(subset=['strike', 'option_type'])
+    if records.empty:
+        return pd.DataFrame(columns=OUTPUT_COLUMNS)
+
+    bucket = pd.to_datetime(records['ts_event']).dt.floor(frequency)
+    records = records.assign(timestamp=bucket)
+    trades = records['action'] == 'T' if 'action' in records.columns else records['size'].notna()
+    records = records.assign(trade_price=records['price'].where(trades),
+                             trade_size=records['size'].where(trades, 0))
+
+    grouped = records.groupby(['timestamp', 'strike', 'option_type'], sort=True)
+    snapshots = grouped.agg(bid=('bid_px_00', 'last'), ask=('ask_px_00', 'last'),
+                            last=('trade_price', 'last'), volume=('trade_size', 'sum'))
+    snapshots['last'] = snapshots['last'].fillna((snapshots['bid'] + snapshots['ask']) / 2)
+    snapshots['open_interest'] = grouped['open_interest'].last() if 'open_interest' in records.columns else 0
+    snapshots = snapshots.reset_index()
+    snapshots['symbol'] = symbol
+    snapshots['volume'] = snapshots['volume'].astype('int64')
+    snapshots['underlying_price'] = underlying_price if underlying_price is not None else np.nan
+    return snapshots[OUTPUT_COLUMNS]
+
+
+def _read_table(path: str) -> pd.DataFrame:
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def main(argv: Optional[Iterable[str]] = None):
+    """Ingest saved Barchart chains or Databento exports into the history store"""
+    parser = argparse.ArgumentParser(description="Ingest options snapshots into the on-disk history store")
+    parser.add_argument('--root', default='data/historical', help='Store directory')
+    subparsers = parser.add_subparsers(dest='source', required=True)
+
+    barchart = subparsers.add_parser('barchart', help='Saved Barchart chain JSON files')
+    barchart.add_argument('files', nargs='+')
+    barchart.add_argument('--symbol', required=True)
+    barchart.add_argument('--timestamp', help='Snapshot time (default: file modification time)')
+    barchart.add_argument('--underlying-price', type=float)
+
+    databento = subparsers.add_parser('databento', help='Databento cbbo/mbp-1/tbbo CSV or Parquet exports')
+    databento.add_argument('files', nargs='+')
+    databento.add_argument('--symbol', required=True)
+    databento.add_argument('--frequency', default='5min')
+    databento.add_argument('--underlying-price', type=float)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    store = OptionsHistoryStore(args.root)
+
+    for path in args.files:
+        if args.source == 'barchart':
+            with open(path) as f:
+                data = json.load(f)
+            timestamp = args.timestamp or datetime.fromtimestamp(os.path.getmtime(path))
+            frame = barchart_snapshot_frame(data, timestamp, args.symbol, args.underlying_price)
+        else:
+            frame = databento_snapshot_frame(_read_table(path), args.symbol, args.frequency,
+                                             args.underlying_price)
+        written = store.write(frame)
+        logger.info(f"{path}: {len(frame)} rows -> {', '.join(written) or 'nothing to store'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Columnar Options History for Backtest Replay
+
+Sorts an options history once by (timestamp, strike, option_type) and
+keeps each column as a NumPy array, so the backtester replays snapshots
+as array slices:
+- Snapshot boundaries found once with a vectorized diff
+- Signal inputs (activity mask, volume/OI ratio) precomputed per row
+- Position marks resolved with a binary search on contract ids within
+  the snapshot instead of a DataFrame scan per position
+"""
+
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Liquidity filter applied before any signal logic
+MIN_SIGNAL_VOLUME = 100
+MIN_SIGNAL_OPEN_INTEREST = 500
+
+
+class OptionsSnapshot:
+    """All quotes sharing one timestamp: rows [start, stop) of the history"""
+
+    __slots__ = ('history', 'start', 'stop', 'timestamp')
+
+    def __init__(self, history: 'OptionsHistory', start: int, stop: int, timestamp: pd.Timestamp):
+        self.history = history
+        self.start = start
+        self.stop = stop
+        self.timestamp = timestamp
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def active_rows(self, min_ratio: float) -> np.ndarray:
+        """Liquid rows with volume/OI above min_ratio, in history order"""
+        history = self.history
+        window = slice(self.start, self.stop)
+        mask = history.active[window] & (history.vol_oi_ratio[window] > min_ratio)
+        return np.flatnonzero(mask) + self.start
+
+    def row_for(self, symbol: str, strike: Any, option_type: str) -> Optional[int]:
+        """First row quoting a contract in this snapshot, or None"""
+        contract = self.history.contract_ids.get((symbol, strike, option_type))
+        if contract is None:
+            return None
+        contracts = self.history.contract[self.start:self.stop]
+        position = int(np.searchsorted(contracts, contract))
+        if position < len(contracts) and contracts[position] == contract:
+            return self.start + position
+        return None
+
+    def last_price(self, symbol: str, strike: Any, option_type: str) -> Optional[float]:
+        row = self.row_for(symbol, strike, option_type)
+        return None if row is None else float(self.history.last[row])
+
+
+class OptionsHistory:
+    """
+    Options quotes as sorted column arrays
+
+    Contract ids are assigned in (strike, option_type, symbol) order and
+    rows are stably sorted by (timestamp, contract id), so rows for the
+    same contract keep their original relative order.
+    """
+
+    def __init__(self, options_data: pd.DataFrame):
+        contract_codes, contract_keys = self._factorize_contracts(options_data)
+        timestamps = options_data['timestamp']
+        order = np.lexsort((contract_codes, pd.DatetimeIndex(timestamps).asi8))
+
+        self.length = len(options_data)
+        self.timestamps = timestamps.iloc[order].reset_index(drop=True)
+        self.contract = contract_codes[order]
+        self.contract_keys = contract_keys
+        self.contract_ids: Dict[Tuple[str, Any, str], int] = {
+            key: i for i, key in enumerate(contract_keys)
+        }
+
+        def column(name):
+            return options_data[name].to_numpy()[order]
+
+        self.strike = column('strike')
+        self.option_type = column('option_type')
+        self.symbol = column('symbol')
+        self.bid = column('bid').astype(float)
+        self.ask = column('ask').astype(float)
+        self.last = column('last').astype(float)
+        self.volume = column('volume')
+        self.open_interest = column('open_interest')
+
+        self.active = (self.volume > MIN_SIGNAL_VOLUME) & (self.open_interest > MIN_SIGNAL_OPEN_INTEREST)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.vol_oi_ratio = self.volume / self.open_interest
+
+        time_values = pd.DatetimeIndex(self.timestamps).asi8
+        if self.length:
+            self.starts = np.concatenate(([0], np.flatnonzero(time_values[1:] != time_values[:-1]) + 1))
+        else:
+            self.starts = np.empty(0, dtype=np.int64)
+        self.stops = np.append(self.starts[1:], self.length)
+        snapshot_times = pd.DatetimeIndex(self.timestamps.iloc[self.starts])
+        self.snapshot_times = list(snapshot_times)
+        self.snapshot_dates = snapshot_times.date
+
+    @staticmethod
+    def _factorize_contracts(options_data: pd.DataFrame):
+        keys = options_data[['strike', 'option_type', 'symbol']]
+        unique = keys.drop_duplicates().sort_values(['strike', 'option_type', 'symbol'], kind='stable')
+        unique_index = pd.MultiIndex.from_frame(unique)
+        codes = unique_index.get_indexer(pd.MultiIndex.from_frame(keys))
+        contract_keys = [(symbol, strike, option_type) for strike, option_type, symbol in unique_index]
+        return codes.astype(np.int64), contract_keys
+
+    @property
+    def empty(self) -> bool:
+        return self.length == 0
+
+    @property
+    def snapshot_count(self) -> int:
+        return len(self.starts)
+
+    def days(self) -> Iterator[Tuple[Any, Iterator[OptionsSnapshot]]]:
+        """(date, snapshots) per trading day in time order"""
+        dates = self.snapshot_dates
+        if not len(dates):
+            return
+        day_starts = [0] + [i for i in range(1, len(dates)) if dates[i] != dates[i - 1]]
+        day_stops = day_starts[1:] + [len(dates)]
+        for first, last in zip(day_starts, day_stops):
+            yield dates[first], (self.snapshot(i) for i in range(first, last))
+
+    def snapshot(self, index: int) -> OptionsSnapshot:
+        return OptionsSnapshot(self, int(self.starts[index]), int(self.stops[index]),
+                               self.snapshot_times[index])
+
+    def row_values(self, row: int) -> Dict[str, Any]:
+        """Python scalars for one row, as iterrows() would produce them"""
+        return {
+            'symbol': self.symbol[row],
+            'strike': self.strike[row].item() if isinstance(self.strike[row], np.generic) else self.strike[row],
+            'option_type': self.option_type[row],
+            'bid': float(self.bid[row]),
+            'ask': float(self.ask[row]),
+            'vol_oi_ratio': float(self.vol_oi_ratio[row])
+        }
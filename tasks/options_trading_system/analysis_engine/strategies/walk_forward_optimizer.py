@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Process-Parallel Walk-Forward Optimizer
+
+Parameter search for HistoricalBacktester walk-forward windows:
+- In-sample options/market frames loaded once per window and exported as
+  memory-mapped .npy columns, so worker processes map the same pages
+  instead of unpickling a copy of the data for every combination
+- Successive halving: every combination is scored on a short prefix of
+  the in-sample days and only the best 1/eta advance to longer prefixes
+- Per-window JSON checkpoints, so an interrupted run resumes at the
+  first unfinished window
+- Wall-time vs summed evaluation time, reported as speedup per worker
+"""
+
+import os
+import json
+import math
+import time
+import shutil
+import hashlib
+import logging
+import tempfile
+import dataclasses
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from itertools import product
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.timezone_utils import get_eastern_time
+
+try:
+    from .options_replay import OptionsHistory
+except ImportError:
+    from options_replay import OptionsHistory
+
+logger = logging.getLogger(__name__)
+
+# BacktestConfig fields that change how a run executes, not its results;
+# every other field is part of the checkpoint key
+CHECKPOINT_EXCLUDED_FIELDS = ('optimization_workers',)
+
+# RAM-backed when available; memmaps there never touch the disk
+SHARED_MEMORY_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+
+class SharedFrame:
+    """
+    Picklable handle to a DataFrame stored as one .npy file per column
+
+    Numeric columns are mapped read-only, datetimes are stored as int64
+    and object columns as integer codes plus their distinct values.
+    """
+
+    def __init__(self, directory: str, name: str, columns: List[Dict[str, Any]], length: int):
+        self.directory = directory
+        self.name = name
+        self.columns = columns
+        self.length = length
+
+    @classmethod
+    def export(cls, df: pd.DataFrame, directory: str, name: str) -> 'SharedFrame':
+        columns = []
+        for position, column in enumerate(df.columns):
+            series = df[column]
+            path = os.path.join(directory, f"{name}.{position}.npy")
+            spec = {'name': column, 'path': path}
+
+            if isinstance(series.dtype, pd.DatetimeTZDtype):
+                spec.update(kind='datetime', tz=str(series.dt.tz))
+                values = series.dt.tz_convert('UTC').dt.tz_localize(None).to_numpy()
+            elif pd.api.types.is_datetime64_dtype(series.dtype):
+                spec.update(kind='datetime', tz=None)
+                values = series.to_numpy()
+            elif pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+                spec.update(kind='numeric')
+                values = series.to_numpy()
+            else:
+                codes, uniques = pd.factorize(series, use_na_sentinel=False)
+                spec.update(kind='coded', values=list(uniques))
+                values = codes.astype(np.int32)
+
+            if spec['kind'] == 'datetime':
+                spec['dtype'] = str(values.dtype)
+                values = values.view(np.int64)
+            np.save(path, np.ascontiguousarray(values))
+            columns.append(spec)
+
+        return cls(directory, name, columns, len(df))
+
+    def load(self) -> pd.DataFrame:
+        data = {}
+        for spec in self.columns:
+            values = np.load(spec['path'], mmap_mode='r')
+            if spec['kind'] == 'datetime':
+                column = pd.Series(np.asarray(values).view(spec['dtype']))
+                data[spec['name']] = column.dt.tz_localize('UTC').dt.tz_convert(spec['tz']) \
+                    if spec['tz'] else column
+            elif spec['kind'] == 'coded':
+                data[spec['name']] = np.asarray(spec['values'], dtype=object)[values]
+            else:
+                data[spec['name']] = values
+        return pd.DataFrame(data)
+
+
+# Worker-process caches: frames and indexed prefixes by export directory,
+# backtesters by class
+_worker_frames: Dict[str, Tuple[pd.DataFrame, pd.DataFrame, Dict[Any, OptionsHistory]]] = {}
+_worker_backtesters: Dict[Any, Any] = {}
+
+
+def _frames_for(task: Dict[str, Any]) -> Tuple[OptionsHistory, pd.DataFrame]:
+    key = task['options'].directory
+    if key not in _worker_frames:
+        _worker_frames.clear()  # One window at a time
+        _worker_frames[key] = (task['options'].load(), task['market'].load(), {})
+    options_data, market_data, prefixes = _worker_frames[key]
+    if task['prefix_end'] not in prefixes:
+        prefixes[task['prefix_end']] = _indexed_prefix(options_data, task['prefix_end'])
+    return prefixes[task['prefix_end']], market_data
+
+
+def evaluate_combination(task: Dict[str, Any]) -> Tuple[int, float, float]:
+    """Score one parameter combination on an in-sample prefix: (index, score, seconds)"""
+    started = time.perf_counter()
+    history, market_data = _frames_for(task)
+
+    cache_key = (task['backtester_class'], task['output_dir'])
+    backtester = _worker_backtesters.get(cache_key)
+    if backtester is None:
+        backtester = _worker_backtesters[cache_key] = task['backtester_class'](task['output_dir'])
+
+    score = _score(backtester.simulate(task['algorithm'], task['config'], history, market_data),
+                   task['config'].optimization_metric)
+    return task['index'], score, time.perf_counter() - started
+
+
+def _indexed_prefix(options_data: pd.DataFrame, prefix_end: Optional[pd.Timestamp]) -> OptionsHistory:
+    """Replay index of the rows before prefix_end (data is in timestamp order); None = all"""
+    if prefix_end is not None:
+        options_data = options_data.iloc[:int(options_data['timestamp'].searchsorted(prefix_end))]
+    return OptionsHistory(options_data)
+
+
+def _score(results, metric: str) -> float:
+    value = float(getattr(results, metric))
+    return value if np.isfinite(value) else -float('inf')
+
+
+def parameter_combinations(parameter_grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    names = list(parameter_grid.keys())
+    return [dict(zip(names, values)) for values in product(*(parameter_grid[n] for n in names))]
+
+
+class WalkForwardOptimizer:
+    """
+    Successive-halving parameter search over a process pool
+
+    Combinations are ranked by config.optimization_metric; ties keep grid
+    order, so parallel and serial runs pick the same parameters.
+    """
+
+    def __init__(self, backtester, workers: Optional[int] = None, eta: int = 3,
+                 min_fraction: float = 1 / 9):
+        """
+        Args:
+            backtester: HistoricalBacktester whose class and data loader are used
+            workers: Worker processes (default: CPU count; 1 evaluates inline)
+            eta: Halving rate; only the best 1/eta survive each rung (1 = exhaustive)
+            min_fraction: Shortest in-sample prefix scored in the first rung
+        """
+        self.backtester = backtester
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.eta = max(1, int(eta))
+        self.min_fraction = min_fraction
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _rung_fractions(self, combinations: int) -> List[float]:
+        if self.eta == 1 or combinations <= 1:
+            return [1.0]
+        rungs = 1 + int(math.floor(math.log(combinations, self.eta) + 1e-9))
+        rungs = min(rungs, 1 + int(math.floor(math.log(1 / self.min_fraction, self.eta) + 1e-9)))
+        return [self.eta ** -(rungs - 1 - r) for r in range(rungs)]
+
+    def optimize(self, algorithm_version: str, config, parameter_grid: Dict[str, List[Any]],
+                 options_data: pd.DataFrame,
+                 market_data: pd.DataFrame) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Best parameters for the period covered by options_data
+
+        Returns:
+            (best_params, stats) where stats counts evaluations, pruned
+            combinations and the share of full-period work actually done
+        """
+        started = time.perf_counter()
+        candidates = parameter_combinations(parameter_grid)
+        configs = [dataclasses.replace(config, **params) for params in candidates]
+        days = np.sort(options_data['timestamp'].dt.normalize().unique())
+        fractions = self._rung_fractions(len(candidates))
+
+        survivors = list(range(len(candidates)))
+        scores: Dict[int, float] = {}
+        evaluations, eval_seconds, work = 0, 0.0, 0.0
+
+        export_dir = None
+        try:
+            if self.workers > 1 and len(candidates) > 1 and len(days):
+                export_dir = tempfile.mkdtemp(prefix='walk_forward_', dir=SHARED_MEMORY_DIR)
+                shared = (SharedFrame.export(options_data, export_dir, 'options'),
+                          SharedFrame.export(market_data, export_dir, 'market'))
+
+            for rung, fraction in enumerate(fractions):
+                if rung == len(fractions) - 1 or not len(days):
+                    prefix_end = None
+                else:
+                    prefix_end = pd.Timestamp(days[max(1, math.ceil(fraction * len(days))) - 1]) + pd.Timedelta(days=1)
+
+                if export_dir:
+                    tasks = [{'index': i, 'config': configs[i], 'prefix_end': prefix_end,
+                              'algorithm': algorithm_version, 'options': shared[0], 'market': shared[1],
+                              'backtester_class': type(self.backtester),
+                              'output_dir': self.backtester.output_dir} for i in survivors]
+                    if self._executor is None:
+                        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    chunksize = max(1, len(tasks) // (self.workers * 4))
+                    outcomes = list(self._executor.map(evaluate_combination, tasks, chunksize=chunksize))
+                else:
+                    outcomes = []
+                    history = _indexed_prefix(options_data, prefix_end)
+                    for i in survivors:
+                        t0 = time.perf_counter()
+                        results = self.backtester.simulate(algorithm_version, configs[i],
+                                                           history, market_data)
+                        outcomes.append((i, _score(results, config.optimization_metric),
+                                         time.perf_counter() - t0))
+
+                for index, score, seconds in outcomes:
+                    scores[index] = score
+                    eval_seconds += seconds
+                evaluations += len(outcomes)
+                work += len(outcomes) * fraction
+
+                ranked = sorted(survivors, key=lambda i: (-scores[i], i))
+                if rung < len(fractions) - 1:
+                    survivors = ranked[:max(1, math.ceil(len(ranked) / self.eta))]
+                else:
+                    survivors = ranked
+        finally:
+            if export_dir:
+                shutil.rmtree(export_dir, ignore_errors=True)
+
+        wall_seconds = time.perf_counter() - started
+        best = survivors[0] if survivors else None
+        stats = {
+            'combinations': len(candidates),
+            'rungs': len(fractions),
+            'evaluations': evaluations,
+            'pruned': len(candidates) - len(survivors),
+            'work_fraction': work / len(candidates) if candidates else 0.0,
+            'workers': self.workers if export_dir else 1,
+            'wall_seconds': wall_seconds,
+            'eval_seconds': eval_seconds,
+            'best_score': scores.get(best) if best is not None else None
+        }
+        return (candidates[best] if best is not None else {}), stats
+
+    def run(self, algorithm_version: str, config,
+            parameter_grid: Dict[str, List[Any]]) -> Dict[str, Any]:
+        """
+        Walk-forward optimization with per-window checkpoints
+
+        Completed windows are read back from the checkpoint file (keyed by
+        algorithm, backtest config, grid and search settings) instead of re-run.
+        """
+        backtester = self.backtester
+        checkpoint_path = self._checkpoint_path(algorithm_version, config, parameter_grid)
+        completed = self._load_checkpoint(checkpoint_path)
+
+        results = {
+            'algorithm': algorithm_version,
+            'windows': [],
+            'best_parameters': None,
+            'out_of_sample_performance': [],
+            'checkpoint': checkpoint_path
+        }
+
+        total_days = (config.end_date - config.start_date).days
+        window_size = total_days // config.walk_forward_windows
+        started = time.perf_counter()
+        resumed, eval_seconds, evaluations = 0, 0.0, 0
+
+        try:
+            for window in range(config.walk_forward_windows - 1):
+                in_sample_start = config.start_date + timedelta(days=window * window_size)
+                in_sample_end = in_sample_start + timedelta(days=window_size * 2 // 3)
+                out_sample_start = in_sample_end
+                out_sample_end = out_sample_start + timedelta(days=window_size // 3)
+
+                if str(window + 1) in completed:
+                    record = completed[str(window + 1)]
+                    resumed += 1
+                    print(f"\nWindow {window + 1}: resumed from checkpoint")
+                else:
+                    print(f"\nWindow {window + 1}:")
+                    print(f"  In-sample: {in_sample_start.date()} to {in_sample_end.date()}")
+                    print(f"  Out-sample: {out_sample_start.date()} to {out_sample_end.date()}")
+
+                    options_data = backtester.data_loader.load_options_data(
+                        "NQM25", in_sample_start, in_sample_end)
+                    market_data = backtester.data_loader.load_market_data(
+                        in_sample_start, in_sample_end)
+                    in_sample_config = dataclasses.replace(
+                        config, start_date=in_sample_start, end_date=in_sample_end)
+                    best_params, stats = self.optimize(
+                        algorithm_version, in_sample_config, parameter_grid, options_data, market_data)
+                    eval_seconds += stats['eval_seconds']
+                    evaluations += stats['evaluations']
+
+                    test_config = dataclasses.replace(
+                        config, start_date=out_sample_start, end_date=out_sample_end, **best_params)
+                    test_results = backtester.run_backtest(algorithm_version, test_config)
+
+                    record = {
+                        'window': window + 1,
+                        'best_parameters': best_params,
+                        'in_sample_period': f"{in_sample_start.date()} to {in_sample_end.date()}",
+                        'out_sample_period': f"{out_sample_start.date()} to {out_sample_end.date()}",
+                        'out_sample_sharpe': test_results.sharpe_ratio,
+                        'out_sample_return': test_results.total_return,
+                        'optimization': stats
+                    }
+                    completed[str(window + 1)] = record
+                    self._save_checkpoint(checkpoint_path, completed)
+
+                results['windows'].append(record)
+                results['out_of_sample_performance'].append(record['out_sample_sharpe'])
+                results['best_parameters'] = record['best_parameters']
+        finally:
+            self.close()
+
+        wall_seconds = time.perf_counter() - started
+        # speedup = evaluation time per wall second; bounded by cores, not workers
+        results['optimization_stats'] = {
+            'workers': self.workers,
+            'cores': os.cpu_count(),
+            'windows_resumed': resumed,
+            'evaluations': evaluations,
+            'wall_seconds': wall_seconds,
+            'eval_seconds': eval_seconds,
+            'speedup': eval_seconds / wall_seconds if wall_seconds > 0 else 0.0
+        }
+        return results
+
+    def _checkpoint_path(self, algorithm_version: str, config,
+                         parameter_grid: Dict[str, List[Any]]) -> str:
+        settings = {name: value for name, value in dataclasses.asdict(config).items()
+                    if name not in CHECKPOINT_EXCLUDED_FIELDS}
+        identity = json.dumps({
+            'algorithm': algorithm_version,
+            'config': settings,
+            'grid': parameter_grid,
+            'eta': self.eta,
+            'min_fraction': self.min_fraction
+        }, sort_keys=True, default=str)
+        digest = hashlib.sha1(identity.encode()).hexdigest()[:12]
+        return os.path.join(self.backtester.output_dir, f"walk_forward_{algorithm_version}_{digest}.json")
+
+    @staticmethod
+    def _load_checkpoint(path: str) -> Dict[str, Any]:
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path) as f:
+                return json.load(f).get('windows', {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable walk-forward checkpoint {path}: {e}")
+            return {}
+
+    @staticmethod
+    def _save_checkpoint(path: str, windows: Dict[str, Any]):
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump({'updated': get_eastern_time().isoformat(), 'windows': windows}, f,
+                      indent=2, default=str)
+        os.replace(temp_path, path)
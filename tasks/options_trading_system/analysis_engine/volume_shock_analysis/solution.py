@@ -790,7 +790,8 @@ class VolumeShockAnalysisEngine:
 
 # Module-level function for easy integration
 def analyze_volume_shocks(data_config: Dict[str, Any],
-                         analysis_config: Dict[str, Any] = None) -> Dict[str, Any]:
+                         analysis_config: Dict[str, Any] = None,
+                         snapshot=None) -> Dict[str, Any]:
     """
     Analyze volume shocks and generate front-running trading signals
 
@@ -800,6 +801,7 @@ def analyze_volume_shocks(data_config: Dict[str, Any],
     Args:
         data_config: Configuration for data sources
         analysis_config: Configuration for volume shock analysis (optional)
+        snapshot: Optional shared MarketSnapshot (skips data ingestion)
 
     Returns:
         Dict with volume shock analysis results and trading signals
@@ -815,9 +817,12 @@ def analyze_volume_shocks(data_config: Dict[str, Any],
         }
 
     try:
-        # Load options data using data ingestion pipeline
-        pipeline_result = run_data_ingestion(data_config)
-        options_data = pipeline_result.get("normalized_data", {})
+        # Load options data from the shared snapshot or the data ingestion pipeline
+        if snapshot is not None:
+            options_data = snapshot.normalized_data
+        else:
+            pipeline_result = run_data_ingestion(data_config)
+            options_data = pipeline_result.get("normalized_data", {})
 
         # Initialize analysis engine
         engine = VolumeShockAnalysisEngine(analysis_config)
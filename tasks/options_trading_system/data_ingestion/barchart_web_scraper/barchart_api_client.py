@@ -4,6 +4,7 @@ Barchart API Client - Direct API calls using reverse-engineered endpoints
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
 from datetime import datetime
 from utils.timezone_utils import get_eastern_time, get_utc_time
@@ -11,12 +12,22 @@ from typing import Dict, Any, Optional
 import logging
 from urllib.parse import urlencode
 
+# Per-contract fields requested from the options endpoint
+OPTIONS_FIELDS = 'strike,openPrice,highPrice,lowPrice,lastPrice,priceChange,bidPrice,askPrice,volume,openInterest,premium,tradeTime,longSymbol,optionType,symbol,symbolCode,symbolType'
+
 class BarchartAPIClient:
     """Direct API client for Barchart options data"""
 
-    def __init__(self):
+    def __init__(self, pool_size: int = 10):
+        """
+        Args:
+            pool_size: Keep-alive connections kept per host (shared by concurrent fetches)
+        """
         self.base_url = "https://www.barchart.com/proxies/core-api/v1"
         self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.logger = logging.getLogger(__name__)
 
         # Default headers based on browser requests
@@ -70,7 +81,7 @@ class BarchartAPIClient:
         params = {
             'symbol': symbol,
             'list': 'futures.options',
-            'fields': 'strike,openPrice,highPrice,lowPrice,lastPrice,priceChange,bidPrice,askPrice,volume,openInterest,premium,tradeTime,longSymbol,optionType,symbol,symbolCode,symbolType',
+            'fields': OPTIONS_FIELDS,
             'meta': 'field.shortName,field.description,field.type,lists.lastUpdate',
             'groupBy': 'optionType',
             'orderBy': 'strike',
@@ -2,19 +2,94 @@
 """
 Barchart Data Cache Manager
 Optimizes API calls by caching frequently accessed data
+- Single-file SQLite index updated one row at a time
+- Compressed payload blobs (zstd when available, zlib otherwise; single
+  contracts use a preset dictionary of Barchart field names)
+- Contracts stored once by content hash, so successive chain snapshots
+  only write the contracts that changed
+- Running size counter and LRU order for O(1) eviction
 """
 
 import os
 import json
 import time
-from datetime import datetime, timedelta
-from utils.timezone_utils import get_eastern_time, get_utc_time
-from typing import Dict, Any, Optional, Tuple
+import zlib
 import hashlib
 import logging
+import threading
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta
+from utils.timezone_utils import get_eastern_time, get_utc_time
+from utils.sqlite_store import get_store
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    from .barchart_api_client import OPTIONS_FIELDS
+except ImportError:
+    from barchart_api_client import OPTIONS_FIELDS
 
 logger = logging.getLogger(__name__)
 
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+    logger.info("zstandard not available, Barchart cache blobs use zlib")
+
+# Blob prefixes naming the codec, so caches stay readable if zstandard comes or goes
+ZSTD_TAG = b'Z'
+ZLIB_TAG = b'z'
+CONTRACT_TAG = b'c'
+
+# Preset zlib dictionary for single-contract blobs, which are too small to
+# compress well on their own: the field names every contract repeats
+CONTRACT_ZDICT = (b''.join(b'"%s":' % field.encode() for field in OPTIONS_FIELDS.split(',')) +
+                  b'"optionType":"Call""optionType":"Put""raw":{')
+
+# Marks a contract list replaced by content hashes in a stored chain skeleton
+CONTRACT_REFS = '$contracts'
+
+# SQLite keeps bound parameters per statement under this
+QUERY_CHUNK = 500
+
+
+def compress_blob(payload: bytes) -> bytes:
+    """Compress a payload, tagged with its codec"""
+    if ZSTD_AVAILABLE:
+        return ZSTD_TAG + zstandard.ZstdCompressor(level=3).compress(payload)
+    return ZLIB_TAG + zlib.compress(payload, 6)
+
+
+def compress_contract(payload: bytes) -> bytes:
+    """Compress one serialized contract with the preset field-name dictionary"""
+    compressor = zlib.compressobj(6, zdict=CONTRACT_ZDICT)
+    return CONTRACT_TAG + compressor.compress(payload) + compressor.flush()
+
+
+def decompress_blob(blob: bytes) -> bytes:
+    """Decompress a blob written by compress_blob or compress_contract"""
+    tag, body = blob[:1], blob[1:]
+    if tag == ZLIB_TAG:
+        return zlib.decompress(body)
+    if tag == CONTRACT_TAG:
+        decompressor = zlib.decompressobj(zdict=CONTRACT_ZDICT)
+        return decompressor.decompress(body) + decompressor.flush()
+    if tag == ZSTD_TAG:
+        if not ZSTD_AVAILABLE:
+            raise ValueError("Cache blob is zstd-compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(body)
+    raise ValueError(f"Unknown cache blob codec {tag!r}")
+
+
+# Compact and order-preserving: Barchart returns fields in a fixed order, so
+# an unchanged contract always serializes (and hashes) the same way
+_ENCODER = json.JSONEncoder(separators=(',', ':'))
+
+
+def _dumps(value: Any) -> bytes:
+    return _ENCODER.encode(value).encode()
+
 
 class BarchartCacheManager:
     """Manages caching for Barchart options data to reduce API calls"""
@@ -26,9 +101,9 @@ class BarchartCacheManager:
         Initialize cache manager
 
         Args:
-            cache_dir: Directory to store cache files
+            cache_dir: Directory holding the cache database
             ttl_minutes: Time-to-live for cache entries in minutes
-            max_cache_size_mb: Maximum cache size in MB
+            max_cache_size_mb: Maximum cache size in MB (compressed)
         """
         self.cache_dir = cache_dir
         self.ttl_seconds = ttl_minutes * 60
@@ -42,40 +117,86 @@ class BarchartCacheManager:
             "hits": 0,
             "misses": 0,
             "evictions": 0,
-            "saves": 0
+            "saves": 0,
+            "contracts_written": 0,
+            "contracts_reused": 0
         }
 
-        # Load cache index
-        self.index_file = os.path.join(self.cache_dir, ".cache_index.json")
-        self.cache_index = self._load_index()
+        self.db_path = os.path.join(self.cache_dir, "barchart_cache.db")
+        self.store = get_store(self.db_path)
+        self._lock = threading.RLock()
+        self._init_database()
+
+        # LRU order (least recently used first) and running size, loaded once
+        self._lru: "OrderedDict[str, None]" = OrderedDict()
+        self.total_size = 0
+        self._load_index()
+        self._migrate_legacy_files()
+
+    def _init_database(self) -> None:
+        """Create cache tables"""
+        with self.store.connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    cache_key TEXT PRIMARY KEY,
+                    symbol TEXT NOT NULL,
+                    futures_symbol TEXT NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    last_access REAL NOT NULL,
+                    size INTEGER NOT NULL,
+                    skeleton BLOB NOT NULL
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cache_contracts (
+                    hash TEXT PRIMARY KEY,
+                    refcount INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    payload BLOB NOT NULL
+                )
+            ''')
+
+    def _load_index(self) -> None:
+        """Rebuild the LRU order and size counter from the database"""
+        with self.store.connection() as conn:
+            for (cache_key,) in conn.execute("SELECT cache_key FROM cache_entries ORDER BY last_access"):
+                self._lru[cache_key] = None
+            self.total_size = (conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0] +
+                               conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_contracts").fetchone()[0])
+
+    def _migrate_legacy_files(self) -> None:
+        """Move entries from the old JSON-file cache into the database"""
+        index_file = os.path.join(self.cache_dir, ".cache_index.json")
+        if not os.path.exists(index_file):
+            return
 
-    def _load_index(self) -> Dict[str, Any]:
-        """Load cache index from disk"""
-        if os.path.exists(self.index_file):
-            try:
-                with open(self.index_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.warning(f"Failed to load cache index: {e}")
-        return {}
-
-    def _save_index(self) -> None:
-        """Save cache index to disk"""
         try:
-            with open(self.index_file, 'w') as f:
-                json.dump(self.cache_index, f, indent=2)
+            with open(index_file, 'r') as f:
+                legacy_index = json.load(f)
         except Exception as e:
-            logger.error(f"Failed to save cache index: {e}")
+            logger.warning(f"Failed to load legacy cache index: {e}")
+            legacy_index = {}
+
+        migrated = 0
+        for cache_key in legacy_index:
+            cache_path = os.path.join(self.cache_dir, f"{cache_key}.json")
+            try:
+                with open(cache_path, 'r') as f:
+                    entry = json.load(f)
+                self._store_entry(entry["symbol"], entry["futures_symbol"], entry["timestamp"], entry["data"])
+                migrated += 1
+            except Exception as e:
+                logger.warning(f"Skipping legacy cache entry {cache_key}: {e}")
+            if os.path.exists(cache_path):
+                os.remove(cache_path)
+        os.remove(index_file)
+        logger.info(f"Migrated {migrated} legacy cache entries to {self.db_path}")
 
     def _get_cache_key(self, symbol: str, futures_symbol: str) -> str:
         """Generate cache key for symbol combination"""
         key_string = f"{symbol}_{futures_symbol}"
         return hashlib.md5(key_string.encode()).hexdigest()
 
-    def _get_cache_path(self, cache_key: str) -> str:
-        """Get file path for cache key"""
-        return os.path.join(self.cache_dir, f"{cache_key}.json")
-
     def _is_cache_valid(self, cache_entry: Dict[str, Any]) -> bool:
         """Check if cache entry is still valid"""
         if "timestamp" not in cache_entry:
@@ -96,6 +217,98 @@ class BarchartCacheManager:
             # After hours - cache for longer (30 minutes)
             return age_seconds < (30 * 60)
 
+    # Chain payloads
+
+    @staticmethod
+    def _split_contracts(data: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, bytes]]:
+        """
+        Replace the chain's contract lists with content hashes
+
+        Returns:
+            (skeleton, hash -> serialized contract)
+        """
+        contracts = {}
+
+        def refs(rows: List[Any]) -> Dict[str, List[str]]:
+            hashes = []
+            for row in rows:
+                payload = _dumps(row)
+                digest = hashlib.blake2b(payload, digest_size=16).hexdigest()
+                contracts[digest] = payload
+                hashes.append(digest)
+            return {CONTRACT_REFS: hashes}
+
+        rows = data.get("data") if isinstance(data, dict) else None
+        if isinstance(rows, list):
+            skeleton = dict(data, data=refs(rows))
+        elif isinstance(rows, dict):
+            skeleton = dict(data, data={group: refs(value) if isinstance(value, list) else value
+                                        for group, value in rows.items()})
+        else:
+            skeleton = data
+        return skeleton, contracts
+
+    @staticmethod
+    def _skeleton_hashes(skeleton: Dict[str, Any]) -> List[str]:
+        rows = skeleton.get("data") if isinstance(skeleton, dict) else None
+        if not isinstance(rows, dict):
+            return []
+        if CONTRACT_REFS in rows:
+            return list(rows[CONTRACT_REFS])
+        return [digest for value in rows.values()
+                if isinstance(value, dict) and CONTRACT_REFS in value
+                for digest in value[CONTRACT_REFS]]
+
+    @staticmethod
+    def _join_contracts(skeleton: Dict[str, Any], contracts: Dict[str, Any]) -> Dict[str, Any]:
+        """Inverse of _split_contracts"""
+        rows = skeleton.get("data") if isinstance(skeleton, dict) else None
+        if not isinstance(rows, dict):
+            return skeleton
+        if CONTRACT_REFS in rows:
+            return dict(skeleton, data=[contracts[digest] for digest in rows[CONTRACT_REFS]])
+        return dict(skeleton, data={
+            group: [contracts[digest] for digest in value[CONTRACT_REFS]]
+            if isinstance(value, dict) and CONTRACT_REFS in value else value
+            for group, value in rows.items()
+        })
+
+    def _load_contracts(self, conn, hashes: List[str]) -> Dict[str, Any]:
+        unique = list(dict.fromkeys(hashes))
+        contracts = {}
+        for i in range(0, len(unique), QUERY_CHUNK):
+            chunk = unique[i:i + QUERY_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            for digest, payload in conn.execute(
+                    f"SELECT hash, payload FROM cache_contracts WHERE hash IN ({placeholders})", chunk):
+                contracts[digest] = json.loads(decompress_blob(payload))
+        return contracts
+
+    def _existing_contracts(self, conn, hashes: List[str]) -> set:
+        existing = set()
+        for i in range(0, len(hashes), QUERY_CHUNK):
+            chunk = hashes[i:i + QUERY_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            existing.update(digest for (digest,) in conn.execute(
+                f"SELECT hash FROM cache_contracts WHERE hash IN ({placeholders})", chunk))
+        return existing
+
+    def _release_contracts(self, conn, hashes: List[str]) -> int:
+        """Drop references to contracts, deleting unreferenced ones; returns bytes freed"""
+        counts = Counter(hashes)
+        conn.executemany("UPDATE cache_contracts SET refcount = refcount - ? WHERE hash = ?",
+                         [(count, digest) for digest, count in counts.items()])
+        freed = 0
+        for digest in counts:
+            row = conn.execute("SELECT size FROM cache_contracts WHERE hash = ? AND refcount <= 0",
+                               (digest,)).fetchone()
+            if row:
+                conn.execute("DELETE FROM cache_contracts WHERE hash = ?", (digest,))
+                freed += row[0]
+        return freed
+
+    # Cache operations
+
     def get(self, symbol: str, futures_symbol: str) -> Optional[Dict[str, Any]]:
         """
         Get data from cache if available and valid
@@ -105,39 +318,46 @@ class BarchartCacheManager:
         """
         cache_key = self._get_cache_key(symbol, futures_symbol)
 
-        if cache_key not in self.cache_index:
-            self.stats["misses"] += 1
-            return None
-
-        cache_path = self._get_cache_path(cache_key)
-
-        if not os.path.exists(cache_path):
-            # Index entry exists but file is missing
-            del self.cache_index[cache_key]
-            self._save_index()
-            self.stats["misses"] += 1
-            return None
-
-        try:
-            with open(cache_path, 'r') as f:
-                cache_entry = json.load(f)
+        with self._lock:
+            if cache_key not in self._lru:
+                self.stats["misses"] += 1
+                return None
 
-            if self._is_cache_valid(cache_entry):
+            try:
+                with self.store.connection() as conn:
+                    row = conn.execute("SELECT timestamp, skeleton FROM cache_entries WHERE cache_key = ?",
+                                       (cache_key,)).fetchone()
+                    if row is None:
+                        # Index entry exists but row is missing
+                        self._lru.pop(cache_key, None)
+                        self.stats["misses"] += 1
+                        return None
+
+                    cache_entry = {"timestamp": row[0]}
+                    valid = self._is_cache_valid(cache_entry)
+                    if valid:
+                        skeleton = json.loads(decompress_blob(row[1]))
+                        contracts = self._load_contracts(conn, self._skeleton_hashes(skeleton))
+
+                if not valid:
+                    # Cache expired
+                    self._evict_entry(cache_key)
+                    self.stats["misses"] += 1
+                    logger.info(f"Cache expired for {symbol}")
+                    return None
+
+                self._lru.move_to_end(cache_key)
+                self.store.execute_async("UPDATE cache_entries SET last_access = ? WHERE cache_key = ?",
+                                         (time.time(), cache_key))
                 self.stats["hits"] += 1
                 logger.info(f"Cache hit for {symbol} (age: {self._get_cache_age_str(cache_entry)})")
-                return cache_entry["data"]
-            else:
-                # Cache expired
-                self._evict_entry(cache_key)
+                return self._join_contracts(skeleton, contracts)
+
+            except Exception as e:
+                logger.error(f"Failed to read cache entry {cache_key}: {e}")
                 self.stats["misses"] += 1
-                logger.info(f"Cache expired for {symbol}")
                 return None
 
-        except Exception as e:
-            logger.error(f"Failed to read cache entry {cache_key}: {e}")
-            self.stats["misses"] += 1
-            return None
-
     def _get_cache_age_str(self, cache_entry: Dict[str, Any]) -> str:
         """Get human-readable cache age"""
         if "timestamp" not in cache_entry:
@@ -163,30 +383,12 @@ class BarchartCacheManager:
             data: Data to cache
         """
         cache_key = self._get_cache_key(symbol, futures_symbol)
-        cache_path = self._get_cache_path(cache_key)
-
-        cache_entry = {
-            "symbol": symbol,
-            "futures_symbol": futures_symbol,
-            "timestamp": get_eastern_time().isoformat(),
-            "data": data
-        }
 
         try:
-            # Check cache size before saving
-            self._enforce_size_limit()
-
-            with open(cache_path, 'w') as f:
-                json.dump(cache_entry, f)
-
-            # Update index
-            self.cache_index[cache_key] = {
-                "symbol": symbol,
-                "futures_symbol": futures_symbol,
-                "timestamp": cache_entry["timestamp"],
-                "size": os.path.getsize(cache_path)
-            }
-            self._save_index()
+            with self._lock:
+                self._store_entry(symbol, futures_symbol, get_eastern_time().isoformat(), data)
+                # Check cache size after saving
+                self._enforce_size_limit(keep=cache_key)
 
             self.stats["saves"] += 1
             logger.info(f"Cached data for {symbol}")
@@ -194,54 +396,90 @@ class BarchartCacheManager:
         except Exception as e:
             logger.error(f"Failed to save cache entry {cache_key}: {e}")
 
-    def _enforce_size_limit(self) -> None:
-        """Enforce cache size limit by evicting old entries"""
-        total_size = sum(entry.get("size", 0) for entry in self.cache_index.values())
-
-        if total_size > self.max_cache_size_bytes:
-            # Sort entries by timestamp (oldest first)
-            sorted_entries = sorted(
-                self.cache_index.items(),
-                key=lambda x: x[1].get("timestamp", ""),
-                reverse=False
-            )
-
-            # Evict oldest entries until we're under the limit
-            for cache_key, entry in sorted_entries:
-                if total_size <= self.max_cache_size_bytes * 0.8:  # Keep 20% buffer
-                    break
-
-                self._evict_entry(cache_key)
-                total_size -= entry.get("size", 0)
+    def _store_entry(self, symbol: str, futures_symbol: str, timestamp: str, data: Dict[str, Any]) -> None:
+        """Write one chain: new contracts are inserted, unchanged ones only gain a reference"""
+        cache_key = self._get_cache_key(symbol, futures_symbol)
+        skeleton, contracts = self._split_contracts(data)
+        hashes = self._skeleton_hashes(skeleton)
+        skeleton_blob = compress_blob(_dumps(skeleton))
+
+        with self.store.connection() as conn:
+            existing = self._existing_contracts(conn, list(contracts))
+            new_rows = [(digest, compress_contract(payload)) for digest, payload in contracts.items()
+                        if digest not in existing]
+            counts = Counter(hashes)
+            conn.executemany("INSERT INTO cache_contracts (hash, refcount, size, payload) VALUES (?, ?, ?, ?)",
+                             [(digest, counts[digest], len(blob), blob) for digest, blob in new_rows])
+            conn.executemany("UPDATE cache_contracts SET refcount = refcount + ? WHERE hash = ?",
+                             [(counts[digest], digest) for digest in existing])
+            added = sum(len(blob) for _, blob in new_rows)
+
+            # Release the previous snapshot after referencing the new one, so
+            # contracts the two share are never deleted and rewritten
+            old = conn.execute("SELECT size, skeleton FROM cache_entries WHERE cache_key = ?",
+                               (cache_key,)).fetchone()
+            freed = 0
+            if old:
+                freed = old[0] + self._release_contracts(
+                    conn, self._skeleton_hashes(json.loads(decompress_blob(old[1]))))
+
+            conn.execute('''
+                INSERT OR REPLACE INTO cache_entries
+                (cache_key, symbol, futures_symbol, timestamp, last_access, size, skeleton)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (cache_key, symbol, futures_symbol, timestamp, time.time(), len(skeleton_blob), skeleton_blob))
+
+        self.total_size += len(skeleton_blob) + added - freed
+        self._lru[cache_key] = None
+        self._lru.move_to_end(cache_key)
+        self.stats["contracts_written"] += len(new_rows)
+        self.stats["contracts_reused"] += len(existing)
+
+    def _enforce_size_limit(self, keep: Optional[str] = None) -> None:
+        """Enforce cache size limit by evicting least recently used entries"""
+        if self.total_size <= self.max_cache_size_bytes:
+            return
+
+        # Evict until we're under the limit
+        while self.total_size > self.max_cache_size_bytes * 0.8 and self._lru:  # Keep 20% buffer
+            cache_key = next(iter(self._lru))
+            if cache_key == keep:
+                break
+            self._evict_entry(cache_key)
 
     def _evict_entry(self, cache_key: str) -> None:
         """Evict a cache entry"""
-        cache_path = self._get_cache_path(cache_key)
-
         try:
-            if os.path.exists(cache_path):
-                os.remove(cache_path)
-
-            if cache_key in self.cache_index:
-                del self.cache_index[cache_key]
-                self._save_index()
-
-            self.stats["evictions"] += 1
+            with self._lock:
+                with self.store.connection() as conn:
+                    row = conn.execute("SELECT size, skeleton FROM cache_entries WHERE cache_key = ?",
+                                       (cache_key,)).fetchone()
+                    if row:
+                        freed = row[0] + self._release_contracts(
+                            conn, self._skeleton_hashes(json.loads(decompress_blob(row[1]))))
+                        conn.execute("DELETE FROM cache_entries WHERE cache_key = ?", (cache_key,))
+                        self.total_size -= freed
+
+                self._lru.pop(cache_key, None)
+                self.stats["evictions"] += 1
 
         except Exception as e:
             logger.error(f"Failed to evict cache entry {cache_key}: {e}")
 
     def clear(self) -> None:
         """Clear all cache entries"""
-        for cache_key in list(self.cache_index.keys()):
-            self._evict_entry(cache_key)
+        with self._lock:
+            with self.store.connection() as conn:
+                conn.execute("DELETE FROM cache_entries")
+                conn.execute("DELETE FROM cache_contracts")
+            self.stats["evictions"] += len(self._lru)
+            self._lru.clear()
+            self.total_size = 0
 
         logger.info("Cache cleared")
 
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
-        total_size = sum(entry.get("size", 0) for entry in self.cache_index.values())
-
         hit_rate = 0
         if self.stats["hits"] + self.stats["misses"] > 0:
             hit_rate = self.stats["hits"] / (self.stats["hits"] + self.stats["misses"])
@@ -252,9 +490,12 @@ class BarchartCacheManager:
             "hit_rate": f"{hit_rate:.1%}",
             "saves": self.stats["saves"],
             "evictions": self.stats["evictions"],
-            "entries": len(self.cache_index),
-            "size_mb": round(total_size / (1024 * 1024), 2),
-            "size_limit_mb": self.max_cache_size_bytes / (1024 * 1024)
+            "entries": len(self._lru),
+            "size_mb": round(self.total_size / (1024 * 1024), 2),
+            "size_limit_mb": self.max_cache_size_bytes / (1024 * 1024),
+            "contracts_written": self.stats["contracts_written"],
+            "contracts_reused": self.stats["contracts_reused"],
+            "compression": "zstd" if ZSTD_AVAILABLE else "zlib"
         }
 
     def print_stats(self) -> None:
@@ -264,8 +505,9 @@ class BarchartCacheManager:
         print(f"  Hit Rate: {stats['hit_rate']}")
         print(f"  Hits: {stats['hits']}, Misses: {stats['misses']}")
         print(f"  Entries: {stats['entries']}")
-        print(f"  Size: {stats['size_mb']}MB / {stats['size_limit_mb']}MB")
+        print(f"  Size: {stats['size_mb']}MB / {stats['size_limit_mb']}MB ({stats['compression']})")
         print(f"  Saves: {stats['saves']}, Evictions: {stats['evictions']}")
+        print(f"  Contracts written: {stats['contracts_written']}, reused: {stats['contracts_reused']}")
 
 
 # Global cache instance
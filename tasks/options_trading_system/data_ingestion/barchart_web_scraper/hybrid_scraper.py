@@ -1,35 +1,45 @@
 #!/usr/bin/env python3
 """
 Hybrid Barchart Scraper - Uses Selenium for auth, then API for data
+Authenticated sessions are stored and reused until they expire
 """
 
 import logging
 import json
 from datetime import datetime
 from utils.timezone_utils import get_eastern_time, get_utc_time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
-from .solution import BarchartWebScraper
-from .barchart_api_client import BarchartAPIClient
 from .cache_manager import get_cache_manager
+from .session_manager import BarchartSessionManager, CookieVault
 
 class HybridBarchartScraper:
     """
     Combines Selenium for authentication with direct API calls for speed
     """
 
-    def __init__(self, headless: bool = True, use_cache: bool = True):
+    def __init__(self, headless: bool = True, use_cache: bool = True,
+                 session_manager: Optional[BarchartSessionManager] = None):
         self.logger = logging.getLogger(__name__)
         self.headless = headless
         self.web_scraper = None
-        self.api_client = None
         self.cookies = None
         self.use_cache = use_cache
         self.cache_manager = get_cache_manager() if use_cache else None
 
+        # One authenticated session shared by every fetch, persisted across runs
+        self.session_manager = session_manager or BarchartSessionManager(
+            authenticator=self._browser_authenticate,
+            vault=CookieVault()
+        )
+        self.api_client = self.session_manager.client
+
     def authenticate(self, futures_symbol: str = "NQM25") -> bool:
         """
-        Use Selenium to visit Barchart and get authentication cookies
+        Make sure an authenticated session is available
+
+        Reuses the in-memory or stored session when it has not expired and
+        only launches the browser otherwise.
 
         Args:
             futures_symbol: Futures symbol to visit (for getting cookies)
@@ -37,6 +47,23 @@ class HybridBarchartScraper:
         Returns:
             True if authentication successful
         """
+        authenticated = self.session_manager.ensure_session(futures_symbol)
+        self.cookies = self.session_manager.cookies
+        return authenticated
+
+    def _browser_authenticate(self, futures_symbol: str) -> Tuple[Optional[Dict[str, str]], Optional[float]]:
+        """
+        Use Selenium to visit Barchart and get authentication cookies
+
+        Args:
+            futures_symbol: Futures symbol to visit (for getting cookies)
+
+        Returns:
+            (cookies, expiry as epoch seconds), cookies None if authentication failed
+        """
+        # Selenium is only needed when no stored session can be reused
+        from .solution import BarchartWebScraper
+
         try:
             self.logger.info("Starting authentication via Selenium...")
 
@@ -64,23 +91,29 @@ class HybridBarchartScraper:
             time.sleep(3)
 
             # Extract cookies
-            self.cookies = self.web_scraper.get_cookies_from_driver()
+            cookies = self.web_scraper.get_cookies_from_driver()
 
             # Check for essential cookies
             essential_cookies = ['laravel_session', 'XSRF-TOKEN', 'laravel_token']
-            found_cookies = [c for c in essential_cookies if c in self.cookies]
+            found_cookies = [c for c in essential_cookies if c in cookies]
 
             self.logger.info(f"Found {len(found_cookies)}/{len(essential_cookies)} essential cookies")
 
+            # The session lasts as long as its shortest-lived essential cookie
+            expiries = [c['expiry'] for c in self.web_scraper.driver.get_cookies()
+                        if c.get('name') in essential_cookies and c.get('expiry')]
+            expires_at = float(min(expiries)) if expiries else None
+
             # Close the browser - we don't need it anymore
             if self.web_scraper.driver:
                 self.web_scraper.driver.quit()
+                self.web_scraper.driver = None
 
-            return len(found_cookies) > 0
+            return (cookies if found_cookies else None), expires_at
 
         except Exception as e:
             self.logger.error(f"Authentication failed: {e}")
-            return False
+            return None, None
 
     def fetch_options_data(self, symbol: str, futures_symbol: str = "NQM25") -> Dict[str, Any]:
         """
@@ -94,42 +127,70 @@ class HybridBarchartScraper:
             Options data from API
         """
         # Check cache first
-        if self.use_cache and self.cache_manager:
-            cached_data = self.cache_manager.get(symbol, futures_symbol)
-            if cached_data:
-                self.logger.info(f"🎯 Using cached data for {symbol}")
-                return cached_data
+        cached_data = self._get_cached(symbol, futures_symbol)
+        if cached_data:
+            return cached_data
+
+        self.logger.info(f"🔄 Fetching fresh data for {symbol} via API...")
+        data = self.session_manager.fetch(symbol, futures_symbol)
+        self.cookies = self.session_manager.cookies
+        self._store_fetched(symbol, futures_symbol, data)
+        return data
+
+    def fetch_many_options(self, symbols: List[str], futures_symbol: str = "NQM25",
+                           max_workers: Optional[int] = None) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Fetch several options symbols concurrently over the shared session
 
-        if not self.cookies:
-            self.logger.error("No cookies available. Run authenticate() first.")
-            return None
+        Args:
+            symbols: Options symbols
+            futures_symbol: Underlying futures symbol
+            max_workers: Concurrent fetches (default: session manager's)
 
-        try:
-            # Initialize API client
-            self.api_client = BarchartAPIClient()
+        Returns:
+            Dict of symbol -> options data (None for failed symbols)
+        """
+        results = {}
+        to_fetch = []
+        for symbol in symbols:
+            cached_data = self._get_cached(symbol, futures_symbol)
+            if cached_data:
+                results[symbol] = cached_data
+            else:
+                to_fetch.append(symbol)
 
-            # Set cookies
-            self.api_client.set_cookies(self.cookies)
+        if to_fetch:
+            self.logger.info(f"🔄 Fetching fresh data for {len(to_fetch)} symbols via API...")
+            fetched = self.session_manager.fetch_many(to_fetch, futures_symbol, max_workers)
+            self.cookies = self.session_manager.cookies
+            for symbol, data in fetched.items():
+                self._store_fetched(symbol, futures_symbol, data)
+                results[symbol] = data
 
-            # Fetch data
-            self.logger.info(f"🔄 Fetching fresh data for {symbol} via API...")
-            data = self.api_client.get_options_data(symbol, futures_symbol)
+        return {symbol: results.get(symbol) for symbol in symbols}
 
-            # Save the data to file
-            if data and data.get('total', 0) > 0:
-                saved_path = self.api_client.save_api_response(data, symbol)
-                self.logger.info(f"✅ Saved {data.get('total', 0)} contracts to {saved_path}")
+    def _get_cached(self, symbol: str, futures_symbol: str) -> Optional[Dict[str, Any]]:
+        if self.use_cache and self.cache_manager:
+            cached_data = self.cache_manager.get(symbol, futures_symbol)
+            if cached_data:
+                self.logger.info(f"🎯 Using cached data for {symbol}")
+                return cached_data
+        return None
 
-                # Cache the data for future requests
-                if self.use_cache and self.cache_manager:
-                    self.cache_manager.save(symbol, futures_symbol, data)
-                    self.logger.info(f"💾 Cached data for {symbol}")
+    def _store_fetched(self, symbol: str, futures_symbol: str, data: Optional[Dict[str, Any]]) -> None:
+        # Save the data to file
+        if data and data.get('total', 0) > 0:
+            saved_path = self.api_client.save_api_response(data, symbol)
+            self.logger.info(f"✅ Saved {data.get('total', 0)} contracts to {saved_path}")
 
-            return data
+            # Cache the data for future requests
+            if self.use_cache and self.cache_manager:
+                self.cache_manager.save(symbol, futures_symbol, data)
+                self.logger.info(f"💾 Cached data for {symbol}")
 
-        except Exception as e:
-            self.logger.error(f"API call failed: {e}")
-            return None
+    def get_session_metrics(self) -> Dict[str, Any]:
+        """Get session reuse metrics (browser launches avoided, time to first data)"""
+        return self.session_manager.get_metrics()
 
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
@@ -155,6 +216,9 @@ class HybridBarchartScraper:
         if self.web_scraper and self.web_scraper.driver:
             self.web_scraper.driver.quit()
 
+        # Pooled connections close; the stored session stays for the next run
+        self.session_manager.close()
+
         # Print cache stats on cleanup
         if self.use_cache:
             self.print_cache_stats()
@@ -216,6 +280,11 @@ def main():
     if data:
         print(f"✅ Success! Retrieved {data.get('total', 0)} contracts")
 
+        metrics = scraper.get_session_metrics()
+        print(f"🔁 Browser launches: {metrics['browser_launches']}, "
+              f"avoided: {metrics['browser_launches_avoided']}, "
+              f"time to first data: {metrics['time_to_first_data']}s")
+
         # Show sample data
         if 'data' in data and 'Call' in data['data'] and data['data']['Call']:
             first_call = data['data']['Call'][0]
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Barchart Session Manager - Reuses authenticated sessions across fetches and runs
+- Cookie vault: authenticated cookies and XSRF token persisted with their expiry
+- One pooled keep-alive API client shared by all fetches
+- Browser authentication only when the vault is empty or expired, or on 401/419
+- Concurrent multi-symbol fetches over the shared connection pool
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+import requests
+
+from .barchart_api_client import BarchartAPIClient
+
+logger = logging.getLogger(__name__)
+
+# Status codes Barchart answers with once the session or XSRF token is stale
+# (419 is Laravel's "page expired")
+AUTH_FAILURE_CODES = (401, 419)
+
+# Laravel sessions last two hours by default; used when the browser reports no expiry
+DEFAULT_SESSION_TTL_MINUTES = 110
+
+# Session cookies are credentials: keep them in the user's cache, never in the repo tree
+DEFAULT_VAULT_PATH = os.path.join("~", ".cache", "nq-options", "barchart_cookies.json")
+
+
+class CookieVault:
+    """Persists authenticated Barchart cookies to disk with their expiry"""
+
+    def __init__(self, path: str = DEFAULT_VAULT_PATH,
+                 refresh_margin_seconds: int = 60):
+        """
+        Initialize cookie vault
+
+        Args:
+            path: JSON file holding the cookies (~ is expanded)
+            refresh_margin_seconds: Treat cookies as expired this long before they are
+        """
+        self.path = os.path.expanduser(path)
+        self.refresh_margin_seconds = refresh_margin_seconds
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Load the stored session if it has not expired
+
+        Returns:
+            Dict with cookies, xsrf_token, expires_at and saved_at, or None
+        """
+        if not os.path.exists(self.path):
+            return None
+
+        try:
+            with open(self.path, 'r') as f:
+                entry = json.load(f)
+        except Exception as e:
+            logger.warning(f"Failed to load cookie vault: {e}")
+            return None
+
+        if not entry.get("cookies"):
+            return None
+        if time.time() >= entry.get("expires_at", 0) - self.refresh_margin_seconds:
+            logger.info("Stored Barchart session has expired")
+            return None
+        return entry
+
+    def save(self, cookies: Dict[str, str], expires_at: float) -> None:
+        """
+        Store cookies with their expiry (epoch seconds)
+
+        The file is written owner-only and replaced atomically, so a crash
+        mid-write never leaves a truncated vault behind.
+        """
+        xsrf_token = cookies.get("XSRF-TOKEN")
+        entry = {
+            "cookies": cookies,
+            "xsrf_token": urllib.parse.unquote(xsrf_token) if xsrf_token else None,
+            "expires_at": expires_at,
+            "saved_at": time.time()
+        }
+
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", mode=0o700, exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entry, f, indent=2)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            logger.error(f"Failed to save cookie vault: {e}")
+
+    def clear(self) -> None:
+        """Remove the stored session"""
+        try:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+        except Exception as e:
+            logger.error(f"Failed to clear cookie vault: {e}")
+
+
+class BarchartSessionManager:
+    """
+    Owns one authenticated BarchartAPIClient for every fetch
+
+    The authenticator is only called when neither the client nor the vault
+    has a live session, or when the API rejects the session with 401/419.
+    Concurrent fetches that hit the same stale session share one
+    re-authentication.
+    """
+
+    def __init__(self, authenticator: Callable[[str], Tuple[Dict[str, str], Optional[float]]],
+                 vault: Optional[CookieVault] = None,
+                 pool_size: int = 10,
+                 max_workers: int = 4,
+                 session_ttl_minutes: int = DEFAULT_SESSION_TTL_MINUTES):
+        """
+        Initialize session manager
+
+        Args:
+            authenticator: futures_symbol -> (cookies, expires_at or None); launches the browser
+            vault: Cookie vault, None to keep sessions in memory only
+            pool_size: Keep-alive connections held by the shared client
+            max_workers: Default concurrency for fetch_many
+            session_ttl_minutes: Session lifetime when the authenticator reports no expiry
+        """
+        self.authenticator = authenticator
+        self.vault = vault
+        self.max_workers = max_workers
+        self.session_ttl_seconds = session_ttl_minutes * 60
+        self.client = BarchartAPIClient(pool_size=pool_size)
+
+        self.cookies: Optional[Dict[str, str]] = None
+        self.expires_at = 0.0
+        self._generation = 0
+        self._auth_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._started_at: Optional[float] = None
+
+        self.metrics = {
+            "browser_launches": 0,
+            "browser_launches_avoided": 0,
+            "reauthentications": 0,
+            "auth_failures": 0,
+            "requests": 0,
+            "failed_requests": 0,
+            "time_to_first_data": None,
+            "last_auth_seconds": None
+        }
+
+    def _session_valid(self) -> bool:
+        margin = self.vault.refresh_margin_seconds if self.vault else 0
+        return bool(self.cookies) and time.time() < self.expires_at - margin
+
+    def ensure_session(self, futures_symbol: str = "NQM25") -> bool:
+        """
+        Make sure the shared client holds a live session
+
+        Returns:
+            True if a session is available
+        """
+        if self._started_at is None:
+            self._started_at = time.perf_counter()
+        with self._auth_lock:
+            if self._session_valid():
+                return True
+
+            entry = self.vault.load() if self.vault else None
+            if entry:
+                self._install(entry["cookies"], entry["expires_at"])
+                self.metrics["browser_launches_avoided"] += 1
+                logger.info("Reusing stored Barchart session "
+                            f"(expires in {int((entry['expires_at'] - time.time()) / 60)}m)")
+                return True
+
+            return self._authenticate(futures_symbol)
+
+    def _authenticate(self, futures_symbol: str) -> bool:
+        """Launch the browser for fresh cookies (caller holds the auth lock)"""
+        start = time.perf_counter()
+        self.metrics["browser_launches"] += 1
+        try:
+            cookies, expires_at = self.authenticator(futures_symbol)
+        except Exception as e:
+            logger.error(f"Browser authentication failed: {e}")
+            cookies, expires_at = None, None
+        self.metrics["last_auth_seconds"] = round(time.perf_counter() - start, 3)
+
+        if not cookies:
+            self.metrics["auth_failures"] += 1
+            return False
+
+        if not expires_at:
+            expires_at = time.time() + self.session_ttl_seconds
+        self._install(cookies, expires_at)
+        if self.vault:
+            self.vault.save(cookies, expires_at)
+        return True
+
+    def _install(self, cookies: Dict[str, str], expires_at: float) -> None:
+        self.client.session.cookies.clear()
+        self.client.set_cookies(cookies)
+        self.cookies = dict(cookies)
+        self.expires_at = expires_at
+        self._generation += 1
+
+    def _reauthenticate(self, futures_symbol: str, stale_generation: int) -> bool:
+        """Replace a rejected session unless another fetch already did"""
+        with self._auth_lock:
+            if self._generation != stale_generation:
+                return bool(self.cookies)
+            self.metrics["reauthentications"] += 1
+            self.cookies = None
+            if self.vault:
+                self.vault.clear()
+            return self._authenticate(futures_symbol)
+
+    def fetch(self, symbol: str, futures_symbol: str = "NQM25") -> Optional[Dict[str, Any]]:
+        """
+        Fetch options data over the shared session
+
+        A 401/419 answer triggers one re-authentication and one retry.
+
+        Returns:
+            Options data from API, or None on failure
+        """
+        if not self.ensure_session(futures_symbol):
+            logger.error("No Barchart session available")
+            return None
+
+        for attempt in range(2):
+            generation = self._generation
+            self._count("requests")
+            try:
+                data = self.client.get_options_data(symbol, futures_symbol)
+            except requests.exceptions.HTTPError as e:
+                status = e.response.status_code if e.response is not None else None
+                if attempt == 0 and status in AUTH_FAILURE_CODES:
+                    logger.info(f"Session rejected ({status}) while fetching {symbol}; re-authenticating")
+                    if self._reauthenticate(futures_symbol, generation):
+                        continue
+                self._count("failed_requests")
+                return None
+            except Exception as e:
+                logger.error(f"API call failed for {symbol}: {e}")
+                self._count("failed_requests")
+                return None
+
+            with self._metrics_lock:
+                if self.metrics["time_to_first_data"] is None:
+                    self.metrics["time_to_first_data"] = round(time.perf_counter() - self._started_at, 3)
+            return data
+
+        return None
+
+    def fetch_many(self, symbols: List[str], futures_symbol: str = "NQM25",
+                   max_workers: Optional[int] = None) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Fetch several symbols concurrently over the shared connection pool
+
+        Returns:
+            Dict of symbol -> options data (None for failed symbols)
+        """
+        if not symbols:
+            return {}
+        if not self.ensure_session(futures_symbol):
+            logger.error("No Barchart session available")
+            return {symbol: None for symbol in symbols}
+
+        results = {}
+        workers = min(max_workers or self.max_workers, len(symbols))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="BarchartFetch") as executor:
+            futures = {executor.submit(self.fetch, symbol, futures_symbol): symbol for symbol in symbols}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        return {symbol: results[symbol] for symbol in symbols}
+
+    def _count(self, metric: str) -> None:
+        with self._metrics_lock:
+            self.metrics[metric] += 1
+
+    def invalidate(self) -> None:
+        """Forget the current session, in memory and on disk"""
+        with self._auth_lock:
+            self.cookies = None
+            self.expires_at = 0.0
+            self.client.session.cookies.clear()
+            if self.vault:
+                self.vault.clear()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get session reuse metrics"""
+        with self._metrics_lock:
+            metrics = dict(self.metrics)
+        metrics["session_expires_in_seconds"] = max(0, int(self.expires_at - time.time())) if self.cookies else 0
+        return metrics
+
+    def close(self) -> None:
+        """Close pooled connections (the vault keeps the session for the next run)"""
+        self.client.session.close()
@@ -6,12 +6,13 @@ This module provides statistical baseline calculations for institutional flow de
 - 20-day lookback for historical patterns
 - Statistical metrics (mean, std, percentiles) by strike and time
 - Incremental updates to minimize API calls
+- Rolling per-day accumulators so updates cost O(new data), not O(lookback)
 - Anomaly detection thresholds
 """
 
 import os
+import sys
 import json
-import sqlite3
 import logging
 from datetime import datetime, timedelta, timezone, time
 from typing import Dict, List, Any, Optional, Tuple
@@ -21,6 +22,15 @@ import numpy as np
 import pandas as pd
 from pathlib import Path
 
+# Shared SQLite storage layer lives in the repository-level utils package
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))
+from utils.sqlite_store import get_store
+
+try:
+    from .streaming_stats import RunningStats, QuantileDigest
+except ImportError:
+    from streaming_stats import RunningStats, QuantileDigest
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -84,6 +94,103 @@ class HistoricalDataPoint:
     large_trades: int  # Trades > 100 contracts
 
 
+BASELINE_PERCENTILES = (0.25, 0.50, 0.75, 0.95)
+MIN_BASELINE_SAMPLES = 5
+
+
+class DailyBaselineSummary:
+    """
+    Mergeable statistics for one strike/type/bucket on one trading day
+
+    Welford accumulators give mean and population std; t-digests give the
+    volume and pressure percentiles. Summaries for the days in the lookback
+    window are merged on demand, and a day leaving the window is dropped.
+    """
+
+    __slots__ = ('volume', 'pressure', 'trade_size', 'large_trade_ratio',
+                 'volume_digest', 'pressure_digest')
+
+    def __init__(self):
+        self.volume = RunningStats()
+        self.pressure = RunningStats()
+        self.trade_size = RunningStats()
+        self.large_trade_ratio = RunningStats()
+        self.volume_digest = QuantileDigest()
+        self.pressure_digest = QuantileDigest()
+
+    def add(self, total_volume: float, buy_pressure_ratio: float, trade_count: int,
+            avg_trade_size: float, large_trades: int):
+        self.volume.add(total_volume)
+        self.volume_digest.add(total_volume)
+        self.pressure.add(buy_pressure_ratio)
+        self.pressure_digest.add(buy_pressure_ratio)
+        if avg_trade_size and avg_trade_size > 0:
+            self.trade_size.add(avg_trade_size)
+        if trade_count and trade_count > 0:
+            self.large_trade_ratio.add((large_trades or 0) / trade_count)
+
+    def add_point(self, point: HistoricalDataPoint):
+        self.add(point.total_volume, point.buy_pressure_ratio, point.trade_count,
+                 point.avg_trade_size, point.large_trades)
+
+    def merge(self, other: 'DailyBaselineSummary'):
+        self.volume.merge(other.volume)
+        self.pressure.merge(other.pressure)
+        self.trade_size.merge(other.trade_size)
+        self.large_trade_ratio.merge(other.large_trade_ratio)
+        self.volume_digest.merge(other.volume_digest)
+        self.pressure_digest.merge(other.pressure_digest)
+
+    @property
+    def sample_count(self) -> int:
+        return self.volume.count
+
+    def to_state(self) -> str:
+        """JSON state for the baseline_accumulators table"""
+        return json.dumps({
+            'volume': self.volume.to_state(),
+            'pressure': self.pressure.to_state(),
+            'trade_size': self.trade_size.to_state(),
+            'large_trade_ratio': self.large_trade_ratio.to_state(),
+            'volume_digest': self.volume_digest.to_state(),
+            'pressure_digest': self.pressure_digest.to_state()
+        })
+
+    @classmethod
+    def from_state(cls, state: str) -> 'DailyBaselineSummary':
+        data = json.loads(state)
+        summary = cls()
+        summary.volume = RunningStats.from_state(data['volume'])
+        summary.pressure = RunningStats.from_state(data['pressure'])
+        summary.trade_size = RunningStats.from_state(data['trade_size'])
+        summary.large_trade_ratio = RunningStats.from_state(data['large_trade_ratio'])
+        summary.volume_digest = QuantileDigest.from_state(data['volume_digest'])
+        summary.pressure_digest = QuantileDigest.from_state(data['pressure_digest'])
+        return summary
+
+
+class RollingBaselineWindow:
+    """Per-day summaries for one strike/type/bucket over the lookback window"""
+
+    __slots__ = ('days',)
+
+    def __init__(self):
+        self.days: Dict[str, DailyBaselineSummary] = {}  # 'YYYY-MM-DD' -> summary
+
+    def evict_before(self, cutoff_day: str) -> List[str]:
+        """Drop days older than the lookback cutoff, returning them"""
+        expired = [day for day in self.days if day < cutoff_day]
+        for day in expired:
+            del self.days[day]
+        return expired
+
+    def combined(self) -> DailyBaselineSummary:
+        total = DailyBaselineSummary()
+        for day in sorted(self.days):
+            total.merge(self.days[day])
+        return total
+
+
 class BaselineDatabase:
     """SQLite database for baseline storage and retrieval"""
 
@@ -91,11 +198,12 @@ class BaselineDatabase:
         """Initialize baseline database"""
         self.db_path = db_path
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.store = get_store(self.db_path)
         self._init_database()
 
     def _init_database(self):
         """Initialize database tables"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
 
             # Historical data points table
@@ -151,6 +259,18 @@ class BaselineDatabase:
                 )
             """)
 
+            # Rolling per-day accumulator state
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS baseline_accumulators (
+                    strike_price REAL NOT NULL,
+                    contract_type TEXT NOT NULL,
+                    time_bucket TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    PRIMARY KEY(strike_price, contract_type, time_bucket, day)
+                )
+            """)
+
             # Create indexes
             cursor.execute("""
                 CREATE INDEX IF NOT EXISTS idx_historical_date
@@ -166,32 +286,54 @@ class BaselineDatabase:
 
     def store_historical_data(self, data_points: List[HistoricalDataPoint]):
         """Store historical data points"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-
-            for point in data_points:
-                cursor.execute("""
-                    INSERT OR REPLACE INTO historical_data
-                    (date, strike_price, contract_type, time_bucket,
-                     total_volume, buy_volume, sell_volume, buy_pressure_ratio,
-                     trade_count, avg_trade_size, large_trades)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    point.date.isoformat(),
-                    point.strike_price,
-                    point.contract_type,
-                    point.time_bucket,
-                    point.total_volume,
-                    point.buy_volume,
-                    point.sell_volume,
-                    point.buy_pressure_ratio,
-                    point.trade_count,
-                    point.avg_trade_size,
-                    point.large_trades
-                ))
+        with self.store.connection() as conn:
+            conn.executemany("""
+                INSERT OR REPLACE INTO historical_data
+                (date, strike_price, contract_type, time_bucket,
+                 total_volume, buy_volume, sell_volume, buy_pressure_ratio,
+                 trade_count, avg_trade_size, large_trades)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [(
+                point.date.isoformat(),
+                point.strike_price,
+                point.contract_type,
+                point.time_bucket,
+                point.total_volume,
+                point.buy_volume,
+                point.sell_volume,
+                point.buy_pressure_ratio,
+                point.trade_count,
+                point.avg_trade_size,
+                point.large_trades
+            ) for point in data_points])
 
             conn.commit()
 
+    def get_historical_rows(self, start_day: str, end_day: Optional[str] = None,
+                            key: Optional[Tuple[float, str, str]] = None) -> List[Tuple]:
+        """
+        Raw historical rows for accumulator rebuilds
+
+        Returns (date, strike_price, contract_type, time_bucket, total_volume,
+        buy_pressure_ratio, trade_count, avg_trade_size, large_trades) tuples
+        with start_day <= date < end_day, optionally for one strike/type/bucket.
+        """
+        query = """
+            SELECT date, strike_price, contract_type, time_bucket, total_volume,
+                   buy_pressure_ratio, trade_count, avg_trade_size, large_trades
+            FROM historical_data WHERE date >= ?
+        """
+        params: List[Any] = [start_day]
+        if end_day:
+            query += " AND date < ?"
+            params.append(end_day)
+        if key:
+            query += " AND strike_price = ? AND contract_type = ? AND time_bucket = ?"
+            params.extend(key)
+
+        with self.store.connection() as conn:
+            return conn.execute(query, params).fetchall()
+
     def get_historical_data(self, strike_price: float, contract_type: str,
                            time_bucket: str, days_back: int = 20) -> pd.DataFrame:
         """Get historical data for baseline calculation"""
@@ -204,7 +346,7 @@ class BaselineDatabase:
             ORDER BY date DESC
         """
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             df = pd.read_sql_query(query, conn, params=(
                 strike_price, contract_type, time_bucket, cutoff_date
             ))
@@ -213,39 +355,72 @@ class BaselineDatabase:
 
     def store_baseline_metrics(self, metrics: BaselineMetrics):
         """Store calculated baseline metrics"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+        self.store_baseline_metrics_batch([metrics])
+
+    def store_baseline_metrics_batch(self, metrics_list: List[BaselineMetrics],
+                                     conn=None):
+        """Store many baseline metrics in one transaction"""
+        rows = [(
+            metrics.strike_price, metrics.contract_type, metrics.time_bucket,
+            metrics.volume_mean, metrics.volume_std,
+            metrics.volume_p25, metrics.volume_p50, metrics.volume_p75, metrics.volume_p95,
+            metrics.pressure_mean, metrics.pressure_std,
+            metrics.pressure_p25, metrics.pressure_p50, metrics.pressure_p75, metrics.pressure_p95,
+            metrics.avg_trade_size_mean, metrics.avg_trade_size_std,
+            metrics.large_trade_ratio_mean,
+            metrics.sample_count, metrics.days_included,
+            metrics.last_updated.isoformat(),
+            metrics.volume_threshold_high, metrics.volume_threshold_extreme,
+            metrics.pressure_threshold_high, metrics.pressure_threshold_low
+        ) for metrics in metrics_list]
+        sql = """
+            INSERT OR REPLACE INTO baseline_metrics
+            (strike_price, contract_type, time_bucket,
+             volume_mean, volume_std, volume_p25, volume_p50, volume_p75, volume_p95,
+             pressure_mean, pressure_std, pressure_p25, pressure_p50, pressure_p75, pressure_p95,
+             avg_trade_size_mean, avg_trade_size_std, large_trade_ratio_mean,
+             sample_count, days_included, last_updated,
+             volume_threshold_high, volume_threshold_extreme,
+             pressure_threshold_high, pressure_threshold_low)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """
 
-            cursor.execute("""
-                INSERT OR REPLACE INTO baseline_metrics
-                (strike_price, contract_type, time_bucket,
-                 volume_mean, volume_std, volume_p25, volume_p50, volume_p75, volume_p95,
-                 pressure_mean, pressure_std, pressure_p25, pressure_p50, pressure_p75, pressure_p95,
-                 avg_trade_size_mean, avg_trade_size_std, large_trade_ratio_mean,
-                 sample_count, days_included, last_updated,
-                 volume_threshold_high, volume_threshold_extreme,
-                 pressure_threshold_high, pressure_threshold_low)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                metrics.strike_price, metrics.contract_type, metrics.time_bucket,
-                metrics.volume_mean, metrics.volume_std,
-                metrics.volume_p25, metrics.volume_p50, metrics.volume_p75, metrics.volume_p95,
-                metrics.pressure_mean, metrics.pressure_std,
-                metrics.pressure_p25, metrics.pressure_p50, metrics.pressure_p75, metrics.pressure_p95,
-                metrics.avg_trade_size_mean, metrics.avg_trade_size_std,
-                metrics.large_trade_ratio_mean,
-                metrics.sample_count, metrics.days_included,
-                metrics.last_updated.isoformat(),
-                metrics.volume_threshold_high, metrics.volume_threshold_extreme,
-                metrics.pressure_threshold_high, metrics.pressure_threshold_low
-            ))
+        if conn is not None:
+            conn.executemany(sql, rows)
+            return
+        with self.store.connection() as conn:
+            conn.executemany(sql, rows)
+            conn.commit()
+
+    def get_accumulator_states(self, since_day: str) -> List[Tuple[float, str, str, str, str]]:
+        """Persisted (strike_price, contract_type, time_bucket, day, state) rows"""
+        with self.store.connection() as conn:
+            return conn.execute("""
+                SELECT strike_price, contract_type, time_bucket, day, state
+                FROM baseline_accumulators WHERE day >= ?
+            """, (since_day,)).fetchall()
 
+    def store_rolling_update(self, day_states: List[Tuple[float, str, str, str, str]],
+                             metrics_list: List[BaselineMetrics], evict_before: str):
+        """
+        Persist changed day accumulators and refreshed metrics atomically
+
+        Accumulator days older than ``evict_before`` are deleted.
+        """
+        with self.store.connection() as conn:
+            conn.execute("DELETE FROM baseline_accumulators WHERE day < ?", (evict_before,))
+            conn.executemany("""
+                INSERT OR REPLACE INTO baseline_accumulators
+                (strike_price, contract_type, time_bucket, day, state)
+                VALUES (?, ?, ?, ?, ?)
+            """, day_states)
+            self.store_baseline_metrics_batch(metrics_list, conn=conn)
             conn.commit()
 
     def get_baseline_metrics(self, strike_price: float, contract_type: str,
                            time_bucket: str) -> Optional[BaselineMetrics]:
         """Get baseline metrics for a specific strike/time"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
 
             cursor.execute("""
@@ -329,138 +504,147 @@ class BaselineCalculationEngine:
         Returns:
             Dict mapping time_bucket to BaselineMetrics
         """
-        # Group data by time bucket
-        bucket_data = defaultdict(list)
+        # Group data by time bucket, then by day
+        bucket_windows = defaultdict(RollingBaselineWindow)
         for point in historical_data:
-            bucket_data[point.time_bucket].append(point)
+            window = bucket_windows[point.time_bucket]
+            day = point.date.date().isoformat()
+            summary = window.days.get(day)
+            if summary is None:
+                summary = window.days[day] = DailyBaselineSummary()
+            summary.add_point(point)
 
         baselines = {}
+        for time_bucket, window in bucket_windows.items():
+            metrics = self._metrics_from_window(strike_price, contract_type, time_bucket, window)
+            if metrics:
+                baselines[time_bucket] = metrics
 
-        for time_bucket, points in bucket_data.items():
-            if len(points) < 5:  # Need minimum samples
-                logger.warning(f"Insufficient data for {strike_price} {contract_type} {time_bucket}")
-                continue
-
-            # Extract arrays for calculation
-            volumes = [p.total_volume for p in points]
-            pressures = [p.buy_pressure_ratio for p in points]
-            trade_sizes = [p.avg_trade_size for p in points if p.avg_trade_size > 0]
-            large_trade_counts = [p.large_trades for p in points]
-            trade_counts = [p.trade_count for p in points if p.trade_count > 0]
-
-            # Calculate volume statistics
-            volume_mean = np.mean(volumes)
-            volume_std = np.std(volumes)
-            volume_percentiles = np.percentile(volumes, [25, 50, 75, 95])
-
-            # Calculate pressure statistics
-            pressure_mean = np.mean(pressures)
-            pressure_std = np.std(pressures)
-            pressure_percentiles = np.percentile(pressures, [25, 50, 75, 95])
-
-            # Calculate trade size statistics
-            trade_size_mean = np.mean(trade_sizes) if trade_sizes else 0
-            trade_size_std = np.std(trade_sizes) if trade_sizes else 0
-
-            # Calculate large trade ratio
-            large_trade_ratios = []
-            for i, tc in enumerate(trade_counts):
-                if tc > 0:
-                    ratio = large_trade_counts[i] / tc
-                    large_trade_ratios.append(ratio)
-
-            large_trade_ratio_mean = np.mean(large_trade_ratios) if large_trade_ratios else 0
-
-            # Calculate anomaly thresholds
-            volume_threshold_high = volume_mean + 2 * volume_std
-            volume_threshold_extreme = volume_mean + 3 * volume_std
-            pressure_threshold_high = min(0.95, pressure_mean + 2 * pressure_std)
-            pressure_threshold_low = max(0.05, pressure_mean - 2 * pressure_std)
-
-            # Count unique days
-            unique_dates = set(p.date.date() for p in points)
-
-            # Create baseline metrics
-            metrics = BaselineMetrics(
-                strike_price=strike_price,
-                contract_type=contract_type,
-                time_bucket=time_bucket,
-                volume_mean=volume_mean,
-                volume_std=volume_std,
-                volume_p25=volume_percentiles[0],
-                volume_p50=volume_percentiles[1],
-                volume_p75=volume_percentiles[2],
-                volume_p95=volume_percentiles[3],
-                pressure_mean=pressure_mean,
-                pressure_std=pressure_std,
-                pressure_p25=pressure_percentiles[0],
-                pressure_p50=pressure_percentiles[1],
-                pressure_p75=pressure_percentiles[2],
-                pressure_p95=pressure_percentiles[3],
-                avg_trade_size_mean=trade_size_mean,
-                avg_trade_size_std=trade_size_std,
-                large_trade_ratio_mean=large_trade_ratio_mean,
-                sample_count=len(points),
-                days_included=len(unique_dates),
-                last_updated=datetime.now(timezone.utc),
-                volume_threshold_high=volume_threshold_high,
-                volume_threshold_extreme=volume_threshold_extreme,
-                pressure_threshold_high=pressure_threshold_high,
-                pressure_threshold_low=pressure_threshold_low
-            )
-
-            baselines[time_bucket] = metrics
-
-            # Store in database
-            self.database.store_baseline_metrics(metrics)
+        # Store in database
+        if baselines:
+            self.database.store_baseline_metrics_batch(list(baselines.values()))
 
         return baselines
 
+    def _metrics_from_window(self, strike_price: float, contract_type: str, time_bucket: str,
+                             window: RollingBaselineWindow) -> Optional[BaselineMetrics]:
+        """Build BaselineMetrics from a window's merged day summaries"""
+        summary = window.combined()
+        if summary.sample_count < MIN_BASELINE_SAMPLES:  # Need minimum samples
+            logger.warning(f"Insufficient data for {strike_price} {contract_type} {time_bucket}")
+            return None
+
+        volume_mean, volume_std = summary.volume.mean, summary.volume.std
+        pressure_mean, pressure_std = summary.pressure.mean, summary.pressure.std
+        volume_percentiles = summary.volume_digest.quantiles(BASELINE_PERCENTILES)
+        pressure_percentiles = summary.pressure_digest.quantiles(BASELINE_PERCENTILES)
+
+        return BaselineMetrics(
+            strike_price=strike_price,
+            contract_type=contract_type,
+            time_bucket=time_bucket,
+            volume_mean=volume_mean,
+            volume_std=volume_std,
+            volume_p25=volume_percentiles[0],
+            volume_p50=volume_percentiles[1],
+            volume_p75=volume_percentiles[2],
+            volume_p95=volume_percentiles[3],
+            pressure_mean=pressure_mean,
+            pressure_std=pressure_std,
+            pressure_p25=pressure_percentiles[0],
+            pressure_p50=pressure_percentiles[1],
+            pressure_p75=pressure_percentiles[2],
+            pressure_p95=pressure_percentiles[3],
+            avg_trade_size_mean=summary.trade_size.mean,
+            avg_trade_size_std=summary.trade_size.std,
+            large_trade_ratio_mean=summary.large_trade_ratio.mean,
+            sample_count=summary.sample_count,
+            days_included=len(window.days),
+            last_updated=datetime.now(timezone.utc),
+            # Anomaly thresholds
+            volume_threshold_high=volume_mean + 2 * volume_std,
+            volume_threshold_extreme=volume_mean + 3 * volume_std,
+            pressure_threshold_high=min(0.95, pressure_mean + 2 * pressure_std),
+            pressure_threshold_low=max(0.05, pressure_mean - 2 * pressure_std)
+        )
+
     def update_baselines_incremental(self, new_data: List[HistoricalDataPoint]):
         """
         Update baselines incrementally with new data
 
-        This avoids recalculating from scratch each time
+        Only the days touched by ``new_data`` are re-read; every other day in
+        the lookback comes from persisted per-day accumulators, and days that
+        slide out of the window are evicted.
         """
-        # Store new historical data
+        if not new_data:
+            return
+
+        # Store new historical data (INSERT OR REPLACE dedupes replayed points)
         self.database.store_historical_data(new_data)
 
-        # Group by strike and type
-        strike_groups = defaultdict(list)
+        cutoff_day = (datetime.now(timezone.utc) - timedelta(days=self.lookback_days)).date().isoformat()
+        new_keys = {(p.strike_price, p.contract_type, p.time_bucket) for p in new_data}
+        touched_strikes = {(strike, contract_type) for strike, contract_type, _ in new_keys}
+
+        # Persisted windows for every bucket of the touched strikes
+        windows: Dict[Tuple[float, str, str], RollingBaselineWindow] = {}
+        for strike, contract_type, time_bucket, day, state in self.database.get_accumulator_states(cutoff_day):
+            if (strike, contract_type) in touched_strikes:
+                key = (strike, contract_type, time_bucket)
+                window = windows.get(key)
+                if window is None:
+                    window = windows[key] = RollingBaselineWindow()
+                window.days[day] = DailyBaselineSummary.from_state(state)
+
+        changed_days = set()
+
+        # Keys without accumulator state are seeded once from stored history
+        for key in new_keys - set(windows):
+            window = windows[key] = RollingBaselineWindow()
+            for row in self.database.get_historical_rows(cutoff_day, key=key):
+                day = row[0][:10]
+                self._add_row(window, day, row)
+                changed_days.add((key, day))
+
+        # Rebuild the days the new data touched from the deduplicated table
+        seeded = {key for key, _ in changed_days}
+        new_days = {p.date.date().isoformat() for p in new_data}
+        rebuild = set()
         for point in new_data:
-            key = (point.strike_price, point.contract_type)
-            strike_groups[key].append(point)
-
-        # Update baselines for each strike
-        for (strike, contract_type), points in strike_groups.items():
-            # Get historical data including new points
-            all_historical = []
-
-            for time_bucket in self.time_buckets:
-                df = self.database.get_historical_data(
-                    strike, contract_type, time_bucket, self.lookback_days
-                )
-
-                # Convert DataFrame to HistoricalDataPoint objects
-                for _, row in df.iterrows():
-                    point = HistoricalDataPoint(
-                        date=datetime.fromisoformat(row['date']),
-                        strike_price=row['strike_price'],
-                        contract_type=row['contract_type'],
-                        time_bucket=row['time_bucket'],
-                        total_volume=row['total_volume'],
-                        buy_volume=row['buy_volume'],
-                        sell_volume=row['sell_volume'],
-                        buy_pressure_ratio=row['buy_pressure_ratio'],
-                        trade_count=row['trade_count'],
-                        avg_trade_size=row['avg_trade_size'],
-                        large_trades=row['large_trades']
-                    )
-                    all_historical.append(point)
-
-            # Recalculate baselines
-            if all_historical:
-                self.calculate_baselines_for_strike(strike, contract_type, all_historical)
+            key = (point.strike_price, point.contract_type, point.time_bucket)
+            if key not in seeded:
+                rebuild.add((key, point.date.date().isoformat()))
+        for key, day in rebuild:
+            windows[key].days.pop(day, None)
+        if rebuild:
+            end_day = (datetime.fromisoformat(max(new_days)) + timedelta(days=1)).date().isoformat()
+            for row in self.database.get_historical_rows(max(min(new_days), cutoff_day), end_day):
+                key, day = (row[1], row[2], row[3]), row[0][:10]
+                if (key, day) in rebuild:
+                    self._add_row(windows[key], day, row)
+            changed_days |= rebuild
+
+        # Evict days that slid out of the lookback and refresh metrics
+        metrics_list = []
+        now = datetime.now(timezone.utc)
+        for key, window in windows.items():
+            window.evict_before(cutoff_day)
+            metrics = self._metrics_from_window(*key, window)
+            if metrics:
+                metrics_list.append(metrics)
+                self._baseline_cache[key] = (metrics, now)
+
+        day_states = [(*key, day, windows[key].days[day].to_state())
+                      for key, day in changed_days if day in windows[key].days]
+        self.database.store_rolling_update(day_states, metrics_list, cutoff_day)
+
+    @staticmethod
+    def _add_row(window: RollingBaselineWindow, day: str, row: Tuple):
+        """Fold a get_historical_rows() tuple into its day summary"""
+        summary = window.days.get(day)
+        if summary is None:
+            summary = window.days[day] = DailyBaselineSummary()
+        summary.add(*row[4:])
 
     def check_anomaly(self, strike_price: float, contract_type: str,
                      time_bucket: str, current_metrics: Dict[str, float]) -> Dict[str, Any]:
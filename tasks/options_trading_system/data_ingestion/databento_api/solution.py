@@ -16,11 +16,11 @@ Architecture:
 import os
 import json
 import logging
-import sqlite3
 import threading
 import time
 from datetime import datetime, timedelta, timezone
 from utils.timezone_utils import get_eastern_time, get_utc_time
+from utils.sqlite_store import get_store
 from typing import Dict, List, Any, Optional, Callable
 from pathlib import Path
 from dataclasses import dataclass, asdict
@@ -70,6 +70,38 @@ class PressureMetrics:
     dominant_side: str
     confidence: float
 
+def to_pressure_metrics(window) -> PressureMetrics:
+    """IFD input for a closed StrikePressureMetrics window (bid = seller-, ask = buyer-initiated volume)"""
+    bid_volume, ask_volume = window.sell_volume, window.buy_volume
+    total_volume = bid_volume + ask_volume
+
+    if bid_volume > 0:
+        pressure_ratio = ask_volume / bid_volume
+    else:
+        pressure_ratio = float('inf') if ask_volume > 0 else 1.0
+
+    buy_percentage = ask_volume / total_volume if total_volume else 0.5
+    if buy_percentage > 0.6:
+        dominant_side = 'BUY'
+    elif buy_percentage < 0.4:
+        dominant_side = 'SELL'
+    else:
+        dominant_side = 'NEUTRAL'
+
+    trades = window.total_trades
+    return PressureMetrics(
+        strike=window.strike_price,
+        option_type=window.contract_type,
+        time_window=window.time_window_start,
+        bid_volume=bid_volume,
+        ask_volume=ask_volume,
+        pressure_ratio=pressure_ratio,
+        total_trades=trades,
+        avg_trade_size=total_volume / trades if trades else 0.0,
+        dominant_side=dominant_side,
+        confidence=min(trades / 20.0, 1.0) * abs(0.5 - buy_percentage) * 2
+    )
+
 class MBOEventProcessor:
     """Processes individual MBO events and derives trade initiation direction"""
 
@@ -351,11 +383,12 @@ class MBODatabase:
             db_path: Path to SQLite database file
         """
         self.db_path = db_path
+        self.store = get_store(self.db_path)
         self._init_database()
 
     def _init_database(self):
         """Initialize database schema"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
 
             # Pressure metrics table
@@ -399,7 +432,7 @@ class MBODatabase:
 
     def store_pressure_metrics(self, metrics: PressureMetrics):
         """Store pressure metrics in database"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT OR REPLACE INTO pressure_metrics
@@ -419,7 +452,7 @@ class MBODatabase:
         """Get pressure metrics history for a strike"""
         since = datetime.now(timezone.utc) - timedelta(hours=hours)
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT * FROM pressure_metrics
@@ -433,7 +466,7 @@ class MBODatabase:
 
     def record_usage(self, date: str, events: int, bytes_processed: int, cost: float, connection_time: float):
         """Record usage statistics"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO usage_monitoring
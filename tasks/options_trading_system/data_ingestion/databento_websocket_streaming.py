@@ -8,6 +8,9 @@ implementing all missing requirements:
 - Market hours control (9:30 AM - 4:00 PM ET)
 - Automatic reconnection with exponential backoff
 - Parent symbol subscription for all strikes
+- Bounded event buffer with a configurable overload policy (block, spill, shed)
+- Optional pressure aggregation sharded across worker processes, with
+  closed windows fed to an IFD engine
 """
 
 import os
@@ -15,12 +18,20 @@ import json
 import logging
 import threading
 import time
-import queue
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Any, Optional, Callable
 from dataclasses import dataclass, asdict
 import pytz
 
+try:
+    from .mbo_records import MBORecord, ns_to_datetime
+    from .mbo_event_buffer import MBOEventBuffer, BLOCK
+    from .mbo_sharding import ShardedMBOProcessor
+except ImportError:
+    from mbo_records import MBORecord, ns_to_datetime
+    from mbo_event_buffer import MBOEventBuffer, BLOCK
+    from mbo_sharding import ShardedMBOProcessor
+
 # Import backfill manager
 try:
     from .websocket_backfill_manager import create_backfill_manager, BackfillManager
@@ -168,7 +179,11 @@ class EnhancedMBOStreamingClient:
     """
 
     def __init__(self, api_key: str, symbols: List[str] = None,
-                 enable_backfill: bool = True, max_backfill_cost: float = 20.0):
+                 enable_backfill: bool = True, max_backfill_cost: float = 20.0,
+                 replay: bool = False, queue_size: int = 50000,
+                 overload_policy: str = BLOCK, spill_dir: str = "outputs/mbo_spill",
+                 instrument_priority: Optional[Dict[Any, int]] = None,
+                 shards: int = 0, window_minutes: int = 5, ifd_engine=None):
         """
         Initialize enhanced MBO streaming client
 
@@ -177,11 +192,28 @@ class EnhancedMBOStreamingClient:
             symbols: Base symbols to stream (e.g., ['NQ'])
             enable_backfill: Enable automatic backfill on reconnection
             max_backfill_cost: Maximum daily backfill cost
+            replay: Offline mode - no WebSocket, market hours or backfill;
+                recorded events are fed through _handle_raw_event
+            queue_size: Events buffered between the reader and processing thread
+            overload_policy: What a full buffer does with new events:
+                'block' (reader waits), 'spill' (journal to spill_dir and
+                replay later) or 'shed' (drop lowest instrument_priority first)
+            spill_dir: Directory for the spill journal
+            instrument_priority: instrument_id or symbol -> priority for
+                'shed' (higher is kept; unlisted instruments are 0)
+            shards: Worker processes aggregating pressure windows
+                (ShardedMBOProcessor); 0 leaves processing to the callbacks
+            window_minutes: Pressure aggregation window when sharded
+            ifd_engine: Object with analyze_pressure_event (e.g. IFDv3Engine)
+                given every closed window when sharded
         """
-        if not DATABENTO_AVAILABLE:
+        if not DATABENTO_AVAILABLE and not replay:
             raise ImportError("Databento package required. Install with: pip install databento")
 
         self.api_key = api_key
+        self.replay = replay
+        if replay:
+            enable_backfill = False
         self.base_symbols = symbols or ['NQ']
         # Convert to parent symbols for options
         self.parent_symbols = [f"{symbol}.OPT" for symbol in self.base_symbols]
@@ -192,6 +224,7 @@ class EnhancedMBOStreamingClient:
             try:
                 self.backfill_manager = create_backfill_manager(api_key, max_backfill_cost)
                 self.backfill_manager.on_backfill_event = self._handle_backfill_event
+                self.backfill_manager.on_backfill_batch = self._handle_backfill_batch
                 logger.info("Backfill manager enabled")
             except Exception as e:
                 logger.warning(f"Failed to initialize backfill manager: {e}")
@@ -206,18 +239,42 @@ class EnhancedMBOStreamingClient:
         self.base_reconnect_delay = 5.0  # seconds
 
         # Event processing
-        self.event_queue = queue.Queue(maxsize=50000)
+        self.instrument_priority = instrument_priority or {}
+        self.event_queue = MBOEventBuffer(
+            maxsize=queue_size,
+            policy=overload_policy,
+            spill_path=os.path.join(spill_dir, f"mbo_spill_{os.getpid()}_{id(self):x}.journal"),
+            priority=self._event_priority
+        )
         self.processing_thread = None
         self.should_stop = False
+        self.batch_size = 500  # Max events handed to on_mbo_batch at once
+
+        # Sharded pressure aggregation (started with the client)
+        self.shards = shards
+        self.window_minutes = window_minutes
+        self.ifd_engine = ifd_engine
+        self.pressure_processor: Optional[ShardedMBOProcessor] = None
+        self._to_pressure_metrics = None
+        # Live only: windows of strikes that stop trading close on the exchange
+        # clock, extrapolated from the newest event (trade or not) this often
+        self.watermark_interval = 1.0
+        self._clock_ts_ns = 0
+        self._clock_at_ns = 0
+        self._next_watermark = 0.0
 
         # Market hours control
         self.market_hours_controller = MarketHoursController()
-        self.enforce_market_hours = True
+        self.enforce_market_hours = not replay
 
-        # Callbacks
+        # Callbacks (events are MBORecords, or dicts for backfill; both support .get())
         self.on_mbo_event: Optional[Callable[[Dict], None]] = None
+        self.on_mbo_batch: Optional[Callable[[List[MBORecord]], None]] = None
         self.on_connection_status: Optional[Callable[[bool], None]] = None
         self.on_error: Optional[Callable[[str], None]] = None
+        # Sharded only, called on the processor's collector thread in exchange-time order
+        self.on_pressure_metrics: Optional[Callable[[List[Any]], None]] = None
+        self.on_ifd_signal: Optional[Callable[[Any], None]] = None
 
         # Statistics
         self.stats = {
@@ -226,8 +283,11 @@ class EnhancedMBOStreamingClient:
             'events_processed': 0,
             'bytes_received': 0,
             'last_event_time': None,
-            'errors': 0
+            'errors': 0,
+            'pressure_windows': 0,
+            'ifd_signals': 0
         }
+        self._last_event_ns = 0
 
         logger.info(f"Enhanced MBO client initialized for symbols: {self.parent_symbols}")
 
@@ -237,6 +297,9 @@ class EnhancedMBOStreamingClient:
 
         # Start processing thread
         self.should_stop = False
+        self.event_queue.open()
+        if self.shards and self.pressure_processor is None:
+            self.pressure_processor = self._start_pressure_processor()
         self.processing_thread = threading.Thread(
             target=self._process_event_queue,
             daemon=True,
@@ -244,7 +307,9 @@ class EnhancedMBOStreamingClient:
         )
         self.processing_thread.start()
 
-        if self.enforce_market_hours:
+        if self.replay:
+            logger.info("Replay mode: waiting for recorded events")
+        elif self.enforce_market_hours:
             # Start market hours monitoring
             self.market_hours_controller.start_monitoring(
                 on_market_open=self._on_market_open,
@@ -272,20 +337,59 @@ class EnhancedMBOStreamingClient:
         # Stop streaming
         self._stop_streaming()
 
-        # Stop processing thread
+        # Stop processing thread (closing the buffer releases blocked producers)
         self.should_stop = True
+        self.event_queue.close()
         if self.processing_thread and self.processing_thread.is_alive():
             self.processing_thread.join(timeout=5)
 
-        # Clear queue
-        while not self.event_queue.empty():
+        # Close the remaining windows and stop the shard workers
+        if self.pressure_processor is not None:
             try:
-                self.event_queue.get_nowait()
-            except:
-                break
+                self.pressure_processor.flush_windows()
+            except (RuntimeError, TimeoutError) as e:
+                logger.error(f"Failed to flush pressure windows: {e}")
+            self.pressure_processor.close()
+            self.pressure_processor = None
+
+        # Unprocessed events stay buffered, spilled ones in the journal, and are replayed on the next start
+        spilled = self.event_queue.spill_pending
+        pending = self.event_queue.qsize() + spilled
+        if pending:
+            logger.warning(f"Keeping {pending} unprocessed events for the next start "
+                           f"({spilled} spilled to {self.event_queue.spill_path})")
 
         logger.info(f"Streaming stopped. Stats: {self.get_stats()}")
 
+    def _start_pressure_processor(self) -> ShardedMBOProcessor:
+        """Start the shard workers; their merged windows reach _handle_pressure_windows"""
+        if self.ifd_engine is not None and self._to_pressure_metrics is None:
+            # Imported here: the IFD input type needs the repository root on sys.path
+            try:
+                from .databento_api.solution import to_pressure_metrics
+            except ImportError:
+                from databento_api.solution import to_pressure_metrics
+            self._to_pressure_metrics = to_pressure_metrics
+
+        processor = ShardedMBOProcessor(self.shards, window_minutes=self.window_minutes)
+        processor.on_windows_closed = self._handle_pressure_windows
+        processor.start()
+        return processor
+
+    def _handle_pressure_windows(self, windows: List[Any]):
+        """Deliver closed StrikePressureMetrics windows and analyze them"""
+        self.stats['pressure_windows'] += len(windows)
+        if self.on_pressure_metrics:
+            self.on_pressure_metrics(windows)
+        if self.ifd_engine is None:
+            return
+        for window in windows:
+            signal = self.ifd_engine.analyze_pressure_event(self._to_pressure_metrics(window))
+            if signal is not None:
+                self.stats['ifd_signals'] += 1
+                if self.on_ifd_signal:
+                    self.on_ifd_signal(signal)
+
     def _start_streaming(self):
         """Start the WebSocket streaming connection"""
         if self.is_streaming:
@@ -351,58 +455,43 @@ class EnhancedMBOStreamingClient:
     def _handle_raw_event(self, event):
         """Handle raw event from WebSocket"""
         try:
+            record = MBORecord.from_databento(event)
             self.stats['events_received'] += 1
-            self.stats['last_event_time'] = datetime.now(timezone.utc)
-
-            # Estimate event size
-            event_size = len(str(event).encode('utf-8'))
-            self.stats['bytes_received'] += event_size
-
-            # Convert to dictionary format
-            event_dict = self._convert_event_to_dict(event)
+            self._last_event_ns = record.received_ns
+            self.stats['bytes_received'] += record.nbytes
 
             # Track timestamp for backfill manager
-            if self.backfill_manager and event_dict.get('ts_event'):
-                event_timestamp = datetime.fromtimestamp(
-                    event_dict['ts_event'] / 1e9, tz=timezone.utc
-                )
-                self.backfill_manager.track_event_timestamp(event_timestamp)
+            if self.backfill_manager and record.ts_event:
+                self.backfill_manager.track_event_ns(record.ts_event)
 
-            # Add to processing queue
-            if not self.event_queue.full():
-                self.event_queue.put(event_dict)
-            else:
-                logger.warning("Event queue full, dropping event")
+            # Add to processing queue (may block, spill or shed when full)
+            if not self.event_queue.put(record):
+                self._log_dropped()
 
         except Exception as e:
             logger.error(f"Error handling raw event: {e}")
             self.stats['errors'] += 1
 
+    def _event_priority(self, event) -> int:
+        """Shed priority of an event's instrument"""
+        priorities = self.instrument_priority
+        if not priorities:
+            return 0
+        priority = priorities.get(event.get('instrument_id'))
+        if priority is None:
+            priority = priorities.get(event.get('symbol'), 0)
+        return priority
+
+    def _log_dropped(self):
+        """Warn on the first dropped event and every 1000th after it"""
+        dropped = self.event_queue.dropped
+        if dropped % 1000 == 1:
+            logger.warning(f"Event queue overloaded ({self.event_queue.policy}), "
+                           f"{dropped} events dropped so far")
+
     def _convert_event_to_dict(self, event) -> Dict[str, Any]:
         """Convert Databento event to dictionary format"""
-        # Extract all available fields from the event
-        event_dict = {
-            'event_type': 'mbo',
-            'ts_event': getattr(event, 'ts_event', None),
-            'ts_recv': getattr(event, 'ts_recv', None),
-            'instrument_id': getattr(event, 'instrument_id', None),
-            'symbol': getattr(event, 'symbol', None),
-            'action': getattr(event, 'action', None),
-            'side': getattr(event, 'side', None),
-            'price': getattr(event, 'price', None),
-            'size': getattr(event, 'size', None),
-            'order_id': getattr(event, 'order_id', None),
-            'flags': getattr(event, 'flags', None),
-            'sequence': getattr(event, 'sequence', None),
-            'order_priority': getattr(event, 'order_priority', None),
-            'ts_in_delta': getattr(event, 'ts_in_delta', None)
-        }
-
-        # Add metadata
-        event_dict['_received_at'] = datetime.now(timezone.utc).isoformat()
-        event_dict['_source'] = 'databento_websocket'
-
-        return event_dict
+        return MBORecord.from_databento(event).to_dict()
 
     def _process_event_queue(self):
         """Process events from queue in separate thread"""
@@ -410,28 +499,58 @@ class EnhancedMBOStreamingClient:
 
         while not self.should_stop:
             try:
-                # Get event with timeout
-                event_dict = self.event_queue.get(timeout=1.0)
-
-                self.stats['events_processed'] += 1
-
-                # Trigger callback
-                if self.on_mbo_event:
-                    self.on_mbo_event(event_dict)
+                # Wait for the first event, then take whatever else is ready
+                batch = self.event_queue.drain(self.batch_size, timeout=self.watermark_interval)
+                if not batch:
+                    if self.pressure_processor is not None and not self.replay:
+                        self._tick_watermark(batch)
+                    continue
+
+                processed_before = self.stats['events_processed']
+                self.stats['events_processed'] += len(batch)
+
+                # Blocks while the shards are max_in_flight rounds behind, so
+                # a slow shard backs events up into the buffer's overload policy
+                if self.pressure_processor is not None:
+                    self.pressure_processor.submit(batch)
+                    if not self.replay:
+                        self._tick_watermark(batch)
+
+                # Trigger callbacks
+                if self.on_mbo_batch:
+                    self.on_mbo_batch(batch)
+                elif self.on_mbo_event:
+                    for event in batch:
+                        self.on_mbo_event(event)
 
                 # Log progress periodically
-                if self.stats['events_processed'] % 1000 == 0:
+                if self.stats['events_processed'] // 1000 > processed_before // 1000:
                     logger.info(f"Processed {self.stats['events_processed']} events, "
                               f"Queue size: {self.event_queue.qsize()}")
 
-            except queue.Empty:
-                continue
             except Exception as e:
                 logger.error(f"Event processing error: {e}")
                 self.stats['errors'] += 1
 
         logger.info("Event processing thread stopped")
 
+    def _tick_watermark(self, batch: List[Any]):
+        """Advance the shards' watermark to the current exchange time, at most once per interval"""
+        now_ns = time.monotonic_ns()
+        for event in reversed(batch):
+            ts_event = event.get('ts_event')
+            if ts_event:
+                if ts_event > self._clock_ts_ns:
+                    # Book updates and heartbeats move the clock, not just trades
+                    self._clock_ts_ns, self._clock_at_ns = ts_event, now_ns
+                break
+
+        if not self._clock_ts_ns or time.monotonic() < self._next_watermark:
+            return
+        self._next_watermark = time.monotonic() + self.watermark_interval
+        # Queued events lag this by far less than the window grace, so they are not counted late
+        self.pressure_processor.advance_watermark(self._clock_ts_ns + (now_ns - self._clock_at_ns))
+
     def _on_connect(self):
         """Handle successful connection"""
         logger.info("WebSocket connected successfully")
@@ -501,17 +620,24 @@ class EnhancedMBOStreamingClient:
         """Handle backfill event - add to processing queue"""
         try:
             # Add backfill event to processing queue
-            if not self.event_queue.full():
-                self.event_queue.put(event_dict)
+            if self.event_queue.put(event_dict):
                 logger.debug(f"Added backfill event to queue: {event_dict.get('symbol')}")
             else:
-                logger.warning("Event queue full during backfill, dropping event")
+                self._log_dropped()
         except Exception as e:
             logger.error(f"Error handling backfill event: {e}")
 
+    def _handle_backfill_batch(self, events: List[Dict[str, Any]]):
+        """Handle a batch of backfill events under the buffer's overload policy"""
+        dropped = len(events) - self.event_queue.put_many(events)
+        if dropped:
+            logger.warning(f"Event queue overloaded during backfill, dropped {dropped}/{len(events)} events")
+
     def get_stats(self) -> Dict[str, Any]:
         """Get current statistics"""
         stats = self.stats.copy()
+        if self._last_event_ns:
+            stats['last_event_time'] = ns_to_datetime(self._last_event_ns)
 
         # Calculate uptime
         if stats['connection_start'] and self.is_connected:
@@ -529,6 +655,7 @@ class EnhancedMBOStreamingClient:
             stats['mbps'] = 0
 
         stats['queue_size'] = self.event_queue.qsize()
+        stats.update(self.event_queue.get_stats())
         stats['is_connected'] = self.is_connected
         stats['is_streaming'] = self.is_streaming
         stats['market_open'] = self.market_hours_controller.is_market_open()
@@ -549,7 +676,9 @@ class EnhancedMBOStreamingClient:
 
 def create_enhanced_mbo_client(api_key: str, symbols: List[str] = None,
                               enable_backfill: bool = True,
-                              max_backfill_cost: float = 20.0) -> EnhancedMBOStreamingClient:
+                              max_backfill_cost: float = 20.0,
+                              overload_policy: str = BLOCK, shards: int = 0,
+                              ifd_engine=None) -> EnhancedMBOStreamingClient:
     """
     Factory function to create enhanced MBO streaming client
 
@@ -558,11 +687,16 @@ def create_enhanced_mbo_client(api_key: str, symbols: List[str] = None,
         symbols: List of base symbols (e.g., ['NQ', 'ES'])
         enable_backfill: Enable automatic backfill on reconnection
         max_backfill_cost: Maximum daily backfill cost
+        overload_policy: 'block', 'spill' or 'shed' when the event queue is full
+        shards: Worker processes for pressure aggregation (0 = none)
+        ifd_engine: IFD engine given every closed pressure window when sharded
 
     Returns:
         Configured EnhancedMBOStreamingClient instance
     """
-    return EnhancedMBOStreamingClient(api_key, symbols, enable_backfill, max_backfill_cost)
+    return EnhancedMBOStreamingClient(api_key, symbols, enable_backfill, max_backfill_cost,
+                                      overload_policy=overload_policy, shards=shards,
+                                      ifd_engine=ifd_engine)
 
 
 if __name__ == "__main__":
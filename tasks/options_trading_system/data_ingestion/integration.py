@@ -7,6 +7,7 @@ PURPOSE: Integrate all data source children into unified data pipeline
 
 import sys
 import os
+import time
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 from utils.timezone_utils import get_eastern_time
@@ -17,6 +18,10 @@ sys.path.insert(0, current_dir)
 
 # Import data normalizer (still needed for pipeline)
 from data_normalizer.solution import normalize_loaded_data
+from market_snapshot import MarketSnapshot, SingleFlight, config_key
+
+# Concurrent ingestion calls with the same config share one in-flight load
+_ingestion_flight = SingleFlight()
 
 
 class DataIngestionPipeline:
@@ -387,11 +392,45 @@ def run_data_ingestion(config: Dict[str, Any]) -> Dict[str, Any]:
     """
     Run the complete data ingestion pipeline
 
+    Concurrent calls with an identical config share one in-flight run.
+
     Args:
         config: Configuration for data sources
 
     Returns:
         Dict with pipeline results
     """
-    pipeline = create_data_ingestion_pipeline(config)
-    return pipeline.run_full_pipeline()
+    def _run():
+        pipeline = create_data_ingestion_pipeline(config)
+        return pipeline.run_full_pipeline()
+
+    return _ingestion_flight.do(config_key(config), _run)
+
+
+def load_market_snapshot(config: Dict[str, Any]) -> MarketSnapshot:
+    """
+    Load data once into an immutable snapshot shared by every analysis
+
+    Args:
+        config: Configuration for data sources
+
+    Returns:
+        MarketSnapshot wrapping the pipeline result
+    """
+    start = time.perf_counter()
+    pipeline_result = run_data_ingestion(config)
+
+    if pipeline_result["pipeline_status"] != "success":
+        raise ValueError("Data ingestion pipeline failed")
+
+    return MarketSnapshot.from_pipeline_result(
+        pipeline_result,
+        key=config_key(config),
+        loaded_at=get_eastern_time(),
+        load_seconds=time.perf_counter() - start
+    )
+
+
+def get_ingestion_stats() -> Dict[str, int]:
+    """Single-flight counters: loads executed vs. callers that shared one"""
+    return dict(_ingestion_flight.stats)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Market Snapshot
+Immutable, content-hashed result of one data ingestion run, shared by every
+analysis in a cycle, plus a single-flight guard so concurrent callers asking
+for the same data config share one in-flight load.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import MappingProxyType
+from typing import Dict, Any, List, Callable, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_UNDERLYING_PRICE = 21376.75
+
+
+def config_key(config: Dict[str, Any]) -> str:
+    """Stable key for a data config (order-independent)"""
+    payload = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def content_hash(normalized_data: Dict[str, Any]) -> str:
+    """Hash of the normalized contracts, identifying the market state"""
+    payload = json.dumps(normalized_data.get("contracts", []), sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+@dataclass(frozen=True)
+class MarketSnapshot:
+    """
+    Read-only view of one ingestion run
+
+    The underlying pipeline result is shared between analyzers and must be
+    treated as read-only; ``pipeline_result`` is exposed as a mapping proxy.
+    """
+    config_key: str
+    content_hash: str
+    loaded_at: datetime
+    load_seconds: float
+    _pipeline_result: Dict[str, Any] = field(repr=False)
+
+    @property
+    def pipeline_result(self) -> Mapping[str, Any]:
+        """Pipeline result in the same shape as run_data_ingestion()"""
+        return MappingProxyType(self._pipeline_result)
+
+    @property
+    def normalized_data(self) -> Dict[str, Any]:
+        return self._pipeline_result["normalized_data"]
+
+    @property
+    def contracts(self) -> List[Dict[str, Any]]:
+        return self._pipeline_result["normalized_data"]["contracts"]
+
+    @property
+    def quality_metrics(self) -> Dict[str, Any]:
+        return self._pipeline_result["quality_metrics"]
+
+    @property
+    def mbo_pressure_metrics(self) -> List[Any]:
+        return self._pipeline_result.get("mbo_pressure_metrics", [])
+
+    @property
+    def underlying_price(self) -> float:
+        """Underlying price from contract metadata, else the average strike"""
+        for contract in self.contracts:
+            if contract.get("underlying_price"):
+                return float(contract["underlying_price"])
+
+        strikes = [c["strike"] for c in self.contracts if c.get("strike") and c["strike"] > 0]
+        if strikes:
+            return sum(strikes) / len(strikes)
+
+        return DEFAULT_UNDERLYING_PRICE
+
+    @classmethod
+    def from_pipeline_result(cls, pipeline_result: Dict[str, Any], key: str,
+                             loaded_at: datetime, load_seconds: float = 0.0) -> 'MarketSnapshot':
+        return cls(
+            config_key=key,
+            content_hash=content_hash(pipeline_result.get("normalized_data", {})),
+            loaded_at=loaded_at,
+            load_seconds=load_seconds,
+            _pipeline_result=pipeline_result
+        )
+
+
+class _Call:
+    """One in-flight load shared by all waiters"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Deduplicate concurrent calls by key
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight block and receive the same result (or exception). Completed
+    results are not cached.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.stats = {"executions": 0, "shared": 0}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.stats["shared"] += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.stats["executions"] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        if call.waiters:
+            logger.debug(f"Single-flight load {key} shared with {call.waiters} concurrent callers")
+        return call.result
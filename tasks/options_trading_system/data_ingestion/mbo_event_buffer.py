@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Bounded MBO Event Buffer with Overload Policies
+
+Hand-off between the WebSocket reader and the event processing thread:
+- Bounded FIFO with drain-many semantics (one lock round-trip per batch)
+- Explicit overload policy when the buffer is full:
+  - block: the producer waits for space (backpressure onto the socket)
+  - spill: events go to an on-disk journal and are replayed, in order,
+    once the consumer catches up
+  - shed: the newest event of the lowest-priority instrument is dropped
+- Counters for blocked puts, spilled, replayed and dropped events
+"""
+
+import os
+import queue
+import pickle
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BLOCK = 'block'
+SPILL = 'spill'
+SHED = 'shed'
+OVERLOAD_POLICIES = (BLOCK, SPILL, SHED)
+
+
+class SpillJournal:
+    """
+    Append-only on-disk FIFO of events
+
+    Events are pickled in chunks; the newest partial chunk stays in memory
+    until it fills, and reads take file chunks first so order is kept.
+    The file is truncated whenever the journal runs empty.
+    """
+
+    def __init__(self, path: str, chunk_size: int = 1000):
+        self.path = path
+        self.chunk_size = max(1, chunk_size)
+        self._tail: List[Any] = []
+        self._file_chunks = 0
+        self._file_events = 0
+        self._read_offset = 0
+        self._writer = None
+        self._reader = None
+
+    def __len__(self) -> int:
+        return self._file_events + len(self._tail)
+
+    def append(self, event: Any):
+        self._tail.append(event)
+        if len(self._tail) >= self.chunk_size:
+            self._write_tail()
+
+    def _write_tail(self):
+        if self._writer is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._writer = open(self.path, 'ab')
+        pickle.dump(self._tail, self._writer, pickle.HIGHEST_PROTOCOL)
+        self._writer.flush()
+        self._file_chunks += 1
+        self._file_events += len(self._tail)
+        self._tail = []
+
+    def read_chunk(self) -> List[Any]:
+        """Oldest chunk of at most chunk_size events (empty when the journal is empty)"""
+        if self._file_chunks:
+            if self._reader is None:
+                self._reader = open(self.path, 'rb')
+            self._reader.seek(self._read_offset)
+            chunk = pickle.load(self._reader)
+            self._read_offset = self._reader.tell()
+            self._file_chunks -= 1
+            self._file_events -= len(chunk)
+            if not self._file_chunks:
+                self._truncate()
+            return chunk
+
+        chunk, self._tail = self._tail, []
+        return chunk
+
+    def _truncate(self):
+        self._close_files()
+        if os.path.exists(self.path):
+            open(self.path, 'wb').close()
+        self._read_offset = 0
+
+    def _close_files(self):
+        for handle in (self._writer, self._reader):
+            if handle is not None:
+                handle.close()
+        self._writer = self._reader = None
+
+    def close(self):
+        """Discard pending events and remove the file"""
+        self._close_files()
+        self._tail = []
+        self._file_chunks = self._file_events = self._read_offset = 0
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class MBOEventBuffer:
+    """
+    Bounded event buffer between one or more producers and a batch consumer
+
+    Args:
+        maxsize: Events held in memory
+        policy: 'block', 'spill' or 'shed' (see module docstring)
+        spill_path: Journal file for the spill policy
+        priority: Event -> int for the shed policy (higher is kept longer)
+        block_timeout: Seconds a blocked put waits before dropping the
+            event; None waits until space frees up or the buffer closes
+        spill_chunk: Events per journal chunk
+    """
+
+    def __init__(self, maxsize: int = 50000, policy: str = BLOCK,
+                 spill_path: Optional[str] = None,
+                 priority: Optional[Callable[[Any], int]] = None,
+                 block_timeout: Optional[float] = None, spill_chunk: int = 1000):
+        if policy not in OVERLOAD_POLICIES:
+            raise ValueError(f"Unknown overload policy '{policy}' (expected one of {OVERLOAD_POLICIES})")
+        if policy == SPILL and not spill_path:
+            raise ValueError("spill policy requires spill_path")
+
+        self.maxsize = maxsize
+        self.policy = policy
+        self.spill_path = spill_path
+        self.priority = priority or (lambda event: 0)
+        self.block_timeout = block_timeout
+        # Journal chunks are refilled whole, so they must fit in the buffer
+        self.spill_chunk = max(1, min(spill_chunk, maxsize // 2))
+
+        self._items: Deque[Any] = deque()
+        self._size = 0  # Live events (shed leaves tombstones in _items)
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._journal: Optional[SpillJournal] = None
+        self.closed = False
+
+        # Shed policy: slots are [event, priority]; each level keeps its
+        # live slots oldest-first, so eviction pops right and drain pops left
+        self._levels: Dict[int, Deque[List[Any]]] = {}
+        self._tombstones = 0
+
+        self.blocked_puts = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.unspilled = 0
+
+    # Producer side
+
+    def put(self, event: Any) -> bool:
+        """Queue (or spill) an event; False when it was dropped"""
+        with self._lock:
+            if self.closed:
+                self.dropped += 1
+                return False
+
+            journal = self._journal
+            if journal is not None and len(journal):
+                # Keep order: nothing overtakes events already on disk
+                journal.append(event)
+                self.spilled += 1
+                return True
+
+            if self._size < self.maxsize:
+                self._append(event)
+                return True
+
+            if self.policy == BLOCK:
+                return self._put_blocking(event)
+            if self.policy == SPILL:
+                self._spill(event)
+                return True
+            return self._shed(event)
+
+    def put_many(self, events: Iterable[Any]) -> int:
+        """Queue events in order; returns how many were accepted"""
+        put = self.put
+        return sum(1 for event in events if put(event))
+
+    def _append(self, event: Any, level: Optional[int] = None):
+        if self.policy == SHED:
+            if level is None:
+                level = self.priority(event)
+            slot = [event, level]
+            self._items.append(slot)
+            self._levels.setdefault(level, deque()).append(slot)
+        else:
+            self._items.append(event)
+        self._size += 1
+        self._not_empty.notify()
+
+    def _put_blocking(self, event: Any) -> bool:
+        self.blocked_puts += 1
+        if not self._not_full.wait_for(lambda: self.closed or self._size < self.maxsize,
+                                       self.block_timeout) or self.closed:
+            self.dropped += 1
+            return False
+        self._append(event)
+        return True
+
+    def _spill(self, event: Any):
+        if self._journal is None:
+            self._journal = SpillJournal(self.spill_path, self.spill_chunk)
+            logger.warning(f"Event buffer full, spilling to {self.spill_path}")
+        self._journal.append(event)
+        self.spilled += 1
+
+    def _shed(self, event: Any) -> bool:
+        level = self.priority(event)
+        lowest = min(lvl for lvl, slots in self._levels.items() if slots)
+        self.dropped += 1
+        if level <= lowest:
+            return False
+
+        victim = self._levels[lowest].pop()
+        victim[0] = None
+        self._tombstones += 1
+        self._size -= 1
+        if self._tombstones > self.maxsize:
+            self._items = deque(slot for slot in self._items if slot[0] is not None)
+            self._tombstones = 0
+        self._append(event, level)
+        return True
+
+    # Consumer side
+
+    def drain(self, max_items: int, timeout: Optional[float] = None) -> List[Any]:
+        """
+        Remove up to max_items events, oldest first
+
+        Waits up to timeout seconds for the first event; returns an empty
+        list on timeout or when the buffer is closed and empty.
+        """
+        with self._lock:
+            if not self._size:
+                self._refill()
+                if not self._size and not self._not_empty.wait_for(
+                        lambda: self._size or self.closed, timeout):
+                    return []
+
+            batch = self._pop(max_items)
+            self._refill()
+            self._not_full.notify_all()
+            return batch
+
+    def _pop(self, max_items: int) -> List[Any]:
+        items = self._items
+        if self.policy != SHED:
+            count = min(max_items, self._size)
+            popleft = items.popleft
+            batch = [popleft() for _ in range(count)]
+            self._size -= count
+            return batch
+
+        batch = []
+        levels = self._levels
+        while items and len(batch) < max_items:
+            event, level = items.popleft()
+            if event is None:
+                self._tombstones -= 1
+                continue
+            levels[level].popleft()
+            batch.append(event)
+        self._size -= len(batch)
+        return batch
+
+    def _refill(self):
+        """Move journal chunks back into memory while they fit"""
+        journal = self._journal
+        while journal is not None and len(journal) and self._size + self.spill_chunk <= self.maxsize:
+            for event in journal.read_chunk():
+                self._append(event)
+                self.unspilled += 1
+
+    def get_nowait(self) -> Any:
+        """Single-event get with queue.Queue semantics"""
+        batch = self.drain(1, timeout=0)
+        if not batch:
+            raise queue.Empty
+        return batch[0]
+
+    # State
+
+    def qsize(self) -> int:
+        return self._size
+
+    def empty(self) -> bool:
+        return not self._size
+
+    def full(self) -> bool:
+        return self._size >= self.maxsize
+
+    @property
+    def spill_pending(self) -> int:
+        return len(self._journal) if self._journal is not None else 0
+
+    def open(self):
+        with self._lock:
+            self.closed = False
+
+    def close(self):
+        """Wake blocked producers and the consumer; later puts are dropped"""
+        with self._lock:
+            self.closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+
+    def clear(self) -> int:
+        """Discard queued and journaled events; returns how many were discarded"""
+        with self._lock:
+            discarded = self._size + self.spill_pending
+            self._items.clear()
+            self._levels.clear()
+            self._size = self._tombstones = 0
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            self._not_full.notify_all()
+            return discarded
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'overload_policy': self.policy,
+            'events_dropped': self.dropped,
+            'events_spilled': self.spilled,
+            'events_unspilled': self.unspilled,
+            'spill_pending': self.spill_pending,
+            'blocked_puts': self.blocked_puts
+        }
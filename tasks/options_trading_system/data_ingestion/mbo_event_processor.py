@@ -11,50 +11,103 @@ This module processes raw MBO events from the WebSocket stream and:
 
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Callable
 from dataclasses import dataclass, asdict
 from collections import defaultdict, deque
+import heapq
 import threading
+import time
 import json
 
+try:
+    from .mbo_records import MBOBatch, ns_to_datetime
+    from .mbo_order_book import OrderBookTracker
+except ImportError:
+    from mbo_records import MBOBatch, ns_to_datetime
+    from mbo_order_book import OrderBookTracker
+
+NANOS_PER_MINUTE = 60 * 1_000_000_000
+NANOS_PER_HOUR = 60 * NANOS_PER_MINUTE
+
+# Trades may arrive this long after their window ends before it is closed
+WINDOW_GRACE_SECONDS = 30
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-@dataclass
 class ProcessedMBOEvent:
-    """Processed MBO event with derived fields"""
-    # Timing
-    timestamp: datetime
-    exchange_timestamp: datetime
-
-    # Contract identification
-    symbol: str
-    instrument_id: int
-    contract_type: str  # 'C' or 'P'
-    strike_price: float
-    expiration_date: str
-
-    # Event details
-    action: str  # 'A'dd, 'M'odify, 'C'ancel, 'T'rade
-    side: str    # 'B'id, 'A'sk, 'T'rade
-    price: float
-    size: int
-
-    # Derived fields
-    trade_direction: Optional[str] = None  # 'BUY' or 'SELL'
-    aggressor_side: Optional[str] = None
-    price_level: Optional[str] = None  # 'BID', 'MID', 'ASK'
+    """
+    Processed MBO event with derived fields
 
-    # Market context
-    bid_price: Optional[float] = None
-    ask_price: Optional[float] = None
-    spread: Optional[float] = None
+    Timestamps are kept as integer nanoseconds; ``timestamp`` and
+    ``exchange_timestamp`` only build datetimes when read.
+    """
 
-    # Sequence tracking
-    sequence_number: int = 0
-    order_id: Optional[int] = None
+    __slots__ = ('ts_processed_ns', 'ts_event_ns', 'symbol', 'instrument_id', 'contract_type',
+                 'strike_price', 'expiration_date', 'action', 'side', 'price', 'size',
+                 'trade_direction', 'aggressor_side', 'price_level', 'bid_price', 'ask_price',
+                 'spread', 'sequence_number', 'order_id')
+
+    def __init__(self, ts_processed_ns: int, ts_event_ns: int, symbol: str, instrument_id: int,
+                 contract_type: str, strike_price: float, expiration_date: str,
+                 action: str, side: str, price: float, size: int,
+                 trade_direction: Optional[str] = None, aggressor_side: Optional[str] = None,
+                 price_level: Optional[str] = None, bid_price: Optional[float] = None,
+                 ask_price: Optional[float] = None, spread: Optional[float] = None,
+                 sequence_number: int = 0, order_id: Optional[int] = None):
+        # Timing
+        self.ts_processed_ns = ts_processed_ns
+        self.ts_event_ns = ts_event_ns
+
+        # Contract identification
+        self.symbol = symbol
+        self.instrument_id = instrument_id
+        self.contract_type = contract_type  # 'C' or 'P'
+        self.strike_price = strike_price
+        self.expiration_date = expiration_date
+
+        # Event details
+        self.action = action  # 'A'dd, 'M'odify, 'C'ancel, 'T'rade
+        self.side = side      # 'B'id, 'A'sk, 'T'rade
+        self.price = price
+        self.size = size
+
+        # Derived fields
+        self.trade_direction = trade_direction  # 'BUY' or 'SELL'
+        self.aggressor_side = aggressor_side
+        self.price_level = price_level  # 'BID', 'MID', 'ASK'
+
+        # Market context
+        self.bid_price = bid_price
+        self.ask_price = ask_price
+        self.spread = spread
+
+        # Sequence tracking
+        self.sequence_number = sequence_number
+        self.order_id = order_id
+
+    @property
+    def timestamp(self) -> datetime:
+        """Processing time"""
+        return ns_to_datetime(self.ts_processed_ns)
+
+    @property
+    def exchange_timestamp(self) -> datetime:
+        """Exchange event time"""
+        return ns_to_datetime(self.ts_event_ns)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Dictionary form with datetime timestamps"""
+        result = {name: getattr(self, name) for name in self.__slots__[2:]}
+        result['timestamp'] = self.timestamp
+        result['exchange_timestamp'] = self.exchange_timestamp
+        return result
+
+    def __repr__(self) -> str:
+        return (f"ProcessedMBOEvent({self.symbol!r}, action={self.action!r}, side={self.side!r}, "
+                f"price={self.price}, size={self.size}, trade_direction={self.trade_direction!r})")
 
 
 @dataclass
@@ -92,6 +145,84 @@ class StrikePressureMetrics:
     total_spread_samples: int = 0
 
 
+class PressureWindow:
+    """Running counters for one (strike, type, window) aggregation"""
+
+    __slots__ = ('buy_volume', 'sell_volume', 'neutral_volume', 'buy_trades', 'sell_trades',
+                 'large_buy_trades', 'large_sell_trades', 'spread_sum', 'spread_samples')
+
+    def __init__(self):
+        self.buy_volume = 0
+        self.sell_volume = 0
+        self.neutral_volume = 0
+        self.buy_trades = 0
+        self.sell_trades = 0
+        self.large_buy_trades = 0
+        self.large_sell_trades = 0
+        self.spread_sum = 0.0
+        self.spread_samples = 0
+
+    def merge(self, other: 'PressureWindow'):
+        """Add another partial window's counters (same strike, type and window)"""
+        self.buy_volume += other.buy_volume
+        self.sell_volume += other.sell_volume
+        self.neutral_volume += other.neutral_volume
+        self.buy_trades += other.buy_trades
+        self.sell_trades += other.sell_trades
+        self.large_buy_trades += other.large_buy_trades
+        self.large_sell_trades += other.large_sell_trades
+        self.spread_sum += other.spread_sum
+        self.spread_samples += other.spread_samples
+
+
+def build_pressure_metrics(window_key: Tuple[float, str, int], window: PressureWindow,
+                           window_minutes: int) -> StrikePressureMetrics:
+    """Metrics for a closed (strike, type, window_start_ns) window"""
+    strike_price, contract_type, window_start_ns = window_key
+    window_start = ns_to_datetime(window_start_ns)
+
+    metrics = StrikePressureMetrics(
+        strike_price=strike_price,
+        contract_type=contract_type,
+        time_window_start=window_start,
+        time_window_end=window_start + timedelta(minutes=window_minutes),
+        buy_volume=window.buy_volume,
+        sell_volume=window.sell_volume,
+        neutral_volume=window.neutral_volume,
+        buy_trades=window.buy_trades,
+        sell_trades=window.sell_trades,
+        large_buy_trades=window.large_buy_trades,
+        large_sell_trades=window.large_sell_trades
+    )
+
+    # Calculate derived metrics
+    metrics.total_volume = metrics.buy_volume + metrics.sell_volume + metrics.neutral_volume
+    metrics.total_trades = metrics.buy_trades + metrics.sell_trades
+    metrics.net_pressure = metrics.buy_volume - metrics.sell_volume
+
+    # Buy pressure ratio
+    if metrics.total_volume > 0:
+        metrics.buy_pressure_ratio = metrics.buy_volume / (metrics.buy_volume + metrics.sell_volume) \
+                                   if (metrics.buy_volume + metrics.sell_volume) > 0 else 0.5
+
+    # Normalized pressure score (-1 to 1)
+    if metrics.total_volume > 0:
+        metrics.pressure_score = metrics.net_pressure / metrics.total_volume
+
+    # Average trade sizes
+    if metrics.buy_trades > 0:
+        metrics.avg_buy_size = metrics.buy_volume / metrics.buy_trades
+    if metrics.sell_trades > 0:
+        metrics.avg_sell_size = metrics.sell_volume / metrics.sell_trades
+
+    # Average spread
+    if window.spread_samples:
+        metrics.avg_spread = window.spread_sum / window.spread_samples
+        metrics.total_spread_samples = window.spread_samples
+
+    return metrics
+
+
 class ContractMapper:
     """Maps instrument IDs to NQ options contracts"""
 
@@ -132,6 +263,7 @@ class ContractMapper:
                         'strike': float(strike_str),
                         'month_code': month_code,
                         'year_digit': year_digit,
+                        'expiration': f"{month_code}{year_digit}",
                         'symbol': symbol
                     }
 
@@ -165,45 +297,6 @@ class ContractMapper:
         return info
 
 
-class BidAskTracker:
-    """Tracks current bid/ask prices for each instrument"""
-
-    def __init__(self):
-        self.bid_prices = {}  # instrument_id -> price
-        self.ask_prices = {}  # instrument_id -> price
-        self.bid_sizes = {}   # instrument_id -> size
-        self.ask_sizes = {}   # instrument_id -> size
-        self._lock = threading.Lock()
-
-    def update_bid(self, instrument_id: int, price: float, size: int):
-        """Update bid price and size"""
-        with self._lock:
-            if price > 0:
-                self.bid_prices[instrument_id] = price
-                self.bid_sizes[instrument_id] = size
-
-    def update_ask(self, instrument_id: int, price: float, size: int):
-        """Update ask price and size"""
-        with self._lock:
-            if price > 0:
-                self.ask_prices[instrument_id] = price
-                self.ask_sizes[instrument_id] = size
-
-    def get_bid_ask(self, instrument_id: int) -> Tuple[Optional[float], Optional[float]]:
-        """Get current bid/ask prices"""
-        with self._lock:
-            bid = self.bid_prices.get(instrument_id)
-            ask = self.ask_prices.get(instrument_id)
-            return bid, ask
-
-    def get_spread(self, instrument_id: int) -> Optional[float]:
-        """Get current bid/ask spread"""
-        bid, ask = self.get_bid_ask(instrument_id)
-        if bid and ask and ask > bid:
-            return ask - bid
-        return None
-
-
 class MBOEventStreamProcessor:
     """
     Main processor for MBO event streams
@@ -223,12 +316,23 @@ class MBOEventStreamProcessor:
         """
         self.window_minutes = window_minutes
         self.contract_mapper = ContractMapper()
-        self.bid_ask_tracker = BidAskTracker()
+        self.order_books = OrderBookTracker()
 
         # Pressure aggregation
-        self.active_windows = defaultdict(lambda: defaultdict(list))
+        self.window_ns = window_minutes * NANOS_PER_MINUTE
+        self.grace_ns = WINDOW_GRACE_SECONDS * 1_000_000_000
+        self.active_windows: Dict[Tuple[float, str, int], PressureWindow] = {}
         self.completed_metrics = deque(maxlen=1000)
 
+        # Event-time window scheduling: min-heap of (window_end_ns, window_key)
+        # drained as the exchange-time watermark passes window end + grace
+        self._window_heap: List[Tuple[int, Tuple[float, str, int]]] = []
+        self.watermark_ns = 0
+        self.late_trades = 0
+
+        # Receives every window closed at a boundary as one batch
+        self.on_windows_closed: Optional[Callable[[List[StrikePressureMetrics]], None]] = None
+
         # Stats
         self.events_processed = 0
         self.trades_processed = 0
@@ -243,94 +347,110 @@ class MBOEventStreamProcessor:
         Process raw MBO event and derive trade direction
 
         Args:
-            raw_event: Raw event from WebSocket stream
+            raw_event: Raw event from WebSocket stream (dict or MBORecord)
 
         Returns:
             ProcessedMBOEvent with derived fields or None
         """
         try:
-            # Skip if no symbol or instrument ID
-            symbol = raw_event.get('symbol')
-            instrument_id = raw_event.get('instrument_id')
-
-            if not symbol or not instrument_id:
-                return None
-
-            # Get contract info
-            contract_info = self.contract_mapper.get_contract_info(instrument_id, symbol)
-            if not contract_info:
-                return None
-
-            # Parse timestamps
-            ts_event = raw_event.get('ts_event', 0)
-            if ts_event:
-                exchange_timestamp = datetime.fromtimestamp(ts_event / 1_000_000_000, tz=timezone.utc)
-            else:
-                exchange_timestamp = datetime.now(timezone.utc)
-
-            # Create base event
-            event = ProcessedMBOEvent(
-                timestamp=datetime.now(timezone.utc),
-                exchange_timestamp=exchange_timestamp,
-                symbol=symbol,
-                instrument_id=instrument_id,
-                contract_type=contract_info['contract_type'],
-                strike_price=contract_info['strike'],
-                expiration_date=f"{contract_info['month_code']}{contract_info['year_digit']}",
-                action=raw_event.get('action', ''),
-                side=raw_event.get('side', ''),
-                price=float(raw_event.get('price', 0)) if raw_event.get('price') else 0,
-                size=int(raw_event.get('size', 0)) if raw_event.get('size') else 0,
-                sequence_number=raw_event.get('sequence', 0),
-                order_id=raw_event.get('order_id')
+            get = raw_event.get
+            return self._process_fields(
+                get('symbol'), get('instrument_id'), get('ts_event', 0), get('action', ''),
+                get('side', ''), get('price'), get('size'), get('sequence', 0), get('order_id'),
+                time.time_ns()
             )
-
-            # Update bid/ask tracking
-            if event.action in ['A', 'M']:  # Add or Modify
-                if event.side == 'B':
-                    self.bid_ask_tracker.update_bid(instrument_id, event.price, event.size)
-                elif event.side == 'A':
-                    self.bid_ask_tracker.update_ask(instrument_id, event.price, event.size)
-
-            # Get current bid/ask
-            bid, ask = self.bid_ask_tracker.get_bid_ask(instrument_id)
-            event.bid_price = bid
-            event.ask_price = ask
-            event.spread = self.bid_ask_tracker.get_spread(instrument_id)
-
-            # Process trades to derive direction
-            if event.action == 'T':  # Trade
-                self.trades_processed += 1
-                event.trade_direction = self._derive_trade_direction(
-                    event.price, bid, ask
-                )
-
-                # Determine price level
-                if bid and ask:
-                    mid = (bid + ask) / 2
-                    if abs(event.price - bid) < 0.01:
-                        event.price_level = 'BID'
-                        event.aggressor_side = 'SELL'
-                    elif abs(event.price - ask) < 0.01:
-                        event.price_level = 'ASK'
-                        event.aggressor_side = 'BUY'
-                    elif abs(event.price - mid) < 0.01:
-                        event.price_level = 'MID'
-                    else:
-                        # Price outside bid/ask
-                        if event.price < bid:
-                            event.price_level = 'BELOW_BID'
-                        elif event.price > ask:
-                            event.price_level = 'ABOVE_ASK'
-
-            self.events_processed += 1
-            return event
-
         except Exception as e:
             self.errors += 1
             logger.error(f"Error processing MBO event: {e}")
             return None
 
+    def process_events(self, raw_events) -> List[ProcessedMBOEvent]:
+        """
+        Process a batch of raw MBO events
+
+        Args:
+            raw_events: MBOBatch, or an iterable of event dicts / MBORecords
+
+        Returns:
+            ProcessedMBOEvents for the events that mapped to a contract
+        """
+        now_ns = time.time_ns()
+        process = self._process_fields
+        processed = []
+
+        if isinstance(raw_events, MBOBatch):
+            rows = raw_events.rows()
+        else:
+            rows = ((e.get('symbol'), e.get('instrument_id'), e.get('ts_event', 0), e.get('action', ''),
+                     e.get('side', ''), e.get('price'), e.get('size'), e.get('sequence', 0), e.get('order_id'))
+                    for e in raw_events)
+
+        for symbol, instrument_id, ts_event, action, side, price, size, sequence, order_id in rows:
+            try:
+                event = process(symbol, instrument_id, ts_event, action, side, price, size,
+                                sequence, order_id, now_ns)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Error processing MBO event: {e}")
+                continue
+            if event is not None:
+                processed.append(event)
+
+        return processed
+
+    def _process_fields(self, symbol, instrument_id, ts_event, action, side, price, size,
+                        sequence, order_id, now_ns: int) -> Optional[ProcessedMBOEvent]:
+        """Core per-event logic shared by process_event and process_events"""
+        # Skip if no symbol or instrument ID
+        if not symbol or not instrument_id:
+            return None
+
+        # Get contract info
+        contract_info = self.contract_mapper.get_contract_info(instrument_id, symbol)
+        if not contract_info:
+            return None
+
+        price = float(price) if price else 0
+        size = int(size) if size else 0
+
+        # Update the order book; trades are classified against the book as it stands
+        bid, ask = self.order_books.apply(instrument_id, action, side, price, size, order_id)
+
+        event = ProcessedMBOEvent(
+            now_ns, ts_event or now_ns, symbol, instrument_id,
+            contract_info['contract_type'], contract_info['strike'], contract_info['expiration'],
+            action, side, price, size,
+            bid_price=bid, ask_price=ask,
+            spread=ask - bid if bid and ask and ask > bid else None,
+            sequence_number=sequence, order_id=order_id
+        )
+
+        # Process trades to derive direction
+        if action == 'T':  # Trade
+            self.trades_processed += 1
+            event.trade_direction = self._derive_trade_direction(price, bid, ask)
+
+            # Determine price level
+            if bid and ask:
+                mid = (bid + ask) / 2
+                if abs(price - bid) < 0.01:
+                    event.price_level = 'BID'
+                    event.aggressor_side = 'SELL'
+                elif abs(price - ask) < 0.01:
+                    event.price_level = 'ASK'
+                    event.aggressor_side = 'BUY'
+                elif abs(price - mid) < 0.01:
+                    event.price_level = 'MID'
+                else:
+                    # Price outside bid/ask
+                    if price < bid:
+                        event.price_level = 'BELOW_BID'
+                    elif price > ask:
+                        event.price_level = 'ABOVE_ASK'
+
+        self.events_processed += 1
+        return event
+
     def _derive_trade_direction(self, trade_price: float,
                                bid_price: Optional[float],
                                ask_price: Optional[float]) -> str:
@@ -361,117 +481,129 @@ class MBOEventStreamProcessor:
         """
         Aggregate trade event into pressure metrics
 
-        Returns completed window metrics if window time has passed
+        Returns the first window closed by this event's timestamp; every
+        window closed at the same time is delivered to on_windows_closed
+        and completed_metrics.
         """
         if event.action != 'T' or not event.trade_direction:
             return None
 
-        # Check for completed windows first
-        completed = self._check_completed_windows()
-
-        # Get window key
-        window_start = self._get_window_start(event.exchange_timestamp)
-        window_key = (event.strike_price, event.contract_type, window_start)
-
         with self._lock:
-            # Add trade to window
-            self.active_windows[window_key]['trades'].append(event)
-
-            # Update volume based on direction
-            if event.trade_direction == 'BUY':
-                self.active_windows[window_key]['buy_volume'] += event.size
-                self.active_windows[window_key]['buy_trades'] += 1
-                if event.size > 100:
-                    self.active_windows[window_key]['large_buy_trades'] += 1
+            completed = self._advance_watermark(event.ts_event_ns)
+            self._add_trade(event)
 
-            elif event.trade_direction == 'SELL':
-                self.active_windows[window_key]['sell_volume'] += event.size
-                self.active_windows[window_key]['sell_trades'] += 1
-                if event.size > 100:
-                    self.active_windows[window_key]['large_sell_trades'] += 1
+        self._emit(completed)
+        return completed[0] if completed else None
 
-            else:  # NEUTRAL or UNKNOWN
-                self.active_windows[window_key]['neutral_volume'] += event.size
+    def aggregate_trades(self, events: List[ProcessedMBOEvent]) -> List[StrikePressureMetrics]:
+        """
+        Aggregate a batch of events into pressure metrics
 
-            # Track spread
-            if event.spread:
-                self.active_windows[window_key]['spreads'].append(event.spread)
+        Returns every window closed while the batch was applied.
+        """
+        completed = []
+        with self._lock:
+            for event in events:
+                if event.action == 'T' and event.trade_direction:
+                    if event.ts_event_ns > self.watermark_ns:
+                        completed.extend(self._advance_watermark(event.ts_event_ns))
+                    self._add_trade(event)
 
+        self._emit(completed)
         return completed
 
-    def _get_window_start(self, timestamp: datetime) -> datetime:
-        """Get the start time for the window containing this timestamp"""
-        minutes = (timestamp.minute // self.window_minutes) * self.window_minutes
-        return timestamp.replace(minute=minutes, second=0, microsecond=0)
+    def advance_watermark(self, ts_ns: Optional[int] = None) -> List[StrikePressureMetrics]:
+        """
+        Close windows up to an event time without a trade
 
-    def _check_completed_windows(self) -> Optional[StrikePressureMetrics]:
-        """Check for and finalize completed time windows"""
-        current_time = datetime.now(timezone.utc)
-        completed = None
+        Args:
+            ts_ns: Exchange time in nanoseconds (defaults to wall clock, for idle live streams)
 
+        Returns:
+            Windows closed by the new watermark
+        """
         with self._lock:
-            # Check each active window
-            for window_key in list(self.active_windows.keys()):
-                strike_price, contract_type, window_start = window_key
-                window_end = window_start + timedelta(minutes=self.window_minutes)
-
-                # If window has ended
-                if current_time >= window_end + timedelta(seconds=30):  # 30s grace period
-                    # Finalize metrics
-                    window_data = self.active_windows[window_key]
-
-                    metrics = StrikePressureMetrics(
-                        strike_price=strike_price,
-                        contract_type=contract_type,
-                        time_window_start=window_start,
-                        time_window_end=window_end,
-                        buy_volume=window_data.get('buy_volume', 0),
-                        sell_volume=window_data.get('sell_volume', 0),
-                        neutral_volume=window_data.get('neutral_volume', 0),
-                        buy_trades=window_data.get('buy_trades', 0),
-                        sell_trades=window_data.get('sell_trades', 0),
-                        large_buy_trades=window_data.get('large_buy_trades', 0),
-                        large_sell_trades=window_data.get('large_sell_trades', 0)
-                    )
-
-                    # Calculate derived metrics
-                    metrics.total_volume = metrics.buy_volume + metrics.sell_volume + metrics.neutral_volume
-                    metrics.total_trades = metrics.buy_trades + metrics.sell_trades
-                    metrics.net_pressure = metrics.buy_volume - metrics.sell_volume
-
-                    # Buy pressure ratio
-                    if metrics.total_volume > 0:
-                        metrics.buy_pressure_ratio = metrics.buy_volume / (metrics.buy_volume + metrics.sell_volume) \
-                                                   if (metrics.buy_volume + metrics.sell_volume) > 0 else 0.5
-
-                    # Normalized pressure score (-1 to 1)
-                    if metrics.total_volume > 0:
-                        metrics.pressure_score = metrics.net_pressure / metrics.total_volume
-
-                    # Average trade sizes
-                    if metrics.buy_trades > 0:
-                        metrics.avg_buy_size = metrics.buy_volume / metrics.buy_trades
-                    if metrics.sell_trades > 0:
-                        metrics.avg_sell_size = metrics.sell_volume / metrics.sell_trades
-
-                    # Average spread
-                    spreads = window_data.get('spreads', [])
-                    if spreads:
-                        metrics.avg_spread = sum(spreads) / len(spreads)
-                        metrics.total_spread_samples = len(spreads)
-
-                    # Store completed metrics
-                    self.completed_metrics.append(metrics)
-
-                    # Remove from active windows
-                    del self.active_windows[window_key]
-
-                    # Return the first completed (could batch later)
-                    if not completed:
-                        completed = metrics
+            completed = self._advance_watermark(ts_ns if ts_ns is not None else time.time_ns())
+        self._emit(completed)
+        return completed
 
+    def flush_windows(self) -> List[StrikePressureMetrics]:
+        """Close every open window (end of a replay or backfill)"""
+        with self._lock:
+            completed = [self._finalize_window(key) for _, key in sorted(self._window_heap)]
+            self._window_heap.clear()
+        self._emit(completed)
         return completed
 
+    def _emit(self, completed: List[StrikePressureMetrics]):
+        if completed and self.on_windows_closed:
+            self.on_windows_closed(completed)
+
+    def _add_trade(self, event: ProcessedMBOEvent):
+        """Add a trade to its window (caller holds the lock)"""
+        window_start_ns = self._window_start_ns(event.ts_event_ns)
+        window_key = (event.strike_price, event.contract_type, window_start_ns)
+        window = self.active_windows.get(window_key)
+
+        if window is None:
+            window_end_ns = window_start_ns + self.window_ns
+            if window_end_ns + self.grace_ns <= self.watermark_ns:
+                # Window already closed; counting it now would emit a partial duplicate
+                self.late_trades += 1
+                return
+            window = self.active_windows[window_key] = PressureWindow()
+            heapq.heappush(self._window_heap, (window_end_ns, window_key))
+
+        # Update volume based on direction
+        size = event.size
+        direction = event.trade_direction
+        if direction == 'BUY':
+            window.buy_volume += size
+            window.buy_trades += 1
+            if size > 100:
+                window.large_buy_trades += 1
+
+        elif direction == 'SELL':
+            window.sell_volume += size
+            window.sell_trades += 1
+            if size > 100:
+                window.large_sell_trades += 1
+
+        else:  # NEUTRAL or UNKNOWN
+            window.neutral_volume += size
+
+        # Track spread
+        if event.spread:
+            window.spread_sum += event.spread
+            window.spread_samples += 1
+
+    def _window_start_ns(self, ts_ns: int) -> int:
+        """Start of the window containing ts_ns (windows align within each UTC hour)"""
+        into_hour = ts_ns % NANOS_PER_HOUR
+        minutes = (into_hour // NANOS_PER_MINUTE // self.window_minutes) * self.window_minutes
+        return ts_ns - into_hour + minutes * NANOS_PER_MINUTE
+
+    def _advance_watermark(self, ts_ns: int) -> List[StrikePressureMetrics]:
+        """Move event time forward and close windows whose end + grace has passed (lock held)"""
+        if ts_ns > self.watermark_ns:
+            self.watermark_ns = ts_ns
+
+        heap = self._window_heap
+        cutoff_ns = self.watermark_ns - self.grace_ns
+        completed = []
+        while heap and heap[0][0] <= cutoff_ns:
+            _, window_key = heapq.heappop(heap)
+            completed.append(self._finalize_window(window_key))
+        return completed
+
+    def _finalize_window(self, window_key: Tuple[float, str, int]) -> StrikePressureMetrics:
+        """Build metrics for a window and retire it (lock held)"""
+        metrics = build_pressure_metrics(window_key, self.active_windows.pop(window_key), self.window_minutes)
+
+        # Store completed metrics
+        self.completed_metrics.append(metrics)
+        return metrics
+
     def get_recent_pressure(self, strike: float, lookback_minutes: int = 30) -> List[StrikePressureMetrics]:
         """Get recent pressure metrics for a specific strike"""
         cutoff_time = datetime.now(timezone.utc) - timedelta(minutes=lookback_minutes)
@@ -491,9 +623,10 @@ class MBOEventStreamProcessor:
             'trades_processed': self.trades_processed,
             'errors': self.errors,
             'active_windows': len(self.active_windows),
+            'late_trades': self.late_trades,
             'completed_windows': len(self.completed_metrics),
             'cached_instruments': len(self.contract_mapper.instrument_cache),
-            'tracked_instruments': len(self.bid_ask_tracker.bid_prices)
+            'tracked_instruments': len(self.order_books)
         }
 
 
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Per-Order MBO Limit Order Book
+
+Reconstructs each instrument's book from Databento MBO messages so trade
+classification sees the real top of book:
+- Orders keyed by order_id; Add, Modify, Cancel, Fill and Clear applied
+- Price levels aggregated per side, prices kept in a heap with lazy deletion
+- O(log n) level insert/delete, amortized O(1) best bid/ask, O(1) depth-at-level
+- Snapshot/restore so a reconnect or backfill can rebuild state quickly
+"""
+
+import logging
+import threading
+from heapq import heapify, heappop, heappush
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BID = 'B'
+ASK = 'A'
+
+
+class BookSide:
+    """
+    One side of a book: aggregated size and order count per price
+
+    ``levels`` is the source of truth. ``_heap`` orders prices best-first
+    (negated for bids); a deleted level stays in the heap until it reaches
+    the top, and the heap is rebuilt once stale entries outnumber live ones.
+    """
+
+    __slots__ = ('is_bid', 'levels', '_heap')
+
+    def __init__(self, is_bid: bool):
+        self.is_bid = is_bid
+        self.levels: Dict[float, List[int]] = {}  # price -> [total_size, order_count]
+        self._heap: List[float] = []
+
+    def add(self, price: float, size: int):
+        level = self.levels.get(price)
+        if level is None:
+            self.levels[price] = [size, 1]
+            heappush(self._heap, -price if self.is_bid else price)
+        else:
+            level[0] += size
+            level[1] += 1
+
+    def reduce(self, price: float, size: int, remove_order: bool):
+        level = self.levels.get(price)
+        if level is None:
+            return
+        level[0] -= size
+        if remove_order:
+            level[1] -= 1
+        if level[1] <= 0 or level[0] <= 0:
+            del self.levels[price]
+            if len(self._heap) > 2 * len(self.levels) + 64:
+                self._rebuild()
+
+    def _rebuild(self):
+        """Drop stale heap entries"""
+        self._heap = [-price for price in self.levels] if self.is_bid else list(self.levels)
+        heapify(self._heap)
+
+    @property
+    def best(self) -> Optional[float]:
+        heap, levels = self._heap, self.levels
+        while heap:
+            price = -heap[0] if self.is_bid else heap[0]
+            if price in levels:
+                return price
+            heappop(heap)
+        return None
+
+    @property
+    def prices(self) -> List[float]:
+        """Live price levels, ascending"""
+        return sorted(self.levels)
+
+    def depth(self, price: float) -> int:
+        level = self.levels.get(price)
+        return level[0] if level else 0
+
+    def clear(self):
+        self._heap.clear()
+        self.levels.clear()
+
+
+class OrderBook:
+    """Limit order book for one instrument, keyed by order_id"""
+
+    __slots__ = ('instrument_id', 'orders', 'bids', 'asks')
+
+    def __init__(self, instrument_id: Optional[int] = None):
+        self.instrument_id = instrument_id
+        self.orders: Dict[int, List[Any]] = {}  # order_id -> [side, price, size]
+        self.bids = BookSide(is_bid=True)
+        self.asks = BookSide(is_bid=False)
+
+    def _side(self, side: str) -> Optional[BookSide]:
+        if side == BID:
+            return self.bids
+        if side == ASK:
+            return self.asks
+        return None
+
+    def add(self, order_id: int, side: str, price: float, size: int):
+        """Add a resting order (an existing order_id is replaced)"""
+        book_side = self._side(side)
+        if book_side is None or size <= 0:
+            return
+        if order_id in self.orders:
+            self.cancel(order_id)
+        self.orders[order_id] = [side, price, size]
+        book_side.add(price, size)
+
+    def modify(self, order_id: int, side: str, price: float, size: int):
+        """Change an order's price and/or size; unknown orders are added"""
+        order = self.orders.get(order_id)
+        if order is None:
+            self.add(order_id, side, price, size)
+            return
+
+        old_side, old_price, old_size = order
+        book_side = self._side(old_side)
+        if size <= 0:
+            self.cancel(order_id)
+        elif price == old_price:
+            level = book_side.levels[price]
+            level[0] += size - old_size
+            order[2] = size
+        else:
+            book_side.reduce(old_price, old_size, remove_order=True)
+            book_side.add(price, size)
+            order[1] = price
+            order[2] = size
+
+    def cancel(self, order_id: int, size: Optional[int] = None):
+        """Cancel ``size`` contracts of an order (all of it when size is None)"""
+        order = self.orders.get(order_id)
+        if order is None:
+            return
+        side, price, resting = order
+        removed = resting if size is None or size >= resting else size
+        remaining = resting - removed
+        self._side(side).reduce(price, removed, remove_order=remaining <= 0)
+        if remaining <= 0:
+            del self.orders[order_id]
+        else:
+            order[2] = remaining
+
+    def fill(self, order_id: int, size: int):
+        """Reduce a resting order by a filled quantity"""
+        self.cancel(order_id, size)
+
+    def clear(self):
+        self.orders.clear()
+        self.bids.clear()
+        self.asks.clear()
+
+    def apply(self, action: str, side: str, price: float, size: int, order_id: int):
+        """Apply one MBO message; trades ('T') do not change the book"""
+        if action == 'A':
+            self.add(order_id, side, price, size)
+        elif action == 'M':
+            self.modify(order_id, side, price, size)
+        elif action == 'C':
+            self.cancel(order_id, size or None)
+        elif action == 'F':
+            self.fill(order_id, size)
+        elif action == 'R':
+            self.clear()
+
+    @property
+    def best_bid(self) -> Optional[float]:
+        return self.bids.best
+
+    @property
+    def best_ask(self) -> Optional[float]:
+        return self.asks.best
+
+    def depth_at(self, side: str, price: float) -> int:
+        """Total resting size at a price level"""
+        book_side = self._side(side)
+        return book_side.depth(price) if book_side else 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-serializable book state"""
+        return {
+            'instrument_id': self.instrument_id,
+            'orders': [[order_id, side, price, size] for order_id, (side, price, size) in self.orders.items()]
+        }
+
+    @classmethod
+    def restore(cls, snapshot: Dict[str, Any]) -> 'OrderBook':
+        """Rebuild a book from snapshot()"""
+        book = cls(snapshot.get('instrument_id'))
+        for order_id, side, price, size in snapshot.get('orders', []):
+            book.add(order_id, side, price, size)
+        return book
+
+
+class OrderBookTracker:
+    """
+    MBO order books for every instrument
+
+    Drop-in replacement for the old last-quote BidAskTracker: top of book
+    reflects cancels and fills, not just the most recent Add or Modify.
+    """
+
+    def __init__(self):
+        self.books: Dict[int, OrderBook] = {}
+        self._lock = threading.Lock()
+
+    def _book(self, instrument_id: int) -> OrderBook:
+        book = self.books.get(instrument_id)
+        if book is None:
+            book = self.books[instrument_id] = OrderBook(instrument_id)
+        return book
+
+    def apply(self, instrument_id: int, action: str, side: str, price: float,
+              size: int, order_id: int) -> Tuple[Optional[float], Optional[float]]:
+        """Apply one MBO message and return the resulting (bid, ask)"""
+        if order_id is None:
+            # Quote without an order ID: keep one synthetic order per side
+            order_id = side
+        with self._lock:
+            book = self._book(instrument_id)
+            if action != 'T':
+                book.apply(action, side, price, size, order_id)
+            return book.bids.best, book.asks.best
+
+    def get_bid_ask(self, instrument_id: int) -> Tuple[Optional[float], Optional[float]]:
+        """Get current best bid/ask prices"""
+        book = self.books.get(instrument_id)
+        if book is None:
+            return None, None
+        return book.bids.best, book.asks.best
+
+    def get_spread(self, instrument_id: int) -> Optional[float]:
+        """Get current bid/ask spread"""
+        bid, ask = self.get_bid_ask(instrument_id)
+        if bid and ask and ask > bid:
+            return ask - bid
+        return None
+
+    def get_depth(self, instrument_id: int, side: str, price: float) -> int:
+        """Resting size at a price level"""
+        book = self.books.get(instrument_id)
+        return book.depth_at(side, price) if book else 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """State of every book, for persisting across reconnects"""
+        with self._lock:
+            return {'books': [book.snapshot() for book in self.books.values()]}
+
+    def restore(self, snapshot: Dict[str, Any]):
+        """Replace all books with a snapshot() result"""
+        books = {}
+        for book_snapshot in snapshot.get('books', []):
+            book = OrderBook.restore(book_snapshot)
+            books[book.instrument_id] = book
+        with self._lock:
+            self.books = books
+        logger.info(f"Restored {len(books)} order books")
+
+    def __len__(self) -> int:
+        return len(self.books)
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Compact MBO Event Records
+
+Allocation-light representations of Databento MBO messages for the live
+streaming hot path:
+- MBORecord: one ``__slots__`` record per message, read through the same
+  ``get()``/``[]`` interface as the legacy event dictionaries
+- MBOBatch: struct-of-arrays batch backed by ``array`` for bulk hand-off
+- Integer nanosecond timestamps throughout; datetimes and ISO strings are
+  only built when a caller asks for them
+"""
+
+import time
+from array import array
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Size of a DBN MBO message; used when a record does not report its own size
+MBO_RECORD_SIZE = 56
+
+NANOS_PER_SECOND = 1_000_000_000
+
+
+def ns_to_datetime(ts_ns: int) -> datetime:
+    """UTC datetime for nanoseconds since the epoch (microsecond precision)"""
+    seconds, nanos = divmod(ts_ns, NANOS_PER_SECOND)
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).replace(microsecond=nanos // 1000)
+
+
+class MBORecord:
+    """
+    One MBO message with integer timestamps
+
+    Field names match the legacy event dictionaries, so consumers that call
+    ``event.get('price')`` or ``event['symbol']`` keep working.
+    """
+
+    __slots__ = ('ts_event', 'ts_recv', 'instrument_id', 'symbol', 'action', 'side',
+                 'price', 'size', 'order_id', 'flags', 'sequence', 'order_priority',
+                 'ts_in_delta', 'received_ns', 'source', 'nbytes')
+
+    event_type = 'mbo'
+
+    # Legacy dictionary keys that map onto differently named attributes
+    _ALIASES = {'_source': 'source', '_received_at': 'received_at'}
+
+    def __init__(self, ts_event: Optional[int] = None, ts_recv: Optional[int] = None,
+                 instrument_id: Optional[int] = None, symbol: Optional[str] = None,
+                 action: Optional[str] = None, side: Optional[str] = None,
+                 price: Any = None, size: Optional[int] = None, order_id: Optional[int] = None,
+                 flags: Optional[int] = None, sequence: Optional[int] = None,
+                 order_priority: Optional[int] = None, ts_in_delta: Optional[int] = None,
+                 received_ns: int = 0, source: str = 'databento_websocket',
+                 nbytes: int = MBO_RECORD_SIZE):
+        self.ts_event = ts_event
+        self.ts_recv = ts_recv
+        self.instrument_id = instrument_id
+        self.symbol = symbol
+        self.action = action
+        self.side = side
+        self.price = price
+        self.size = size
+        self.order_id = order_id
+        self.flags = flags
+        self.sequence = sequence
+        self.order_priority = order_priority
+        self.ts_in_delta = ts_in_delta
+        self.received_ns = received_ns
+        self.source = source
+        self.nbytes = nbytes
+
+    @classmethod
+    def from_databento(cls, event, received_ns: Optional[int] = None,
+                       source: str = 'databento_websocket') -> 'MBORecord':
+        """Build a record from a Databento MBO message (or any object with the same attributes)"""
+        return cls(
+            getattr(event, 'ts_event', None),
+            getattr(event, 'ts_recv', None),
+            getattr(event, 'instrument_id', None),
+            getattr(event, 'symbol', None),
+            getattr(event, 'action', None),
+            getattr(event, 'side', None),
+            getattr(event, 'price', None),
+            getattr(event, 'size', None),
+            getattr(event, 'order_id', None),
+            getattr(event, 'flags', None),
+            getattr(event, 'sequence', None),
+            getattr(event, 'order_priority', None),
+            getattr(event, 'ts_in_delta', None),
+            received_ns if received_ns is not None else time.time_ns(),
+            source,
+            getattr(event, 'record_size', None) or MBO_RECORD_SIZE
+        )
+
+    @classmethod
+    def from_dict(cls, event_dict: Dict[str, Any]) -> 'MBORecord':
+        """Build a record from a legacy event dictionary"""
+        get = event_dict.get
+        return cls(get('ts_event'), get('ts_recv'), get('instrument_id'), get('symbol'),
+                   get('action'), get('side'), get('price'), get('size'), get('order_id'),
+                   get('flags'), get('sequence'), get('order_priority'), get('ts_in_delta'),
+                   time.time_ns(), get('_source', 'databento_websocket'))
+
+    @property
+    def received_at(self) -> str:
+        """ISO receive time, formatted on demand"""
+        return ns_to_datetime(self.received_ns).isoformat()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Dictionary-style field access"""
+        value = getattr(self, self._ALIASES.get(key, key), None)
+        return default if value is None else value
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, self._ALIASES.get(key, key))
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Legacy event dictionary (for JSON output and older consumers)"""
+        return {
+            'event_type': self.event_type,
+            'ts_event': self.ts_event,
+            'ts_recv': self.ts_recv,
+            'instrument_id': self.instrument_id,
+            'symbol': self.symbol,
+            'action': self.action,
+            'side': self.side,
+            'price': self.price,
+            'size': self.size,
+            'order_id': self.order_id,
+            'flags': self.flags,
+            'sequence': self.sequence,
+            'order_priority': self.order_priority,
+            'ts_in_delta': self.ts_in_delta,
+            '_received_at': self.received_at,
+            '_source': self.source
+        }
+
+    def __repr__(self) -> str:
+        return (f"MBORecord({self.symbol!r}, action={self.action!r}, side={self.side!r}, "
+                f"price={self.price}, size={self.size}, ts_event={self.ts_event})")
+
+
+class MBOBatch:
+    """
+    Struct-of-arrays batch of MBO messages
+
+    Numeric fields live in typed ``array`` columns and action/side in byte
+    arrays, so a batch of N messages costs a handful of objects rather than N.
+    """
+
+    __slots__ = ('ts_event', 'instrument_id', 'price', 'size', 'sequence', 'order_id',
+                 'action', 'side', 'symbols')
+
+    def __init__(self):
+        self.ts_event = array('q')
+        self.instrument_id = array('q')
+        self.price = array('d')
+        self.size = array('q')
+        self.sequence = array('q')
+        self.order_id = array('Q')
+        self.action = bytearray()
+        self.side = bytearray()
+        self.symbols: List[Optional[str]] = []
+
+    @classmethod
+    def from_records(cls, records: Iterable[Any]) -> 'MBOBatch':
+        """Build a batch from MBORecords, Databento messages or event dictionaries"""
+        batch = cls()
+        for record in records:
+            batch.append(record)
+        return batch
+
+    @classmethod
+    def from_mbo_records(cls, records: List[MBORecord]) -> 'MBOBatch':
+        """Column-at-a-time build from MBORecords (several times faster than append)"""
+        batch = cls()
+        batch.ts_event = array('q', [r.ts_event or 0 for r in records])
+        batch.instrument_id = array('q', [r.instrument_id or 0 for r in records])
+        batch.price = array('d', [r.price or 0.0 for r in records])
+        batch.size = array('q', [r.size or 0 for r in records])
+        batch.sequence = array('q', [r.sequence or 0 for r in records])
+        batch.order_id = array('Q', [r.order_id or 0 for r in records])
+        batch.action = bytearray(''.join([r.action or ' ' for r in records]), 'ascii')
+        batch.side = bytearray(''.join([r.side or ' ' for r in records]), 'ascii')
+        batch.symbols = [r.symbol for r in records]
+        return batch
+
+    def append(self, record: Any):
+        """Append one message (MBORecord, Databento message or event dictionary)"""
+        get = record.get if hasattr(record, 'get') else lambda key: getattr(record, key, None)
+        self.ts_event.append(get('ts_event') or 0)
+        self.instrument_id.append(get('instrument_id') or 0)
+        self.price.append(get('price') or 0.0)
+        self.size.append(get('size') or 0)
+        self.sequence.append(get('sequence') or 0)
+        self.order_id.append(get('order_id') or 0)
+        self.action.append(ord(get('action') or ' '))
+        self.side.append(ord(get('side') or ' '))
+        self.symbols.append(get('symbol'))
+
+    def __len__(self) -> int:
+        return len(self.ts_event)
+
+    def rows(self) -> Iterator[Tuple[Optional[str], int, int, str, str, float, int, int, int]]:
+        """Iterate (symbol, instrument_id, ts_event, action, side, price, size, sequence, order_id)"""
+        return zip(self.symbols, self.instrument_id, self.ts_event,
+                   self.action.decode('ascii'), self.side.decode('ascii'),
+                   self.price, self.size, self.sequence, self.order_id)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the numeric and code columns"""
+        return sum(column.itemsize * len(column) for column in
+                   (self.ts_event, self.instrument_id, self.price, self.size,
+                    self.sequence, self.order_id)) + len(self.action) + len(self.side)
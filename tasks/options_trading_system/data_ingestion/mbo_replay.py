@@ -0,0 +1,565 @@
+#!/usr/bin/env python3
+"""
+Offline MBO Replay Harness
+
+Feeds recorded or synthetic MBO files through the live ingest chain:
+EnhancedMBOStreamingClient._handle_raw_event -> event queue ->
+MBOEventStreamProcessor.process_events / aggregate_trades (or a
+ShardedMBOProcessor) -> IFDv3Engine.analyze_pressure_event
+
+- DBN-style CSV files (optionally gzipped), or .dbn/.dbn.zst files when
+  the databento package is installed
+- Deterministic synthetic generator (resting quotes plus trades at bid/ask)
+- Replay at event-time speed (1x, 10x, ...) or as fast as possible
+- Report: events/sec, per-stage latency histograms, queue depth over time,
+  dropped events and RSS growth; compare against a saved baseline report
+  to gate regressions
+"""
+
+import os
+import sys
+import csv
+import gzip
+import json
+import time
+import random
+import logging
+import argparse
+import threading
+from datetime import datetime, timezone
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence
+
+# Task root (analysis_engine) and repository root (utils) for script use
+current_dir = os.path.dirname(os.path.abspath(__file__))
+for path in (os.path.dirname(current_dir), os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))):
+    if path not in sys.path:
+        sys.path.append(path)
+
+try:
+    from .mbo_records import MBORecord
+    from .mbo_event_processor import MBOEventStreamProcessor, StrikePressureMetrics
+    from .mbo_sharding import ShardedMBOProcessor
+    from .streaming_stats import LatencyHistogram
+    from .databento_websocket_streaming import EnhancedMBOStreamingClient
+    from .databento_api.solution import to_pressure_metrics
+except ImportError:
+    from mbo_records import MBORecord
+    from mbo_event_processor import MBOEventStreamProcessor, StrikePressureMetrics
+    from mbo_sharding import ShardedMBOProcessor
+    from streaming_stats import LatencyHistogram
+    from databento_websocket_streaming import EnhancedMBOStreamingClient
+    from databento_api.solution import to_pressure_metrics
+
+try:
+    import databento as db
+    DATABENTO_AVAILABLE = True
+except ImportError:
+    DATABENTO_AVAILABLE = False
+    db = None
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Column order of replay CSV files (a subset of Databento's MBO CSV output)
+MBO_CSV_FIELDS = ('ts_recv', 'ts_event', 'instrument_id', 'action', 'side', 'price', 'size',
+                  'order_id', 'flags', 'ts_in_delta', 'sequence', 'symbol')
+
+# Synthetic session start: 9:30 AM ET on a trading day
+SYNTHETIC_START_NS = int(datetime(2025, 6, 2, 13, 30, tzinfo=timezone.utc).timestamp()) * 1_000_000_000
+
+TICK = 0.25
+
+# Stages need this many baseline samples before their p99 is gated
+MIN_GATED_SAMPLES = 1000
+
+
+def generate_synthetic_mbo(path: str, events: int = 100_000, strikes: int = 40, seed: int = 7,
+                           events_per_second: float = 2000.0, trade_share: float = 0.3,
+                           start_ns: int = SYNTHETIC_START_NS, underlying: str = 'NQM5',
+                           first_strike: float = 21000.0, strike_step: float = 25.0) -> int:
+    """
+    Write a deterministic synthetic MBO session to a CSV file
+
+    Every call and put of `strikes` strikes opens with a resting bid and
+    ask; after that each step either trades at the bid or ask (direction
+    biased per instrument, so windows have a dominant side) or moves the
+    quote, re-posting bid and ask as cancel + add pairs. Same arguments, same file.
+
+    Returns:
+        Number of records written
+    """
+    rng = random.Random(seed)
+    mean_gap_ns = 1e9 / events_per_second
+    opener = gzip.open if path.endswith('.gz') else open
+
+    instruments = []
+    for i in range(strikes):
+        strike = first_strike + i * strike_step
+        for option_type in ('C', 'P'):
+            instruments.append({
+                'id': 100_000 + len(instruments),
+                'symbol': f"{underlying} {option_type}{int(strike)}",
+                'mid': rng.randint(40, 800),  # In ticks
+                'buy_bias': rng.choice((0.2, 0.35, 0.5, 0.65, 0.8)),
+                'bid_order': 0,
+                'ask_order': 0
+            })
+
+    ts_event = start_ns
+    state = {'written': 0, 'order_id': 0}
+
+    with opener(path, 'wt', newline='') as handle:
+        writer = csv.writer(handle)
+        writer.writerow(MBO_CSV_FIELDS)
+
+        def emit(inst, action, side, ticks, size, order_id):
+            ts_recv = ts_event + rng.randint(20_000, 200_000)
+            writer.writerow((ts_recv, ts_event, inst['id'], action, side, ticks * TICK, size,
+                             order_id, 0, rng.randint(5_000, 50_000), state['written'], inst['symbol']))
+            state['written'] += 1
+
+        def quote(inst, side):
+            half_spread = rng.choice((1, 1, 2))
+            ticks = inst['mid'] - half_spread if side == 'B' else inst['mid'] + half_spread
+            key = 'bid_order' if side == 'B' else 'ask_order'
+            if inst[key]:
+                emit(inst, 'C', side, ticks, 0, inst[key])
+            state['order_id'] += 1
+            inst[key] = state['order_id']
+            emit(inst, 'A', side, ticks, rng.randint(1, 50), inst[key])
+
+        for inst in instruments:
+            quote(inst, 'B')
+            quote(inst, 'A')
+
+        while state['written'] < events:
+            ts_event += int(rng.expovariate(1.0) * mean_gap_ns) + 1
+            inst = rng.choice(instruments)
+            if rng.random() < trade_share:
+                size = rng.randint(1, 20) if rng.random() < 0.95 else rng.randint(101, 400)
+                if rng.random() < inst['buy_bias']:
+                    emit(inst, 'T', 'B', inst['mid'] + 1, size, 0)  # Buyer lifts the ask
+                else:
+                    emit(inst, 'T', 'A', inst['mid'] - 1, size, 0)  # Seller hits the bid
+            else:
+                inst['mid'] = max(inst['mid'] + rng.choice((-1, 0, 1)), 4)
+                quote(inst, 'B')
+                quote(inst, 'A')
+
+    return state['written']
+
+
+def read_mbo_file(path: str) -> List[MBORecord]:
+    """
+    Load a replay file into memory (parsing is kept out of the measurement)
+
+    Accepts the CSV layout written by generate_synthetic_mbo or Databento's
+    CSV export with decimal prices (.csv / .csv.gz), and .dbn / .dbn.zst
+    files when the databento package is installed.
+    """
+    if '.dbn' in os.path.basename(path):
+        return _read_dbn(path)
+
+    opener = gzip.open if path.endswith('.gz') else open
+    records = []
+    with opener(path, 'rt', newline='') as handle:
+        for row in csv.DictReader(handle):
+            records.append(MBORecord(
+                int(row['ts_event']), int(row['ts_recv']), int(row['instrument_id']), row['symbol'],
+                row['action'], row['side'], float(row['price']), int(row['size']),
+                int(row['order_id']), int(row.get('flags') or 0), int(row.get('sequence') or 0),
+                None, int(row.get('ts_in_delta') or 0), source='replay'
+            ))
+    return records
+
+
+def _read_dbn(path: str) -> List[MBORecord]:
+    if not DATABENTO_AVAILABLE:
+        raise ImportError("Databento package required for DBN files. Install with: pip install databento")
+    frame = db.DBNStore.from_file(path).to_df(price_type='float', pretty_ts=False, map_symbols=True)
+    records = []
+    for ts_recv, row in zip(frame.index, frame.itertuples(index=False)):
+        records.append(MBORecord(
+            int(row.ts_event), int(ts_recv), int(row.instrument_id), row.symbol, row.action,
+            row.side, float(row.price), int(row.size), int(row.order_id), int(row.flags),
+            int(row.sequence), None, int(row.ts_in_delta), source='replay'
+        ))
+    return records
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process (0 when it cannot be read)"""
+    if PSUTIL_AVAILABLE:
+        return psutil.Process().memory_info().rss
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # Peak, in KB on Linux
+    except (ImportError, AttributeError):
+        return 0
+
+
+class MBOReplayHarness:
+    """
+    Replays MBO records through the streaming client, processor and IFD engine
+
+    Args:
+        records: Events in exchange-time order (see read_mbo_file)
+        speed: Event-time multiplier (1.0 = recorded pace, 10.0 = ten times
+            faster); None replays as fast as the feeder can push
+        engine: Object with analyze_pressure_event (e.g. IFDv3Engine); when
+            None, closed windows are collected but not analyzed
+        window_minutes: Pressure aggregation window
+        queue_size: Override the client's event queue capacity
+        overload_policy: Client overload policy ('block', 'spill' or 'shed')
+        instrument_priority: Client shed priorities (instrument_id or symbol -> int)
+        sample_interval: Seconds between queue depth / RSS samples
+        shards: Worker processes for a ShardedMBOProcessor; 0 processes in
+            the client's thread (process_batch then times the hand-off)
+    """
+
+    # Latency histograms (nanoseconds); process/aggregate are per batch, analyze per window
+    STAGES = ('ingest', 'queue_wait', 'process_batch', 'aggregate_batch', 'analyze', 'end_to_end')
+
+    def __init__(self, records: Sequence[MBORecord], speed: Optional[float] = None, engine=None,
+                 window_minutes: int = 5, queue_size: Optional[int] = None,
+                 sample_interval: float = 0.01, overload_policy: str = 'block',
+                 instrument_priority: Optional[Dict[Any, int]] = None,
+                 spill_dir: Optional[str] = None, shards: int = 0):
+        self.records = records
+        self.speed = speed
+        self.engine = engine
+        self.window_minutes = window_minutes
+        self.queue_size = queue_size
+        self.overload_policy = overload_policy
+        self.instrument_priority = instrument_priority
+        self.spill_dir = spill_dir
+        self.sample_interval = sample_interval
+        self.shards = shards
+
+        self.histograms = {stage: LatencyHistogram() for stage in self.STAGES}
+        self.windows: List[StrikePressureMetrics] = []
+        self.signals: List[Any] = []
+        self.queue_depth: List[List[float]] = []  # [elapsed seconds, depth]
+        self.analysis_errors = 0
+        self.events_completed = 0  # Counted after a batch clears the whole chain
+        self._inflight: Deque[List[MBORecord]] = deque()  # Sharded batches awaiting their round
+
+    def _record_queue_wait(self, batch: List[MBORecord]):
+        dequeued_ns = time.time_ns()
+        queue_wait = self.histograms['queue_wait'].record
+        for record in batch:
+            queue_wait(dequeued_ns - record.received_ns)
+
+    def _on_batch(self, batch: List[MBORecord]):
+        histograms = self.histograms
+        self._record_queue_wait(batch)
+
+        started = time.perf_counter_ns()
+        events = self.processor.process_events(batch)
+        processed = time.perf_counter_ns()
+        closed = self.processor.aggregate_trades(events)
+        histograms['process_batch'].record(processed - started)
+        histograms['aggregate_batch'].record(time.perf_counter_ns() - processed)
+
+        self._analyze(closed)
+        self._complete(batch)
+
+    def _on_sharded_batch(self, batch: List[MBORecord]):
+        self._record_queue_wait(batch)
+        self._inflight.append(batch)
+        started = time.perf_counter_ns()
+        self.processor.submit(batch)
+        self.histograms['process_batch'].record(time.perf_counter_ns() - started)
+
+    def _on_round(self, round_id: int, windows: List[StrikePressureMetrics]):
+        """Collector thread: rounds complete in submission order (flush rounds carry no batch)"""
+        self._analyze(windows)
+        if self._inflight:
+            self._complete(self._inflight.popleft())
+
+    def _complete(self, batch: List[MBORecord]):
+        done_ns = time.time_ns()
+        end_to_end = self.histograms['end_to_end'].record
+        for record in batch:
+            end_to_end(done_ns - record.received_ns)
+        self.events_completed += len(batch)
+
+    def _analyze(self, windows: List[StrikePressureMetrics]):
+        self.windows.extend(windows)
+        if self.engine is None:
+            return
+        analyze = self.histograms['analyze'].record
+        for window in windows:
+            started = time.perf_counter_ns()
+            try:
+                signal = self.engine.analyze_pressure_event(to_pressure_metrics(window))
+            except Exception as e:
+                self.analysis_errors += 1
+                logger.error(f"Analysis failed for {window.strike_price}{window.contract_type}: {e}")
+                continue
+            analyze(time.perf_counter_ns() - started)
+            if signal is not None:
+                self.signals.append(signal)
+
+    def _sample(self, started: float, stop: threading.Event):
+        while not stop.wait(self.sample_interval):
+            self.queue_depth.append([time.perf_counter() - started, self.client.event_queue.qsize()])
+            self.rss_peak = max(self.rss_peak, current_rss_bytes())
+
+    def run(self, drain_timeout: float = 60.0) -> Dict[str, Any]:
+        """Replay every record, drain the queue, close open windows and return the report"""
+        options = {'overload_policy': self.overload_policy, 'instrument_priority': self.instrument_priority}
+        if self.queue_size:
+            options['queue_size'] = self.queue_size
+        if self.spill_dir:
+            options['spill_dir'] = self.spill_dir
+        self.client = client = EnhancedMBOStreamingClient(None, replay=True, **options)
+        if self.shards:
+            self.processor = ShardedMBOProcessor(self.shards, window_minutes=self.window_minutes)
+            self.processor.on_round_complete = self._on_round
+            self.processor.start()
+            client.on_mbo_batch = self._on_sharded_batch
+        else:
+            self.processor = MBOEventStreamProcessor(window_minutes=self.window_minutes)
+            client.on_mbo_batch = self._on_batch
+
+        self.rss_start = self.rss_peak = current_rss_bytes()
+        started = time.perf_counter()
+        stop_sampling = threading.Event()
+        sampler = threading.Thread(target=self._sample, args=(started, stop_sampling),
+                                   daemon=True, name="MBO-ReplaySampler")
+        client.start()
+        sampler.start()
+
+        try:
+            self._feed(client)
+            fed = time.perf_counter()
+
+            # Wait until every queued event has cleared the chain (events_processed
+            # is counted before the batch callback runs)
+            deadline = fed + drain_timeout
+            stats, buffer = client.stats, client.event_queue
+            while self.events_completed + buffer.dropped < stats['events_received']:
+                if time.perf_counter() > deadline:
+                    logger.warning("Replay drain timed out")
+                    break
+                time.sleep(0.001)
+            if self.shards:
+                self.processor.flush_windows()  # Analyzed by _on_round
+            else:
+                self._analyze(self.processor.flush_windows())
+            finished = time.perf_counter()
+            self.processor_stats = self.processor.get_stats()
+        finally:
+            stop_sampling.set()
+            sampler.join()
+            client.stop()
+            if self.shards:
+                self.processor.close()
+
+        return self._report(started, fed, finished)
+
+    def _feed(self, client: EnhancedMBOStreamingClient):
+        """Push records into the client, pacing by exchange time unless replaying at max speed"""
+        handle = client._handle_raw_event
+        ingest = self.histograms['ingest'].record
+        perf_counter_ns = time.perf_counter_ns
+        if not self.records:
+            return
+
+        first_ts = self.records[0].ts_event
+        feed_start = perf_counter_ns()
+        for record in self.records:
+            if self.speed:
+                # Sleep only when more than 1ms ahead; behind schedule, push in a burst
+                ahead_ns = (record.ts_event - first_ts) / self.speed - (perf_counter_ns() - feed_start)
+                if ahead_ns > 1_000_000:
+                    time.sleep(ahead_ns / 1e9)
+            t0 = perf_counter_ns()
+            handle(record)
+            ingest(perf_counter_ns() - t0)
+
+    def _report(self, started: float, fed: float, finished: float) -> Dict[str, Any]:
+        stats = self.client.stats
+        buffer = self.client.event_queue.get_stats()
+        elapsed = finished - started
+        rss_end = current_rss_bytes()
+        depths = [depth for _, depth in self.queue_depth]
+        records = self.records
+        span_ns = records[-1].ts_event - records[0].ts_event if records else 0
+
+        return {
+            'events': len(records),
+            'speed': self.speed or 'max',
+            'recorded_seconds': span_ns / 1e9,
+            'feed_seconds': fed - started,
+            'wall_seconds': elapsed,
+            'events_per_second': stats['events_processed'] / elapsed if elapsed > 0 else 0.0,
+            'events_received': stats['events_received'],
+            'events_processed': stats['events_processed'],
+            'events_dropped': buffer['events_dropped'],
+            'events_spilled': buffer['events_spilled'],
+            'blocked_puts': buffer['blocked_puts'],
+            'overload_policy': buffer['overload_policy'],
+            'client_errors': stats['errors'],
+            'shards': self.shards,
+            'processor': self.processor_stats,
+            'windows_closed': len(self.windows),
+            'signals': len(self.signals),
+            'analysis_errors': self.analysis_errors,
+            'latency_us': {stage: self._summarize(histogram)
+                           for stage, histogram in self.histograms.items() if histogram.count},
+            'queue_depth': {
+                'max': max(depths) if depths else 0,
+                'mean': sum(depths) / len(depths) if depths else 0.0,
+                'samples': self.queue_depth
+            },
+            'rss_mb': {
+                'start': self.rss_start / 1e6,
+                'peak': max(self.rss_peak, rss_end) / 1e6,
+                'end': rss_end / 1e6,
+                'growth': (rss_end - self.rss_start) / 1e6
+            }
+        }
+
+    @staticmethod
+    def _summarize(histogram: LatencyHistogram) -> Dict[str, float]:
+        p50, p90, p99, p999 = histogram.percentiles((50, 90, 99, 99.9))
+        return {
+            'count': histogram.count,
+            'mean': histogram.mean / 1000,
+            'p50': p50 / 1000,
+            'p90': p90 / 1000,
+            'p99': p99 / 1000,
+            'p99.9': p999 / 1000,
+            'max': histogram.max / 1000
+        }
+
+
+def check_regression(report: Dict[str, Any], baseline: Dict[str, Any],
+                     tolerance: float = 0.25, rss_slack_mb: float = 32.0) -> List[str]:
+    """
+    Compare a replay report with a saved baseline report
+
+    Returns:
+        Failure descriptions (empty when within tolerance)
+    """
+    failures = []
+    floor = baseline['events_per_second'] * (1 - tolerance)
+    if report['events_per_second'] < floor:
+        failures.append(f"throughput {report['events_per_second']:,.0f}/s below {floor:,.0f}/s")
+
+    if report['events_dropped'] > baseline['events_dropped']:
+        failures.append(f"dropped {report['events_dropped']} events (baseline {baseline['events_dropped']})")
+
+    for stage, summary in baseline.get('latency_us', {}).items():
+        current = report['latency_us'].get(stage)
+        if summary['count'] < MIN_GATED_SAMPLES:
+            continue  # p99 of a few hundred batches is mostly scheduler noise
+        ceiling = summary['p99'] * (1 + tolerance)
+        if current and current['p99'] > ceiling:
+            failures.append(f"{stage} p99 {current['p99']:.1f}µs above {ceiling:.1f}µs")
+
+    growth_limit = max(baseline['rss_mb']['growth'], 0.0) * (1 + tolerance) + rss_slack_mb
+    if report['rss_mb']['growth'] > growth_limit:
+        failures.append(f"RSS grew {report['rss_mb']['growth']:.1f}MB (limit {growth_limit:.1f}MB)")
+
+    return failures
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    speed = 'max speed' if report['speed'] == 'max' else f"{report['speed']}x"
+    if report.get('shards'):
+        speed += f" on {report['shards']} shards"
+    lines = [
+        f"Replayed {report['events']:,} events at {speed} "
+        f"({report['recorded_seconds']:.1f}s recorded) in {report['wall_seconds']:.2f}s: "
+        f"{report['events_per_second']:,.0f} events/sec",
+        f"Dropped: {report['events_dropped']:,}  Spilled: {report['events_spilled']:,}  Windows: {report['windows_closed']:,}  "
+        f"Signals: {report['signals']:,}  Max queue depth: {report['queue_depth']['max']:,}  "
+        f"RSS growth: {report['rss_mb']['growth']:+.1f}MB",
+        f"{'stage':<16} {'count':>9} {'p50 µs':>9} {'p99 µs':>9} {'p99.9 µs':>9} {'max µs':>10}"
+    ]
+    for stage, s in report['latency_us'].items():
+        lines.append(f"{stage:<16} {s['count']:>9,} {s['p50']:>9.1f} {s['p99']:>9.1f} "
+                     f"{s['p99.9']:>9.1f} {s['max']:>10.1f}")
+    return '\n'.join(lines)
+
+
+def _create_engine(db_path: str):
+    """IFDv3Engine with its baselines in db_path"""
+    from analysis_engine.institutional_flow_v3.solution import IFDv3Engine
+    return IFDv3Engine({'baseline_db_path': db_path})
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline MBO replay harness")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate = commands.add_parser('generate', help="Write a synthetic MBO session")
+    generate.add_argument('path')
+    generate.add_argument('--events', type=int, default=100_000)
+    generate.add_argument('--strikes', type=int, default=40)
+    generate.add_argument('--seed', type=int, default=7)
+    generate.add_argument('--rate', type=float, default=2000.0, help="Events per second of exchange time")
+
+    replay = commands.add_parser('replay', help="Replay a file through the ingest chain")
+    replay.add_argument('path')
+    replay.add_argument('--speed', default='max', help="'max' or an event-time multiplier such as 1 or 10")
+    replay.add_argument('--window-minutes', type=int, default=5)
+    replay.add_argument('--queue-size', type=int, default=None)
+    replay.add_argument('--policy', choices=('block', 'spill', 'shed'), default='block',
+                        help="Overload policy of the client's event queue")
+    replay.add_argument('--shards', type=int, default=0, help="Worker processes (0 = single thread)")
+    replay.add_argument('--no-ifd', action='store_true', help="Stop after window aggregation")
+    replay.add_argument('--baseline-db', default=None, help="IFD baseline database (default: temporary)")
+    replay.add_argument('--baseline', help="Fail if the report regresses against this saved report")
+    replay.add_argument('--save', help="Write the report as JSON")
+    replay.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    if args.command == 'generate':
+        written = generate_synthetic_mbo(args.path, args.events, args.strikes, args.seed, args.rate)
+        print(f"Wrote {written:,} events to {args.path}")
+        return 0
+
+    logging.getLogger().setLevel(logging.WARNING)
+    records = read_mbo_file(args.path)
+    engine = None
+    if not args.no_ifd:
+        import tempfile
+        engine = _create_engine(args.baseline_db or os.path.join(tempfile.mkdtemp(), 'replay_baselines.db'))
+
+    speed = None if args.speed == 'max' else float(args.speed)
+    harness = MBOReplayHarness(records, speed=speed, engine=engine, window_minutes=args.window_minutes,
+                               queue_size=args.queue_size, overload_policy=args.policy, shards=args.shards)
+    report = harness.run()
+    if engine is not None:
+        engine.close()
+    print(format_report(report))
+
+    if args.save:
+        with open(args.save, 'w') as handle:
+            json.dump(report, handle, indent=2, default=str)
+    if args.baseline:
+        with open(args.baseline) as handle:
+            failures = check_regression(report, json.load(handle), args.tolerance)
+        for failure in failures:
+            print(f"REGRESSION: {failure}")
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
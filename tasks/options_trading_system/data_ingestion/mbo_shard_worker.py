@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Entry Point for Sharded MBO Worker Processes
+
+Spawned children unpickle their target by importing its module. This one
+imports nothing from data_ingestion at module level, so the child can put
+the parent's import root first on its own sys.path before the processor
+modules load - a data_ingestion directory elsewhere on the path (the
+repository root has an older one) then cannot shadow them.
+"""
+
+import sys
+
+
+def run_shard_worker(import_root: str, tasks, results, window_minutes: int):
+    """Fix the child's import root, then run the shard worker loop"""
+    if import_root in sys.path:
+        sys.path.remove(import_root)
+    sys.path.insert(0, import_root)
+
+    try:
+        from .mbo_sharding import _shard_worker
+    except ImportError:
+        from mbo_sharding import _shard_worker
+    _shard_worker(tasks, results, window_minutes)
@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+Sharded Multi-Process MBO Processing
+
+Spreads MBOEventStreamProcessor work across worker processes:
+- Events are hash-partitioned by instrument_id, so each worker owns the
+  order books and window state of its instruments
+- Each submitted batch becomes a round: per-shard MBOBatch columns go out
+  with the round's exchange-time watermark, and every worker returns the
+  partial windows that watermark closed
+- advance_watermark() sends a watermark-only round, so a live client's
+  clock closes windows of strikes that stopped trading
+- A collector thread merges partial windows with the same (strike, type,
+  window) key - several expirations can share one - and delivers closed
+  StrikePressureMetrics in exchange-time order, round by round
+- A bounded number of rounds in flight keeps memory flat when workers
+  fall behind (submit blocks, which backs up the event buffer)
+- A shard that dies fails the processor: blocked and later calls raise
+  instead of waiting for rounds that will never complete
+
+For in-order feeds the output matches a single MBOEventStreamProcessor.
+"""
+
+import os
+import time
+import logging
+import threading
+import multiprocessing
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+try:
+    from .mbo_records import MBORecord, MBOBatch
+    from .mbo_shard_worker import run_shard_worker
+    from .mbo_event_processor import (
+        MBOEventStreamProcessor, PressureWindow, StrikePressureMetrics, build_pressure_metrics,
+        NANOS_PER_MINUTE
+    )
+except ImportError:
+    from mbo_records import MBORecord, MBOBatch
+    from mbo_shard_worker import run_shard_worker
+    from mbo_event_processor import (
+        MBOEventStreamProcessor, PressureWindow, StrikePressureMetrics, build_pressure_metrics,
+        NANOS_PER_MINUTE
+    )
+
+logger = logging.getLogger(__name__)
+
+WindowKey = Tuple[float, str, int]
+
+# Worker commands
+_BATCH, _WATERMARK, _FLUSH, _STATS, _STOP = 'batch', 'watermark', 'flush', 'stats', 'stop'
+
+
+class ShardProcessor(MBOEventStreamProcessor):
+    """Processor for one shard: closed windows are returned as raw (key, counters) partials"""
+
+    def _finalize_window(self, window_key: WindowKey) -> Tuple[WindowKey, PressureWindow]:
+        return window_key, self.active_windows.pop(window_key)
+
+
+def _shard_worker(tasks, results, window_minutes: int):
+    """Worker process loop: apply rounds to this shard's processor"""
+    processor = ShardProcessor(window_minutes=window_minutes)
+    results.send(None)  # Ready
+    while True:
+        command, payload, watermark_ns = tasks.recv()
+        try:
+            if command == _BATCH:
+                closed = processor.aggregate_trades(processor.process_events(payload))
+                if watermark_ns:
+                    closed.extend(processor.advance_watermark(watermark_ns))
+                results.send(closed)
+            elif command == _WATERMARK:
+                results.send(processor.advance_watermark(watermark_ns))
+            elif command == _FLUSH:
+                results.send(processor.flush_windows())
+            elif command == _STATS:
+                results.send(processor.get_stats())
+            else:
+                results.send(None)
+                break
+        except Exception as e:
+            results.send(e)
+
+
+class ShardedMBOProcessor:
+    """
+    Hash-partitioned MBO processing across worker processes
+
+    Args:
+        shards: Worker processes
+        window_minutes: Pressure aggregation window
+        max_in_flight: Rounds submitted but not yet merged before submit blocks
+        start_method: multiprocessing start method ('spawn' is safe next to
+            the streaming client's threads)
+        request_timeout: Seconds flush_windows/get_stats wait for their round
+    """
+
+    def __init__(self, shards: int = 4, window_minutes: int = 5, max_in_flight: int = 8,
+                 start_method: str = 'spawn', request_timeout: float = 60.0):
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        self.shards = shards
+        self.window_minutes = window_minutes
+        self.window_ns = window_minutes * NANOS_PER_MINUTE
+        self.max_in_flight = max_in_flight
+        self.start_method = start_method
+        self.request_timeout = request_timeout
+
+        self.completed_metrics: Deque[StrikePressureMetrics] = deque(maxlen=1000)
+        self.watermark_ns = 0
+
+        # Receives every window closed by a round, in exchange-time order
+        self.on_windows_closed: Optional[Callable[[List[StrikePressureMetrics]], None]] = None
+        # Receives (round_id, windows) for every round, including empty ones
+        self.on_round_complete: Optional[Callable[[int, List[StrikePressureMetrics]], None]] = None
+
+        self.rounds_submitted = 0
+        self.rounds_completed = 0
+        self.events_submitted = 0
+        self.errors = 0
+
+        self._workers: List[Any] = []
+        self._tasks: List[Any] = []
+        self._results: List[Any] = []
+        self._pending: Deque[Tuple[int, str]] = deque()  # Rounds awaiting results, in order
+        self._slots = threading.Semaphore(max_in_flight)
+        self._submit_lock = threading.Lock()
+        self._progress = threading.Condition()
+        self._round_windows: Dict[int, List[StrikePressureMetrics]] = {}
+        self._abandoned: set = set()  # Request rounds whose caller timed out
+        self._collector: Optional[threading.Thread] = None
+        self._running = False
+        self._failure: Optional[str] = None
+
+    def start(self):
+        """Start the worker processes and wait until each is ready"""
+        if self._running:
+            return
+        context = multiprocessing.get_context(self.start_method)
+        self._failure = None
+        self._pending.clear()
+        self._round_windows.clear()
+        self._abandoned.clear()
+        self._slots = threading.Semaphore(self.max_in_flight)
+
+        # Spawned workers re-import this module through sys.path; the worker
+        # entry point puts this copy's import root first in the child
+        import_root = os.path.dirname(os.path.abspath(__file__))
+        if __package__:
+            import_root = os.path.dirname(import_root)
+        for shard in range(self.shards):
+            task_recv, task_send = context.Pipe(duplex=False)
+            result_recv, result_send = context.Pipe(duplex=False)
+            worker = context.Process(target=run_shard_worker,
+                                     args=(import_root, task_recv, result_send, self.window_minutes),
+                                     daemon=True, name=f"MBO-Shard-{shard}")
+            worker.start()
+            task_recv.close()
+            result_send.close()
+            self._workers.append(worker)
+            self._tasks.append(task_send)
+            self._results.append(result_recv)
+        for results in self._results:
+            results.recv()
+
+        self._running = True
+        self._collector = threading.Thread(target=self._collect, daemon=True, name="MBO-ShardCollector")
+        self._collector.start()
+        logger.info(f"Sharded MBO processor started with {self.shards} workers")
+
+    def close(self):
+        """Stop workers after every submitted round has been merged"""
+        if not self._running:
+            return
+        with self._submit_lock:
+            self._running = False
+            self._enqueue(-1, _STOP)
+            for tasks in self._tasks:
+                try:
+                    tasks.send((_STOP, None, 0))
+                except OSError:
+                    pass  # Worker already gone
+        self._collector.join()
+        for worker in self._workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+        for connection in self._tasks + self._results:
+            connection.close()
+        self._workers, self._tasks, self._results = [], [], []
+        logger.info("Sharded MBO processor stopped")
+
+    # Submission
+
+    def submit(self, records: List[Any]) -> int:
+        """
+        Partition a batch by instrument and send it to the workers
+
+        Blocks while max_in_flight rounds are unmerged.
+
+        Returns:
+            Round id (passed to on_round_complete)
+
+        Raises:
+            RuntimeError: If the processor is not running or a shard failed
+        """
+        self._check_running()
+        shards = self.shards
+        parts: List[List[MBORecord]] = [[] for _ in range(shards)]
+        watermark_ns = self.watermark_ns
+        for record in records:
+            if not isinstance(record, MBORecord):
+                record = MBORecord.from_dict(record)  # Backfill events arrive as dicts
+            parts[(record.instrument_id or 0) % shards].append(record)
+            # Windows close on trade time only, matching MBOEventStreamProcessor
+            if record.action == 'T' and record.ts_event and record.ts_event > watermark_ns:
+                watermark_ns = record.ts_event
+        batches = [MBOBatch.from_mbo_records(part) for part in parts]
+
+        self._acquire_slot()
+        with self._submit_lock:
+            watermark_ns = self.watermark_ns = max(self.watermark_ns, watermark_ns)
+            round_id = self.rounds_submitted
+            self.rounds_submitted += 1
+            self.events_submitted += len(records)
+            self._send_round(round_id, _BATCH, batches, watermark_ns)
+        return round_id
+
+    def advance_watermark(self, ts_ns: Optional[int] = None) -> Optional[int]:
+        """
+        Close windows up to an event time without a trade
+
+        Args:
+            ts_ns: Exchange time in nanoseconds (defaults to wall clock, for idle live streams)
+
+        Returns:
+            Round id, or None when the watermark is already past ts_ns
+
+        Raises:
+            RuntimeError: If the processor is not running or a shard failed
+        """
+        self._check_running()
+        if ts_ns is None:
+            ts_ns = time.time_ns()
+        if ts_ns <= self.watermark_ns:
+            return None
+
+        self._acquire_slot()
+        with self._submit_lock:
+            if ts_ns <= self.watermark_ns:
+                self._slots.release()
+                return None
+            self.watermark_ns = ts_ns
+            round_id = self.rounds_submitted
+            self.rounds_submitted += 1
+            self._send_round(round_id, _WATERMARK, [None] * self.shards, ts_ns)
+        return round_id
+
+    def _check_running(self):
+        if self._failure:
+            raise RuntimeError(f"Sharded MBO processor failed: {self._failure}")
+        if not self._running:
+            raise RuntimeError("Sharded MBO processor is not running")
+
+    def _acquire_slot(self):
+        """Wait for a free round slot; raises once the processor has failed"""
+        self._slots.acquire()
+        if self._failure:
+            self._slots.release()  # Pass the wake-up on to the next blocked caller
+            self._check_running()
+
+    def _send_round(self, round_id: int, command: str, payloads: List[Any], watermark_ns: int):
+        """Queue a round for the collector and send its part to every shard (caller holds the submit lock)"""
+        self._enqueue(round_id, command)
+        for tasks, payload in zip(self._tasks, payloads):
+            try:
+                tasks.send((command, payload, watermark_ns))
+            except OSError as e:
+                # The collector fails the processor when it reads this round
+                raise RuntimeError(f"Shard connection lost while sending {command} round {round_id}") from e
+
+    def _enqueue(self, round_id: int, command: str):
+        with self._progress:
+            self._pending.append((round_id, command))
+            self._progress.notify_all()
+
+    def flush_windows(self) -> List[StrikePressureMetrics]:
+        """Close every open window on every shard (end of a replay or backfill)"""
+        return self._request(_FLUSH)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Processor statistics summed across shards"""
+        per_shard = self._request(_STATS)
+        stats: Dict[str, Any] = {}
+        for shard_stats in per_shard:
+            for key, value in shard_stats.items():
+                stats[key] = stats.get(key, 0) + value
+        stats['completed_windows'] = len(self.completed_metrics)
+        stats.update({
+            'shards': self.shards,
+            'rounds_submitted': self.rounds_submitted,
+            'rounds_completed': self.rounds_completed,
+            'errors': stats.get('errors', 0) + self.errors
+        })
+        return stats
+
+    def _request(self, command: str):
+        """Send a command to every shard as its own round and wait for the merged result"""
+        self._check_running()
+        self._acquire_slot()
+        with self._submit_lock:
+            round_id = self.rounds_submitted
+            self.rounds_submitted += 1
+            self._send_round(round_id, command, [None] * self.shards, 0)
+        with self._progress:
+            done = self._progress.wait_for(lambda: round_id in self._round_windows or self._failure,
+                                           self.request_timeout)
+            if round_id in self._round_windows:
+                return self._round_windows.pop(round_id)
+            if not done:
+                self._abandoned.add(round_id)
+                raise TimeoutError(f"Shards did not answer {command} within {self.request_timeout}s")
+        self._check_running()
+
+    # Collection
+
+    def _collect(self):
+        """Collector thread: read each round from every shard, in submission order"""
+        while True:
+            with self._progress:
+                self._progress.wait_for(lambda: self._pending)
+                round_id, command = self._pending.popleft()
+
+            try:
+                replies = [results.recv() for results in self._results]
+            except (EOFError, OSError) as e:
+                self._fail(f"shard connection lost on {command} round {round_id} ({e!r})")
+                return
+            if command == _STOP:
+                break
+
+            try:
+                self._complete_round(round_id, command, replies)
+            except Exception as e:
+                self._fail(f"merging {command} round {round_id} failed ({e!r})")
+                return
+
+    def _complete_round(self, round_id: int, command: str, replies: List[Any]):
+        failures = [reply for reply in replies if isinstance(reply, Exception)]
+        for failure in failures:
+            self.errors += 1
+            logger.error(f"Shard failed on {command} round {round_id}: {failure}")
+        replies = [reply for reply in replies if not isinstance(reply, Exception)]
+
+        if command == _STATS:
+            self._finish(round_id, replies)
+            return
+
+        windows = self._merge(replies)
+        if windows and self.on_windows_closed:
+            try:
+                self.on_windows_closed(windows)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Windows callback failed: {e}")
+        if self.on_round_complete:
+            try:
+                self.on_round_complete(round_id, windows)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Round callback failed: {e}")
+        self._finish(round_id, windows if command == _FLUSH else None)
+
+    def _finish(self, round_id: int, result):
+        with self._progress:
+            self.rounds_completed += 1
+            if result is not None:
+                if round_id in self._abandoned:
+                    self._abandoned.discard(round_id)
+                else:
+                    self._round_windows[round_id] = result
+            self._progress.notify_all()
+        self._slots.release()
+
+    def _fail(self, reason: str):
+        """Stop accepting rounds and wake every caller blocked on a slot or a result"""
+        logger.error(f"Sharded MBO processor failed: {reason}")
+        with self._progress:
+            self._failure = reason
+            self._progress.notify_all()
+        self._slots.release()
+
+    def _merge(self, replies: List[List[Tuple[WindowKey, PressureWindow]]]) -> List[StrikePressureMetrics]:
+        """Combine shard partials of the same window and order by window end, then key"""
+        merged: Dict[WindowKey, PressureWindow] = {}
+        for partials in replies:
+            for window_key, window in partials:
+                existing = merged.get(window_key)
+                if existing is None:
+                    merged[window_key] = window
+                else:
+                    existing.merge(window)
+
+        window_ns = self.window_ns
+        windows = []
+        for window_key in sorted(merged, key=lambda key: (key[2] + window_ns, key)):
+            metrics = build_pressure_metrics(window_key, merged[window_key], self.window_minutes)
+            self.completed_metrics.append(metrics)
+            windows.append(metrics)
+        return windows
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every submitted round has been merged"""
+        with self._progress:
+            return self._progress.wait_for(
+                lambda: self.rounds_completed >= self.rounds_submitted or self._failure, timeout
+            ) and not self._failure
+
+
+def create_sharded_processor(shards: int = 4, window_minutes: int = 5) -> ShardedMBOProcessor:
+    """
+    Factory function to create and start a sharded MBO processor
+
+    Args:
+        shards: Worker processes (one per core is a good start)
+        window_minutes: Time window for pressure aggregation
+
+    Returns:
+        Started ShardedMBOProcessor
+    """
+    processor = ShardedMBOProcessor(shards, window_minutes)
+    processor.start()
+    return processor
@@ -6,17 +6,51 @@ PURPOSE: Load Nasdaq-100 options data from Polygon.io API
 
 This module provides access to Nasdaq-100 options data through Polygon.io API.
 Supports both NDX (index) and QQQ (ETF) options as alternatives to NQ futures options.
+
+The client shares one keep-alive session across a worker pool:
+- Token-bucket rate limit held across all concurrent workers
+- next_url pagination with the next page requested while the current one is consumed
+- Per-contract aggregate fan-out
+- On-disk response cache with TTL and ETag revalidation for reference
+  and aggregate endpoints (last trades are always fetched live, and
+  aggregate ranges reaching today are always revalidated)
 """
 
 import os
+import zlib
+import hashlib
+import logging
 import requests
+import threading
 import time
 import json
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlencode, urlparse
 from utils.timezone_utils import get_eastern_time, get_utc_time
-from typing import Dict, List, Optional, Any
+from utils.sqlite_store import get_store
+from typing import Callable, Dict, Iterator, List, Optional, Any
 from dataclasses import dataclass, asdict
 
+logger = logging.getLogger(__name__)
+
+# Largest page the options contracts endpoint returns
+MAX_PAGE_SIZE = 1000
+
+# Endpoint families served from the response cache; everything else
+# (last trade, quotes, snapshots) is always a live request
+CACHEABLE_PATH_PREFIXES = ('/v3/reference/', '/v2/aggs/')
+
+
+def _settled_before(to_date: str, today: str) -> bool:
+    """Whether an aggregate range ends on a YYYY-MM-DD date before today, so its bars are final"""
+    try:
+        datetime.strptime(to_date, '%Y-%m-%d')
+    except (TypeError, ValueError):
+        return False  # Millisecond timestamps and other forms are treated as still open
+    return to_date < today
+
 
 @dataclass
 class PolygonOptionsContract:
@@ -39,11 +73,128 @@ class PolygonOptionsContract:
     timestamp: str = None
 
 
+class TokenBucket:
+    """
+    Thread-safe token bucket
+
+    Every caller takes one token; callers that find the bucket empty reserve
+    the next token and sleep until it is due, so concurrent workers share
+    one rate and are served in arrival order.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Largest burst allowed after an idle period
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until it is available; returns seconds waited"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class PolygonResponseCache:
+    """
+    On-disk cache of Polygon responses
+
+    Responses younger than the TTL are served without a request. Older ones
+    are revalidated with their ETag / Last-Modified, so an unchanged
+    response costs a 304 instead of a full download.
+    """
+
+    def __init__(self, cache_dir: str = "outputs/polygon_cache", ttl_seconds: float = 300):
+        self.ttl_seconds = ttl_seconds
+        os.makedirs(cache_dir, exist_ok=True)
+        self.db_path = os.path.join(cache_dir, "polygon_responses.db")
+        self.store = get_store(self.db_path)
+        with self.store.connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS polygon_responses (
+                    cache_key TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    stored_at REAL NOT NULL,
+                    body BLOB NOT NULL
+                )
+            ''')
+
+    @staticmethod
+    def key(url: str, params: Dict[str, Any]) -> str:
+        """Cache key for a request (without the API key)"""
+        query = urlencode(sorted((k, str(v)) for k, v in params.items() if k != 'apiKey'))
+        return hashlib.sha256(f"{url}?{query}".encode()).hexdigest()
+
+    def get(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Stored response with its validators and a 'fresh' flag, or None"""
+        with self.store.connection() as conn:
+            row = conn.execute(
+                "SELECT etag, last_modified, stored_at, body FROM polygon_responses WHERE cache_key = ?",
+                (cache_key,)).fetchone()
+        if row is None:
+            return None
+        return {
+            'etag': row[0],
+            'last_modified': row[1],
+            'fresh': time.time() - row[2] < self.ttl_seconds,
+            'data': json.loads(zlib.decompress(row[3]))
+        }
+
+    def put(self, cache_key: str, url: str, data: Dict[str, Any],
+            etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        body = zlib.compress(json.dumps(data, separators=(',', ':')).encode())
+        self.store.execute_async('''
+            INSERT OR REPLACE INTO polygon_responses (cache_key, url, etag, last_modified, stored_at, body)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (cache_key, url, etag, last_modified, time.time(), body))
+
+    def touch(self, cache_key: str) -> None:
+        """Restart the TTL of a response the server confirmed unchanged"""
+        self.store.execute_async("UPDATE polygon_responses SET stored_at = ? WHERE cache_key = ?",
+                                 (time.time(), cache_key))
+
+
 class PolygonAPIClient:
     """Polygon.io API client for options data"""
 
-    def __init__(self, api_key: str = None):
-        """Initialize the Polygon client with API key"""
+    def __init__(self, api_key: str = None,
+                 requests_per_minute: Optional[float] = 5,
+                 burst: float = 1,
+                 max_workers: int = 4,
+                 pool_size: int = 10,
+                 cache_dir: Optional[str] = "outputs/polygon_cache",
+                 cache_ttl: float = 300,
+                 max_retries: int = 2,
+                 timeout: float = 30):
+        """
+        Initialize the Polygon client with API key
+
+        Args:
+            api_key: Polygon API key (default: POLYGON_API_KEY)
+            requests_per_minute: Rate shared by all workers, None for no limit (free tier: 5)
+            burst: Requests allowed back to back after an idle period
+            max_workers: Concurrent requests for pagination prefetch and fan-out
+            pool_size: Keep-alive connections held by the shared session
+            cache_dir: Response cache directory, None to disable caching
+            cache_ttl: Seconds a cached reference/aggregate response is served
+                without revalidation (aggregates ending today always revalidate)
+            max_retries: Retries after a 429 response
+            timeout: Request timeout in seconds
+        """
         self.api_key = api_key or os.getenv('POLYGON_API_KEY')
 
         if not self.api_key:
@@ -55,28 +206,102 @@ class PolygonAPIClient:
             'Content-Type': 'application/json'
         }
         self.last_request_time = 0
-        self.min_request_interval = 12  # 5 requests per minute = 12 seconds between requests
-
-    def _make_request(self, endpoint: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Make a request to the Polygon API with rate limiting"""
-        # Rate limiting
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
+        self.min_request_interval = 60 / requests_per_minute if requests_per_minute else 0
+        self.rate_limiter = TokenBucket(requests_per_minute / 60, burst) if requests_per_minute else None
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.timeout = timeout
+
+        # One keep-alive connection pool for every worker
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(pool_size, max_workers))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self.cache = PolygonResponseCache(cache_dir, cache_ttl) if cache_dir else None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            'requests': 0,
+            'cache_hits': 0,
+            'not_modified': 0,
+            'retries': 0,
+            'rate_limit_wait_seconds': 0.0
+        }
 
-        if time_since_last_request < self.min_request_interval:
-            sleep_time = self.min_request_interval - time_since_last_request
-            time.sleep(sleep_time)
+    def _count(self, stat: str, amount: float = 1) -> None:
+        with self._stats_lock:
+            self.stats[stat] += amount
+
+    def _submit(self, function: Callable, *args) -> Future:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="PolygonWorker")
+            return self._executor.submit(function, *args)
+
+    def close(self) -> None:
+        """Stop the worker pool and close pooled connections"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+        self.session.close()
+
+    def _make_request(self, endpoint: str, params: Dict[str, Any] = None,
+                      revalidate: bool = False) -> Dict[str, Any]:
+        """
+        Make a request to the Polygon API with rate limiting (endpoint may be a full next_url)
 
-        url = f"{self.base_url}{endpoint}"
+        revalidate skips the TTL for cacheable endpoints whose data may still
+        change: a cached response is only reused after a 304.
+        """
+        if endpoint.startswith(('http://', 'https://')):
+            url = endpoint
+        else:
+            url = f"{self.base_url}{endpoint}"
+        params = dict(params or {})
+
+        cache = self.cache if self.cache and urlparse(url).path.startswith(CACHEABLE_PATH_PREFIXES) else None
+        cache_key = cached = None
+        if cache:
+            cache_key = cache.key(url, params)
+            cached = cache.get(cache_key)
+            if cached and cached['fresh'] and not revalidate:
+                self._count('cache_hits')
+                return cached['data']
 
         # Add API key to params
-        if params is None:
-            params = {}
         params['apiKey'] = self.api_key
 
+        headers = {}
+        if cached:
+            if cached['etag']:
+                headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                headers['If-Modified-Since'] = cached['last_modified']
+
         try:
-            response = requests.get(url, params=params)
-            self.last_request_time = time.time()
+            for attempt in range(self.max_retries + 1):
+                # Rate limiting, shared by every worker
+                if self.rate_limiter:
+                    self._count('rate_limit_wait_seconds', self.rate_limiter.acquire())
+
+                response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+                self.last_request_time = time.time()
+                self._count('requests')
+
+                if response.status_code == 429 and attempt < self.max_retries:
+                    self._count('retries')
+                    retry_after = response.headers.get('Retry-After')
+                    time.sleep(float(retry_after) if retry_after else max(self.min_request_interval, 1))
+                    continue
+                break
+
+            if response.status_code == 304 and cached:
+                self._count('not_modified')
+                cache.touch(cache_key)
+                return cached['data']
 
             response.raise_for_status()
             data = response.json()
@@ -84,6 +309,9 @@ class PolygonAPIClient:
             if 'status' in data and data['status'] != 'OK':
                 raise Exception(f"API Error: {data.get('error', 'Unknown error')}")
 
+            if cache:
+                cache.put(cache_key, url, data, response.headers.get('ETag'),
+                          response.headers.get('Last-Modified'))
             return data
         except requests.exceptions.RequestException as e:
             raise Exception(f"API request failed: {e}")
@@ -99,13 +327,28 @@ class PolygonAPIClient:
             underlying_ticker: The underlying asset ticker (e.g., "NDX", "QQQ")
             contract_type: Type of contract ("call" or "put")
             expiration_date: Filter by expiration date (YYYY-MM-DD)
-            limit: Number of results to return
+            limit: Number of results to return (more than one page follows next_url)
+        """
+        contracts = []
+        for page in self.iter_options_contract_pages(underlying_ticker, contract_type, expiration_date, limit):
+            contracts.extend(page)
+        return contracts
+
+    def iter_options_contract_pages(self, underlying_ticker: str,
+                                    contract_type: str = None,
+                                    expiration_date: str = None,
+                                    limit: int = 100) -> Iterator[List[PolygonOptionsContract]]:
+        """
+        Yield options contracts page by page, following next_url
+
+        The next page is requested as soon as a page arrives, so it downloads
+        while the caller works on the current one.
         """
         endpoint = "/v3/reference/options/contracts"
 
         params = {
             'underlying_ticker': underlying_ticker,
-            'limit': limit,
+            'limit': min(limit, MAX_PAGE_SIZE),
             'order': 'desc',
             'sort': 'expiration_date'
         }
@@ -116,23 +359,37 @@ class PolygonAPIClient:
         if expiration_date:
             params['expiration_date'] = expiration_date
 
-        response = self._make_request(endpoint, params)
-        contracts = []
-
-        if 'results' in response:
-            timestamp = get_eastern_time().isoformat()
-            for contract_data in response['results']:
-                contract = PolygonOptionsContract(
-                    ticker=contract_data.get('ticker', ''),
-                    underlying_ticker=underlying_ticker,
-                    contract_type=contract_data.get('contract_type', ''),
-                    strike_price=float(contract_data.get('strike_price', 0)),
-                    expiration_date=contract_data.get('expiration_date', ''),
-                    timestamp=timestamp
-                )
-                contracts.append(contract)
-
-        return contracts
+        remaining = limit
+        pending = self._submit(self._make_request, endpoint, params)
+        try:
+            while pending is not None:
+                response = pending.result()
+                results = response.get('results', [])[:remaining]
+                remaining -= len(results)
+
+                next_url = response.get('next_url')
+                pending = None
+                if next_url and results and remaining > 0:
+                    pending = self._submit(self._make_request, next_url)
+
+                timestamp = get_eastern_time().isoformat()
+                yield [self._parse_contract(contract_data, underlying_ticker, timestamp)
+                       for contract_data in results]
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    @staticmethod
+    def _parse_contract(contract_data: Dict[str, Any], underlying_ticker: str,
+                        timestamp: str) -> PolygonOptionsContract:
+        return PolygonOptionsContract(
+            ticker=contract_data.get('ticker', ''),
+            underlying_ticker=underlying_ticker,
+            contract_type=contract_data.get('contract_type', ''),
+            strike_price=float(contract_data.get('strike_price', 0)),
+            expiration_date=contract_data.get('expiration_date', ''),
+            timestamp=timestamp
+        )
 
     def get_last_trade(self, ticker: str) -> Dict[str, Any]:
         """Get the last trade for an options contract"""
@@ -145,11 +402,12 @@ class PolygonAPIClient:
                       from_date: str = None,
                       to_date: str = None,
                       limit: int = 10) -> Dict[str, Any]:
-        """Get aggregate bars for an options contract"""
+        """Get aggregate bars for an options contract (ranges ending today are never served stale)"""
+        today = get_eastern_time().strftime('%Y-%m-%d')
         if not from_date:
-            from_date = get_eastern_time().strftime('%Y-%m-%d')
+            from_date = today
         if not to_date:
-            to_date = get_eastern_time().strftime('%Y-%m-%d')
+            to_date = today
 
         endpoint = f"/v2/aggs/ticker/{ticker}/range/{multiplier}/{timespan}/{from_date}/{to_date}"
 
@@ -159,7 +417,33 @@ class PolygonAPIClient:
             'limit': limit
         }
 
-        return self._make_request(endpoint, params)
+        return self._make_request(endpoint, params, revalidate=not _settled_before(to_date, today))
+
+    def get_aggregates_many(self, tickers: List[str],
+                            multiplier: int = 1,
+                            timespan: str = 'day',
+                            from_date: str = None,
+                            to_date: str = None,
+                            limit: int = 10) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Get aggregate bars for many contracts concurrently
+
+        Requests fan out over the worker pool and still share the rate limit.
+
+        Returns:
+            Dict of ticker -> aggregates response (None for failed tickers)
+        """
+        futures = {ticker: self._submit(self.get_aggregates, ticker, multiplier, timespan,
+                                        from_date, to_date, limit)
+                   for ticker in dict.fromkeys(tickers)}
+        results = {}
+        for ticker, future in futures.items():
+            try:
+                results[ticker] = future.result()
+            except Exception as e:
+                logger.warning(f"Aggregates failed for {ticker}: {e}")
+                results[ticker] = None
+        return results
 
 
 def load_polygon_api_data(config: Dict[str, Any]) -> Dict[str, Any]:
@@ -172,6 +456,8 @@ def load_polygon_api_data(config: Dict[str, Any]) -> Dict[str, Any]:
             - tickers: List of underlying tickers to fetch (default: ["NDX", "QQQ"])
             - limit: Number of contracts per ticker (default: 20)
             - include_pricing: Whether to fetch pricing data (default: False due to rate limits)
+            - requests_per_minute: API rate limit (default: 5, the free tier)
+            - cache_dir: Response cache directory (default: outputs/polygon_cache, None to disable)
 
     Returns:
         Dict with standardized options data
@@ -182,7 +468,9 @@ def load_polygon_api_data(config: Dict[str, Any]) -> Dict[str, Any]:
     limit = config.get('limit', 20)
     include_pricing = config.get('include_pricing', False)
 
-    client = PolygonAPIClient(api_key=api_key)
+    client = PolygonAPIClient(api_key=api_key,
+                              requests_per_minute=config.get('requests_per_minute', 5),
+                              cache_dir=config.get('cache_dir', "outputs/polygon_cache"))
 
     all_contracts = []
     source_summary = {}
@@ -216,6 +504,8 @@ def load_polygon_api_data(config: Dict[str, Any]) -> Dict[str, Any]:
                 'error': str(e)
             }
 
+    client.close()
+
     # Convert to standard format
     options_data = []
     for contract in all_contracts:
@@ -17,11 +17,11 @@ import time
 import schedule
 from datetime import datetime, timedelta, timezone, time as datetime_time
 from utils.timezone_utils import get_eastern_time, get_utc_time
+from utils.sqlite_store import get_store
 from typing import Dict, List, Any, Optional, Callable
 from dataclasses import dataclass, asdict
 from enum import Enum
 from pathlib import Path
-import sqlite3
 
 # Import baseline engine
 from baseline_calculation_engine import (
@@ -81,11 +81,12 @@ class JobDatabase:
         """Initialize job database"""
         self.db_path = db_path
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.store = get_store(self.db_path)
         self._init_database()
 
     def _init_database(self):
         """Initialize database schema"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
 
             cursor.execute("""
@@ -123,7 +124,7 @@ class JobDatabase:
 
     def record_execution(self, record: JobExecutionRecord):
         """Record job execution"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
 
             cursor.execute("""
@@ -154,7 +155,7 @@ class JobDatabase:
 
     def get_last_successful_run(self, job_type: str) -> Optional[JobExecutionRecord]:
         """Get last successful job execution"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
 
             cursor.execute("""
@@ -505,7 +506,7 @@ class ScheduledBaselineUpdater:
     def get_job_status(self) -> Dict[str, Any]:
         """Get current job status and history"""
         # Get recent job executions
-        with sqlite3.connect(self.job_database.db_path) as conn:
+        with self.job_database.store.connection() as conn:
             cursor = conn.cursor()
 
             cursor.execute("""
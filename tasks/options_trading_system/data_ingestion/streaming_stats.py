@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Streaming Statistics Accumulators
+
+Mergeable, serializable summaries for incremental baseline maintenance:
+- RunningStats: Welford mean/variance with Chan et al. parallel merge
+- QuantileDigest: merging t-digest for streaming percentiles, exact
+  (numpy linear interpolation) while every centroid is a single sample
+- LatencyHistogram: fixed log-linear buckets for integer latencies
+  (constant-time record, ~1.6% relative precision, mergeable)
+"""
+
+import math
+from bisect import bisect_right
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class RunningStats:
+    """Welford accumulator for count, mean and population variance"""
+
+    __slots__ = ('count', 'mean', 'm2')
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def merge(self, other: 'RunningStats'):
+        """Fold another accumulator into this one"""
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+
+    @property
+    def variance(self) -> float:
+        """Population variance (matches numpy's default ddof=0)"""
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(max(self.variance, 0.0))
+
+    def to_state(self) -> List[float]:
+        return [self.count, self.mean, self.m2]
+
+    @classmethod
+    def from_state(cls, state: List[float]) -> 'RunningStats':
+        return cls(int(state[0]), state[1], state[2])
+
+
+class QuantileDigest:
+    """
+    Merging t-digest
+
+    Centroids are (mean, weight) pairs kept sorted by mean. Small inputs
+    stay as weight-1 centroids, so percentiles equal numpy's linear
+    interpolation until the digest has to compress.
+    """
+
+    __slots__ = ('compression', 'means', 'weights', '_buffer')
+
+    def __init__(self, compression: int = 100):
+        self.compression = compression
+        self.means: List[float] = []
+        self.weights: List[float] = []
+        self._buffer: List[List[float]] = []
+
+    def add(self, value: float, weight: float = 1.0):
+        self._buffer.append([value, weight])
+        if len(self._buffer) > self.compression * 4:
+            self._compress()
+
+    def merge(self, other: 'QuantileDigest'):
+        """Fold another digest's centroids into this one"""
+        other._flush()
+        self._buffer.extend([m, w] for m, w in zip(other.means, other.weights))
+        if len(self._buffer) > self.compression * 4:
+            self._compress()
+
+    @property
+    def count(self) -> float:
+        self._flush()
+        return sum(self.weights)
+
+    def _flush(self):
+        if self._buffer:
+            self._compress()
+
+    def _compress(self):
+        points = sorted(self._buffer + [[m, w] for m, w in zip(self.means, self.weights)])
+        self._buffer = []
+        total = sum(w for _, w in points)
+
+        # Keep every sample while they fit; otherwise merge with the k1 size bound
+        if len(points) <= self.compression:
+            self.means = [m for m, _ in points]
+            self.weights = [w for _, w in points]
+            return
+
+        def scale(q: float) -> float:
+            return self.compression / (2 * math.pi) * math.asin(2 * min(max(q, 0.0), 1.0) - 1)
+
+        means, weights = [], []
+        cumulative = 0.0
+        current_mean, current_weight = points[0]
+        for mean, weight in points[1:]:
+            # A centroid may span at most one unit of the k1 scale function
+            q_left = cumulative / total
+            q_right = (cumulative + current_weight + weight) / total
+            if scale(q_right) - scale(q_left) <= 1.0:
+                current_weight += weight
+                current_mean += (mean - current_mean) * weight / current_weight
+            else:
+                means.append(current_mean)
+                weights.append(current_weight)
+                cumulative += current_weight
+                current_mean, current_weight = mean, weight
+        means.append(current_mean)
+        weights.append(current_weight)
+        self.means, self.weights = means, weights
+
+    def quantile(self, q: float) -> float:
+        """Value at quantile q (0..1)"""
+        self._flush()
+        means, weights = self.means, self.weights
+        if not means:
+            return 0.0
+        if len(means) == 1:
+            return means[0]
+
+        if all(w == 1 for w in weights):
+            # Exact: numpy's default linear interpolation between order statistics
+            position = q * (len(means) - 1)
+            lower = int(math.floor(position))
+            upper = min(lower + 1, len(means) - 1)
+            return means[lower] + (means[upper] - means[lower]) * (position - lower)
+
+        # Interpolate between centroid centres by cumulative weight
+        total = sum(weights)
+        target = q * total
+        centres = []
+        cumulative = 0.0
+        for weight in weights:
+            centres.append(cumulative + weight / 2)
+            cumulative += weight
+        if target <= centres[0]:
+            return means[0]
+        if target >= centres[-1]:
+            return means[-1]
+        index = bisect_right(centres, target) - 1
+        span = centres[index + 1] - centres[index]
+        fraction = (target - centres[index]) / span if span else 0.0
+        return means[index] + (means[index + 1] - means[index]) * fraction
+
+    def quantiles(self, qs: Iterable[float]) -> List[float]:
+        return [self.quantile(q) for q in qs]
+
+    def to_state(self) -> Dict[str, Any]:
+        self._flush()
+        return {'c': self.compression, 'm': self.means, 'w': self.weights}
+
+    @classmethod
+    def from_state(cls, state: Optional[Dict[str, Any]]) -> 'QuantileDigest':
+        digest = cls(state.get('c', 100) if state else 100)
+        if state:
+            digest.means = list(state['m'])
+            digest.weights = list(state['w'])
+        return digest
+
+
+class LatencyHistogram:
+    """
+    Log-linear histogram of non-negative integer latencies (e.g. nanoseconds)
+
+    Values below 2**SUB_BUCKET_BITS get exact buckets; above that every
+    power-of-two range is split into 2**(SUB_BUCKET_BITS - 1) equal
+    buckets, so a reported percentile is within ~1.6% of the true value.
+    Recording is a few integer operations and memory grows with the
+    log of the largest value, not the sample count.
+    """
+
+    SUB_BUCKET_BITS = 7
+    _SUB = 1 << SUB_BUCKET_BITS
+    _HALF = _SUB >> 1
+
+    __slots__ = ('counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.counts: List[int] = []
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    @classmethod
+    def _index(cls, value: int) -> int:
+        if value < cls._SUB:
+            return value
+        shift = value.bit_length() - cls.SUB_BUCKET_BITS
+        return cls._SUB + (shift - 1) * cls._HALF + (value >> shift) - cls._HALF
+
+    @classmethod
+    def _bounds(cls, index: int) -> Tuple[int, int]:
+        """Smallest and largest value recorded into a bucket"""
+        if index < cls._SUB:
+            return index, index
+        shift, offset = divmod(index - cls._SUB, cls._HALF)
+        top = offset + cls._HALF
+        return top << (shift + 1), ((top + 1) << (shift + 1)) - 1
+
+    def record(self, value: int, count: int = 1):
+        value = max(int(value), 0)
+        index = self._index(value)
+        counts = self.counts
+        if index >= len(counts):
+            counts.extend([0] * (index + 1 - len(counts)))
+        counts[index] += count
+        if not self.count or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.count += count
+        self.total += value * count
+
+    def merge(self, other: 'LatencyHistogram'):
+        """Fold another histogram's counts into this one"""
+        if not other.count:
+            return
+        if len(other.counts) > len(self.counts):
+            self.counts.extend([0] * (len(other.counts) - len(self.counts)))
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.min = other.min if not self.count else min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.count += other.count
+        self.total += other.total
+
+    def reset(self):
+        self.counts = []
+        self.count = self.total = self.min = self.max = 0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p: float) -> int:
+        """Value at percentile p (0..100), reported as its bucket midpoint"""
+        if not self.count:
+            return 0
+        rank = max(1, math.ceil(self.count * p / 100.0))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                low, high = self._bounds(index)
+                return min(max((low + high) // 2, self.min), self.max)
+        return self.max
+
+    def percentiles(self, ps: Iterable[float]) -> List[int]:
+        return [self.percentile(p) for p in ps]
+
+    def count_at_or_below(self, value: int) -> int:
+        """Samples recorded into buckets that lie entirely at or below value"""
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count:
+                if self._bounds(index)[1] > value:
+                    break
+                seen += count
+        return seen
+
+    def std(self) -> float:
+        """Population standard deviation from bucket midpoints"""
+        if self.count < 2:
+            return 0.0
+        mean = self.mean
+        squares = sum(count * ((low + high) / 2 - mean) ** 2 for low, high, count in self.buckets())
+        return math.sqrt(squares / self.count)
+
+    def buckets(self) -> Iterable[Tuple[int, int, int]]:
+        """(low, high, count) for every non-empty bucket, ascending"""
+        for index, count in enumerate(self.counts):
+            if count:
+                low, high = self._bounds(index)
+                yield low, high, count
+
+    def to_state(self) -> Dict[str, Any]:
+        return {'b': {i: c for i, c in enumerate(self.counts) if c},
+                'n': self.count, 't': self.total, 'lo': self.min, 'hi': self.max}
+
+    @classmethod
+    def from_state(cls, state: Optional[Dict[str, Any]]) -> 'LatencyHistogram':
+        histogram = cls()
+        if state:
+            for index, count in state['b'].items():
+                index = int(index)
+                if index >= len(histogram.counts):
+                    histogram.counts.extend([0] * (index + 1 - len(histogram.counts)))
+                histogram.counts[index] = count
+            histogram.count, histogram.total = state['n'], state['t']
+            histogram.min, histogram.max = state['lo'], state['hi']
+        return histogram
@@ -10,17 +10,22 @@ This module enhances the WebSocket streaming with automatic backfill capabilitie
 """
 
 import os
+import sys
 import json
 import logging
-import sqlite3
 import threading
 import time
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Any, Optional, Callable
+from typing import Dict, List, Any, Optional, Callable, Tuple
 from dataclasses import dataclass, asdict
 from collections import deque
+from operator import attrgetter
 import queue
 
+# Shared SQLite storage layer lives in the repository-level utils package
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))
+from utils.sqlite_store import get_store
+
 # Try importing databento
 try:
     import databento as db
@@ -79,11 +84,12 @@ class BackfillDatabase:
     def __init__(self, db_path: str = "outputs/backfill_tracking.db"):
         self.db_path = db_path
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.store = get_store(self.db_path)
         self._init_database()
 
     def _init_database(self):
         """Initialize database schema"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
 
             # Connection gaps table
@@ -141,7 +147,7 @@ class BackfillDatabase:
 
     def record_connection_gap(self, gap: ConnectionGap):
         """Record a connection gap"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
 
             cursor.execute("""
@@ -163,7 +169,7 @@ class BackfillDatabase:
 
     def record_backfill_request(self, request: BackfillRequest):
         """Record backfill request"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.store.connection() as conn:
             cursor = conn.cursor()
 
             cursor.execute("""
@@ -187,6 +193,131 @@ class BackfillDatabase:
 
             conn.commit()
 
+    def get_backfill_event_ids(self, start_time: datetime, end_time: datetime) -> List[str]:
+        """Event IDs already recorded within a time range (seeds the dedup index)"""
+        with self.store.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT event_id FROM backfill_events
+                WHERE timestamp >= ? AND timestamp <= ?
+            """, (start_time.isoformat(), end_time.isoformat()))
+            return [row[0] for row in cursor.fetchall()]
+
+    def record_backfill_events(self, rows: List[Tuple[str, str, str, str, str]]):
+        """Queue a chunk of (event_id, request_id, timestamp, symbol, event_type) rows"""
+        self.store.executemany_async("""
+            INSERT OR IGNORE INTO backfill_events
+            (event_id, request_id, timestamp, symbol, event_type)
+            VALUES (?, ?, ?, ?, ?)
+        """, rows)
+
+
+class BackfillDedupIndex:
+    """
+    In-memory deduplication index for one backfill gap
+
+    Events are keyed by (instrument_id, ts_event, sequence) so distinct
+    messages in the same nanosecond are not collapsed. The index is seeded
+    from the database for the gap's time range, so membership checks never
+    touch SQLite during replay. Rows recorded before sequence numbers were
+    part of the key ("{instrument_id}_{ts_event}") cover every message at
+    that nanosecond, as they did when they were written.
+    """
+
+    def __init__(self, seed_ids: Optional[List[str]] = None):
+        self._seen = set()
+        self._legacy = set()
+        for event_id in seed_ids or ():
+            if event_id.count('_') == 1:
+                self._legacy.add(event_id)
+            else:
+                self._seen.add(event_id)
+        self.seeded = len(self._seen) + len(self._legacy)
+        self.duplicates = 0
+
+    @classmethod
+    def from_database(cls, database: BackfillDatabase, start_time: datetime,
+                      end_time: datetime) -> 'BackfillDedupIndex':
+        return cls(database.get_backfill_event_ids(start_time, end_time))
+
+    def add(self, event_id: str) -> bool:
+        """Add an event ID; returns False if it was already seen"""
+        if event_id in self:
+            self.duplicates += 1
+            return False
+        self._seen.add(event_id)
+        return True
+
+    def add_event(self, instrument_id: Any, ts_event: Any, sequence: Any) -> Optional[str]:
+        """Add one MBO message; returns its event ID, or None if it was already seen"""
+        event_id = f"{instrument_id}_{ts_event}_{sequence}"
+        if event_id in self._seen or (self._legacy and f"{instrument_id}_{ts_event}" in self._legacy):
+            self.duplicates += 1
+            return None
+        self._seen.add(event_id)
+        return event_id
+
+    def __contains__(self, event_id: str) -> bool:
+        if event_id in self._seen or event_id in self._legacy:
+            return True
+        # A sequenced ID is also covered by a legacy row for its nanosecond
+        return bool(self._legacy) and event_id.rpartition('_')[0] in self._legacy
+
+    def __len__(self) -> int:
+        return len(self._seen) + len(self._legacy)
+
+
+# Attributes every Databento MBO record carries; symbol only exists on
+# records that have been mapped, so it is read separately
+_MBO_FIELDS = ('ts_event', 'ts_recv', 'instrument_id', 'action', 'side',
+               'price', 'size', 'order_id', 'flags', 'sequence')
+_get_mbo_fields = attrgetter(*_MBO_FIELDS)
+
+
+def _mbo_event_dict(event, backfill_timestamp: str) -> Dict[str, Any]:
+    """Convert a historical MBO record to the streaming event dictionary format"""
+    try:
+        ts_event, ts_recv, instrument_id, action, side, price, size, order_id, flags, sequence = \
+            _get_mbo_fields(event)
+    except AttributeError:
+        ts_event, ts_recv, instrument_id, action, side, price, size, order_id, flags, sequence = \
+            (getattr(event, name, None) for name in _MBO_FIELDS)
+
+    return {
+        'event_type': 'mbo',
+        'ts_event': ts_event,
+        'ts_recv': ts_recv,
+        'instrument_id': instrument_id,
+        'symbol': getattr(event, 'symbol', None),
+        'action': action,
+        'side': side,
+        'price': price,
+        'size': size,
+        'order_id': order_id,
+        'flags': flags,
+        'sequence': sequence,
+        '_source': 'databento_backfill',
+        '_backfill_timestamp': backfill_timestamp
+    }
+
+
+def _ns_to_iso(ts_ns: Optional[int], prefixes: Dict[int, str]) -> str:
+    """UTC ISO timestamp for nanoseconds since epoch, caching the per-second prefix"""
+    if not ts_ns:
+        return datetime.now(timezone.utc).isoformat()
+
+    seconds, nanos = divmod(ts_ns, 1_000_000_000)
+    prefix = prefixes.get(seconds)
+    if prefix is None:
+        prefix = datetime.fromtimestamp(seconds, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+        prefixes[seconds] = prefix
+
+    micros = nanos // 1000
+    # Matches datetime.isoformat(), which omits a zero fractional part
+    if micros:
+        return f"{prefix}.{micros:06d}+00:00"
+    return f"{prefix}+00:00"
+
 
 class BackfillManager:
     """
@@ -199,29 +330,35 @@ class BackfillManager:
     - Deduplication of overlapping data
     """
 
-    def __init__(self, api_key: str, max_backfill_cost: float = 20.0):
+    def __init__(self, api_key: str, max_backfill_cost: float = 20.0,
+                 replay_batch_size: int = 1000, persist_chunk_size: int = 10000):
         """
         Initialize backfill manager
 
         Args:
             api_key: Databento API key
             max_backfill_cost: Maximum cost for backfill operations per day
+            replay_batch_size: Events handed to the processor per batch
+            persist_chunk_size: Dedup rows written per executemany chunk
         """
         if not DATABENTO_AVAILABLE:
             raise ImportError("Databento package required for backfill operations")
 
         self.api_key = api_key
         self.max_backfill_cost = max_backfill_cost
+        self.replay_batch_size = replay_batch_size
+        self.persist_chunk_size = persist_chunk_size
         self.database = BackfillDatabase()
 
         # Tracking
-        self.last_event_timestamp: Optional[datetime] = None
+        self._last_event_ns = 0
         self.disconnect_time: Optional[datetime] = None
         self.daily_backfill_cost = 0.0
         self.backfill_requests: deque = deque(maxlen=100)
 
-        # Callbacks
+        # Callbacks (on_backfill_batch takes precedence over per-event delivery)
         self.on_backfill_event: Optional[Callable[[Dict], None]] = None
+        self.on_backfill_batch: Optional[Callable[[List[Dict]], None]] = None
         self.on_backfill_complete: Optional[Callable[[BackfillRequest], None]] = None
 
         # Cost estimation (rough Databento pricing)
@@ -234,6 +371,25 @@ class BackfillManager:
         """Track the timestamp of the last received event"""
         self.last_event_timestamp = event_timestamp
 
+    def track_event_ns(self, ts_event: int):
+        """Track the last event by its nanosecond timestamp (datetime built on demand)"""
+        self._last_event_ns = ts_event
+
+    @property
+    def last_event_timestamp(self) -> Optional[datetime]:
+        if not self._last_event_ns:
+            return None
+        seconds, nanos = divmod(self._last_event_ns, 1_000_000_000)
+        return datetime.fromtimestamp(seconds, tz=timezone.utc).replace(microsecond=nanos // 1000)
+
+    @last_event_timestamp.setter
+    def last_event_timestamp(self, value: Optional[datetime]):
+        if value is None:
+            self._last_event_ns = 0
+        else:
+            epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+            self._last_event_ns = (value - epoch) // timedelta(microseconds=1) * 1000
+
     def on_disconnect(self):
         """Handle disconnection - record disconnect time"""
         self.disconnect_time = datetime.now(timezone.utc)
@@ -337,23 +493,7 @@ class BackfillManager:
             )
 
             # Process backfill data
-            events_processed = 0
-            for event in data:
-                # Create event dictionary
-                event_dict = self._convert_historical_event(event)
-
-                # Check for duplicates
-                event_id = f"{event_dict.get('instrument_id')}_{event_dict.get('ts_event')}"
-                if not self._is_duplicate_event(event_id, request.request_id):
-                    # Send to callback
-                    if self.on_backfill_event:
-                        event_dict['_backfill'] = True  # Mark as backfill data
-                        self.on_backfill_event(event_dict)
-
-                    events_processed += 1
-
-                    # Record event for deduplication
-                    self._record_backfill_event(event_id, request.request_id, event_dict)
+            events_processed = self._replay_events(data, request)
 
             # Complete request
             request.status = "COMPLETED"
@@ -379,65 +519,63 @@ class BackfillManager:
             self.database.record_backfill_request(request)
             self.backfill_requests.append(request)
 
-    def _convert_historical_event(self, event) -> Dict[str, Any]:
-        """Convert historical event to dictionary format"""
-        # Similar to WebSocket conversion
-        event_dict = {
-            'event_type': 'mbo',
-            'ts_event': getattr(event, 'ts_event', None),
-            'ts_recv': getattr(event, 'ts_recv', None),
-            'instrument_id': getattr(event, 'instrument_id', None),
-            'symbol': getattr(event, 'symbol', None),
-            'action': getattr(event, 'action', None),
-            'side': getattr(event, 'side', None),
-            'price': getattr(event, 'price', None),
-            'size': getattr(event, 'size', None),
-            'order_id': getattr(event, 'order_id', None),
-            'flags': getattr(event, 'flags', None),
-            'sequence': getattr(event, 'sequence', None),
-            '_source': 'databento_backfill',
-            '_backfill_timestamp': datetime.now(timezone.utc).isoformat()
-        }
-
-        return event_dict
-
-    def _is_duplicate_event(self, event_id: str, request_id: str) -> bool:
-        """Check if event is duplicate"""
-        with sqlite3.connect(self.database.db_path) as conn:
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                SELECT COUNT(*) FROM backfill_events
-                WHERE event_id = ?
-            """, (event_id,))
-
-            count = cursor.fetchone()[0]
-            return count > 0
-
-    def _record_backfill_event(self, event_id: str, request_id: str, event_dict: Dict):
-        """Record backfill event for deduplication"""
-        with sqlite3.connect(self.database.db_path) as conn:
-            cursor = conn.cursor()
-
-            timestamp = event_dict.get('ts_event')
-            if timestamp:
-                timestamp = datetime.fromtimestamp(timestamp / 1e9, tz=timezone.utc).isoformat()
-            else:
-                timestamp = datetime.now(timezone.utc).isoformat()
-
-            cursor.execute("""
-                INSERT OR IGNORE INTO backfill_events
-                (event_id, request_id, timestamp, symbol, event_type)
-                VALUES (?, ?, ?, ?, ?)
-            """, (
-                event_id,
-                request_id,
-                timestamp,
-                event_dict.get('symbol', ''),
-                event_dict.get('action', '')
-            ))
+    def _replay_events(self, data, request: BackfillRequest) -> int:
+        """
+        Stream historical events through dedup into the processor in batches
 
-            conn.commit()
+        Duplicate checks hit the in-memory index only; dedup rows are
+        persisted in executemany chunks by the shared store's writer.
+        """
+        dedup = BackfillDedupIndex.from_database(self.database, request.start_time, request.end_time)
+        add_event = dedup.add_event
+        backfill_timestamp = datetime.now(timezone.utc).isoformat()
+        request_id = request.request_id
+        deliver = self.on_backfill_batch is not None or self.on_backfill_event is not None
+        batch_size = self.replay_batch_size
+        chunk_size = self.persist_chunk_size
+        second_prefixes: Dict[int, str] = {}
+
+        events_processed = 0
+        batch: List[Dict[str, Any]] = []
+        rows: List[Tuple[str, str, str, str, str]] = []
+
+        for event in data:
+            event_dict = _mbo_event_dict(event, backfill_timestamp)
+            ts_event = event_dict['ts_event']
+            event_id = add_event(event_dict['instrument_id'], ts_event, event_dict['sequence'])
+            if event_id is None:
+                continue
+            events_processed += 1
+
+            if deliver:
+                event_dict['_backfill'] = True  # Mark as backfill data
+                batch.append(event_dict)
+                if len(batch) >= batch_size:
+                    self._dispatch_backfill_batch(batch)
+                    batch = []
+
+            rows.append((event_id, request_id, _ns_to_iso(ts_event, second_prefixes),
+                         event_dict['symbol'] or '', event_dict['action'] or ''))
+            if len(rows) >= chunk_size:
+                self.database.record_backfill_events(rows)
+                rows = []
+
+        if batch:
+            self._dispatch_backfill_batch(batch)
+        if rows:
+            self.database.record_backfill_events(rows)
+        # No flush here: the next from_database() read flushes the store first
+
+        logger.info(f"Backfill dedup: {dedup.seeded} seeded, {dedup.duplicates} duplicates skipped")
+        return events_processed
+
+    def _dispatch_backfill_batch(self, batch: List[Dict[str, Any]]):
+        """Hand a batch of backfill events to the processor"""
+        if self.on_backfill_batch:
+            self.on_backfill_batch(batch)
+        elif self.on_backfill_event:
+            for event_dict in batch:
+                self.on_backfill_event(event_dict)
 
     def get_backfill_statistics(self) -> Dict[str, Any]:
         """Get backfill operation statistics"""
@@ -455,7 +593,7 @@ class BackfillManager:
         success_rate = len(completed_requests) / total_requests if total_requests > 0 else 0
 
         # Gap analysis
-        with sqlite3.connect(self.database.db_path) as conn:
+        with self.database.store.connection() as conn:
             cursor = conn.cursor()
 
             cursor.execute("""
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Backtest Replay Performance Tests
+
+Validates that the columnar replay core reproduces the original
+DataFrame replay (groupby snapshots, iterrows signals, per-position
+DataFrame scans) trade for trade, and reports snapshots per second on a
+60-day NQ options history.
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+from dataclasses import asdict
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Add necessary paths
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'tasks', 'options_trading_system', 'analysis_engine'))
+
+from strategies.historical_backtester import (
+    HistoricalBacktester, BacktestConfig, BacktestResults, MarketRegime
+)
+from strategies.options_replay import OptionsHistory
+
+STRIKES = np.arange(21000, 21700, 25)
+
+
+def make_options_history(start: datetime, days: int, seed: int = 8) -> pd.DataFrame:
+    """Synthetic NQ chain in HistoricalDataLoader's row layout, with vol/OI spikes"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start, periods=days * 24 * 12, freq='5min')
+    dates = dates[(dates.dayofweek < 5) & (dates.hour >= 9) & (dates.hour < 16)]
+
+    timestamps = np.repeat(dates.values, len(STRIKES) * 2)
+    strikes = np.tile(np.repeat(STRIKES, 2), len(dates))
+    types = np.tile(['CALL', 'PUT'], len(dates) * len(STRIKES))
+    base = np.repeat(21350 + np.sin(dates.hour.values) * 50, len(STRIKES) * 2)
+    intrinsic = np.where(types == 'CALL', np.maximum(0, base - strikes), np.maximum(0, strikes - base))
+    mid = intrinsic + np.abs(base - strikes) * 0.01 + rng.uniform(1, 5, len(base))
+    volume = np.where(np.abs(base - strikes) < 100, rng.poisson(100, len(base)), rng.poisson(20, len(base)))
+    open_interest = rng.integers(100, 5000, len(base))
+    hot = rng.random(len(base)) < 0.01
+    volume[hot], open_interest[hot] = 8000, 600
+
+    return pd.DataFrame({
+        'timestamp': timestamps, 'symbol': 'NQM25', 'strike': strikes, 'option_type': types,
+        'bid': mid - 0.5, 'ask': mid + 0.5, 'last': mid, 'volume': volume,
+        'open_interest': open_interest, 'underlying_price': base
+    })
+
+
+def make_market_data(start: datetime, days: int, seed: int = 3) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start, periods=days, freq='D')
+    return pd.DataFrame({'date': dates, 'vix': np.maximum(10, 15 + rng.normal(0, 6, days)),
+                         'market_volume': rng.normal(1e6, 2e5, days),
+                         'spy_return': rng.normal(-0.002, 0.02, days)})
+
+
+class LegacyReplay:
+    """The original DataFrame replay loop, kept as the reference"""
+
+    def __init__(self, backtester: HistoricalBacktester):
+        self.bt = backtester
+
+    def simulate(self, algorithm_version, config, options_data, market_data):
+        results = BacktestResults(backtest_id='legacy', algorithm_version=algorithm_version, config=config)
+        portfolio = {'capital': config.initial_capital, 'positions': {}, 'equity_curve': [],
+                     'peak_equity': config.initial_capital}
+        for date, day_data in options_data.groupby(options_data['timestamp'].dt.date):
+            regime = self.bt.regime_detector.detect_regime(market_data[market_data['date'] <= pd.Timestamp(date)])
+            for timestamp, snapshot in day_data.groupby('timestamp'):
+                for signal in self.generate_signals(algorithm_version, snapshot, portfolio, regime):
+                    trade = self.bt._execute_trade(signal, portfolio, config, timestamp, regime)
+                    if trade:
+                        results.trades.append(trade)
+                self.update_positions(portfolio, snapshot, timestamp)
+                equity = self.calculate_equity(portfolio, snapshot)
+                portfolio['equity_curve'].append({'timestamp': timestamp, 'equity': equity,
+                                                  'cash': portfolio['capital'],
+                                                  'positions_value': equity - portfolio['capital']})
+                portfolio['peak_equity'] = max(portfolio['peak_equity'], equity)
+        self.bt._calculate_metrics(results, portfolio)
+        return results
+
+    @staticmethod
+    def generate_signals(algorithm_version, snapshot, portfolio, regime):
+        signals = []
+        active = snapshot[(snapshot['volume'] > 100) & (snapshot['open_interest'] > 500)].copy()
+        active['vol_oi_ratio'] = active['volume'] / active['open_interest']
+        if algorithm_version == "v1.0":
+            for _, opt in active[active['vol_oi_ratio'] > 10].iterrows():
+                signals.append({'symbol': opt['symbol'], 'strike': opt['strike'],
+                                'option_type': opt['option_type'], 'direction': 'LONG',
+                                'confidence': min(opt['vol_oi_ratio'] / 50, 1.0),
+                                'entry_price': opt['ask'], 'signal_strength': opt['vol_oi_ratio']})
+        elif algorithm_version == "v3.0":
+            threshold = 5 if regime in [MarketRegime.BEAR_VOLATILE, MarketRegime.CRASH] else 10
+            for _, opt in active[active['vol_oi_ratio'] > threshold].iterrows():
+                if regime in [MarketRegime.BEAR_QUIET, MarketRegime.BEAR_VOLATILE]:
+                    direction = 'SHORT' if opt['option_type'] == 'PUT' else 'LONG'
+                else:
+                    direction = 'LONG' if opt['option_type'] == 'CALL' else 'SHORT'
+                confidence = min(min(opt['vol_oi_ratio'] / 50, 0.8) +
+                                 (0.1 if regime != MarketRegime.SIDEWAYS else 0), 0.95)
+                signals.append({'symbol': opt['symbol'], 'strike': opt['strike'],
+                                'option_type': opt['option_type'], 'direction': direction,
+                                'confidence': confidence,
+                                'entry_price': opt['ask'] if direction == 'LONG' else opt['bid'],
+                                'signal_strength': opt['vol_oi_ratio'] *
+                                (1.2 if regime != MarketRegime.SIDEWAYS else 1.0)})
+        return signals[:portfolio.get('max_positions', 10) - len(portfolio['positions'])]
+
+    @staticmethod
+    def _price(snapshot, trade):
+        rows = snapshot[(snapshot['symbol'] == trade.symbol) & (snapshot['strike'] == trade.strike) &
+                        (snapshot['option_type'] == trade.option_type)]
+        return None if rows.empty else rows.iloc[0]['last']
+
+    def update_positions(self, portfolio, snapshot, timestamp):
+        closed = []
+        for key, trade in portfolio['positions'].items():
+            price = self._price(snapshot, trade)
+            if price is None:
+                continue
+            long = trade.side == "LONG"
+            if (price <= trade.stop_loss_price) if long else (price >= trade.stop_loss_price):
+                reason = "stop_loss"
+            elif (price >= trade.take_profit_price) if long else (price <= trade.take_profit_price):
+                reason = "take_profit"
+            else:
+                continue
+            trade.exit_time, trade.exit_price, trade.exit_reason = timestamp, price, reason
+            trade.gross_pnl = ((price - trade.entry_price) if long else (trade.entry_price - price)) \
+                * trade.quantity * 100
+            trade.net_pnl = trade.gross_pnl - trade.commission - trade.slippage
+            portfolio['capital'] += trade.net_pnl + trade.entry_price * trade.quantity * 100
+            closed.append(key)
+        for key in closed:
+            del portfolio['positions'][key]
+
+    def calculate_equity(self, portfolio, snapshot):
+        equity = portfolio['capital']
+        for trade in portfolio['positions'].values():
+            price = self._price(snapshot, trade)
+            if price is not None:
+                equity += (price if trade.side == "LONG" else 2 * trade.entry_price - price) * trade.quantity * 100
+        return equity
+
+
+class TestColumnarReplay(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.output_dir = tempfile.mkdtemp()
+        cls.backtester = HistoricalBacktester(cls.output_dir)
+        cls.start = datetime(2024, 1, 1)
+        cls.options = make_options_history(cls.start, 4)
+        cls.market = make_market_data(cls.start, 4)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.output_dir, ignore_errors=True)
+
+    def assert_same_replay(self, algorithm, config, options):
+        expected = LegacyReplay(self.backtester).simulate(algorithm, config, options, self.market)
+        actual = self.backtester.simulate(algorithm, config, options, self.market)
+
+        self.assertEqual([asdict(t) for t in actual.trades], [asdict(t) for t in expected.trades])
+        pd.testing.assert_frame_equal(pd.DataFrame(actual.equity_curve), pd.DataFrame(expected.equity_curve))
+        self.assertEqual(actual.sharpe_ratio, expected.sharpe_ratio)
+        return len(expected.trades)
+
+    def test_matches_legacy_replay(self):
+        trades = 0
+        for algorithm in ('v1.0', 'v3.0'):
+            for sizing in ('fixed', 'kelly'):
+                config = BacktestConfig(start_date=self.start, end_date=datetime(2024, 1, 5),
+                                        position_sizing=sizing, stop_loss=0.05, take_profit=0.1)
+                trades += self.assert_same_replay(algorithm, config, self.options)
+        self.assertGreater(trades, 100)
+
+    def test_unsorted_rows_with_missing_quotes(self):
+        rng = np.random.default_rng(2)
+        # Drop quotes so positions go unmarked, then shuffle whole snapshots
+        options = self.options[rng.random(len(self.options)) > 0.2]
+        snapshots = [group for _, group in options.groupby('timestamp')]
+        shuffled = pd.concat([snapshots[i] for i in rng.permutation(len(snapshots))])
+        config = BacktestConfig(start_date=self.start, end_date=datetime(2024, 1, 5))
+
+        expected = LegacyReplay(self.backtester).simulate('v3.0', config, options, self.market)
+        actual = self.backtester.simulate('v3.0', config, shuffled, self.market)
+        self.assertEqual([asdict(t) for t in actual.trades], [asdict(t) for t in expected.trades])
+        pd.testing.assert_frame_equal(pd.DataFrame(actual.equity_curve), pd.DataFrame(expected.equity_curve))
+
+    def test_history_index(self):
+        history = OptionsHistory(self.options)
+        snapshot = history.snapshot(3)
+        self.assertEqual(len(snapshot), len(STRIKES) * 2)
+        row = snapshot.row_for('NQM25', 21350, 'PUT')
+        self.assertEqual((history.strike[row], history.option_type[row]), (21350, 'PUT'))
+        self.assertIsNone(snapshot.row_for('NQM25', 99999, 'PUT'))
+        self.assertEqual(history.snapshot_count, self.options['timestamp'].nunique())
+
+
+def run_benchmark(days: int = 60, legacy_days: int = 3):
+    """Print snapshots/sec for the DataFrame replay and the columnar core"""
+    start = datetime(2024, 1, 1)
+    options = make_options_history(start, days)
+    market = make_market_data(start, days)
+    output_dir = tempfile.mkdtemp()
+    try:
+        backtester = HistoricalBacktester(output_dir)
+        config = BacktestConfig(start_date=start, end_date=datetime(2024, 3, 1))
+        legacy_options = options[options['timestamp'] < pd.Timestamp(start) + pd.Timedelta(days=legacy_days)]
+
+        print(f"\n{'replay':<18} {'rows':>10} {'snapshots':>10} {'seconds':>9} {'snapshots/sec':>14}")
+        started = time.perf_counter()
+        LegacyReplay(backtester).simulate('v3.0', config, legacy_options, market)
+        elapsed = time.perf_counter() - started
+        snapshots = legacy_options['timestamp'].nunique()
+        print(f"{'DataFrame':<18} {len(legacy_options):>10,} {snapshots:>10,} {elapsed:>9.2f} "
+              f"{snapshots / elapsed:>14,.0f}")
+
+        started = time.perf_counter()
+        results = backtester.simulate('v3.0', config, options, market)
+        elapsed = time.perf_counter() - started
+        snapshots = len(results.equity_curve)
+        print(f"{'columnar':<18} {len(options):>10,} {snapshots:>10,} {elapsed:>9.2f} "
+              f"{snapshots / elapsed:>14,.0f}")
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    print("⏪ Backtest Replay Benchmark")
+    run_benchmark()
+    unittest.main(verbosity=2)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Bar Store Performance Tests
+
+Validates FiveMinuteBarStore range handling against full-window
+aggregation and simulates 30-second dashboard refreshes, comparing bytes
+fetched with re-downloading the whole window each time.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+# Add necessary paths
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'scripts'))
+
+from bar_store import FiveMinuteBarStore, OHLCV_RECORD_SIZE
+from data_aggregation import aggregate_1min_to_5min
+
+EPOCH = datetime(2025, 6, 16, 13, 30, tzinfo=timezone.utc)
+
+
+def make_minutes(days: int = 2, seed: int = 5) -> pd.DataFrame:
+    """Synthetic 1-minute OHLCV bars (the shape of DBNStore.to_df())"""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(EPOCH, periods=days * 24 * 60, freq='1min', tz='UTC')
+    close = 21000 + np.cumsum(rng.normal(0, 2, len(index)))
+    return pd.DataFrame({
+        'open': close - rng.normal(0, 1, len(index)), 'high': close + 3,
+        'low': close - 3, 'close': close, 'volume': rng.integers(1, 500, len(index))
+    }, index=index)
+
+
+class FakeTimeseries:
+    """Serves get_range-style slices of a fixed minute series and logs calls"""
+
+    def __init__(self, minutes: pd.DataFrame):
+        self.minutes = minutes
+        self.calls = []
+
+    def fetch(self, symbol, start, end):
+        self.calls.append((start, end))
+        index = self.minutes.index
+        bars = self.minutes.iloc[index.searchsorted(pd.Timestamp(start)):index.searchsorted(pd.Timestamp(end))]
+        return bars.copy(), len(bars) * OHLCV_RECORD_SIZE
+
+
+class TestFiveMinuteBarStore(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.minutes = make_minutes()
+        self.source = FakeTimeseries(self.minutes)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def expected(self, start, end):
+        index = self.minutes.index
+        return aggregate_1min_to_5min(
+            self.minutes.iloc[index.searchsorted(pd.Timestamp(start)):index.searchsorted(pd.Timestamp(end))])
+
+    def test_sliding_window_fetches_only_tail(self):
+        store = FiveMinuteBarStore(cache_dir=None)
+        start, end = EPOCH + timedelta(hours=2), EPOCH + timedelta(hours=6)
+        pd.testing.assert_frame_equal(store.get_5min_bars('NQM5', start, end, self.source.fetch),
+                                      self.expected(start, end))
+
+        for step in range(1, 6):
+            shifted = (start + timedelta(seconds=30 * step), end + timedelta(seconds=30 * step))
+            pd.testing.assert_frame_equal(store.get_5min_bars('NQM5', *shifted, self.source.fetch),
+                                          self.expected(*shifted))
+            self.assertEqual(self.source.calls[-1][0], end + timedelta(seconds=30 * (step - 1)))
+
+        # A window inside the covered range is a pure hit
+        store.get_5min_bars('NQM5', start + timedelta(hours=1), end, self.source.fetch)
+        stats = store.get_stats()
+        self.assertEqual((stats['misses'], stats['partial_hits'], stats['cache_hits']), (1, 5, 1))
+        self.assertEqual(stats['api_requests'], 6)
+
+    def test_head_extension_and_disjoint_reset(self):
+        store = FiveMinuteBarStore(cache_dir=None)
+        store.get_5min_bars('NQM5', EPOCH + timedelta(hours=4), EPOCH + timedelta(hours=6), self.source.fetch)
+        start, end = EPOCH + timedelta(hours=1), EPOCH + timedelta(hours=7)
+        pd.testing.assert_frame_equal(store.get_5min_bars('NQM5', start, end, self.source.fetch),
+                                      self.expected(start, end))
+
+        later = (EPOCH + timedelta(hours=30), EPOCH + timedelta(hours=32))
+        pd.testing.assert_frame_equal(store.get_5min_bars('NQM5', *later, self.source.fetch),
+                                      self.expected(*later))
+        self.assertEqual(store.get_stats()['misses'], 2)
+
+    def test_bounded_and_persisted(self):
+        store = FiveMinuteBarStore(cache_dir=self.temp_dir, max_symbols=2, max_bars_per_symbol=600)
+        window = (EPOCH, EPOCH + timedelta(hours=12))
+        for symbol in ('NQM5', 'ESM5', 'NQU5'):
+            store.get_5min_bars(symbol, *window, self.source.fetch)
+
+        stats = store.get_stats()
+        self.assertEqual(stats['symbols_cached'], 2)
+        self.assertEqual(stats['bars_cached'], 1200)
+        self.assertEqual(stats['evictions'], 1)
+
+        # A new store reloads the trimmed series from disk
+        calls = len(self.source.calls)
+        reloaded = FiveMinuteBarStore(cache_dir=self.temp_dir)
+        recent = (EPOCH + timedelta(hours=11), EPOCH + timedelta(hours=12))
+        pd.testing.assert_frame_equal(reloaded.get_5min_bars('NQM5', *recent, self.source.fetch),
+                                      self.expected(*recent))
+        self.assertEqual(len(self.source.calls), calls)
+        self.assertIsNotNone(reloaded.latest_5min_bars('NQM5', hours_back=1))
+
+
+def run_benchmark(window_hours: int = 24, refreshes: int = 240):
+    """Print bytes and requests for an hour-long run of 30-second refreshes"""
+    minutes = make_minutes(days=3)
+    end = EPOCH + timedelta(hours=window_hours + 2)
+    print(f"\n{'path':<20} {'api requests':>12} {'bytes fetched':>14} {'MB':>8}")
+
+    legacy_bytes = 0
+    source = FakeTimeseries(minutes)
+    for step in range(refreshes):
+        stop = end + timedelta(seconds=30 * step)
+        _, nbytes = source.fetch('NQM5', stop - timedelta(hours=window_hours), stop)
+        legacy_bytes += nbytes
+    print(f"{'full re-download':<20} {refreshes:>12,} {legacy_bytes:>14,} {legacy_bytes / 1e6:>8.2f}")
+
+    source = FakeTimeseries(minutes)
+    store = FiveMinuteBarStore(cache_dir=None)
+    for step in range(refreshes):
+        stop = end + timedelta(seconds=30 * step)
+        store.get_5min_bars('NQM5', stop - timedelta(hours=window_hours), stop, source.fetch)
+    stats = store.get_stats()
+    print(f"{'bar store':<20} {stats['api_requests']:>12,} {stats['bytes_fetched']:>14,} "
+          f"{stats['bytes_fetched'] / 1e6:>8.2f}")
+    return {"legacy_bytes": legacy_bytes, "store_bytes": stats['bytes_fetched']}
+
+
+if __name__ == '__main__':
+    print("🗃️ Bar Store Refresh Benchmark")
+    run_benchmark()
+    unittest.main(verbosity=2)
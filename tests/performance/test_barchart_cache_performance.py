@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Barchart Cache Storage Performance Tests
+
+Checks the SQLite-backed BarchartCacheManager: chains round-trip through
+compressed blobs, successive snapshots of a symbol only write the
+contracts that changed, the running size counter matches the stored
+bytes, eviction follows least-recent use, expiry still goes through the
+market-hours TTL, and old JSON-file caches are migrated. The benchmark
+compares saves against the previous pretty-JSON file and index layout.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import tempfile
+import unittest
+from datetime import timedelta
+
+# Add necessary paths
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'tasks', 'options_trading_system', 'data_ingestion'))
+
+from utils.sqlite_store import get_store
+from utils.timezone_utils import get_eastern_time
+from barchart_web_scraper.cache_manager import BarchartCacheManager
+
+logging.getLogger('barchart_web_scraper.cache_manager').setLevel(logging.CRITICAL)
+
+
+def make_chain(symbol, strikes=100, seed=0, changed=()):
+    """Barchart-shaped options chain (raw=1); `changed` strikes get a new last price"""
+    rng = random.Random(seed)
+    groups = {}
+    for option_type in ('Call', 'Put'):
+        rows = []
+        for i in range(strikes):
+            strike = 21000 + i * 25
+            raw = {
+                'strike': strike, 'openPrice': 100.25 + i, 'highPrice': 110.5 + i, 'lowPrice': 95.0 + i,
+                'lastPrice': round(101.75 + i + (rng.random() if strike in changed else 0), 2),
+                'priceChange': -1.25, 'bidPrice': 101.5 + i, 'askPrice': 102.0 + i,
+                'volume': i * 3, 'openInterest': i * 11, 'premium': 2035 + i * 20, 'tradeTime': 1718900000 + i,
+                'longSymbol': f"Nasdaq 100 E-Mini {symbol} {strike} {option_type}", 'optionType': option_type,
+                'symbol': f"{symbol}|{strike}{option_type[0]}", 'symbolCode': 'FUTOPT', 'symbolType': 34
+            }
+            row = {field: f"{value:,.2f}" if isinstance(value, float) else value for field, value in raw.items()}
+            row['raw'] = raw
+            rows.append(row)
+        groups[option_type] = rows
+    return {'count': strikes * 2, 'total': strikes * 2, 'data': groups,
+            'meta': {'lists': {'lastUpdate': 1718900000}}}
+
+
+class TestBarchartCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.temp_dir.name, 'cache')
+        self.cache = BarchartCacheManager(cache_dir=self.cache_dir)
+
+    def tearDown(self):
+        get_store(self.cache.db_path).close()
+        self.temp_dir.cleanup()
+
+    def _stored_bytes(self, cache):
+        with cache.store.connection() as conn:
+            return (conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0] +
+                    conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_contracts").fetchone()[0])
+
+    def _contract_rows(self):
+        with self.cache.store.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM cache_contracts").fetchone()[0]
+
+    def test_round_trip_and_compression(self):
+        chain = make_chain('MC7M25')
+        self.cache.save('MC7M25', 'NQM25', chain)
+        self.assertEqual(self.cache.get('MC7M25', 'NQM25'), chain)
+        self.assertLess(self.cache.total_size, len(json.dumps(chain, indent=2)) / 3)
+
+        # Flat lists and payloads without contracts round-trip too
+        flat = {'total': 2, 'data': [{'strike': 1}, {'strike': 2}]}
+        self.cache.save('FLAT', 'NQM25', flat)
+        self.assertEqual(self.cache.get('FLAT', 'NQM25'), flat)
+        self.cache.save('EMPTY', 'NQM25', {'total': 0})
+        self.assertEqual(self.cache.get('EMPTY', 'NQM25'), {'total': 0})
+        self.assertIsNone(self.cache.get('MISSING', 'NQM25'))
+        self.assertEqual(self.cache.get_stats()['hits'], 3)
+
+    def test_snapshots_share_unchanged_contracts(self):
+        self.cache.save('MC7M25', 'NQM25', make_chain('MC7M25'))
+        self.assertEqual(self.cache.stats['contracts_written'], 200)
+
+        changed = {21000, 21025, 21050, 21075, 21100}
+        snapshot = make_chain('MC7M25', seed=1, changed=changed)
+        self.cache.save('MC7M25', 'NQM25', snapshot)
+        self.assertEqual(self.cache.stats['contracts_written'], 210)   # Call and Put of each changed strike
+        self.assertEqual(self.cache.stats['contracts_reused'], 190)
+        self.assertEqual(self._contract_rows(), 200)                   # Superseded contracts are gone
+        self.assertEqual(self.cache.get('MC7M25', 'NQM25'), snapshot)
+        self.assertEqual(self.cache.total_size, self._stored_bytes(self.cache))
+
+        # Another symbol referencing the same contracts keeps them alive
+        self.cache.save('MC7M25', 'NQU25', snapshot)
+        self.assertEqual(self._contract_rows(), 200)
+        self.cache._evict_entry(self.cache._get_cache_key('MC7M25', 'NQM25'))
+        self.assertEqual(self.cache.get('MC7M25', 'NQU25'), snapshot)
+        self.assertEqual(self.cache.total_size, self._stored_bytes(self.cache))
+
+    def test_lru_eviction_with_running_size(self):
+        self.cache.save('S0', 'NQM25', make_chain('S0'))
+        entry_size = self.cache.total_size
+        self.cache.max_cache_size_bytes = int(entry_size * 3.5)
+
+        for i in range(1, 4):
+            self.cache.save(f"S{i}", 'NQM25', make_chain(f"S{i}"))
+            self.cache.get('S0', 'NQM25')   # Keep S0 recently used
+        self.assertEqual(self.cache.stats['evictions'], 2)
+
+        self.assertIsNotNone(self.cache.get('S0', 'NQM25'))
+        self.assertIsNotNone(self.cache.get('S3', 'NQM25'))
+        self.assertIsNone(self.cache.get('S1', 'NQM25'))
+        self.assertIsNone(self.cache.get('S2', 'NQM25'))
+        self.assertLessEqual(self.cache.total_size, self.cache.max_cache_size_bytes)
+        self.assertEqual(self.cache.total_size, self._stored_bytes(self.cache))
+
+    def test_expiry_uses_market_hours_ttl(self):
+        self.cache.save('MC7M25', 'NQM25', make_chain('MC7M25'))
+        stale = (get_eastern_time() - timedelta(hours=1)).isoformat()
+        self.assertFalse(self.cache._is_cache_valid({'timestamp': stale}))
+        with self.cache.store.connection() as conn:
+            conn.execute("UPDATE cache_entries SET timestamp = ?", (stale,))
+
+        self.assertIsNone(self.cache.get('MC7M25', 'NQM25'))
+        self.assertEqual(self.cache.stats['evictions'], 1)
+        self.assertEqual(self.cache.total_size, 0)
+        self.assertEqual(self._contract_rows(), 0)
+
+    def test_reload_and_legacy_migration(self):
+        for i in range(3):
+            self.cache.save(f"S{i}", 'NQM25', make_chain(f"S{i}"))
+        self.cache.get('S0', 'NQM25')
+        self.cache.store.flush()
+
+        # Drop a file from the old JSON layout next to the database
+        legacy = make_chain('OLD')
+        key = self.cache._get_cache_key('OLD', 'NQM25')
+        with open(os.path.join(self.cache_dir, f"{key}.json"), 'w') as f:
+            json.dump({'symbol': 'OLD', 'futures_symbol': 'NQM25',
+                       'timestamp': get_eastern_time().isoformat(), 'data': legacy}, f, indent=2)
+        with open(os.path.join(self.cache_dir, '.cache_index.json'), 'w') as f:
+            json.dump({key: {'symbol': 'OLD'}}, f)
+
+        reopened = BarchartCacheManager(cache_dir=self.cache_dir)
+        self.assertEqual(list(reopened._lru)[:3],
+                         [self.cache._get_cache_key(s, 'NQM25') for s in ('S1', 'S2', 'S0')])
+        self.assertEqual(reopened.total_size, self._stored_bytes(reopened))
+        self.assertEqual(reopened.get('OLD', 'NQM25'), legacy)
+        self.assertEqual([name for name in os.listdir(self.cache_dir) if name.endswith('.json')], [])
+
+        reopened.clear()
+        self.assertEqual(reopened.get_stats()['entries'], 0)
+        self.assertEqual(self._stored_bytes(reopened), 0)
+
+
+def legacy_save(cache_dir, index, symbol, futures_symbol, data):
+    """Previous layout: pretty JSON file per entry plus a full index rewrite"""
+    import hashlib
+    key = hashlib.md5(f"{symbol}_{futures_symbol}".encode()).hexdigest()
+    path = os.path.join(cache_dir, f"{key}.json")
+    timestamp = get_eastern_time().isoformat()
+    with open(path, 'w') as f:
+        json.dump({'symbol': symbol, 'futures_symbol': futures_symbol, 'timestamp': timestamp, 'data': data}, f)
+    index[key] = {'symbol': symbol, 'futures_symbol': futures_symbol, 'timestamp': timestamp,
+                  'size': os.path.getsize(path)}
+    with open(os.path.join(cache_dir, '.cache_index.json'), 'w') as f:
+        json.dump(index, f, indent=2)
+
+
+def run_benchmark(symbols: int = 200, snapshots: int = 5, strikes: int = 200):
+    """Saving successive chain snapshots: JSON files vs SQLite delta blobs"""
+    chains = [[make_chain(f"S{s}", strikes, seed=n, changed=set(range(21000, 21000 + 25 * strikes, 25 * 20)))
+               for s in range(symbols)] for n in range(snapshots)]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        legacy_dir = os.path.join(temp_dir, 'legacy')
+        os.makedirs(legacy_dir)
+        index = {}
+        start = time.perf_counter()
+        for snapshot in chains:
+            for s, chain in enumerate(snapshot):
+                legacy_save(legacy_dir, index, f"S{s}", 'NQM25', chain)
+        legacy_seconds = time.perf_counter() - start
+        legacy_bytes = sum(os.path.getsize(os.path.join(legacy_dir, name)) for name in os.listdir(legacy_dir))
+
+        cache = BarchartCacheManager(cache_dir=os.path.join(temp_dir, 'sqlite'))
+        start = time.perf_counter()
+        for snapshot in chains:
+            for s, chain in enumerate(snapshot):
+                cache.save(f"S{s}", 'NQM25', chain)
+        sqlite_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for s in range(symbols):
+            cache.get(f"S{s}", 'NQM25')
+        get_seconds = time.perf_counter() - start
+
+        saves = symbols * snapshots
+        stats = cache.get_stats()
+        print(f"  {saves:,} saves of {strikes * 2}-contract chains (5% of strikes change per snapshot)")
+        print(f"  JSON files + index:  {legacy_seconds:6.2f}s  {legacy_bytes / 1e6:7.1f} MB on disk")
+        print(f"  SQLite delta blobs:  {sqlite_seconds:6.2f}s  {cache.total_size / 1e6:7.1f} MB stored "
+              f"({stats['compression']})")
+        print(f"  Contracts written {stats['contracts_written']:,}, reused {stats['contracts_reused']:,}")
+        print(f"  Reads: {get_seconds / symbols * 1000:.2f} ms per chain")
+        get_store(cache.db_path).close()
+
+
+if __name__ == '__main__':
+    print("🗄️ Barchart Cache Storage Benchmark")
+    run_benchmark()
+    unittest.main(verbosity=2)
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Barchart Session Reuse Performance Tests
+
+Runs BarchartSessionManager and HybridBarchartScraper against a local
+stand-in for the Barchart quotes API that answers 419 once its XSRF token
+rotates. A fake authenticator stands in for the Selenium browser and
+counts launches: stored sessions must be reused across runs, a rejected
+session must trigger exactly one re-authentication even under concurrent
+fetches, and concurrent fetches must share a few keep-alive connections.
+The benchmark compares browser-per-run against the cookie vault.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import tempfile
+import threading
+import unittest
+from urllib.parse import urlparse, parse_qs, quote
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add necessary paths
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'tasks', 'options_trading_system', 'data_ingestion'))
+
+from barchart_web_scraper.session_manager import BarchartSessionManager, CookieVault
+from barchart_web_scraper.hybrid_scraper import HybridBarchartScraper
+
+logging.getLogger('barchart_web_scraper').setLevel(logging.CRITICAL)
+
+
+class QuotesHandler(BaseHTTPRequestHandler):
+    """/quotes/get answers with a small chain, or 419 for a stale XSRF token"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.connections.add(self.client_address)
+            server.requests += 1
+        url = urlparse(self.path)
+        if self.headers.get('X-XSRF-TOKEN') != server.token:
+            self._send(419, {'message': 'CSRF token mismatch.'})
+            return
+        symbol = parse_qs(url.query)['symbol'][0]
+        time.sleep(server.latency)
+        calls = [{'symbol': f"{symbol}C{strike}", 'strike': strike, 'lastPrice': 1.0}
+                 for strike in range(21000, 21010)]
+        self._send(200, {'count': len(calls), 'total': len(calls), 'data': {'Call': calls, 'Put': []}})
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StandInBarchart:
+    """Local quotes API plus a fake browser authenticator"""
+
+    def __init__(self, launch_seconds: float = 0.0, latency: float = 0.0):
+        self.launch_seconds = launch_seconds
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), QuotesHandler)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.connections = set()
+        self.server.requests = 0
+        self.server.latency = latency
+        self.server.token = 'token/0'
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.launches = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def rotate_token(self):
+        self.server.token = f"token/{self.launches + 1}"
+
+    def authenticate(self, futures_symbol):
+        """Stands in for a Chrome cold start"""
+        self.launches += 1
+        time.sleep(self.launch_seconds)
+        cookies = {'laravel_session': 'session', 'laravel_token': 'jwt',
+                   'XSRF-TOKEN': quote(self.server.token, safe='')}
+        return cookies, time.time() + 3600
+
+    def manager(self, vault, **options):
+        manager = BarchartSessionManager(self.authenticate, vault, **options)
+        manager.client.base_url = self.base_url
+        return manager
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestSessionReuse(unittest.TestCase):
+
+    def setUp(self):
+        self.barchart = StandInBarchart()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.vault_path = os.path.join(self.temp_dir.name, 'session', 'cookies.json')
+
+    def tearDown(self):
+        self.barchart.close()
+        self.temp_dir.cleanup()
+
+    def test_vault_reused_across_runs(self):
+        first = self.barchart.manager(CookieVault(self.vault_path))
+        self.assertEqual(first.fetch('MC7M25')['total'], 10)
+        first.close()
+        self.assertEqual(self.barchart.launches, 1)
+        self.assertEqual(os.stat(self.vault_path).st_mode & 0o777, 0o600)
+        with open(self.vault_path) as f:
+            self.assertEqual(json.load(f)['xsrf_token'], 'token/0')
+
+        # A new process with the same vault goes straight to the API
+        for _ in range(3):
+            manager = self.barchart.manager(CookieVault(self.vault_path))
+            self.assertEqual(manager.fetch('MC7M25')['total'], 10)
+            metrics = manager.get_metrics()
+            self.assertEqual(metrics['browser_launches'], 0)
+            self.assertEqual(metrics['browser_launches_avoided'], 1)
+            self.assertIsNotNone(metrics['time_to_first_data'])
+            manager.close()
+        self.assertEqual(self.barchart.launches, 1)
+
+    def test_default_vault_outside_repo(self):
+        home = os.environ.get('HOME')
+        os.environ['HOME'] = self.temp_dir.name
+        try:
+            vault = CookieVault()
+        finally:
+            if home is None:
+                del os.environ['HOME']
+            else:
+                os.environ['HOME'] = home
+        self.assertEqual(vault.path, os.path.join(self.temp_dir.name, '.cache', 'nq-options', 'barchart_cookies.json'))
+
+        vault.save({'XSRF-TOKEN': 'token%2F0'}, time.time() + 3600)
+        self.assertEqual(vault.load()['xsrf_token'], 'token/0')
+        self.assertEqual(os.stat(os.path.dirname(vault.path)).st_mode & 0o777, 0o700)
+
+    def test_expired_vault_relaunches_browser(self):
+        vault = CookieVault(self.vault_path)
+        vault.save({'XSRF-TOKEN': 'token%2F0'}, time.time() + 30)  # Inside the refresh margin
+        self.assertIsNone(vault.load())
+
+        manager = self.barchart.manager(vault)
+        self.assertIsNotNone(manager.fetch('MC7M25'))
+        self.assertEqual(self.barchart.launches, 1)
+        self.assertGreater(vault.load()['expires_at'], time.time() + 3000)
+
+    def test_rejected_session_reauthenticates_once(self):
+        manager = self.barchart.manager(CookieVault(self.vault_path), max_workers=8)
+        self.assertTrue(manager.ensure_session())
+
+        self.barchart.rotate_token()
+        symbols = [f"MC{i}M25" for i in range(16)]
+        results = manager.fetch_many(symbols)
+        self.assertEqual(list(results), symbols)
+        self.assertTrue(all(data and data['total'] == 10 for data in results.values()))
+
+        metrics = manager.get_metrics()
+        self.assertEqual(self.barchart.launches, 2)
+        self.assertEqual(metrics['reauthentications'], 1)
+        self.assertEqual(metrics['failed_requests'], 0)
+        with open(self.vault_path) as f:
+            self.assertEqual(json.load(f)['xsrf_token'], self.barchart.server.token)
+
+    def test_failed_authentication(self):
+        manager = BarchartSessionManager(lambda futures_symbol: (None, None), CookieVault(self.vault_path))
+        self.assertIsNone(manager.fetch('MC7M25'))
+        self.assertEqual(manager.get_metrics()['auth_failures'], 1)
+        self.assertFalse(os.path.exists(self.vault_path))
+
+    def test_concurrent_fetches_share_pool(self):
+        manager = self.barchart.manager(None, pool_size=4, max_workers=4)
+        for _ in range(3):
+            results = manager.fetch_many([f"MC{i}M25" for i in range(20)])
+            self.assertTrue(all(results.values()))
+        self.assertEqual(self.barchart.server.requests, 60)
+        self.assertLessEqual(len(self.barchart.server.connections), 4)
+
+    def test_hybrid_scraper_uses_shared_session(self):
+        manager = self.barchart.manager(CookieVault(self.vault_path))
+        scraper = HybridBarchartScraper(use_cache=False, session_manager=manager)
+        cwd = os.getcwd()
+        os.chdir(self.temp_dir.name)  # API responses are saved under outputs/
+        try:
+            self.assertTrue(scraper.authenticate())
+            self.assertIsNotNone(scraper.fetch_options_data('MC7M25'))
+            results = scraper.fetch_many_options(['MC1M25', 'MC2M25', 'MC3M25'])
+        finally:
+            os.chdir(cwd)
+        self.assertTrue(all(data['total'] == 10 for data in results.values()))
+        self.assertIs(scraper.api_client, manager.client)
+        self.assertEqual(scraper.get_session_metrics()['browser_launches'], 1)
+
+
+def run_benchmark(runs: int = 5, symbols: int = 8, launch_seconds: float = 2.0):
+    """Browser-per-run vs cookie vault with pooled concurrent fetches"""
+    barchart = StandInBarchart(launch_seconds=launch_seconds, latency=0.05)
+    names = [f"MC{i}M25" for i in range(symbols)]
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            start = time.perf_counter()
+            first_data = []
+            for _ in range(runs):
+                run_start = time.perf_counter()
+                manager = barchart.manager(None, max_workers=1)
+                for name in names:
+                    manager.fetch(name)
+                first_data.append(manager.get_metrics()['time_to_first_data'])
+                manager.close()
+            baseline = time.perf_counter() - start
+            baseline_launches = barchart.launches
+
+            barchart.launches = 0
+            vault_path = os.path.join(temp_dir, 'cookies.json')
+            start = time.perf_counter()
+            vault_first_data, avoided = [], 0
+            for _ in range(runs):
+                manager = barchart.manager(CookieVault(vault_path), max_workers=symbols)
+                manager.fetch_many(names)
+                metrics = manager.get_metrics()
+                vault_first_data.append(metrics['time_to_first_data'])
+                avoided += metrics['browser_launches_avoided']
+                manager.close()
+            pooled = time.perf_counter() - start
+
+        print(f"  {runs} runs x {symbols} symbols, simulated browser start {launch_seconds:.1f}s")
+        print(f"  Browser per run:   {baseline:6.2f}s  launches {baseline_launches}, "
+              f"first data {sum(first_data) / runs:.2f}s avg")
+        print(f"  Vault + pool:      {pooled:6.2f}s  launches {barchart.launches}, avoided {avoided}, "
+              f"first data {sum(vault_first_data[1:]) / max(1, runs - 1):.3f}s avg after first run")
+        print(f"  Speedup: {baseline / pooled:.1f}x")
+    finally:
+        barchart.close()
+
+
+if __name__ == '__main__':
+    print("🔐 Barchart Session Reuse Benchmark")
+    run_benchmark()
+    unittest.main(verbosity=2)
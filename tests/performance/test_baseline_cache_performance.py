@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+IFD v3.0 Baseline Cache Performance Tests
+
+Validates the LRU stale-while-revalidate cache behind
+HistoricalBaselineManager.get_baseline_context (bounded capacity,
+invalidation on new history rows, coalesced background refreshes, the
+single-pass percentile recompute) and compares streaming-path baseline
+lookups with expired entries against the original synchronous recompute.
+"""
+
+import os
+import sys
+import time
+import logging
+import tempfile
+import threading
+import statistics
+import unittest
+from datetime import datetime, timedelta, timezone
+
+# Add necessary paths
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, current_dir)
+sys.path.insert(0, os.path.join(project_root, 'tasks', 'options_trading_system', 'analysis_engine'))
+
+from utils.sqlite_store import get_store
+from institutional_flow_v3.baseline_cache import BaselineContextCache
+from institutional_flow_v3.solution import IFDv3Engine, HistoricalBaselineManager
+from test_ifd_write_behind_performance import make_metrics
+
+logging.getLogger('institutional_flow_v3.solution').setLevel(logging.WARNING)
+
+
+def seed_history(manager: HistoricalBaselineManager, strikes, days: int = 15):
+    """One row per strike/type/day over the lookback window"""
+    start = datetime.now(timezone.utc) - timedelta(days=days - 1)
+    for day in range(days):
+        for i, strike in enumerate(strikes):
+            for option_type in ('C', 'P'):
+                pm = make_metrics(1, start=start + timedelta(days=day))[0]
+                pm.strike, pm.option_type = strike, option_type
+                pm.pressure_ratio = 1.0 + ((day * 7 + i * 3) % 11) / 4
+                manager.update_historical_data(pm)
+    manager.flush()
+
+
+class TestBaselineContextCache(unittest.TestCase):
+
+    def test_lru_capacity(self):
+        cache = BaselineContextCache(lambda key: key[0] * 2, capacity=3)
+        for key in [(1, 'C'), (2, 'C'), (3, 'C')]:
+            cache.get_or_compute(key)
+        cache.get((1, 'C'))  # Most recently used now
+        cache.get_or_compute((4, 'C'))
+        self.assertNotIn((2, 'C'), cache)
+        self.assertIn((1, 'C'), cache)
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(cache.get_stats()['evictions'], 1)
+
+    def test_stale_served_while_refreshing(self):
+        release = threading.Event()
+        calls = []
+
+        def compute(key):
+            calls.append(key)
+            if len(calls) > 1:
+                release.wait(5)
+            return len(calls)
+
+        cache = BaselineContextCache(compute)
+        self.assertEqual(cache.get_or_compute(('k',)), 1)
+        for _ in range(50):
+            cache.invalidate(('k',))
+            self.assertEqual(cache.get_or_compute(('k',)), 1)  # Stale value, never blocks
+        release.set()
+        self.assertTrue(cache.wait_for_refreshes())
+        # One refresh in flight plus at most one re-run for later invalidations
+        self.assertLessEqual(len(calls), 3)
+        self.assertEqual(cache.get_or_compute(('k',)), len(calls))
+        stats = cache.get_stats()
+        self.assertEqual((stats['misses'], stats['stale_hits']), (1, 50))
+        cache.close()
+
+    def test_min_refresh_interval_defers_invalidation(self):
+        calls = []
+        cache = BaselineContextCache(lambda key: calls.append(key) or len(calls), min_refresh_seconds=0.1)
+        self.assertEqual(cache.get_or_compute('k'), 1)
+        for _ in range(20):
+            cache.invalidate('k')
+            self.assertEqual(cache.get('k'), 1)
+        stats = cache.get_stats()
+        self.assertEqual((stats['hits'], stats['stale_hits'], stats['deferred_refreshes']), (20, 0, 20))
+
+        time.sleep(0.12)
+        self.assertEqual(cache.get('k'), 1)  # Interval over: stale value served, one refresh
+        self.assertTrue(cache.wait_for_refreshes())
+        self.assertEqual(cache.get('k'), 2)
+        self.assertEqual(len(calls), 2)
+        cache.close()
+
+    def test_ttl_expiry(self):
+        cache = BaselineContextCache(lambda key: time.perf_counter(), ttl_seconds=0.0,
+                                     background_refresh=False)
+        first = cache.get_or_compute('k')
+        self.assertNotEqual(cache.get_or_compute('k'), first)
+        self.assertEqual(cache.get_stats()['refreshes'], 2)
+
+
+class TestBaselineManagerCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'baselines.db')
+
+    def tearDown(self):
+        get_store(self.db_path).close()
+        self.temp_dir.cleanup()
+
+    def test_single_pass_percentiles_match(self):
+        manager = HistoricalBaselineManager(self.db_path)
+        seed_history(manager, [21500.0])
+        baseline = manager.get_baseline_context(21500.0, 'C')
+
+        with manager.store.connection() as conn:
+            ratios = [r[0] for r in conn.execute(
+                "SELECT pressure_ratio FROM historical_pressure WHERE strike = ? AND option_type = ? "
+                "ORDER BY date", (21500.0, 'C'))]
+        for p in [10, 25, 50, 75, 90, 95, 99]:
+            self.assertEqual(baseline.pressure_percentiles[p], statistics.quantiles(ratios, n=100)[p - 1])
+        self.assertAlmostEqual(baseline.mean_pressure_ratio, statistics.mean(ratios))
+
+    def test_new_rows_invalidate_strike(self):
+        manager = HistoricalBaselineManager(self.db_path, write_behind=True, min_refresh_seconds=0.2)
+        seed_history(manager, [21500.0, 21525.0])
+        before = manager.get_baseline_context(21500.0, 'C').mean_pressure_ratio
+        other = manager.get_baseline_context(21525.0, 'C')
+
+        pm = make_metrics(1, start=datetime.now(timezone.utc))[0]
+        pm.strike, pm.option_type, pm.pressure_ratio = 21500.0, 'C', 40.0
+        manager.update_historical_data(pm)
+        # Inside the refresh interval the loaded baseline is still a plain hit
+        self.assertEqual(manager.get_baseline_context(21500.0, 'C').mean_pressure_ratio, before)
+        self.assertEqual(manager.baseline_cache.get_stats()['refreshes'], 2)
+
+        time.sleep(0.25)
+        self.assertEqual(manager.get_baseline_context(21500.0, 'C').mean_pressure_ratio, before)  # Stale
+        self.assertTrue(manager.baseline_cache.wait_for_refreshes())
+        self.assertGreater(manager.get_baseline_context(21500.0, 'C').mean_pressure_ratio, before)
+        self.assertIs(manager.get_baseline_context(21525.0, 'C'), other)
+        manager.close()
+
+    def test_invalidations_keep_write_batches(self):
+        engine = IFDv3Engine({'baseline_db_path': self.db_path})
+        store = engine.baseline_manager.store
+        for pm in make_metrics(2000):
+            engine.analyze_pressure_event(pm)
+        engine.baseline_manager.baseline_cache.wait_for_refreshes()
+        engine.baseline_manager.flush()
+
+        stats = engine.get_analysis_summary()['baseline_cache']
+        self.assertEqual((stats['misses'], stats['hits'], stats['stale_hits']), (80, 1920, 0))
+        self.assertEqual(stats['refreshes'], 80)  # Only the first lookup of each key
+        # Apart from the 80 first lookups, rows are committed in writer-sized batches
+        self.assertLessEqual(store.stats['batches_committed'], 80 + 10)
+        engine.close()
+
+    def test_summary_exposes_counters(self):
+        engine = IFDv3Engine({'baseline_db_path': self.db_path})
+        for pm in make_metrics(120):
+            engine.analyze_pressure_event(pm)
+        engine.baseline_manager.baseline_cache.wait_for_refreshes()
+        stats = engine.get_analysis_summary()['baseline_cache']
+        self.assertEqual(stats['misses'], 80)
+        self.assertEqual(stats['hits'] + stats['stale_hits'], 40)
+        self.assertGreaterEqual(stats['refreshes'], 80)
+        self.assertGreater(stats['avg_refresh_ms'], 0.0)
+        engine.close()
+
+
+def run_benchmark(strikes: int = 50, lookups: int = 5000):
+    """Print baseline lookup latency with every entry expired: synchronous vs background refresh"""
+    strike_list = [21000.0 + 25 * i for i in range(strikes)]
+    keys = [(strike, option_type) for strike in strike_list for option_type in ('C', 'P')]
+    print(f"\n{lookups} lookups over {len(keys)} expired baselines")
+    print(f"{'refresh':<12} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'recomputes':>11}")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for mode, background in (('synchronous', False), ('background', True)):
+            db_path = os.path.join(temp_dir, f'{mode}.db')
+            manager = HistoricalBaselineManager(db_path, background_refresh=background)
+            seed_history(manager, strike_list, days=20)
+            manager.baseline_cache.ttl_seconds = 0.0  # Every lookup finds an expired entry
+            for key in keys:
+                manager.get_baseline_context(*key)
+
+            latencies = []
+            for i in range(lookups):
+                started = time.perf_counter()
+                manager.get_baseline_context(*keys[i % len(keys)])
+                latencies.append((time.perf_counter() - started) * 1000)
+            manager.baseline_cache.wait_for_refreshes()
+            latencies.sort()
+            stats = manager.baseline_cache.get_stats()
+            print(f"{mode:<12} {latencies[len(latencies) // 2]:>8.3f} "
+                  f"{latencies[int(len(latencies) * 0.99)]:>8.3f} {latencies[-1]:>8.3f} "
+                  f"{stats['refreshes'] - len(keys):>11,}")
+            manager.close()
+            get_store(db_path).close()
+
+
+if __name__ == '__main__':
+    print("📊 IFD v3.0 Baseline Cache Benchmark")
+    run_benchmark()
+    unittest.main(verbosity=2)
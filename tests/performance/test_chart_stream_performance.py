@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Chart Stream Performance Tests
+
+Validates that ChartFeed diffs applied to a client's figure reproduce a
+full rebuild, that concurrent viewers share one refresh, and compares the
+bytes shipped per dashboard tick for full figures and patches.
+"""
+
+import os
+import sys
+import json
+import random
+import threading
+import unittest
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+# Add necessary paths
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'scripts'))
+
+from chart_stream import (
+    ChartFeed, build_ifd_marker_groups, candle_columns, patch_chart, EASTERN
+)
+
+START = datetime(2025, 6, 16, 13, 30, tzinfo=timezone.utc)
+CONFIG = {'indicators': {'ifd_v3': {'show_signals': True, 'min_confidence_display': 0.7}}}
+
+
+def make_bars(count: int, seed: int = 9) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(START, periods=count, freq='5min', tz='UTC')
+    close = 21000 + np.cumsum(rng.normal(0, 5, count))
+    return pd.DataFrame({'open': close + rng.normal(0, 3, count), 'high': close + 8,
+                         'low': close - 8, 'close': close,
+                         'volume': rng.integers(100, 3000, count)}, index=index)
+
+
+def make_signals(bars: pd.DataFrame, count: int, seed: int = 2):
+    rng = random.Random(seed)
+    signals = []
+    for _ in range(count):
+        ts = bars.index[rng.randrange(len(bars))] + pd.Timedelta(seconds=rng.randint(-200, 200))
+        signals.append(SimpleNamespace(
+            window_timestamp=ts.to_pydatetime(), max_confidence=rng.uniform(0.5, 1.0),
+            dominant_action=rng.choice(['STRONG_BUY', 'BUY', 'MONITOR']),
+            window_strength=rng.choice(['EXTREME', 'HIGH', 'MODERATE']), signal_count=2))
+    return signals
+
+
+def full_figure(feed: ChartFeed):
+    """Figure dict in the trace layout NQDashAppIFD._create_chart produces"""
+    columns = candle_columns(feed.bars)
+    data = [{'x': columns['x'], 'open': columns['open'], 'high': columns['high'],
+             'low': columns['low'], 'close': columns['close']},
+            {'x': list(columns['x']), 'y': columns['volume'], 'marker': {'color': columns['color']}}]
+    for group in feed.marker_groups.values():
+        data.append({'x': group['timestamps'], 'y': group['prices'],
+                     'hovertext': group['hover_texts'], 'marker': {'size': group['sizes']}})
+    return {'data': data}
+
+
+def legacy_marker_groups(df_display, ifd_signals, min_confidence=0.7):
+    """The original per-signal linear scan from _add_ifd_overlay"""
+    groups = {}
+    for signal in ifd_signals:
+        if signal.max_confidence < min_confidence:
+            continue
+        for idx, bar_time in enumerate(df_display.index):
+            if abs((bar_time.to_pydatetime() - signal.window_timestamp).total_seconds()) < 300:
+                bar = df_display.iloc[idx]
+                if signal.dominant_action in ("STRONG_BUY", "BUY"):
+                    price = bar['high'] + (bar['high'] - bar['low']) * 0.1
+                else:
+                    price = bar['low'] - (bar['high'] - bar['low']) * 0.1
+                groups.setdefault(signal.dominant_action, []).append((signal.window_timestamp, price))
+                break
+    return groups
+
+
+class TestChartFeed(unittest.TestCase):
+
+    def test_marker_groups_match_linear_scan(self):
+        bars = make_bars(120).tz_convert(EASTERN)
+        signals = make_signals(bars, 80)
+        groups = build_ifd_marker_groups(bars, signals, CONFIG)
+        expected = legacy_marker_groups(bars, signals)
+
+        self.assertEqual(sorted(groups), sorted(expected))
+        for action, points in expected.items():
+            self.assertEqual(groups[action]['timestamps'], [ts for ts, _ in points])
+            np.testing.assert_allclose(groups[action]['prices'], [p for _, p in points])
+
+    def test_patches_reproduce_full_figure(self):
+        history = make_bars(400)
+        signals = make_signals(history, 60)
+        feed = ChartFeed()
+        feed.apply(history.iloc[:288], signals, CONFIG)
+        client = full_figure(feed)
+        cursor, actions = feed.revision, feed.marker_actions
+
+        for step in range(1, 40):
+            window = history.iloc[step:288 + step].copy()
+            window.iloc[-2, window.columns.get_loc('close')] += 1.5  # late revision of a recent bar
+            feed.apply(window, signals, CONFIG)
+            update = feed.updates_since(cursor)
+            self.assertIsNotNone(update)
+            patch_chart(client, update, actions)
+            cursor = update['revision']
+            self.assertEqual(client, full_figure(feed))
+
+        # Each tick ships the trimmed/appended/revised bars, not the window
+        self.assertLess(feed.stats['bars_sent'], 40 * 4)
+
+    def test_structural_change_forces_full_figure(self):
+        bars = make_bars(100)
+        feed = ChartFeed()
+        feed.apply(bars.iloc[50:], [], None)
+        cursor = feed.revision
+
+        feed.apply(bars, [], None)  # backfilled history in front
+        self.assertIsNone(feed.updates_since(cursor))
+        self.assertIsNotNone(feed.updates_since(feed.revision))
+
+    def test_viewers_share_refresh(self):
+        feed = ChartFeed()
+        calls = []
+        barrier = threading.Barrier(8)
+
+        def loader():
+            calls.append(1)
+            return make_bars(50), []
+
+        def viewer():
+            barrier.wait()
+            feed.refresh(loader, None, max_age=15)
+
+        threads = [threading.Thread(target=viewer) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(feed.stats['shared_refreshes'], 7)
+
+
+def _payload_bytes(payload) -> int:
+    return len(json.dumps(payload, default=str))
+
+
+def run_benchmark(window_bars: int = 288, ticks: int = 120, viewers: int = 5):
+    """Print bytes and recomputations per tick for full figures vs patches"""
+    history = make_bars(window_bars + ticks)
+    signals = make_signals(history, 150)
+
+    full_bytes = 0
+    feed = ChartFeed()
+    feed.apply(history.iloc[:window_bars], signals, CONFIG)
+    cursors = [feed.revision] * viewers
+    patch_bytes = 0
+    for tick in range(1, ticks + 1):
+        window = history.iloc[tick // 10:window_bars + tick // 10]  # new bar every 10 ticks
+        feed.apply(window, signals, CONFIG)
+        full_bytes += viewers * _payload_bytes(full_figure(feed))
+        for i, cursor in enumerate(cursors):
+            update = feed.updates_since(cursor)
+            patch_bytes += _payload_bytes(update)
+            cursors[i] = update['revision']
+
+    print(f"\n{'mode':<20} {'bytes/tick/viewer':>18} {'recomputes/tick':>16}")
+    print(f"{'full figure':<20} {full_bytes / ticks / viewers:>18,.0f} {viewers:>16}")
+    print(f"{'patch':<20} {patch_bytes / ticks / viewers:>18,.0f} {1:>16}")
+    return {"full_bytes": full_bytes, "patch_bytes": patch_bytes}
+
+
+if __name__ == '__main__':
+    print("📡 Chart Stream Benchmark")
+    run_benchmark()
+    unittest.main(verbosity=2)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Expected Value Engine Performance Tests
+
+Validates the vectorized EV engine against the scalar reference loop and
+benchmarks both across NQ chain sizes.
+"""
+
+import os
+import sys
+import time
+import random
+import unittest
+
+# Add necessary paths
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'tasks', 'options_trading_system'))
+sys.path.insert(0, os.path.join(project_root, 'tasks', 'options_trading_system', 'analysis_engine'))
+
+from expected_value_analysis.solution import (
+    ExpectedValueAnalyzer, OptionsStrike, NUMPY_AVAILABLE
+)
+
+CURRENT_PRICE = 21376.75
+
+
+def generate_chain(num_strikes: int, seed: int = 42, spacing: float = 25.0):
+    """Generate a synthetic NQ options chain centred on CURRENT_PRICE"""
+    rng = random.Random(seed)
+    first = round(CURRENT_PRICE / spacing) * spacing - (num_strikes // 2) * spacing
+    strikes = []
+    for i in range(num_strikes):
+        strikes.append(OptionsStrike(
+            first + i * spacing,
+            rng.randint(0, 5000), rng.randint(0, 20000), round(rng.uniform(0.5, 400), 2),
+            rng.randint(0, 5000), rng.randint(0, 20000), round(rng.uniform(0.5, 400), 2)
+        ))
+    rng.shuffle(strikes)
+    return strikes
+
+
+def _as_tuples(setups):
+    return [(s.tp, s.sl, s.direction, s.probability, s.reward, s.risk, s.ev) for s in setups]
+
+
+@unittest.skipUnless(NUMPY_AVAILABLE, "numpy not available")
+class TestVectorizedEVEngine(unittest.TestCase):
+    """Vectorized engine must reproduce the scalar ranking exactly"""
+
+    def setUp(self):
+        config = {"max_risk": 400}
+        self.vectorized = ExpectedValueAnalyzer(config)
+        self.scalar = ExpectedValueAnalyzer(dict(config, use_vectorized_engine=False))
+
+    def test_matches_scalar_ranking(self):
+        for num_strikes, seed in [(1, 1), (7, 2), (40, 3), (60, 4)]:
+            strikes = generate_chain(num_strikes, seed)
+            expected = self.scalar.calculate_ev_combinations(CURRENT_PRICE, strikes)
+            actual = self.vectorized.calculate_ev_combinations(CURRENT_PRICE, strikes)
+            self.assertEqual(_as_tuples(expected), _as_tuples(actual), f"{num_strikes} strikes")
+
+    def test_top_k_matches_prefix(self):
+        strikes = generate_chain(60, seed=5)
+        full = self.vectorized.calculate_ev_combinations(CURRENT_PRICE, strikes)
+        for k in (0, 1, 10, len(full), len(full) + 5):
+            top = self.vectorized.calculate_ev_combinations(CURRENT_PRICE, strikes, top_k=k)
+            self.assertEqual(_as_tuples(full[:k]), _as_tuples(top))
+
+    def test_quality_mask_matches_filter(self):
+        strikes = generate_chain(60, seed=6)
+        setups = self.scalar.calculate_ev_combinations(CURRENT_PRICE, strikes)
+        expected = self.scalar.filter_quality_setups(setups)
+
+        engine = self.vectorized.engine
+        combos = engine.score(CURRENT_PRICE, strikes)
+        mask = engine.quality_mask(combos, self.vectorized.min_ev, self.vectorized.min_probability)
+        actual = self.vectorized._materialize_setups(combos, engine.rank(combos, mask=mask))
+        self.assertEqual(_as_tuples(expected), _as_tuples(actual))
+
+    def test_empty_chain(self):
+        self.assertEqual(self.vectorized.calculate_ev_combinations(CURRENT_PRICE, []), [])
+
+
+def run_benchmark(chain_sizes=(25, 50, 100, 200, 400), scalar_limit=100, repeats=3):
+    """Print EV sweep timings for the scalar loop and the vectorized engine"""
+    config = {"max_risk": 400}
+    vectorized = ExpectedValueAnalyzer(config)
+    scalar = ExpectedValueAnalyzer(dict(config, use_vectorized_engine=False))
+
+    print(f"\n{'strikes':>8} {'setups':>8} {'scalar ms':>11} {'vector ms':>11} {'top-10 ms':>11} {'speedup':>9}")
+    results = []
+    for size in chain_sizes:
+        strikes = generate_chain(size)
+
+        def best_of(fn):
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                out = fn()
+                timings.append((time.perf_counter() - start) * 1000)
+            return min(timings), out
+
+        vector_ms, setups = best_of(lambda: vectorized.calculate_ev_combinations(CURRENT_PRICE, strikes))
+        top_ms, _ = best_of(lambda: vectorized.calculate_ev_combinations(CURRENT_PRICE, strikes, top_k=10))
+
+        scalar_ms = None
+        if size <= scalar_limit:
+            scalar_ms, _ = best_of(lambda: scalar.calculate_ev_combinations(CURRENT_PRICE, strikes))
+
+        speedup = f"{scalar_ms / vector_ms:8.1f}x" if scalar_ms else f"{'-':>9}"
+        scalar_col = f"{scalar_ms:11.2f}" if scalar_ms else f"{'-':>11}"
+        print(f"{size:>8} {len(setups):>8} {scalar_col} {vector_ms:11.2f} {top_ms:11.2f} {speedup}")
+        results.append({"strikes": size, "setups": len(setups), "scalar_ms": scalar_ms,
+                         "vectorized_ms": vector_ms, "top_k_ms": top_ms})
+    return results
+
+
+if __name__ == '__main__':
+    if NUMPY_AVAILABLE:
+        print("⚡ Expected Value Engine Benchmark")
+        run_benchmark()
+    unittest.main(verbosity=2)
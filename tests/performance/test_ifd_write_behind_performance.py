@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+IFD v3.0 Write-Behind History Performance Tests
+
+Validates that IFDv3Engine's queued historical pressure updates land in
+SQLite in order and survive shutdown, and compares the
+analyze_pressure_event latency percentiles for inline commits versus the
+batched background writer.
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import logging
+import tempfile
+import textwrap
+import unittest
+import subprocess
+from unittest.mock import patch
+from datetime import datetime, timedelta, timezone
+
+# Add necessary paths
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'tasks', 'options_trading_system', 'analysis_engine'))
+
+from utils.sqlite_store import get_store
+from institutional_flow_v3.solution import IFDv3Engine, HistoricalBaselineManager, PressureMetrics
+from institutional_flow_v3.optimizations import (OptimizedBaselineManager, OptimizedIFDv3Analyzer,
+                                                 run_optimized_ifd_v3_analysis)
+
+logging.getLogger('institutional_flow_v3.solution').setLevel(logging.WARNING)
+
+STRIKES = [21000.0 + 25 * i for i in range(40)]
+
+# Analyzes events and exits without close(); a 30s flush interval keeps the history rows queued
+EXIT_SCRIPT = textwrap.dedent("""
+    import sys
+    sys.path[:0] = sys.argv[1:3]
+    from utils.sqlite_store import get_store
+    from institutional_flow_v3.solution import IFDv3Engine
+    from test_ifd_write_behind_performance import make_metrics
+    get_store(sys.argv[3], flush_interval=30)
+    engine = IFDv3Engine({'baseline_db_path': sys.argv[3]})
+    for pm in make_metrics(200):
+        engine.analyze_pressure_event(pm)
+""")
+
+
+def make_metrics(count: int, start: datetime = None, days: int = 1):
+    """Pressure windows cycling through strikes, call/put and ``days`` dates"""
+    start = start or datetime(2025, 6, 2, 14, 30, tzinfo=timezone.utc)
+    metrics = []
+    for i in range(count):
+        bid, ask = 100 + i % 50, 150 + (i * 7) % 300
+        metrics.append(PressureMetrics(
+            strike=STRIKES[i % len(STRIKES)], option_type='C' if (i // len(STRIKES)) % 2 == 0 else 'P',
+            time_window=start + timedelta(days=i % days, seconds=i),
+            bid_volume=bid, ask_volume=ask, pressure_ratio=ask / bid, total_trades=20,
+            avg_trade_size=12.5, dominant_side='BUY', confidence=0.8
+        ))
+    return metrics
+
+
+def stored_rows(db_path: str):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT strike, option_type, date, pressure_ratio FROM historical_pressure "
+                            "ORDER BY strike, option_type, date").fetchall()
+
+
+class WriteBehindTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'baselines.db')
+
+    def tearDown(self):
+        get_store(self.db_path).close()
+        self.temp_dir.cleanup()
+
+
+class TestWriteBehindHistory(WriteBehindTestCase):
+
+    def test_last_update_per_key_wins(self):
+        manager = HistoricalBaselineManager(self.db_path, write_behind=True)
+        metrics = make_metrics(400)
+        for pm in metrics:
+            manager.update_historical_data(pm)
+        self.assertTrue(manager.flush(timeout=5))
+
+        expected = {}
+        for pm in metrics:
+            expected[(pm.strike, pm.option_type, pm.time_window.strftime('%Y-%m-%d'))] = pm.pressure_ratio
+        self.assertEqual({row[:3]: row[3] for row in stored_rows(self.db_path)}, expected)
+
+    def test_matches_inline_commits(self):
+        metrics = make_metrics(300, days=3)
+        inline_path = os.path.join(self.temp_dir.name, 'inline.db')
+        inline = HistoricalBaselineManager(inline_path)
+        queued = HistoricalBaselineManager(self.db_path, write_behind=True)
+        for pm in metrics:
+            inline.update_historical_data(pm)
+            queued.update_historical_data(pm)
+        queued.flush()
+        self.assertEqual(stored_rows(self.db_path), stored_rows(inline_path))
+        get_store(inline_path).close()
+
+    def test_reads_see_queued_updates(self):
+        manager = HistoricalBaselineManager(self.db_path, write_behind=True)
+        for pm in make_metrics(10, start=datetime.now(timezone.utc) - timedelta(days=9), days=10):
+            pm.strike, pm.option_type = 21500.0, 'C'
+            manager.update_historical_data(pm)
+        baseline = manager.get_baseline_context(21500.0, 'C')
+        self.assertGreater(baseline.data_quality, 0.0)
+        self.assertEqual(manager.store.pending_writes, 0)
+
+    def test_engine_close_is_durable(self):
+        engine = IFDv3Engine({'baseline_db_path': self.db_path})
+        self.assertTrue(engine.baseline_manager.write_behind)
+        for pm in make_metrics(200):
+            engine.analyze_pressure_event(pm)
+        engine.close()
+        self.assertEqual(len(stored_rows(self.db_path)), 80)
+
+        stats = engine.get_latency_stats()
+        self.assertEqual(set(stats), set(IFDv3Engine.LATENCY_STAGES))
+        self.assertEqual(stats['total']['count'], 200)
+        self.assertLessEqual(stats['history_update']['p99_ms'], stats['history_update']['max_ms'])
+
+    def test_engine_exit_without_close_is_durable(self):
+        result = subprocess.run(
+            [sys.executable, "-c", EXIT_SCRIPT, project_root,
+             os.path.join(project_root, 'tasks', 'options_trading_system', 'analysis_engine'), self.db_path],
+            cwd=current_dir, capture_output=True, text=True, timeout=120)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertNotIn("Dropped write", result.stderr)
+        self.assertEqual(len(stored_rows(self.db_path)), 80)
+
+    def test_pipeline_run_closes_analyzer(self):
+        get_store(self.db_path, flush_interval=30)
+        with patch.object(OptimizedIFDv3Analyzer, 'close', autospec=True,
+                          side_effect=IFDv3Engine.close) as close:
+            result = run_optimized_ifd_v3_analysis(make_metrics(120), {'db_path': self.db_path})
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual(close.call_count, 1)
+        self.assertEqual(len(stored_rows(self.db_path)), 80)
+
+    def test_batch_update_queued(self):
+        manager = OptimizedBaselineManager({'db_path': self.db_path})
+        manager.batch_update_historical_data(make_metrics(120))
+        self.assertTrue(manager.flush(timeout=5))
+        self.assertEqual(len(stored_rows(self.db_path)), 80)
+
+
+def run_benchmark(events: int = 2000):
+    """Print analyze_pressure_event stage percentiles for inline vs write-behind history"""
+    metrics = make_metrics(events, days=5)
+    print(f"\n{events} pressure events")
+    print(f"{'history writes':<14} {'stage':<15} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for mode, write_behind in (('inline', False), ('write-behind', True)):
+            db_path = os.path.join(temp_dir, f'{mode}.db')
+            engine = IFDv3Engine({'baseline_db_path': db_path, 'write_behind_history': write_behind})
+            started = time.perf_counter()
+            for pm in metrics:
+                engine.analyze_pressure_event(pm)
+            engine.close()
+            elapsed = time.perf_counter() - started
+            stats = engine.get_latency_stats()
+            for stage in ('history_update', 'total'):
+                print(f"{mode:<14} {stage:<15} {stats[stage]['p50_ms']:>8.3f} "
+                      f"{stats[stage]['p99_ms']:>8.3f} {stats[stage]['max_ms']:>8.3f}")
+            print(f"{mode:<14} {'events/sec':<15} {events / elapsed:>8,.0f} (including final flush)")
+            get_store(db_path).close()
+
+
+if __name__ == '__main__':
+    print("📝 IFD v3.0 Write-Behind History Benchmark")
+    run_benchmark()
+    unittest.main(verbosity=2)
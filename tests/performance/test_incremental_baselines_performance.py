@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Incremental Baseline Performance Tests
+
+Validates the rolling per-day accumulators behind
+BaselineCalculationEngine.update_baselines_incremental against a numpy
+recompute of the lookback window, and compares a nightly one-day update
+with the legacy full-window recalculation.
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+# Add necessary paths
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'tasks', 'options_trading_system'))
+
+from data_ingestion.streaming_stats import RunningStats, QuantileDigest
+from data_ingestion.baseline_calculation_engine import (
+    BaselineCalculationEngine, HistoricalDataPoint
+)
+
+BUCKETS = ['09:30-10:00', '10:00-10:30', '10:30-11:00']
+
+
+def generate_points(strikes, days, buckets=BUCKETS, seed=3, end=None):
+    """Synthetic daily bucket summaries ending today (or ``end``)"""
+    rng = random.Random(seed)
+    end = end or datetime.now(timezone.utc).replace(hour=15, minute=0, second=0, microsecond=0)
+    points = []
+    for day in range(days):
+        date = end - timedelta(days=days - 1 - day)
+        for strike in strikes:
+            for contract_type in ('C', 'P'):
+                for index, bucket in enumerate(buckets):
+                    trade_count = rng.randint(0, 80)
+                    points.append(HistoricalDataPoint(
+                        date=date.replace(minute=index),
+                        strike_price=strike, contract_type=contract_type, time_bucket=bucket,
+                        total_volume=rng.randint(100, 5000), buy_volume=0, sell_volume=0,
+                        buy_pressure_ratio=rng.random(), trade_count=trade_count,
+                        avg_trade_size=rng.choice([0, rng.uniform(1, 60)]),
+                        large_trades=rng.randint(0, trade_count)
+                    ))
+    return points
+
+
+def reference_metrics(points):
+    """numpy recompute of one strike/type/bucket"""
+    volumes = [p.total_volume for p in points]
+    pressures = [p.buy_pressure_ratio for p in points]
+    sizes = [p.avg_trade_size for p in points if p.avg_trade_size > 0]
+    ratios = [p.large_trades / p.trade_count for p in points if p.trade_count > 0]
+    return {
+        'volume_mean': np.mean(volumes), 'volume_std': np.std(volumes),
+        'volume_p': list(np.percentile(volumes, [25, 50, 75, 95])),
+        'pressure_mean': np.mean(pressures), 'pressure_std': np.std(pressures),
+        'pressure_p': list(np.percentile(pressures, [25, 50, 75, 95])),
+        'avg_trade_size_mean': np.mean(sizes) if sizes else 0,
+        'large_trade_ratio_mean': np.mean(ratios) if ratios else 0,
+        'sample_count': len(points),
+        'days_included': len({p.date.date() for p in points})
+    }
+
+
+class TestStreamingStats(unittest.TestCase):
+
+    def test_running_stats_merge_matches_numpy(self):
+        rng = random.Random(1)
+        values = [rng.gauss(100, 15) for _ in range(1000)]
+        left, right = RunningStats(), RunningStats()
+        for value in values[:400]:
+            left.add(value)
+        for value in values[400:]:
+            right.add(value)
+        left.merge(right)
+        restored = RunningStats.from_state(left.to_state())
+
+        self.assertEqual(restored.count, 1000)
+        self.assertAlmostEqual(restored.mean, np.mean(values), places=9)
+        self.assertAlmostEqual(restored.std, np.std(values), places=9)
+
+    def test_digest_exact_for_small_windows(self):
+        values = [random.Random(2).uniform(0, 1) for _ in range(60)]
+        digest = QuantileDigest()
+        for value in values:
+            digest.add(value)
+        self.assertEqual(digest.quantiles([0.25, 0.5, 0.75, 0.95]),
+                         list(np.percentile(values, [25, 50, 75, 95])))
+
+    def test_digest_bounded_for_large_streams(self):
+        rng = random.Random(4)
+        values = [rng.lognormvariate(7, 0.6) for _ in range(50000)]
+        parts = [QuantileDigest() for _ in range(5)]
+        for i, value in enumerate(values):
+            parts[i % 5].add(value)
+        digest = QuantileDigest()
+        for part in parts:
+            digest.merge(QuantileDigest.from_state(part.to_state()))
+
+        self.assertLess(len(digest.means), 200)
+        for q in (0.25, 0.5, 0.75, 0.95):
+            expected = np.percentile(values, q * 100)
+            self.assertAlmostEqual(digest.quantile(q) / expected, 1.0, delta=0.02)
+
+
+class TestIncrementalBaselines(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'baselines.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def assertMatchesReference(self, metrics, points):
+        expected = reference_metrics(points)
+        self.assertEqual(metrics.sample_count, expected['sample_count'])
+        self.assertEqual(metrics.days_included, expected['days_included'])
+        for field in ('volume_mean', 'volume_std', 'pressure_mean', 'pressure_std',
+                      'avg_trade_size_mean', 'large_trade_ratio_mean'):
+            self.assertAlmostEqual(getattr(metrics, field), expected[field], places=6, msg=field)
+        actual_p = [metrics.volume_p25, metrics.volume_p50, metrics.volume_p75, metrics.volume_p95]
+        np.testing.assert_allclose(actual_p, expected['volume_p'])
+        actual_p = [metrics.pressure_p25, metrics.pressure_p50, metrics.pressure_p75, metrics.pressure_p95]
+        np.testing.assert_allclose(actual_p, expected['pressure_p'])
+
+    def test_calculate_matches_numpy(self):
+        engine = BaselineCalculationEngine(self.db_path)
+        points = [p for p in generate_points([21000], 12) if p.contract_type == 'C']
+        baselines = engine.calculate_baselines_for_strike(21000, 'C', points)
+
+        self.assertEqual(set(baselines), set(BUCKETS))
+        for bucket, metrics in baselines.items():
+            self.assertMatchesReference(metrics, [p for p in points if p.time_bucket == bucket])
+            self.assertEqual(engine.database.get_baseline_metrics(21000, 'C', bucket).sample_count,
+                             metrics.sample_count)
+
+    def test_daily_updates_slide_window(self):
+        engine = BaselineCalculationEngine(self.db_path, lookback_days=20)
+        points = generate_points([21000, 21025], 26)
+        by_day = {}
+        for point in points:
+            by_day.setdefault(point.date.date(), []).append(point)
+
+        for day in sorted(by_day):
+            engine.update_baselines_incremental(by_day[day])
+
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=20)).date()
+        in_window = [p for p in points if p.date.date() >= cutoff]
+        for strike in (21000, 21025):
+            for contract_type in ('C', 'P'):
+                for bucket in BUCKETS:
+                    expected = [p for p in in_window if (p.strike_price, p.contract_type, p.time_bucket)
+                                == (strike, contract_type, bucket)]
+                    metrics = engine.database.get_baseline_metrics(strike, contract_type, bucket)
+                    self.assertEqual(metrics.days_included, 21)
+                    self.assertMatchesReference(metrics, expected)
+
+        # Evicted days no longer have accumulator state
+        states = engine.database.get_accumulator_states('0000-00-00')
+        self.assertTrue(all(day >= cutoff.isoformat() for _, _, _, day, _ in states))
+
+    def test_restart_and_replay(self):
+        points = generate_points([21000], 10)
+        first = BaselineCalculationEngine(self.db_path)
+        first.update_baselines_incremental(points[:len(points) // 2])
+
+        # A new engine continues from persisted accumulators; replays are deduped
+        second = BaselineCalculationEngine(self.db_path)
+        second.update_baselines_incremental(points[len(points) // 2 - 10:])
+        second.update_baselines_incremental(points[-6:])
+
+        for bucket in BUCKETS:
+            expected = [p for p in points if p.contract_type == 'P' and p.time_bucket == bucket]
+            self.assertMatchesReference(second.get_baseline(21000, 'P', bucket), expected)
+
+    def test_seeds_from_existing_history(self):
+        engine = BaselineCalculationEngine(self.db_path)
+        points = generate_points([21000], 8)
+        engine.database.store_historical_data(points[:-6])
+
+        engine.update_baselines_incremental(points[-6:])
+        expected = [p for p in points if p.contract_type == 'C' and p.time_bucket == BUCKETS[0]]
+        self.assertMatchesReference(engine.database.get_baseline_metrics(21000, 'C', BUCKETS[0]), expected)
+
+
+def legacy_update(engine, new_data):
+    """The previous update path: re-read every bucket of each touched strike"""
+    engine.database.store_historical_data(new_data)
+    for strike, contract_type in {(p.strike_price, p.contract_type) for p in new_data}:
+        all_historical = []
+        for time_bucket in engine.time_buckets:
+            df = engine.database.get_historical_data(strike, contract_type, time_bucket, engine.lookback_days)
+            for _, row in df.iterrows():
+                all_historical.append(HistoricalDataPoint(
+                    date=datetime.fromisoformat(row['date']), strike_price=row['strike_price'],
+                    contract_type=row['contract_type'], time_bucket=row['time_bucket'],
+                    total_volume=row['total_volume'], buy_volume=row['buy_volume'],
+                    sell_volume=row['sell_volume'], buy_pressure_ratio=row['buy_pressure_ratio'],
+                    trade_count=row['trade_count'], avg_trade_size=row['avg_trade_size'],
+                    large_trades=row['large_trades']))
+        engine.calculate_baselines_for_strike(strike, contract_type, all_historical)
+
+
+def run_benchmark(strike_count: int = 40, history_days: int = 20):
+    """Print nightly update time for the legacy recompute and the rolling accumulators"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        strikes = [21000 + i * 25 for i in range(strike_count)]
+        results = {}
+        print(f"\n{'path':<24} {'history rows':>12} {'nightly rows':>12} {'seconds':>10}")
+        for label, update in (("legacy recompute", legacy_update),
+                              ("rolling accumulators", BaselineCalculationEngine.update_baselines_incremental)):
+            engine = BaselineCalculationEngine(os.path.join(temp_dir, f"{label.split()[0]}.db"))
+            points = generate_points(strikes, history_days + 1, buckets=engine.time_buckets)
+            history, nightly = points[:-len(points) // (history_days + 1)], points[-len(points) // (history_days + 1):]
+            update(engine, history)
+
+            start = time.perf_counter()
+            update(engine, nightly)
+            elapsed = time.perf_counter() - start
+            results[label] = elapsed
+            print(f"{label:<24} {len(history):>12,} {len(nightly):>12,} {elapsed:>10.3f}")
+        return results
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    print("📈 Incremental Baseline Benchmark")
+    run_benchmark()
+    unittest.main(verbosity=2)
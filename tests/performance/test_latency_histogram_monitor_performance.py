@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Latency Monitor Histogram Performance Tests
+
+Checks that the rolling per-component histograms behind LatencyMonitor
+serve 1m/5m/1h percentiles within histogram precision of the exact
+values, that minute snapshots round-trip through SQLite and feed the
+performance report, and that threshold alerts fire from the recent
+window. The benchmark compares component statistics from raw
+measurement rows with statistics from histograms.
+"""
+
+import os
+import sys
+import time
+import random
+import logging
+import tempfile
+import unittest
+from datetime import datetime, timezone
+
+# Add necessary paths
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'tasks', 'options_trading_system'))
+sys.path.insert(0, os.path.join(project_root, 'tasks', 'options_trading_system', 'analysis_engine'))
+
+from utils.sqlite_store import get_store
+from phase4.latency_monitor import (
+    LatencyMonitor, LatencyComponent, LatencyMeasurement, LatencyThreshold,
+    RollingLatencyHistogram, decode_histogram
+)
+
+logging.getLogger('phase4.latency_monitor').setLevel(logging.ERROR)
+
+MINUTE = 60
+
+
+def exact_percentile(values, p):
+    ordered = sorted(values)
+    return ordered[max(0, -(-len(ordered) * p // 100) - 1)]
+
+
+class TestRollingHistogram(unittest.TestCase):
+
+    def test_windows_and_ring_reuse(self):
+        rolling = RollingLatencyHistogram()
+        start = 1_000_000 * MINUTE
+        for minute in range(90):
+            for _ in range(minute + 1):
+                rolling.record(10.0 + minute, now=start + minute * MINUTE + 5)
+
+        now = start + 89 * MINUTE + 30
+        last_minute, means = rolling.window(1, now)
+        self.assertEqual(last_minute.count, 90)
+        self.assertEqual(means, [99.0])
+        self.assertEqual(rolling.window(5, now)[0].count, sum(range(86, 91)))
+        hour, means = rolling.window(60, now)
+        self.assertEqual(hour.count, sum(range(31, 91)))  # Minutes 0-29 were overwritten
+        self.assertEqual(len(means), 60)
+        self.assertEqual(hour.min, 40_000)
+        self.assertEqual(hour.max, 99_000)
+
+    def test_percentiles_within_precision(self):
+        rng = random.Random(7)
+        rolling = RollingLatencyHistogram()
+        now = time.time()
+        latencies = [rng.lognormvariate(3.0, 0.8) for _ in range(20_000)]
+        for latency in latencies:
+            rolling.record(latency, now)
+        histogram, _ = rolling.window(1, now)
+        for p in (50, 95, 99):
+            exact = exact_percentile(latencies, p)
+            self.assertAlmostEqual(histogram.percentile(p) / 1000, exact, delta=exact * 0.02)
+
+
+class TestMonitorHistograms(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'latency.db')
+        self.monitor = LatencyMonitor({'db_path': self.db_path, 'analysis': {}})
+
+    def tearDown(self):
+        get_store(self.db_path).close()
+        self.temp_dir.cleanup()
+
+    def _raw_rows(self):
+        self.monitor.database.store.flush()
+        with self.monitor.database.store.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM latency_measurements").fetchone()[0]
+
+    def test_checkpoints_feed_histograms(self):
+        for i in range(5):
+            self.monitor.track_request(f"req_{i}")
+            self.monitor.checkpoint(f"req_{i}", LatencyComponent.DATA_INGESTION)
+            self.monitor.checkpoint(f"req_{i}", LatencyComponent.PRESSURE_ANALYSIS)
+            self.monitor.finish_request(f"req_{i}")
+
+        for component in (LatencyComponent.DATA_INGESTION, LatencyComponent.PRESSURE_ANALYSIS,
+                          LatencyComponent.END_TO_END):
+            self.assertEqual(self.monitor.get_latency_percentiles(component, '1m')['count'], 5)
+        self.assertEqual(self.monitor.get_latency_percentiles(LatencyComponent.DECISION_MAKING)['count'], 0)
+        self.assertEqual(self._raw_rows(), 25)  # Checkpoint rows plus the finished request's rows
+
+    def test_raw_rows_optional(self):
+        monitor = LatencyMonitor({'db_path': self.db_path, 'analysis': {}, 'store_raw_measurements': False})
+        monitor.track_request('req')
+        monitor.checkpoint('req', LatencyComponent.SIGNAL_GENERATION)
+        monitor.finish_request('req')
+        self.assertEqual(self._raw_rows(), 0)
+        self.assertEqual(monitor.get_latency_percentiles(LatencyComponent.END_TO_END)['count'], 1)
+
+    def test_snapshots_round_trip_and_feed_report(self):
+        rng = random.Random(3)
+        now = time.time()
+        component = LatencyComponent.PRESSURE_ANALYSIS
+        latencies = []
+        for minutes_ago in (150, 90, 30, 2, 0):  # 150 and 90 share a ring slot with 30 and are overwritten
+            for _ in range(500):
+                latency = rng.uniform(5, 55) + (40 if minutes_ago == 0 else 0)
+                latencies.append(latency)
+                self.monitor.record_latency(component, latency, now - minutes_ago * MINUTE)
+
+        self.assertEqual(self.monitor.snapshot_histograms(now=now), 2)  # 30 and 2 minutes ago
+        self.assertEqual(self.monitor.snapshot_histograms(now=now), 0)
+        current_minute = RollingLatencyHistogram.minute_of(now)
+        rows = self.monitor.database.get_histogram_snapshots(component, 0, current_minute)
+        self.assertEqual([minute for minute, _ in rows], [current_minute - 30, current_minute - 2])
+        self.assertEqual(rows[0][1].to_state(),
+                         self.monitor.histograms[component].minutes(current_minute - 30,
+                                                                    current_minute - 30)[0][1].to_state())
+
+        with self.monitor.database.store.connection() as conn:
+            blob = conn.execute("SELECT histogram FROM latency_histogram_snapshots LIMIT 1").fetchone()[0]
+        self.assertLess(len(blob), 1024)
+        self.assertEqual(decode_histogram(blob).count, 500)
+
+        report = self.monitor.generate_performance_report(hours=1)
+        stats = report['components'][component.value]
+        self.assertEqual(stats['count'], 1500)
+        recent = latencies[-1500:]
+        self.assertAlmostEqual(stats['p95'], exact_percentile(recent, 95), delta=2.0)
+        self.assertAlmostEqual(stats['mean'], sum(recent) / len(recent), delta=0.5)
+        self.assertEqual(stats['measurements_under_target'], len(recent))
+        self.assertEqual(report['components'][LatencyComponent.END_TO_END.value]['count'], 0)
+
+        # The open minute was persisted too once monitoring stops
+        self.monitor.stop_monitoring()
+        rows = self.monitor.database.get_histogram_snapshots(component, 0, current_minute)
+        self.assertEqual(sum(histogram.count for _, histogram in rows), 1500)
+
+    def test_statistics_match_raw_analysis(self):
+        rng = random.Random(11)
+        component = LatencyComponent.BASELINE_LOOKUP
+        now = datetime.now(timezone.utc)
+        measurements = []
+        for i in range(2000):
+            latency = rng.gammavariate(2.0, 15.0)
+            measurements.append(LatencyMeasurement(f"m{i}", now, component, latency))
+            self.monitor.record_latency(component, latency)
+
+        exact = self.monitor.analyzer.analyze_component_latency(measurements)
+        streamed = self.monitor.get_component_statistics(component, hours=1, force_refresh=True)
+        self.assertEqual(streamed.count, exact.count)
+        for field in ('mean', 'median', 'p95', 'p99', 'std_dev', 'max_latency'):
+            self.assertAlmostEqual(getattr(streamed, field), getattr(exact, field),
+                                   delta=getattr(exact, field) * 0.02, msg=field)
+        self.assertAlmostEqual(streamed.sla_compliance_percentage, exact.sla_compliance_percentage, delta=1.0)
+        self.assertEqual(streamed.performance_grade, exact.performance_grade)
+
+    def test_breach_alerts_from_recent_window(self):
+        component = LatencyComponent.END_TO_END
+        analyzer = self.monitor.analyzer
+        for _ in range(20):
+            self.monitor.record_latency(component, 200.0)
+        recent, minute_means = self.monitor.histograms[component].window(5)
+        alerts = analyzer.check_histogram_breaches(component, recent, minute_means)
+        self.assertEqual({alert.threshold for alert in alerts},
+                         {LatencyThreshold.TARGET, LatencyThreshold.WARNING, LatencyThreshold.CRITICAL})
+        self.assertTrue(all(alert.breach_duration == 1.0 for alert in alerts))
+
+        quiet = LatencyComponent.DATA_INGESTION
+        for _ in range(5):
+            self.monitor.record_latency(quiet, 500.0)
+        recent, minute_means = self.monitor.histograms[quiet].window(5)
+        self.assertEqual(analyzer.check_histogram_breaches(quiet, recent, minute_means), [])
+
+
+def run_benchmark(samples: int = 100_000):
+    """One component's hourly statistics: raw-row re-scan vs rolling histogram"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'latency.db')
+        monitor = LatencyMonitor({'db_path': db_path, 'analysis': {}})
+        component = LatencyComponent.END_TO_END
+        rng = random.Random(1)
+        now = datetime.now(timezone.utc)
+
+        start = time.perf_counter()
+        for i in range(samples):
+            latency = rng.gammavariate(2.0, 15.0)
+            monitor.record_latency(component, latency)
+            monitor.database.store_measurement(LatencyMeasurement(f"m{i}", now, component, latency))
+        monitor.database.store.flush()
+        print(f"  Recorded {samples:,} samples in {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        rows = monitor.database.get_recent_measurements(component, hours=1)
+        exact = monitor.analyzer.analyze_component_latency(rows)
+        rescan = time.perf_counter() - start
+
+        start = time.perf_counter()
+        streamed = monitor.get_component_statistics(component, hours=1, force_refresh=True)
+        histogram = time.perf_counter() - start
+
+        print(f"  Raw-row re-scan:   {rescan * 1000:>9.1f} ms  (p95 {exact.p95:.2f}ms)")
+        print(f"  Rolling histogram: {histogram * 1000:>9.1f} ms  (p95 {streamed.p95:.2f}ms)")
+        print(f"  Speedup: {rescan / histogram:,.0f}x")
+        get_store(db_path).close()
+
+
+if __name__ == '__main__':
+    print("⏱️ Latency Monitor Histogram Benchmark")
+    run_benchmark()
+    unittest.main(verbosity=2)
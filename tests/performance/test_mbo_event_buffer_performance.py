@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+MBO Event Buffer Performance Tests
+
+Checks each overload policy of the bounded event buffer (block, spill,
+shed) and replays a synthetic session through the streaming client with
+a deliberately small queue: block and spill must lose nothing and close
+the same windows as an unconstrained replay, shed must drop low-priority
+instruments first, and events still spilled when the client stops are
+replayed when it restarts. The benchmark compares drain-many hand-off with the
+old one-get-per-event queue.
+"""
+
+import os
+import sys
+import time
+import queue
+import logging
+import tempfile
+import threading
+import unittest
+
+# Add necessary paths
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'tasks', 'options_trading_system'))
+
+from data_ingestion.mbo_event_buffer import MBOEventBuffer, SpillJournal
+from data_ingestion.mbo_replay import MBOReplayHarness, generate_synthetic_mbo, read_mbo_file
+from data_ingestion.databento_websocket_streaming import EnhancedMBOStreamingClient
+
+logging.getLogger('data_ingestion.databento_websocket_streaming').setLevel(logging.ERROR)
+logging.getLogger('data_ingestion.mbo_event_buffer').setLevel(logging.ERROR)
+
+
+def window_keys(windows):
+    return sorted((w.strike_price, w.contract_type, w.time_window_start, w.buy_volume, w.sell_volume)
+                  for w in windows)
+
+
+class TestOverloadPolicies(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.spill_path = os.path.join(self.temp_dir.name, 'spill', 'events.journal')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_drain_many_is_fifo(self):
+        buffer = MBOEventBuffer(maxsize=100)
+        self.assertEqual(buffer.put_many(range(60)), 60)
+        self.assertEqual(buffer.drain(25), list(range(25)))
+        self.assertEqual(buffer.drain(100), list(range(25, 60)))
+        self.assertEqual(buffer.drain(10, timeout=0.01), [])
+        with self.assertRaises(queue.Empty):
+            buffer.get_nowait()
+
+    def test_block_waits_for_space(self):
+        buffer = MBOEventBuffer(maxsize=10)
+        buffer.put_many(range(10))
+        producer = threading.Thread(target=buffer.put_many, args=(range(10, 30),))
+        producer.start()
+
+        received = []
+        while len(received) < 30:
+            received.extend(buffer.drain(4, timeout=1.0))
+            self.assertLessEqual(buffer.qsize(), 10)
+        producer.join()
+        self.assertEqual(received, list(range(30)))
+        self.assertEqual(buffer.dropped, 0)
+        self.assertGreater(buffer.blocked_puts, 0)
+
+    def test_block_timeout_and_close_drop(self):
+        buffer = MBOEventBuffer(maxsize=2, block_timeout=0.01)
+        buffer.put_many((1, 2))
+        self.assertFalse(buffer.put(3))
+        buffer.close()
+        self.assertFalse(buffer.put(4))
+        self.assertEqual(buffer.dropped, 2)
+
+    def test_spill_replays_in_order(self):
+        buffer = MBOEventBuffer(maxsize=100, policy='spill', spill_path=self.spill_path, spill_chunk=16)
+        self.assertEqual(buffer.put_many(range(1000)), 1000)
+        self.assertEqual(buffer.qsize(), 100)
+        self.assertEqual(buffer.spill_pending, 900)
+        self.assertTrue(os.path.getsize(self.spill_path) > 0)
+
+        received = buffer.drain(30)
+        buffer.put_many(range(1000, 1100))  # Arrives after the journal; must not overtake it
+        while True:
+            batch = buffer.drain(30, timeout=0.01)
+            if not batch:
+                break
+            received.extend(batch)
+            self.assertLessEqual(buffer.qsize(), 100)
+
+        self.assertEqual(received, list(range(1100)))
+        self.assertEqual(buffer.get_stats()['events_spilled'], buffer.get_stats()['events_unspilled'])
+        self.assertEqual(os.path.getsize(self.spill_path), 0)
+
+        buffer.put_many(range(200))
+        self.assertEqual(buffer.clear(), 200)
+        self.assertFalse(os.path.exists(self.spill_path))
+
+    def test_journal_keeps_pickled_records(self):
+        records = read_mbo_file(self._session(200))
+        journal = SpillJournal(self.spill_path, chunk_size=64)
+        for record in records:
+            journal.append(record)
+        replayed = []
+        while len(journal):
+            replayed.extend(journal.read_chunk())
+        self.assertEqual([r.to_dict() for r in replayed], [r.to_dict() for r in records])
+        journal.close()
+
+    def test_shed_drops_lowest_priority_newest_first(self):
+        buffer = MBOEventBuffer(maxsize=6, policy='shed', priority=lambda event: event[0])
+        buffer.put_many([(0, 'a'), (1, 'b'), (0, 'c'), (2, 'd'), (0, 'e'), (1, 'f')])
+        self.assertFalse(buffer.put((0, 'g')))  # Nothing lower to evict
+        self.assertTrue(buffer.put((2, 'h')))   # Evicts (0, 'e')
+        self.assertTrue(buffer.put((1, 'i')))   # Evicts (0, 'c')
+        self.assertEqual(buffer.dropped, 3)
+        self.assertEqual(buffer.qsize(), 6)
+        self.assertEqual([event[1] for event in buffer.drain(10)], ['a', 'b', 'd', 'f', 'h', 'i'])
+
+    def test_shed_compacts_tombstones(self):
+        buffer = MBOEventBuffer(maxsize=4, policy='shed', priority=lambda event: event)
+        buffer.put_many((0, 0, 0, 0))
+        for _ in range(50):
+            buffer.put(0)   # Shed on arrival
+            buffer.put(1)   # Evicts a 0, then 1s evict nothing
+        self.assertLessEqual(len(buffer._items), 2 * buffer.maxsize + 1)
+        self.assertEqual(buffer.drain(10), [1, 1, 1, 1])
+
+    def _session(self, events):
+        path = os.path.join(self.temp_dir.name, f'session_{events}.csv')
+        generate_synthetic_mbo(path, events=events, strikes=10, events_per_second=50)
+        return path
+
+
+class TestClientOverload(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        path = os.path.join(cls.temp_dir.name, 'session.csv')
+        generate_synthetic_mbo(path, events=20_000, strikes=20, events_per_second=50)
+        cls.records = read_mbo_file(path)
+        reference = MBOReplayHarness(cls.records, window_minutes=1)
+        reference.run()
+        cls.reference_windows = window_keys(reference.windows)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
+
+    def _replay(self, policy, **options):
+        harness = MBOReplayHarness(self.records, window_minutes=1, queue_size=64, overload_policy=policy,
+                                   spill_dir=os.path.join(self.temp_dir.name, policy), **options)
+        return harness, harness.run()
+
+    def test_block_is_lossless(self):
+        harness, report = self._replay('block')
+        self.assertEqual(report['events_dropped'], 0)
+        self.assertEqual(report['events_processed'], len(self.records))
+        self.assertGreater(report['blocked_puts'], 0)
+        self.assertLessEqual(report['queue_depth']['max'], 64)
+        self.assertEqual(window_keys(harness.windows), self.reference_windows)
+
+    def test_spill_is_lossless(self):
+        harness, report = self._replay('spill')
+        self.assertEqual(report['events_dropped'], 0)
+        self.assertEqual(report['events_processed'], len(self.records))
+        self.assertGreater(report['events_spilled'], 0)
+        self.assertEqual(window_keys(harness.windows), self.reference_windows)
+
+    def test_shed_keeps_priority_instruments(self):
+        # Calls outrank puts, so shedding should fall on puts
+        priority = {record.instrument_id: 1 for record in self.records if ' C' in record.symbol}
+        harness, report = self._replay('shed', instrument_priority=priority)
+        self.assertGreater(report['events_dropped'], 0)
+        self.assertEqual(report['events_processed'] + report['events_dropped'], len(self.records))
+
+        def volume(windows, contract_type):
+            return sum(w[3] + w[4] for w in windows if w[1] == contract_type)
+
+        kept = window_keys(harness.windows)
+        call_share = volume(kept, 'C') / volume(self.reference_windows, 'C')
+        put_share = volume(kept, 'P') / volume(self.reference_windows, 'P')
+        self.assertGreater(call_share, put_share)
+
+        stats = harness.client.get_stats()
+        self.assertEqual(stats['overload_policy'], 'shed')
+        self.assertEqual(stats['events_dropped'], report['events_dropped'])
+
+
+    def test_spilled_events_survive_stop(self):
+        records = self.records[:2000]
+        client = EnhancedMBOStreamingClient(None, replay=True, queue_size=64, overload_policy='spill',
+                                            spill_dir=os.path.join(self.temp_dir.name, 'restart'))
+        processed, gate = [], threading.Event()
+
+        def slow_consumer(batch):
+            gate.wait()
+            processed.extend(batch)
+
+        client.on_mbo_batch = slow_consumer
+        client.start()
+        for record in records:
+            client._handle_raw_event(record)
+        self.assertGreater(client.event_queue.spill_pending, 0)
+
+        # Stop while the consumer is stuck mid-batch, with most events still on disk
+        stopper = threading.Thread(target=client.stop)
+        stopper.start()
+        while not client.should_stop:
+            time.sleep(0.001)
+        gate.set()
+        stopper.join()
+        self.assertLess(len(processed), len(records))
+        self.assertGreater(client.event_queue.spill_pending, 0)
+        self.assertTrue(os.path.getsize(client.event_queue.spill_path))
+
+        client.start()
+        try:
+            deadline = time.time() + 30
+            while len(processed) < len(records) and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            client.stop()
+        self.assertEqual([r.sequence for r in processed], [r.sequence for r in records])
+        self.assertEqual(client.event_queue.get_stats()['events_dropped'], 0)
+        self.assertEqual(client.event_queue.spill_pending, 0)
+
+
+def run_benchmark(events: int = 500_000, batch_size: int = 500):
+    """Producer/consumer hand-off: queue.Queue get-per-event vs MBOEventBuffer.drain"""
+    def consume_queue(q):
+        taken = 0
+        while taken < events:
+            batch = [q.get(timeout=1.0)]
+            while len(batch) < batch_size:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            taken += len(batch)
+
+    def consume_buffer(buffer):
+        taken = 0
+        while taken < events:
+            taken += len(buffer.drain(batch_size, timeout=1.0))
+
+    legacy = queue.Queue(maxsize=50000)
+    buffer = MBOEventBuffer(maxsize=50000)
+    for name, put, consume, target in (('queue.Queue', legacy.put, consume_queue, legacy),
+                                       ('MBOEventBuffer', buffer.put, consume_buffer, buffer)):
+        consumer = threading.Thread(target=consume, args=(target,))
+        start = time.perf_counter()
+        consumer.start()
+        for i in range(events):
+            put(i)
+        consumer.join()
+        elapsed = time.perf_counter() - start
+        print(f"  {name:<15} {events / elapsed:>12,.0f} events/sec")
+
+
+if __name__ == '__main__':
+    print("📦 MBO Event Buffer Benchmark")
+    run_benchmark()
+    unittest.main(verbosity=2)
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+MBO Hot Path Performance Tests
+
+Validates the compact MBO record path (MBORecord / MBOBatch feeding
+process_events) against the legacy per-event dictionary path, and reports
+events/sec and bytes allocated per event for each.
+"""
+
+import os
+import sys
+import time
+import random
+import tracemalloc
+import unittest
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Add necessary paths
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'tasks', 'options_trading_system'))
+
+from data_ingestion.mbo_records import MBORecord, MBOBatch, MBO_RECORD_SIZE
+from data_ingestion.mbo_event_processor import MBOEventStreamProcessor, ProcessedMBOEvent
+
+STRIKES = [21000 + i * 25 for i in range(16)]
+
+
+def generate_messages(count: int, seed: int = 7, start_ns: int = None):
+    """Synthetic Databento-style MBO messages: quote updates with ~25% trades"""
+    rng = random.Random(seed)
+    ts = start_ns or time.time_ns()
+    messages = []
+    for i in range(count):
+        strike = STRIKES[i % len(STRIKES)]
+        option_type = 'C' if (i // len(STRIKES)) % 2 == 0 else 'P'
+        bid = 100.0 + (i % 7) * 0.25
+        roll = rng.random()
+        if roll < 0.375:
+            action, side, price = 'A', 'B', bid
+        elif roll < 0.75:
+            action, side, price = 'A', 'A', bid + 0.5
+        else:
+            action, side, price = 'T', 'N', rng.choice([bid, bid + 0.5, bid + 0.25])
+        ts += 1000
+        messages.append(SimpleNamespace(
+            ts_event=ts, ts_recv=ts + 200, instrument_id=1000 + STRIKES.index(strike) * 2 + (option_type == 'P'),
+            symbol=f"NQM5 {option_type}{strike}", action=action, side=side, price=price,
+            size=rng.randint(1, 150), order_id=i, flags=0, sequence=i,
+            order_priority=i, ts_in_delta=100
+        ))
+    return messages
+
+
+def _comparable(event: ProcessedMBOEvent):
+    result = event.to_dict()
+    result.pop('timestamp')
+    return result
+
+
+class TestMBORecords(unittest.TestCase):
+
+    def test_record_reads_like_legacy_dict(self):
+        message = generate_messages(1)[0]
+        record = MBORecord.from_databento(message)
+        legacy = record.to_dict()
+
+        self.assertEqual(len(legacy), 16)
+        for key, value in legacy.items():
+            self.assertEqual(record.get(key), value, key)
+        self.assertEqual(record['symbol'], message.symbol)
+        self.assertEqual(record.get('missing', 'default'), 'default')
+        self.assertEqual(record.nbytes, MBO_RECORD_SIZE)
+        self.assertFalse(hasattr(record, '__dict__'))
+
+    def test_batch_columns(self):
+        messages = generate_messages(100)
+        batch = MBOBatch.from_records(messages)
+        self.assertEqual(len(batch), 100)
+        rows = list(batch.rows())
+        self.assertEqual(rows[5][0], messages[5].symbol)
+        self.assertEqual(rows[5][3], messages[5].action)
+        self.assertLess(batch.nbytes, 100 * MBO_RECORD_SIZE)
+
+
+class TestBatchProcessing(unittest.TestCase):
+
+    def setUp(self):
+        self.messages = generate_messages(2000)
+
+    def test_batch_matches_per_event(self):
+        per_event = MBOEventStreamProcessor()
+        expected = [per_event.process_event(MBORecord.from_databento(m).to_dict()) for m in self.messages]
+
+        for source in ([MBORecord.from_databento(m) for m in self.messages],
+                       MBOBatch.from_records(self.messages)):
+            batched = MBOEventStreamProcessor()
+            actual = batched.process_events(source)
+            self.assertEqual([_comparable(e) for e in expected], [_comparable(e) for e in actual])
+            self.assertEqual(batched.get_stats(), per_event.get_stats())
+
+    def test_processed_event_is_compact(self):
+        event = MBOEventStreamProcessor().process_events([MBORecord.from_databento(self.messages[0])])[0]
+        self.assertFalse(hasattr(event, '__dict__'))
+        self.assertEqual(event.exchange_timestamp,
+                         datetime.fromtimestamp(self.messages[0].ts_event // 1000 / 1e6, tz=timezone.utc))
+
+    def test_window_start_ns_matches_datetime(self):
+        processor = MBOEventStreamProcessor(window_minutes=7)
+        for ts_ns in (1718893851_123456789, 1718895599_999999999, 1718892000_000000000):
+            timestamp = datetime.fromtimestamp(ts_ns // 1000 / 1e6, tz=timezone.utc)
+            expected = timestamp.replace(minute=timestamp.minute // 7 * 7, second=0, microsecond=0)
+            self.assertEqual(processor._window_start_ns(ts_ns), int(expected.timestamp()) * 1_000_000_000)
+
+    def test_aggregate_trades_returns_all_completed_windows(self):
+        processor = MBOEventStreamProcessor(window_minutes=5)
+        old = generate_messages(400, start_ns=time.time_ns() - 3600 * 1_000_000_000)
+        events = processor.process_events(MBOBatch.from_records(old))
+        self.assertEqual(processor.aggregate_trades(events), [])
+
+        trades = [e for e in events if e.action == 'T']
+        completed = processor.advance_watermark()
+        self.assertEqual(len(completed), len({(e.strike_price, e.contract_type) for e in trades}))
+        self.assertEqual(sum(m.total_volume for m in completed), sum(e.size for e in trades))
+        self.assertEqual(len(processor.active_windows), 0)
+
+    def test_streaming_client_queues_records(self):
+        import data_ingestion.databento_websocket_streaming as streaming
+        with patch.object(streaming, "DATABENTO_AVAILABLE", True):
+            client = streaming.EnhancedMBOStreamingClient("test-key", enable_backfill=False)
+
+        for message in self.messages[:10]:
+            client._handle_raw_event(message)
+
+        self.assertEqual(client.stats['events_received'], 10)
+        self.assertEqual(client.stats['bytes_received'], 10 * MBO_RECORD_SIZE)
+        self.assertIsInstance(client.event_queue.get_nowait(), MBORecord)
+
+
+def _measure(fn, count):
+    """Return (events/sec, bytes allocated per event) for fn()"""
+    start = time.perf_counter()
+    fn()
+    rate = count / (time.perf_counter() - start)
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = fn()
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del result
+    return rate, allocated / count
+
+
+def run_benchmark(event_count: int = 100000):
+    """Print events/sec and retained bytes per event for each ingestion path"""
+    messages = generate_messages(event_count)
+
+    def legacy_path():
+        processor = MBOEventStreamProcessor()
+        events = [MBORecord.from_databento(m).to_dict() for m in messages]
+        return events, [processor.process_event(e) for e in events]
+
+    def record_path():
+        processor = MBOEventStreamProcessor()
+        records = [MBORecord.from_databento(m) for m in messages]
+        return records, processor.process_events(records)
+
+    def batch_path():
+        processor = MBOEventStreamProcessor()
+        batch = MBOBatch.from_records(messages)
+        return batch, processor.process_events(batch)
+
+    results = {}
+    print(f"\n{'path':<22} {'events/sec':>12} {'bytes/event':>12}")
+    for label, fn in (("dict per event", legacy_path), ("MBORecord batch", record_path),
+                      ("MBOBatch columns", batch_path)):
+        rate, per_event = _measure(fn, event_count)
+        results[label] = {"events_per_sec": rate, "bytes_per_event": per_event}
+        print(f"{label:<22} {rate:12,.0f} {per_event:12,.0f}")
+    return results
+
+
+if __name__ == '__main__':
+    print("⚡ MBO Hot Path Benchmark")
+    run_benchmark()
+    unittest.main(verbosity=2)
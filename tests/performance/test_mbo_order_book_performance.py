@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+MBO Order Book Performance Tests
+
+Validates per-order book reconstruction against a brute-force reference
+and replays a synthetic NQ options MBO stream to report messages/sec.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import unittest
+
+# Add necessary paths
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'tasks', 'options_trading_system'))
+
+from data_ingestion.mbo_order_book import OrderBook, OrderBookTracker
+from data_ingestion.mbo_event_processor import MBOEventStreamProcessor
+
+# Rough peak message rate for the NQ options complex on GLBX.MDP3
+TARGET_MESSAGES_PER_SEC = 100000
+
+
+def generate_mbo_stream(count: int, instruments: int = 50, seed: int = 11):
+    """
+    Synthetic MBO messages (action, side, price, size, order_id, instrument_id)
+
+    Mix of adds, modifies, partial/full cancels, fills and trades over a
+    resting book of a few hundred orders per instrument.
+    """
+    rng = random.Random(seed)
+    live = {i: {} for i in range(instruments)}
+    next_order_id = 1
+    messages = []
+
+    for _ in range(count):
+        instrument_id = rng.randrange(instruments)
+        orders = live[instrument_id]
+        roll = rng.random()
+
+        if roll < 0.40 or len(orders) < 20:
+            side = rng.choice('BA')
+            price = round(100.0 + (-rng.randint(1, 20) if side == 'B' else rng.randint(0, 19)) * 0.25, 2)
+            size = rng.randint(1, 50)
+            orders[next_order_id] = [side, price, size]
+            messages.append(('A', side, price, size, next_order_id, instrument_id))
+            next_order_id += 1
+            continue
+
+        order_id = rng.choice(list(orders)) if len(orders) < 64 else next(iter(orders))
+        side, price, size = orders[order_id]
+        if roll < 0.60:
+            new_price = round(price + rng.choice((-0.25, 0, 0.25)), 2)
+            new_size = rng.randint(1, 50)
+            orders[order_id] = [side, new_price, new_size]
+            messages.append(('M', side, new_price, new_size, order_id, instrument_id))
+        elif roll < 0.85:
+            cancelled = size if rng.random() < 0.7 else rng.randint(1, size)
+            messages.append(('C', side, price, cancelled, order_id, instrument_id))
+            if cancelled >= size:
+                del orders[order_id]
+            else:
+                orders[order_id][2] -= cancelled
+        else:
+            filled = rng.randint(1, size)
+            messages.append(('T', 'A' if side == 'B' else 'B', price, filled, 0, instrument_id))
+            messages.append(('F', side, price, filled, order_id, instrument_id))
+            if filled >= size:
+                del orders[order_id]
+            else:
+                orders[order_id][2] -= filled
+
+    return messages, live
+
+
+class TestOrderBook(unittest.TestCase):
+
+    def test_matches_reference_book(self):
+        messages, reference = generate_mbo_stream(20000, instruments=5)
+        tracker = OrderBookTracker()
+        for action, side, price, size, order_id, instrument_id in messages:
+            tracker.apply(instrument_id, action, side, price, size, order_id)
+
+        for instrument_id, orders in reference.items():
+            bids = [price for side, price, _ in orders.values() if side == 'B']
+            asks = [price for side, price, _ in orders.values() if side == 'A']
+            self.assertEqual(tracker.get_bid_ask(instrument_id), (max(bids, default=None), min(asks, default=None)))
+
+            for side in 'BA':
+                depth = {}
+                for order_side, price, size in orders.values():
+                    if order_side == side:
+                        depth[price] = depth.get(price, 0) + size
+                for price, size in depth.items():
+                    self.assertEqual(tracker.get_depth(instrument_id, side, price), size)
+
+    def test_cancelled_best_bid_falls_back(self):
+        book = OrderBook(1)
+        book.add(1, 'B', 10.00, 5)
+        book.add(2, 'B', 10.25, 5)
+        book.add(3, 'A', 10.75, 5)
+        self.assertEqual(book.best_bid, 10.25)
+
+        book.cancel(2)
+        self.assertEqual(book.best_bid, 10.00)
+
+        book.fill(3, 2)
+        self.assertEqual(book.depth_at('A', 10.75), 3)
+        book.fill(3, 3)
+        self.assertIsNone(book.best_ask)
+
+    def test_modify_moves_level(self):
+        book = OrderBook(1)
+        book.add(1, 'A', 11.00, 4)
+        book.modify(1, 'A', 10.50, 6)
+        self.assertEqual(book.best_ask, 10.50)
+        self.assertEqual(book.depth_at('A', 11.00), 0)
+        self.assertEqual(book.depth_at('A', 10.50), 6)
+
+    def test_deleted_levels_are_skipped_and_compacted(self):
+        book = OrderBook(1)
+        for i in range(500):
+            book.add(i, 'B', 10.0 + i * 0.25, 1)
+        for i in range(499, 0, -1):
+            book.cancel(i)
+            self.assertEqual(book.best_bid, 10.0 + (i - 1) * 0.25)
+        book.add(1000, 'B', 12.0, 1)  # Re-listing a deleted level
+        self.assertEqual(book.best_bid, 12.0)
+        self.assertEqual(book.bids.prices, [10.0, 12.0])
+        self.assertLessEqual(len(book.bids._heap), 2 * len(book.bids.levels) + 64)
+
+        # Churn at depth never lets stale entries pile up
+        for i in range(20000):
+            book.add(2000 + i, 'A', 20.0 + (i % 400) * 0.25, 1)
+            book.cancel(2000 + i)
+        self.assertIsNone(book.best_ask)
+        self.assertLessEqual(len(book.asks._heap), 64)
+
+    def test_snapshot_round_trip(self):
+        messages, _ = generate_mbo_stream(5000, instruments=5)
+        tracker = OrderBookTracker()
+        for action, side, price, size, order_id, instrument_id in messages:
+            tracker.apply(instrument_id, action, side, price, size, order_id)
+
+        restored = OrderBookTracker()
+        restored.restore(json.loads(json.dumps(tracker.snapshot())))
+        for instrument_id in range(5):
+            self.assertEqual(restored.get_bid_ask(instrument_id), tracker.get_bid_ask(instrument_id))
+            self.assertEqual(restored.books[instrument_id].orders, tracker.books[instrument_id].orders)
+
+    def test_processor_classifies_against_live_book(self):
+        processor = MBOEventStreamProcessor()
+        base = {'symbol': 'NQM5 C21000', 'instrument_id': 7, 'ts_event': time.time_ns()}
+        for action, side, price, order_id in (('A', 'B', 10.0, 1), ('A', 'B', 10.25, 2),
+                                              ('A', 'A', 10.75, 3), ('C', 'B', 10.25, 2)):
+            processor.process_event(dict(base, action=action, side=side, price=price, size=5, order_id=order_id))
+
+        trade = processor.process_event(dict(base, action='T', side='A', price=10.0, size=1))
+        # The stale 10.25 bid is gone, so a print at 10.00 hit the bid
+        self.assertEqual((trade.bid_price, trade.ask_price), (10.0, 10.75))
+        self.assertEqual(trade.trade_direction, 'SELL')
+
+
+def measure_level_churn(depth: int, operations: int = 100000) -> float:
+    """Mean µs to open and close one price level, plus a best-price read, with `depth` levels resting"""
+    rng = random.Random(depth)
+    book = OrderBook(1)
+    for i in range(depth):
+        book.add(i, 'B', i * 0.25, 1)
+    prices = [rng.randrange(depth) * 0.25 + 0.125 for _ in range(operations)]
+
+    start = time.perf_counter()
+    for i, price in enumerate(prices):
+        book.add(depth + i, 'B', price, 1)
+        book.best_bid
+        book.cancel(depth + i)
+    return (time.perf_counter() - start) / operations * 1e6
+
+
+def run_benchmark(message_count: int = 300000):
+    """Print replay messages/sec for the order book alone and through the processor"""
+    messages, _ = generate_mbo_stream(message_count)
+    count = len(messages)
+
+    tracker = OrderBookTracker()
+    apply = tracker.apply
+    start = time.perf_counter()
+    for action, side, price, size, order_id, instrument_id in messages:
+        apply(instrument_id, action, side, price, size, order_id)
+    book_rate = count / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    snapshot = tracker.snapshot()
+    OrderBookTracker().restore(snapshot)
+    restore_ms = (time.perf_counter() - start) * 1000
+    resting = sum(len(book['orders']) for book in snapshot['books'])
+
+    processor = MBOEventStreamProcessor()
+    events = [{'symbol': f"NQM5 C{21000 + instrument_id * 25}", 'instrument_id': instrument_id + 1,
+               'ts_event': 1, 'action': action, 'side': side, 'price': price, 'size': size,
+               'order_id': order_id}
+              for action, side, price, size, order_id, instrument_id in messages]
+    start = time.perf_counter()
+    processor.process_events(events)
+    processor_rate = count / (time.perf_counter() - start)
+
+    print(f"\n{'stage':<28} {'result':>16}")
+    print(f"{'messages replayed':<28} {count:>16,}")
+    print(f"{'order book msgs/sec':<28} {book_rate:>16,.0f}")
+    print(f"{'processor msgs/sec':<28} {processor_rate:>16,.0f}")
+    print(f"{'snapshot+restore ms':<28} {restore_ms:>16,.1f} ({resting:,} orders)")
+    print(f"{'target msgs/sec':<28} {TARGET_MESSAGES_PER_SEC:>16,}")
+
+    print(f"\n{'resting levels':>14} {'µs/level churn':>15}")
+    for depth in (100, 1000, 10000, 100000):
+        print(f"{depth:>14,} {measure_level_churn(depth):>15.2f}")
+    return {"book_rate": book_rate, "processor_rate": processor_rate, "restore_ms": restore_ms}
+
+
+if __name__ == '__main__':
+    print("📒 MBO Order Book Replay Benchmark")
+    run_benchmark()
+    unittest.main(verbosity=2)
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+MBO Replay Harness Performance Tests
+
+Replays deterministic synthetic MBO sessions through the real ingest chain
+(EnhancedMBOStreamingClient._handle_raw_event -> event queue ->
+MBOEventStreamProcessor -> IFDv3Engine.analyze_pressure_event) and checks
+that every event is accounted for, that paced and max-speed replays close
+the same windows, and that the latency histograms and regression gate
+report what they should. The benchmark prints the full replay report at
+max speed and 10x.
+"""
+
+import os
+import sys
+import math
+import random
+import logging
+import tempfile
+import unittest
+
+# Add necessary paths
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'tasks', 'options_trading_system'))
+sys.path.insert(0, os.path.join(project_root, 'tasks', 'options_trading_system', 'analysis_engine'))
+
+from utils.sqlite_store import get_store
+from data_ingestion.streaming_stats import LatencyHistogram
+from data_ingestion.mbo_event_processor import MBOEventStreamProcessor
+from data_ingestion.mbo_replay import (
+    MBOReplayHarness, generate_synthetic_mbo, read_mbo_file, check_regression, format_report
+)
+from institutional_flow_v3.solution import IFDv3Engine
+
+logging.getLogger('institutional_flow_v3.solution').setLevel(logging.WARNING)
+logging.getLogger('data_ingestion.databento_websocket_streaming').setLevel(logging.ERROR)
+logging.getLogger('data_ingestion.mbo_event_processor').setLevel(logging.WARNING)
+
+
+def window_keys(windows):
+    return sorted((w.strike_price, w.contract_type, w.time_window_start, w.buy_volume, w.sell_volume)
+                  for w in windows)
+
+
+class ReplayTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.session_path = os.path.join(cls.temp_dir.name, 'session.csv')
+        generate_synthetic_mbo(cls.session_path, events=20_000, strikes=20, events_per_second=50)
+        cls.records = read_mbo_file(cls.session_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
+
+
+class TestSyntheticSessions(ReplayTestCase):
+
+    def test_generator_is_deterministic(self):
+        again = os.path.join(self.temp_dir.name, 'again.csv.gz')
+        other = os.path.join(self.temp_dir.name, 'other.csv')
+        generate_synthetic_mbo(again, events=20_000, strikes=20, events_per_second=50)
+        generate_synthetic_mbo(other, events=20_000, strikes=20, events_per_second=50, seed=8)
+
+        replayed = read_mbo_file(again)
+        self.assertEqual([r.to_dict() for r in replayed[:50]], [r.to_dict() for r in self.records[:50]])
+        self.assertEqual([(r.ts_event, r.price, r.size) for r in replayed],
+                         [(r.ts_event, r.price, r.size) for r in self.records])
+        self.assertNotEqual([r.price for r in read_mbo_file(other)], [r.price for r in self.records])
+
+    def test_session_shape(self):
+        self.assertGreaterEqual(len(self.records), 20_000)
+        timestamps = [r.ts_event for r in self.records]
+        self.assertEqual(timestamps, sorted(timestamps))
+        self.assertEqual({r.action for r in self.records}, {'A', 'C', 'T'})
+        self.assertEqual(len({r.instrument_id for r in self.records}), 40)
+
+
+class TestLatencyHistogram(unittest.TestCase):
+
+    def test_percentiles_within_precision(self):
+        rng = random.Random(3)
+        values = [int(rng.lognormvariate(10, 1.5)) for _ in range(50_000)]
+        histogram = LatencyHistogram()
+        for value in values:
+            histogram.record(value)
+        values.sort()
+        for p in (50, 90, 99, 99.9):
+            exact = values[max(1, math.ceil(len(values) * p / 100)) - 1]
+            self.assertLessEqual(abs(histogram.percentile(p) - exact), exact * 0.016 + 1)
+        self.assertEqual((histogram.min, histogram.max, histogram.count), (values[0], values[-1], len(values)))
+
+    def test_merge_and_state(self):
+        first, second, both = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+        for value in range(0, 100_000, 7):
+            (first if value % 2 else second).record(value)
+            both.record(value)
+        first.merge(second)
+        self.assertEqual(first.counts, both.counts)
+        self.assertEqual(first.percentiles((50, 99)), both.percentiles((50, 99)))
+        restored = LatencyHistogram.from_state(both.to_state())
+        self.assertEqual((restored.counts, restored.total, restored.min), (both.counts, both.total, both.min))
+
+
+class TestReplayHarness(ReplayTestCase):
+
+    def test_max_speed_matches_direct_processing(self):
+        report = MBOReplayHarness(self.records, window_minutes=1).run()
+        self.assertEqual(report['events_received'], len(self.records))
+        self.assertEqual(report['events_processed'], len(self.records))
+        self.assertEqual(report['events_dropped'], 0)
+        self.assertEqual(report['latency_us']['end_to_end']['count'], len(self.records))
+        self.assertGreater(report['events_per_second'], 0)
+
+        processor = MBOEventStreamProcessor(window_minutes=1)
+        expected = processor.aggregate_trades(processor.process_events(self.records)) + processor.flush_windows()
+        harness = MBOReplayHarness(self.records, window_minutes=1)
+        harness.run()
+        self.assertEqual(window_keys(harness.windows), window_keys(expected))
+        self.assertGreater(len(expected), 100)
+
+    def test_paced_replay(self):
+        records = self.records[:3000]
+        recorded = (records[-1].ts_event - records[0].ts_event) / 1e9
+        harness = MBOReplayHarness(records, speed=recorded / 0.3, window_minutes=1)  # ~0.3s of wall time
+        report = harness.run()
+        self.assertGreaterEqual(report['feed_seconds'], 0.28)
+        self.assertEqual(report['events_dropped'], 0)
+        self.assertTrue(report['queue_depth']['samples'])
+
+        unpaced = MBOReplayHarness(records, window_minutes=1)
+        unpaced.run()
+        self.assertEqual(window_keys(harness.windows), window_keys(unpaced.windows))
+
+    def test_full_chain_with_ifd(self):
+        db_path = os.path.join(self.temp_dir.name, 'replay_baselines.db')
+        engine = IFDv3Engine({'baseline_db_path': db_path})
+        harness = MBOReplayHarness(self.records, window_minutes=1, engine=engine)
+        report = harness.run()
+        engine.close()
+        get_store(db_path).close()
+
+        self.assertEqual(report['analysis_errors'], 0)
+        self.assertEqual(report['latency_us']['analyze']['count'], report['windows_closed'])
+        self.assertEqual(engine.get_latency_stats()['total']['count'], report['windows_closed'])
+        self.assertEqual(set(report['latency_us']), set(MBOReplayHarness.STAGES))
+
+    def test_overflow_is_counted(self):
+        report = MBOReplayHarness(self.records, window_minutes=1, queue_size=50, overload_policy='shed').run()
+        self.assertGreater(report['events_dropped'], 0)
+        self.assertEqual(report['events_processed'] + report['events_dropped'], len(self.records))
+        self.assertLessEqual(report['queue_depth']['max'], 50)
+
+    def test_regression_gate(self):
+        report = MBOReplayHarness(self.records, window_minutes=1).run()
+        self.assertEqual(check_regression(report, report), [])
+
+        slower = dict(report, events_per_second=report['events_per_second'] * 0.5, events_dropped=10)
+        failures = check_regression(slower, report)
+        self.assertEqual(len(failures), 2)
+        self.assertIn('throughput', failures[0])
+
+
+def run_benchmark(events: int = 100_000):
+    """Print the replay report for a synthetic session at max speed and 10x, IFD included"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, 'session.csv')
+        generate_synthetic_mbo(path, events=events, strikes=40, events_per_second=2000)
+        records = read_mbo_file(path)
+        for speed in (None, 10.0):
+            db_path = os.path.join(temp_dir, f'baselines_{speed}.db')
+            engine = IFDv3Engine({'baseline_db_path': db_path})
+            report = MBOReplayHarness(records, speed=speed, engine=engine, window_minutes=1).run()
+            engine.close()
+            get_store(db_path).close()
+            print()
+            print(format_report(report))
+
+
+if __name__ == '__main__':
+    print("🎞️ MBO Replay Harness Benchmark")
+    run_benchmark()
+    unittest.main(verbosity=2)
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Sharded MBO Processing Performance Tests
+
+Checks that hash-partitioning MBO events by instrument across worker
+processes closes exactly the windows a single MBOEventStreamProcessor
+does - including strikes shared by several expirations, whose partial
+windows live on different shards - in exchange-time order, and through
+the replay harness and the live streaming client with IFD analysis
+attached. The benchmark replays a
+synthetic session at max speed on 1..N shards.
+"""
+
+import os
+import sys
+import time
+import logging
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add necessary paths
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'tasks', 'options_trading_system'))
+sys.path.insert(0, os.path.join(project_root, 'tasks', 'options_trading_system', 'analysis_engine'))
+
+from utils.sqlite_store import get_store
+from data_ingestion.mbo_event_processor import MBOEventStreamProcessor, PressureWindow, build_pressure_metrics
+from data_ingestion.mbo_records import MBORecord
+from data_ingestion.mbo_sharding import ShardedMBOProcessor
+from data_ingestion.mbo_replay import MBOReplayHarness, generate_synthetic_mbo, read_mbo_file, format_report
+import data_ingestion.databento_websocket_streaming as streaming
+from data_ingestion.databento_websocket_streaming import EnhancedMBOStreamingClient
+from institutional_flow_v3.solution import IFDv3Engine
+
+logging.getLogger('data_ingestion.databento_websocket_streaming').setLevel(logging.ERROR)
+logging.getLogger('data_ingestion.mbo_event_processor').setLevel(logging.WARNING)
+logging.getLogger('data_ingestion.mbo_sharding').setLevel(logging.WARNING)
+logging.getLogger('institutional_flow_v3.solution').setLevel(logging.WARNING)
+
+
+def window_keys(windows):
+    return [(w.strike_price, w.contract_type, w.time_window_start, w.buy_volume, w.sell_volume,
+             w.neutral_volume, w.large_buy_trades, w.total_spread_samples, round(w.avg_spread, 9))
+            for w in windows]
+
+
+def two_expiration_session(directory: str, events: int = 10_000):
+    """Two expirations with the same strikes, interleaved in exchange time"""
+    front = os.path.join(directory, 'front.csv')
+    back = os.path.join(directory, 'back.csv')
+    generate_synthetic_mbo(front, events=events, strikes=10, events_per_second=50)
+    generate_synthetic_mbo(back, events=events, strikes=10, events_per_second=50, seed=9, underlying='NQU5')
+    records = read_mbo_file(front)
+    for record in read_mbo_file(back):
+        record.instrument_id += 1_000_001  # Odd offset: same strike lands on the other shard of two
+        records.append(record)
+    records.sort(key=lambda record: record.ts_event)
+    return records
+
+
+def single_process_windows(records, window_minutes=1, batch_size=500):
+    processor = MBOEventStreamProcessor(window_minutes=window_minutes)
+    closed = []
+    for i in range(0, len(records), batch_size):
+        closed.extend(processor.aggregate_trades(processor.process_events(records[i:i + batch_size])))
+    return closed + processor.flush_windows()
+
+
+class TestWindowMerge(unittest.TestCase):
+
+    def test_split_window_merges_to_whole(self):
+        whole, first, second = PressureWindow(), PressureWindow(), PressureWindow()
+        for i, part in enumerate((first, second, first, second, second)):
+            for window in (whole, part):
+                window.buy_volume += i + 1
+                window.sell_trades += 1
+                window.large_buy_trades += i % 2
+                window.spread_sum += 0.25 * i
+                window.spread_samples += 1
+        first.merge(second)
+        key = (21000.0, 'C', 0)
+        self.assertEqual(build_pressure_metrics(key, first, 5), build_pressure_metrics(key, whole, 5))
+
+
+class TestShardedProcessor(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.records = two_expiration_session(cls.temp_dir.name)
+        cls.expected = single_process_windows(cls.records)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
+
+    def _run_sharded(self, shards, batch_size=500):
+        processor = ShardedMBOProcessor(shards, window_minutes=1)
+        delivered, rounds = [], []
+        processor.on_windows_closed = delivered.extend
+        processor.on_round_complete = lambda round_id, windows: rounds.append(round_id)
+        processor.start()
+        try:
+            for i in range(0, len(self.records), batch_size):
+                processor.submit(self.records[i:i + batch_size])
+            flushed = processor.flush_windows()
+            stats = processor.get_stats()
+        finally:
+            processor.close()
+        return delivered, flushed, rounds, stats
+
+    def test_matches_single_process(self):
+        for shards in (1, 2, 3):
+            with self.subTest(shards=shards):
+                delivered, flushed, rounds, stats = self._run_sharded(shards)
+                self.assertEqual(window_keys(delivered), window_keys(self.expected))
+                self.assertEqual(rounds, sorted(rounds))
+                self.assertEqual(stats['events_processed'], len(self.records))
+                self.assertEqual(stats['tracked_instruments'], 40)
+                self.assertEqual(stats['rounds_completed'], stats['rounds_submitted'])
+                self.assertTrue(flushed)
+
+    def test_shared_strikes_span_shards(self):
+        ids = {(r.symbol.split()[1], r.instrument_id % 2) for r in self.records}
+        self.assertEqual(len(ids), 40)  # Every strike/type on both shards
+        delivered, _, _, _ = self._run_sharded(2)
+        ends = [(w.time_window_end, w.strike_price, w.contract_type) for w in delivered]
+        self.assertEqual(ends, sorted(ends))
+
+    def test_backfill_dicts_and_errors(self):
+        processor = ShardedMBOProcessor(2, window_minutes=1)
+        with self.assertRaises(RuntimeError):
+            processor.submit(self.records[:10])
+        processor.start()
+        try:
+            processor.submit([r.to_dict() for r in self.records[:2000]])
+            processor.submit(self.records[2000:4000])
+            self.assertTrue(processor.wait_idle(timeout=30))
+            self.assertEqual(processor.get_stats()['events_processed'], 4000)
+        finally:
+            processor.close()
+        with self.assertRaises(RuntimeError):
+            processor.get_stats()
+
+    def _slow_session(self):
+        """About six minutes of trading, so windows close while rounds are submitted"""
+        path = os.path.join(self.temp_dir.name, 'slow.csv')
+        if not os.path.exists(path):
+            generate_synthetic_mbo(path, events=5000, strikes=5, events_per_second=5)
+        return read_mbo_file(path)
+
+    def test_callback_error_keeps_collecting(self):
+        records = self._slow_session()
+        processor = ShardedMBOProcessor(2, window_minutes=1, max_in_flight=2)
+        calls = []
+
+        def failing_once(windows):
+            calls.append(len(windows))
+            if len(calls) == 1:
+                raise ValueError("downstream failure")
+
+        processor.on_windows_closed = failing_once
+        path = list(sys.path)
+        processor.start()
+        try:
+            self.assertEqual(sys.path, path)  # Workers fix their own import root
+            for i in range(0, len(records), 250):
+                processor.submit(records[i:i + 250])
+            self.assertTrue(processor.wait_idle(timeout=30))
+            self.assertEqual(processor.rounds_completed, processor.rounds_submitted)
+            self.assertEqual(processor.errors, 1)
+            self.assertGreater(len(calls), 1)
+        finally:
+            processor.close()
+
+    def test_dead_shard_fails_instead_of_blocking(self):
+        processor = ShardedMBOProcessor(2, window_minutes=1, max_in_flight=2, request_timeout=10)
+        processor.start()
+        try:
+            processor.submit(self.records[:500])
+            self.assertTrue(processor.wait_idle(timeout=30))
+            processor._workers[1].kill()
+            processor._workers[1].join()
+            with self.assertRaises(RuntimeError):
+                for i in range(0, len(self.records), 500):
+                    processor.submit(self.records[i:i + 500])
+            self.assertFalse(processor.wait_idle(timeout=10))
+            with self.assertRaises(RuntimeError):
+                processor.flush_windows()
+        finally:
+            processor.close()
+
+
+class TestShardedReplay(unittest.TestCase):
+
+    def test_harness_with_ifd(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'session.csv')
+            generate_synthetic_mbo(path, events=20_000, strikes=20, events_per_second=50)
+            records = read_mbo_file(path)
+
+            reference = MBOReplayHarness(records, window_minutes=1)
+            reference.run()
+
+            db_path = os.path.join(temp_dir, 'replay_baselines.db')
+            engine = IFDv3Engine({'baseline_db_path': db_path})
+            harness = MBOReplayHarness(records, window_minutes=1, engine=engine, shards=2)
+            report = harness.run()
+            engine.close()
+            get_store(db_path).close()
+
+        self.assertEqual(sorted(window_keys(harness.windows)), sorted(window_keys(reference.windows)))
+        self.assertEqual(report['events_dropped'], 0)
+        self.assertEqual(report['latency_us']['end_to_end']['count'], len(records))
+        self.assertEqual(report['latency_us']['analyze']['count'], report['windows_closed'])
+        self.assertEqual(report['processor']['shards'], 2)
+        self.assertEqual(report['analysis_errors'], 0)
+
+
+class TestShardedLiveClient(unittest.TestCase):
+
+    def test_client_feeds_windows_to_ifd(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            records = two_expiration_session(temp_dir, events=4000)
+            db_path = os.path.join(temp_dir, 'live_baselines.db')
+            engine = IFDv3Engine({'baseline_db_path': db_path})
+            analyzed = []
+            analyze = engine.analyze_pressure_event
+            engine.analyze_pressure_event = lambda metrics: analyzed.append(metrics) or analyze(metrics)
+
+            client = EnhancedMBOStreamingClient(None, replay=True, shards=2, window_minutes=1,
+                                                ifd_engine=engine, spill_dir=temp_dir)
+            delivered = []
+            client.on_pressure_metrics = delivered.extend
+            client.start()
+            try:
+                self.assertIsNotNone(client.pressure_processor)
+                for record in records:
+                    client._handle_raw_event(record)
+                deadline = time.time() + 30
+                while client.stats['events_processed'] < len(records) and time.time() < deadline:
+                    time.sleep(0.01)
+                self.assertTrue(client.pressure_processor.wait_idle(timeout=30))
+            finally:
+                client.stop()
+                engine.close()
+                get_store(db_path).close()
+
+        self.assertIsNone(client.pressure_processor)
+        self.assertEqual(sorted(window_keys(delivered)), sorted(window_keys(single_process_windows(records))))
+        self.assertEqual(client.stats['pressure_windows'], len(delivered))
+        self.assertEqual([(m.strike, m.option_type, m.time_window) for m in analyzed],
+                         [(w.strike_price, w.contract_type, w.time_window_start) for w in delivered])
+
+    def test_quiet_strike_closes_on_live_clock(self):
+        """A strike that stops trading emits its window while only book updates arrive"""
+        minute_ns = 60 * 1_000_000_000
+        start_ns = (time.time_ns() // minute_ns - 10) * minute_ns
+        busy, quiet = 'NQM5 C21000', 'NQM5 C21500'
+        records = [
+            MBORecord(start_ns, instrument_id=1, symbol=quiet, action='A', side='B', price=10.0, size=5, order_id=1),
+            MBORecord(start_ns, instrument_id=1, symbol=quiet, action='A', side='A', price=10.5, size=5, order_id=2),
+            MBORecord(start_ns + 1000, instrument_id=1, symbol=quiet, action='T', side='B', price=10.5, size=3),
+        ]
+        # No more trades anywhere: only quotes on another strike, past the window end + grace
+        for i in range(1, 4):
+            records.append(MBORecord(start_ns + i * minute_ns, instrument_id=2, symbol=busy, action='A',
+                                     side='B', price=20.0, size=1, order_id=10 + i))
+
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                patch.object(streaming, "DATABENTO_AVAILABLE", True), \
+                patch.object(EnhancedMBOStreamingClient, '_start_streaming'):
+            client = EnhancedMBOStreamingClient("test-key", enable_backfill=False, shards=1,
+                                                window_minutes=1, spill_dir=temp_dir)
+            client.enforce_market_hours = False
+            client.watermark_interval = 0.05
+            delivered = []
+            client.on_pressure_metrics = delivered.extend
+            client.start()
+            try:
+                for record in records:
+                    client._handle_raw_event(record)
+                deadline = time.time() + 30
+                while not delivered and time.time() < deadline:
+                    time.sleep(0.02)
+                self.assertTrue(client.pressure_processor.wait_idle(timeout=30))
+                closed_live = list(delivered)
+            finally:
+                client.stop()
+
+        self.assertEqual([(w.strike_price, w.buy_volume) for w in closed_live], [(21500.0, 3)])
+
+
+def run_benchmark(events: int = 200_000):
+    """Replay throughput at max speed for 0 (in-thread) and 1..cores shards"""
+    cores = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, 'session.csv')
+        generate_synthetic_mbo(path, events=events, strikes=40, events_per_second=2000)
+        records = read_mbo_file(path)
+        for shards in [0] + [n for n in (1, 2, 4, 8) if n <= cores]:
+            report = MBOReplayHarness(records, window_minutes=1, shards=shards).run()
+            print(f"  shards={shards}: {report['events_per_second']:>10,.0f} events/sec")
+        print()
+        print(format_report(report))
+
+
+if __name__ == '__main__':
+    print("🧩 Sharded MBO Processing Benchmark")
+    run_benchmark()
+    unittest.main(verbosity=2)
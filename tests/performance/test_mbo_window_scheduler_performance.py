@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+MBO Window Scheduler Performance Tests
+
+Validates event-time (watermark) finalization of pressure windows and
+benchmarks trade aggregation as the number of open strike windows grows.
+"""
+
+import os
+import sys
+import time
+import unittest
+from datetime import datetime, timezone
+
+# Add necessary paths
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'tasks', 'options_trading_system'))
+
+from data_ingestion.mbo_event_processor import MBOEventStreamProcessor, ProcessedMBOEvent
+
+SECOND_NS = 1_000_000_000
+# 2025-06-20 14:30:00 UTC, aligned to a 5-minute window
+SESSION_START_NS = int(datetime(2025, 6, 20, 14, 30, tzinfo=timezone.utc).timestamp()) * SECOND_NS
+
+
+def make_trade(strike: float, ts_ns: int, size: int = 10, direction: str = 'BUY',
+               contract_type: str = 'C', spread: float = 0.5) -> ProcessedMBOEvent:
+    return ProcessedMBOEvent(
+        ts_ns, ts_ns, f"NQM5 {contract_type}{int(strike)}", int(strike), contract_type, strike, 'M5',
+        'T', 'A', 100.0, size, trade_direction=direction, spread=spread
+    )
+
+
+class TestWindowScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.processor = MBOEventStreamProcessor(window_minutes=5)
+        self.batches = []
+        self.processor.on_windows_closed = self.batches.append
+
+    def test_windows_close_on_event_time(self):
+        for strike in (21000.0, 21025.0, 21050.0):
+            self.processor.aggregate_trade(make_trade(strike, SESSION_START_NS + 60 * SECOND_NS))
+
+        # Past the window end but inside the 30s grace period: still open
+        self.assertIsNone(self.processor.aggregate_trade(
+            make_trade(21000.0, SESSION_START_NS + 320 * SECOND_NS)))
+        self.assertEqual(self.batches, [])
+
+        # Watermark passes end + grace: all three strikes close together
+        first = self.processor.aggregate_trade(make_trade(21000.0, SESSION_START_NS + 331 * SECOND_NS))
+        self.assertIsNotNone(first)
+        self.assertEqual(len(self.batches), 1)
+        self.assertEqual(sorted(m.strike_price for m in self.batches[0]), [21000.0, 21025.0, 21050.0])
+        self.assertEqual(self.batches[0][0].time_window_start,
+                         datetime(2025, 6, 20, 14, 30, tzinfo=timezone.utc))
+        self.assertEqual(len(self.processor.active_windows), 1)
+
+    def test_late_trade_is_dropped(self):
+        self.processor.aggregate_trade(make_trade(21000.0, SESSION_START_NS + 10 * SECOND_NS))
+        self.processor.aggregate_trade(make_trade(21000.0, SESSION_START_NS + 400 * SECOND_NS))
+        self.processor.aggregate_trade(make_trade(21000.0, SESSION_START_NS + 20 * SECOND_NS))
+        self.assertEqual(self.processor.get_stats()['late_trades'], 1)
+        self.assertEqual(self.batches[0][0].total_volume, 10)
+
+    def test_running_counters(self):
+        trades = [make_trade(21000.0, SESSION_START_NS + i * SECOND_NS, size=50 + i * 30,
+                             direction='BUY' if i % 3 else 'SELL', spread=0.25 * (1 + i % 4))
+                  for i in range(10)]
+        self.processor.aggregate_trades(trades)
+        (metrics,) = self.processor.flush_windows()
+
+        buys = [t for t in trades if t.trade_direction == 'BUY']
+        sells = [t for t in trades if t.trade_direction == 'SELL']
+        self.assertEqual(metrics.buy_volume, sum(t.size for t in buys))
+        self.assertEqual(metrics.sell_volume, sum(t.size for t in sells))
+        self.assertEqual(metrics.large_buy_trades, sum(1 for t in buys if t.size > 100))
+        self.assertAlmostEqual(metrics.avg_spread, sum(t.spread for t in trades) / len(trades))
+        self.assertEqual(metrics.total_spread_samples, 10)
+        self.assertEqual(self.processor.active_windows, {})
+
+    def test_batch_returns_every_closed_window(self):
+        trades = [make_trade(21000.0 + (i % 20) * 25, SESSION_START_NS + i * SECOND_NS) for i in range(1800)]
+        completed = self.processor.aggregate_trades(trades)
+        # 30 minutes of trades: the first five 5-minute windows have closed for all 20 strikes
+        self.assertEqual(len(completed), 5 * 20)
+        self.assertEqual(sum(len(batch) for batch in self.batches), 100)
+
+
+def run_benchmark(trades_per_run: int = 100000, strike_counts=(10, 100, 400)):
+    """Print trades/sec as the number of concurrently open windows grows"""
+    print(f"\n{'open windows':>13} {'trades/sec':>12} {'windows closed':>15}")
+    results = []
+    for strikes in strike_counts:
+        processor = MBOEventStreamProcessor(window_minutes=5)
+        # Spread trades over 30 minutes of event time, cycling through every strike/type
+        step_ns = 30 * 60 * SECOND_NS // trades_per_run
+        trades = [make_trade(21000.0 + (i % strikes) * 5, SESSION_START_NS + i * step_ns,
+                             contract_type='C' if (i // strikes) % 2 == 0 else 'P')
+                  for i in range(trades_per_run)]
+
+        start = time.perf_counter()
+        closed = 0
+        for trade in trades:
+            if processor.aggregate_trade(trade):
+                closed += 1
+        rate = trades_per_run / (time.perf_counter() - start)
+        closed = len(processor.completed_metrics)
+        print(f"{strikes * 2:>13} {rate:12,.0f} {closed:>15,}")
+        results.append({"open_windows": strikes * 2, "trades_per_sec": rate, "windows_closed": closed})
+    return results
+
+
+if __name__ == '__main__':
+    print("⏱️  MBO Window Scheduler Benchmark")
+    run_benchmark()
+    unittest.main(verbosity=2)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo Engine Performance Tests
+
+Validates the vectorized drawdown and resampling against the original
+per-path loop, checks seeded results are independent of the worker
+count, and compares simulated paths per second.
+"""
+
+import os
+import sys
+import time
+import unittest
+
+import numpy as np
+
+# Add necessary paths
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'tasks', 'options_trading_system', 'analysis_engine'))
+
+from strategies.monte_carlo import max_drawdowns, simulate_trade_paths, summarize_simulations
+from strategies.historical_backtester import HistoricalBacktester
+
+REPORT_KEYS = {'num_simulations', 'return_mean', 'return_std', 'return_5th_percentile',
+               'return_95th_percentile', 'drawdown_mean', 'drawdown_95th_percentile',
+               'probability_of_loss', 'probability_of_50pct_drawdown'}
+
+
+def make_trade_returns(count: int = 150, seed: int = 4) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.normal(0.001, 0.02, count)
+
+
+def legacy_max_drawdown(returns) -> float:
+    """The original element-by-element drawdown"""
+    equity = [1.0]
+    for ret in returns:
+        equity.append(equity[-1] * (1 + ret))
+    peak, max_dd = equity[0], 0
+    for value in equity:
+        if value > peak:
+            peak = value
+        dd = (value - peak) / peak
+        if dd < max_dd:
+            max_dd = dd
+    return max_dd
+
+
+def legacy_simulation(trade_returns, num_simulations: int):
+    """The original per-path bootstrap loop"""
+    returns, drawdowns = [], []
+    for _ in range(num_simulations):
+        sampled = np.random.choice(trade_returns, size=len(trade_returns), replace=True)
+        returns.append(np.sum(sampled))
+        drawdowns.append(legacy_max_drawdown(sampled))
+    return returns, drawdowns
+
+
+class TestMonteCarloEngine(unittest.TestCase):
+
+    def test_drawdowns_match_loop(self):
+        rng = np.random.default_rng(1)
+        paths = rng.normal(-0.002, 0.05, (200, 60))
+        paths[0] = 0.01  # Never below the starting equity
+        expected = [legacy_max_drawdown(row) for row in paths]
+        np.testing.assert_allclose(max_drawdowns(paths), expected, rtol=1e-12, atol=1e-15)
+        self.assertEqual(max_drawdowns(paths)[0], 0.0)
+
+    def test_paths_match_loop_on_same_draws(self):
+        trade_returns = make_trade_returns(30)
+        totals, drawdowns = simulate_trade_paths(trade_returns, 50, seed=5, chunk_paths=50)
+
+        # Replay the chunk's index stream: one draw per trade across all paths
+        rng = np.random.default_rng(np.random.SeedSequence(5).spawn(1)[0])
+        indices = np.stack([rng.integers(0, 30, size=50, dtype=np.int16) for _ in range(30)], axis=1)
+        sampled = trade_returns[indices]
+        np.testing.assert_allclose(totals, sampled.sum(axis=1), rtol=1e-12)
+        np.testing.assert_allclose(drawdowns, [legacy_max_drawdown(row) for row in sampled],
+                                   rtol=1e-12, atol=1e-15)
+
+    def test_seeded_paths_independent_of_workers(self):
+        trade_returns = make_trade_returns()
+        serial = simulate_trade_paths(trade_returns, 5000, seed=11, chunk_paths=700)
+        parallel = simulate_trade_paths(trade_returns, 5000, seed=11, workers=2, chunk_paths=700)
+        np.testing.assert_array_equal(parallel[0], serial[0])
+        np.testing.assert_array_equal(parallel[1], serial[1])
+        self.assertEqual(len(serial[0]), 5000)
+        self.assertFalse(np.array_equal(serial[0], simulate_trade_paths(trade_returns, 5000, seed=12)[0]))
+
+    def test_report_matches_legacy_distribution(self):
+        trade_returns = make_trade_returns()
+        report = summarize_simulations(*simulate_trade_paths(trade_returns, 20000, seed=3))
+        np.random.seed(3)
+        legacy = summarize_simulations(*map(np.asarray, legacy_simulation(trade_returns, 4000)))
+
+        self.assertEqual(set(report), REPORT_KEYS)
+        self.assertEqual(report['num_simulations'], 20000)
+        for key in ('return_mean', 'return_5th_percentile', 'drawdown_mean'):
+            self.assertAlmostEqual(report[key], legacy[key], delta=0.1 * abs(legacy[key]) + 0.005)
+
+    def test_backtester_drawdown_helper(self):
+        backtester = HistoricalBacktester.__new__(HistoricalBacktester)
+        returns = list(make_trade_returns(40))
+        self.assertAlmostEqual(backtester._calculate_max_drawdown_from_returns(returns),
+                               legacy_max_drawdown(returns))
+        self.assertEqual(backtester._calculate_max_drawdown_from_returns([]), 0)
+
+
+def run_benchmark(trades: int = 150):
+    """Print simulated paths per second for the loop and the vectorized engine"""
+    trade_returns = make_trade_returns(trades)
+    print(f"\n{'engine':<22} {'paths':>9} {'seconds':>9} {'paths/sec':>12}")
+
+    started = time.perf_counter()
+    legacy_simulation(trade_returns, 2000)
+    elapsed = time.perf_counter() - started
+    legacy_rate = 2000 / elapsed
+    print(f"{'per-path loop':<22} {2000:>9,} {elapsed:>9.2f} {legacy_rate:>12,.0f}")
+
+    for paths in (100_000, 500_000):
+        started = time.perf_counter()
+        simulate_trade_paths(trade_returns, paths, seed=1)
+        elapsed = time.perf_counter() - started
+        print(f"{'vectorized':<22} {paths:>9,} {elapsed:>9.2f} {paths / elapsed:>12,.0f} "
+              f"({paths / elapsed / legacy_rate:.0f}x)")
+
+
+if __name__ == '__main__':
+    print("🎲 Monte Carlo Benchmark")
+    run_benchmark()
+    unittest.main(verbosity=2)
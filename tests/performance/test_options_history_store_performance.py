@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Options History Store Performance Tests
+
+Validates the day-partitioned on-disk store (round trip, strike range and
+option type pushdown, merge/replace writes, Barchart and Databento
+ingestion) and compares loading a multi-month window from the store with
+the loader's original row-by-row synthesis.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Add necessary paths
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, current_dir)
+sys.path.insert(0, os.path.join(project_root, 'tasks', 'options_trading_system', 'analysis_engine'))
+
+from strategies.options_history_store import OptionsHistoryStore, trading_days, main as ingest
+from strategies.historical_backtester import HistoricalDataLoader
+from test_backtest_replay_performance import make_options_history
+
+
+def legacy_options_data(symbol: str, start_date: datetime, end_date: datetime) -> pd.DataFrame:
+    """The original nested-loop synthesis (date x strike x type)"""
+    dates = pd.date_range(start_date, end_date, freq='5min')
+    dates = dates[dates.dayofweek < 5]
+    dates = dates[(dates.hour >= 9) & (dates.hour < 16)]
+    data = []
+    for date in dates:
+        base_price = 21350 + np.sin(date.hour) * 50
+        for strike in np.arange(21000, 21700, 25):
+            for opt_type in ['CALL', 'PUT']:
+                if opt_type == 'CALL':
+                    intrinsic = max(0, base_price - strike)
+                else:
+                    intrinsic = max(0, strike - base_price)
+                time_value = abs(base_price - strike) * 0.01 + np.random.uniform(1, 5)
+                data.append({
+                    'timestamp': date, 'symbol': symbol, 'strike': strike, 'option_type': opt_type,
+                    'bid': intrinsic + time_value - 0.5, 'ask': intrinsic + time_value + 0.5,
+                    'last': intrinsic + time_value,
+                    'volume': np.random.poisson(100) if abs(base_price - strike) < 100 else np.random.poisson(20),
+                    'open_interest': np.random.randint(100, 5000), 'underlying_price': base_price
+                })
+    return pd.DataFrame(data)
+
+
+class StoreTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix='options_store_')
+        self.store = OptionsHistoryStore(self.root)
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+class TestOptionsHistoryStore(StoreTestCase):
+
+    def test_round_trip(self):
+        history = make_options_history(datetime(2024, 1, 1), 5)
+        written = self.store.write(history)
+        self.assertEqual(sorted(written), [f"NQM25/2024-01-0{d}" for d in range(1, 6)])
+        self.assertEqual(self.store.days('NQM25'), [f"2024-01-0{d}" for d in range(1, 6)])
+
+        loaded = self.store.load('NQM25', datetime(2024, 1, 1), datetime(2024, 1, 5, 23, 59))
+        expected = history.sort_values(['timestamp', 'strike', 'option_type']).reset_index(drop=True)
+        pd.testing.assert_frame_equal(loaded, expected, check_dtype=False)
+
+    def test_pushdown_matches_filter(self):
+        history = make_options_history(datetime(2024, 1, 1), 5)
+        self.store.write(history)
+        start, end = datetime(2024, 1, 2, 10, 30), datetime(2024, 1, 4, 11, 0)
+
+        loaded = self.store.load('NQM25', start, end, strike_range=(21200, 21300),
+                                 option_types=['put'], columns=['last', 'volume'])
+        expected = history[history['timestamp'].between(start, end) &
+                           history['strike'].between(21200, 21300) &
+                           (history['option_type'] == 'PUT')]
+        self.assertEqual(list(loaded.columns), ['timestamp', 'symbol', 'strike', 'option_type', 'last', 'volume'])
+        self.assertEqual(len(loaded), len(expected))
+        np.testing.assert_array_equal(loaded['last'], expected.sort_values(['timestamp', 'strike'])['last'])
+
+        self.assertTrue(self.store.load('NQM25', start, end, strike_range=(30000, 31000)).empty)
+        self.assertTrue(self.store.load('ESM25', start, end).empty)
+
+    def test_merge_and_replace(self):
+        day = make_options_history(datetime(2024, 1, 2), 1)
+        morning = day[day['timestamp'].dt.hour < 12]
+        afternoon = day[day['timestamp'].dt.hour >= 12].copy()
+        self.store.write(morning)
+        self.store.write(afternoon)
+        window = (datetime(2024, 1, 2), datetime(2024, 1, 2, 23, 59))
+        self.assertEqual(len(self.store.load('NQM25', *window)), len(day))
+
+        # Same keys overwrite, never duplicate
+        afternoon['last'] = -1.0
+        self.store.write(afternoon)
+        merged = self.store.load('NQM25', *window)
+        self.assertEqual(len(merged), len(day))
+        self.assertTrue((merged[merged['timestamp'].dt.hour >= 12]['last'] == -1.0).all())
+
+        self.store.write(afternoon, merge=False)
+        self.assertEqual(len(self.store.load('NQM25', *window)), len(afternoon))
+        self.assertFalse(any(name.endswith(('.tmp', '.old')) for name in os.listdir(os.path.join(self.root, 'NQM25'))))
+
+    def test_tz_aware_history(self):
+        history = make_options_history(datetime(2024, 1, 2), 1)
+        history['timestamp'] = history['timestamp'].dt.tz_localize('US/Eastern')
+        self.store.write(history)
+        loaded = self.store.load('NQM25', datetime(2024, 1, 2, 10), datetime(2024, 1, 2, 10, 5))
+        self.assertEqual(str(loaded['timestamp'].dt.tz), 'US/Eastern')
+        self.assertEqual(set(loaded['timestamp'].dt.hour), {10})
+        self.assertEqual(len(loaded), 2 * 28 * 2)
+
+
+class TestIngestion(StoreTestCase):
+
+    def test_barchart_chain(self):
+        chain = {'data': {
+            'Call': [{'raw': {'strike': 21500, 'lastPrice': 120.5, 'bidPrice': 120, 'askPrice': 121,
+                              'volume': 340, 'openInterest': 1200}}],
+            'Put': [{'raw': {'strike': '21,400', 'lastPrice': 80, 'bidPrice': 'N/A', 'askPrice': 81,
+                             'volume': 15, 'openInterest': 900}}]
+        }}
+        path = os.path.join(self.root, 'chain.json')
+        with open(path, 'w') as f:
+            json.dump(chain, f)
+
+        ingest(['--root', self.root, 'barchart', path, '--symbol', 'MC7M25', '--timestamp', '2025-06-02 10:15'])
+        loaded = self.store.load('MC7M25', datetime(2025, 6, 2), datetime(2025, 6, 3))
+        self.assertEqual(list(loaded['strike']), [21400.0, 21500.0])
+        self.assertEqual(list(loaded['option_type']), ['PUT', 'CALL'])
+        self.assertEqual(loaded['bid'].iloc[0], 80.0)  # Missing bid falls back to last
+        self.assertEqual(loaded['volume'].iloc[1], 340)
+
+    def test_databento_export(self):
+        records = pd.DataFrame({
+            'ts_event': ['2025-06-02 14:31:00', '2025-06-02 14:32:00', '2025-06-02 14:33:00',
+                         '2025-06-02 14:36:00'],
+            'symbol': ['NQM5 C21500', 'NQM5 C21500', 'NQM5 P21400', 'NQM5 C21500'],
+            'action': ['A', 'T', 'T', 'A'],
+            'price': [np.nan, 101.0, 55.0, np.nan],
+            'size': [0, 3, 2, 0],
+            'bid_px_00': [100.0, 100.5, 54.5, 102.0],
+            'ask_px_00': [101.0, 101.5, 55.5, 103.0]
+        })
+        path = os.path.join(self.root, 'cbbo.csv')
+        records.to_csv(path, index=False)
+
+        ingest(['--root', self.root, 'databento', path, '--symbol', 'NQM25'])
+        loaded = self.store.load('NQM25', datetime(2025, 6, 2), datetime(2025, 6, 3))
+        self.assertEqual(len(loaded), 3)
+        first_call = loaded[(loaded['option_type'] == 'CALL')].iloc[0]
+        self.assertEqual((first_call['bid'], first_call['last'], first_call['volume']), (100.5, 101.0, 3))
+        second_call = loaded[(loaded['option_type'] == 'CALL')].iloc[1]
+        self.assertEqual(second_call['last'], 102.5)  # No trade: mid
+        self.assertEqual(second_call['volume'], 0)
+
+
+class TestLoaderIntegration(StoreTestCase):
+
+    def test_loader_prefers_store(self):
+        history = make_options_history(datetime(2024, 1, 1), 3)
+        self.store.write(history)
+        loader = HistoricalDataLoader(self.root)
+        loaded = loader.load_options_data('NQM25', datetime(2024, 1, 1), datetime(2024, 1, 3, 23, 59),
+                                          strike_range=(21300, 21400))
+        self.assertEqual(len(loaded), history['strike'].between(21300, 21400).sum())
+
+    def test_missing_days_follow_trading_calendar(self):
+        history = make_options_history(datetime(2024, 1, 1), 3)  # Mon-Wed
+        self.store.write(history)
+        start, end = datetime(2024, 1, 1), datetime(2024, 1, 7, 23, 59)
+        self.assertEqual(self.store.missing_days('NQM25', start, end), ['2024-01-04', '2024-01-05'])
+        self.assertEqual(self.store.missing_days('NQM25', start, datetime(2024, 1, 3, 23, 59)), [])
+
+        # Good Friday, Juneteenth, Independence Day and Christmas are not trading days
+        self.assertNotIn('2024-03-29', trading_days(datetime(2024, 3, 25), datetime(2024, 4, 1)))
+        self.assertEqual(trading_days(datetime(2024, 6, 17), datetime(2024, 6, 21)),
+                         ['2024-06-17', '2024-06-18', '2024-06-20', '2024-06-21'])
+        self.assertEqual(trading_days(datetime(2024, 7, 3), datetime(2024, 7, 5)), ['2024-07-03', '2024-07-05'])
+        self.assertEqual(trading_days(datetime(2024, 12, 24), datetime(2024, 12, 26)), ['2024-12-24', '2024-12-26'])
+
+    def test_partial_window_returns_stored_days(self):
+        history = make_options_history(datetime(2024, 1, 1), 3)
+        self.store.write(history)
+        start, end = datetime(2024, 1, 1), datetime(2024, 1, 7, 23, 59)
+
+        loader = HistoricalDataLoader(self.root)
+        with self.assertLogs('strategies.historical_backtester', 'WARNING') as logs:
+            loaded = loader.load_options_data('NQM25', start, end, option_types=['CALL'])
+        self.assertIn('returning stored days only: 2024-01-04, 2024-01-05', logs.output[0])
+        self.assertEqual(loader.missing_days['NQM25'], ['2024-01-04', '2024-01-05'])
+        pd.testing.assert_frame_equal(loaded, self.store.load('NQM25', start, end, option_types=['CALL']))
+
+    def test_opt_in_fill_uses_session_time(self):
+        history = make_options_history(datetime(2024, 1, 1), 3)
+        self.store.write(history)
+        start, end = datetime(2024, 1, 1), datetime(2024, 1, 7, 23, 59)
+
+        loader = HistoricalDataLoader(self.root, fill_missing_days=True)
+        with self.assertLogs('strategies.historical_backtester', 'WARNING') as logs:
+            loaded = loader.load_options_data('NQM25', start, end, option_types=['CALL'])
+        self.assertIn('filling with synthetic data: 2024-01-04, 2024-01-05', logs.output[0])
+        days = loaded['timestamp'].dt.strftime('%Y-%m-%d')
+        self.assertEqual(sorted(days.unique()), ['2024-01-01', '2024-01-02', '2024-01-03',
+                                                 '2024-01-04', '2024-01-05'])
+        self.assertEqual((days <= '2024-01-03').sum(), (history['option_type'] == 'CALL').sum())
+        self.assertEqual(set(loaded['option_type']), {'CALL'})
+        self.assertTrue(loaded['timestamp'].is_monotonic_increasing)
+        self.assertEqual(self.store.days('NQM25'), ['2024-01-01', '2024-01-02', '2024-01-03'])
+
+        # UTC history (Databento ingests): fills land in the Eastern session, not 9-16 UTC
+        utc = history.assign(timestamp=history['timestamp'].dt.tz_localize('US/Eastern').dt.tz_convert('UTC'),
+                             symbol='NQU25')
+        self.store.write(utc)
+        with self.assertLogs('strategies.historical_backtester', 'WARNING'):
+            loaded = loader.load_options_data('NQU25', start, end)
+        self.assertEqual(str(loaded['timestamp'].dt.tz), 'UTC')
+        filled = loaded[loaded['timestamp'] >= pd.Timestamp('2024-01-04', tz='UTC')]
+        eastern = filled['timestamp'].dt.tz_convert('US/Eastern')
+        self.assertEqual((eastern.min().strftime('%H:%M'), eastern.max().strftime('%Y-%m-%d %H:%M')),
+                         ('09:00', '2024-01-05 15:55'))
+
+    def test_mixed_zone_days(self):
+        history = make_options_history(datetime(2024, 1, 2), 2)
+        eastern = history['timestamp'].dt.tz_localize('US/Eastern')
+        first_day = history['timestamp'].dt.day == 2
+        self.store.write(history[first_day].assign(timestamp=eastern[first_day]))
+        self.store.write(history[~first_day].assign(timestamp=eastern[~first_day].dt.tz_convert('UTC')))
+
+        loaded = self.store.load('NQM25', datetime(2024, 1, 2), datetime(2024, 1, 4))
+        self.assertEqual(str(loaded['timestamp'].dt.tz), 'UTC')
+        pd.testing.assert_series_equal(loaded['timestamp'].dt.tz_convert('US/Eastern'),
+                                       eastern.sort_values().reset_index(drop=True), check_names=False,
+                                       check_dtype=False)
+
+        self.store.write(make_options_history(datetime(2024, 1, 4), 1))  # Naive
+        with self.assertRaises(ValueError):
+            self.store.load('NQM25', datetime(2024, 1, 2), datetime(2024, 1, 5))
+
+    def test_synthetic_fallback_schema(self):
+        loader = HistoricalDataLoader(self.root)
+        start, end = datetime(2024, 1, 1), datetime(2024, 1, 2, 23, 59)
+        np.random.seed(0)
+        synthetic = loader.load_options_data('NQM25', start, end)
+        np.random.seed(0)
+        legacy = legacy_options_data('NQM25', start, end)
+
+        self.assertEqual(list(synthetic.columns), list(legacy.columns))
+        self.assertEqual(len(synthetic), len(legacy))
+        pd.testing.assert_frame_equal(synthetic[['timestamp', 'strike', 'option_type', 'underlying_price']],
+                                      legacy[['timestamp', 'strike', 'option_type', 'underlying_price']],
+                                      check_dtype=False)
+        np.testing.assert_allclose(synthetic['ask'] - synthetic['bid'], 1.0)
+        self.assertEqual(self.store.days('NQM25'), [])  # Synthetic data is never persisted
+
+        puts = loader.load_options_data('NQM25', start, end, option_types=['PUT'])
+        self.assertEqual(set(puts['option_type']), {'PUT'})
+
+
+def run_benchmark(days: int = 90):
+    """Print load time of a multi-month window: legacy synthesis vs the store"""
+    root = tempfile.mkdtemp(prefix='options_store_bench_')
+    try:
+        start = datetime(2024, 1, 1)
+        end = start + pd.Timedelta(days=days) - pd.Timedelta(minutes=1)
+        store = OptionsHistoryStore(root)
+        history = make_options_history(start, days)
+        started = time.perf_counter()
+        store.write(history, merge=False)
+        write_seconds = time.perf_counter() - started
+
+        print(f"\n{days}-day window, {len(history):,} rows (store written in {write_seconds:.1f}s)")
+        print(f"{'loader':<34} {'rows':>10} {'seconds':>9}")
+
+        legacy_days = 5
+        started = time.perf_counter()
+        legacy_rows = len(legacy_options_data('NQM25', start, start + pd.Timedelta(days=legacy_days)))
+        legacy_seconds = (time.perf_counter() - started) * days / legacy_days
+        print(f"{'nested-loop synthesis (projected)':<34} {legacy_rows * days // legacy_days:>10,} {legacy_seconds:>9.2f}")
+
+        timings = [
+            ('vectorized synthesis', lambda: HistoricalDataLoader(os.path.join(root, 'empty'))
+             .load_options_data('NQM25', start, end)),
+            ('store, full window', lambda: store.load('NQM25', start, end)),
+            ('store, +/-100 strikes, calls', lambda: store.load('NQM25', start, end, strike_range=(21250, 21450),
+                                                                option_types=['CALL'])),
+        ]
+        for name, load in timings:
+            started = time.perf_counter()
+            rows = len(load())
+            elapsed = time.perf_counter() - started
+            print(f"{name:<34} {rows:>10,} {elapsed:>9.2f} ({legacy_seconds / elapsed:.0f}x)")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    print("🗄️ Options History Store Benchmark")
+    run_benchmark()
+    unittest.main(verbosity=2)
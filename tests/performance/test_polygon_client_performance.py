@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Polygon API Client Performance Tests
+
+Runs PolygonAPIClient against a local stub of the Polygon REST API:
+contract pages must follow next_url in order with the next page already
+downloading while the caller consumes the current one, aggregate fan-out
+must stay inside the shared token-bucket rate over a few keep-alive
+connections, and cached responses must be served within their TTL and
+revalidated with ETags afterwards. The benchmark compares one-at-a-time
+requests with the pooled, fanned-out client.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import tempfile
+import threading
+import unittest
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add necessary paths
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'tasks', 'options_trading_system', 'data_ingestion'))
+
+from utils.sqlite_store import get_store
+from polygon_api.solution import PolygonAPIClient, TokenBucket
+
+logging.getLogger('polygon_api.solution').setLevel(logging.CRITICAL)
+
+TOTAL_CONTRACTS = 2500
+
+
+class PolygonHandler(BaseHTTPRequestHandler):
+    """Options contracts with cursor pagination, aggregates with ETags, 429 on demand"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        with server.lock:
+            server.connections.add(self.client_address)
+            server.request_times.append(time.monotonic())
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            if query.get('apiKey') != 'test-key':
+                self._send(401, {'status': 'ERROR', 'error': 'Unknown API Key'})
+            elif server.throttle_next:
+                server.throttle_next -= 1
+                self._send(429, {'status': 'ERROR'}, {'Retry-After': '0.05'})
+            elif url.path == '/v3/reference/options/contracts':
+                self._contracts(query)
+            elif url.path.startswith('/v2/aggs/ticker/'):
+                self._aggregates(url.path.split('/')[4])
+            elif url.path.startswith('/v2/last/trade/'):
+                server.trades += 1
+                self._send(200, {'status': 'OK', 'results': {'T': url.path.split('/')[4], 'p': 1.0 + server.trades}})
+            else:
+                self._send(404, {'status': 'ERROR', 'error': 'Not found'})
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def _contracts(self, query):
+        time.sleep(self.server.latency)
+        limit = int(query['limit'])
+        start = int(query.get('cursor', 0))
+        end = min(start + limit, TOTAL_CONTRACTS)
+        results = [{'ticker': f"O:QQQ{i:06d}", 'contract_type': 'call' if i % 2 else 'put',
+                    'strike_price': 300 + i, 'expiration_date': '2026-12-18'} for i in range(start, end)]
+        payload = {'status': 'OK', 'results': results}
+        if end < TOTAL_CONTRACTS:
+            host = self.server.server_address
+            payload['next_url'] = (f"http://{host[0]}:{host[1]}/v3/reference/options/contracts"
+                                   f"?cursor={end}&limit={limit}")
+        self._send(200, payload)
+
+    def _aggregates(self, ticker):
+        etag = f'"{ticker}-v1"'
+        if self.headers.get('If-None-Match') == etag:
+            self.server.not_modified += 1
+            self._send(304, None, {'ETag': etag})
+            return
+        time.sleep(self.server.latency)
+        self._send(200, {'status': 'OK', 'ticker': ticker, 'resultsCount': 1,
+                         'results': [{'o': 1.0, 'h': 2.0, 'l': 0.5, 'c': 1.5, 'v': 100}]}, {'ETag': etag})
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload).encode() if payload is not None else b''
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubPolygon:
+
+    def __init__(self, latency: float = 0.0):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), PolygonHandler)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.latency = latency
+        self.server.throttle_next = 0
+        self.reset()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def reset(self):
+        self.server.connections = set()
+        self.server.request_times = []
+        self.server.in_flight = 0
+        self.server.max_in_flight = 0
+        self.server.not_modified = 0
+        self.server.trades = 0
+
+    def client(self, **options):
+        options.setdefault('requests_per_minute', None)
+        options.setdefault('cache_dir', None)
+        client = PolygonAPIClient(api_key='test-key', **options)
+        client.base_url = self.base_url
+        return client
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_rate_shared_across_threads(self):
+        bucket = TokenBucket(rate=50, capacity=1)
+        times = []
+        lock = threading.Lock()
+
+        def worker():
+            for _ in range(10):
+                bucket.acquire()
+                with lock:
+                    times.append(time.monotonic())
+
+        start = time.monotonic()
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertGreaterEqual(time.monotonic() - start, 39 / 50 - 0.02)
+        times.sort()
+        self.assertTrue(all(times[i + 10] - times[i] >= 10 / 50 - 0.04 for i in range(len(times) - 10)))
+
+
+class TestPolygonClient(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.stub = StubPolygon()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.stub.close()
+
+    def setUp(self):
+        self.stub.reset()
+        self.stub.server.latency = 0.0
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        get_store(os.path.join(self.temp_dir.name, 'polygon_responses.db')).close()
+        self.temp_dir.cleanup()
+
+    def test_pagination_follows_next_url(self):
+        client = self.stub.client()
+        contracts = client.get_options_contracts('QQQ', limit=5000)
+        self.assertEqual(len(contracts), TOTAL_CONTRACTS)
+        self.assertEqual([c.ticker for c in contracts], [f"O:QQQ{i:06d}" for i in range(TOTAL_CONTRACTS)])
+        self.assertEqual(len(self.stub.server.request_times), 3)
+
+        # Limits below one page behave as before: one request, truncated results
+        self.stub.reset()
+        self.assertEqual(len(client.get_options_contracts('QQQ', limit=100)), 100)
+        self.assertEqual(len(client.get_options_contracts('QQQ', limit=1200)), 1200)
+        self.assertEqual(len(self.stub.server.request_times), 3)
+        client.close()
+
+    def test_next_page_prefetched_while_consuming(self):
+        self.stub.server.latency = 0.2
+        client = self.stub.client()
+        start = time.perf_counter()
+        pages = 0
+        for page in client.iter_options_contract_pages('QQQ', limit=5000):
+            pages += 1
+            time.sleep(0.2)  # Caller works on the page
+        elapsed = time.perf_counter() - start
+        client.close()
+        self.assertEqual(pages, 3)
+        self.assertLess(elapsed, 1.0)  # One-at-a-time would take 3 x (0.2 + 0.2) = 1.2s
+
+    def test_fan_out_respects_shared_rate(self):
+        client = self.stub.client(requests_per_minute=1200, max_workers=8)  # 20/s
+        tickers = [f"O:QQQ{i:06d}" for i in range(30)]
+        start = time.perf_counter()
+        results = client.get_aggregates_many(tickers, from_date='2026-01-02', to_date='2026-01-02')
+        elapsed = time.perf_counter() - start
+        client.close()
+
+        self.assertEqual(list(results), tickers)
+        self.assertTrue(all(results[t]['ticker'] == t for t in tickers))
+        self.assertGreaterEqual(elapsed, 29 / 20 - 0.05)
+        times = self.stub.server.request_times
+        for i in range(len(times) - 10):
+            self.assertGreaterEqual(times[i + 10] - times[i], 10 / 20 - 0.05)
+        self.assertLessEqual(len(self.stub.server.connections), 8)
+
+    def test_fan_out_concurrency_and_keep_alive(self):
+        self.stub.server.latency = 0.1
+        client = self.stub.client(max_workers=8)
+        tickers = [f"O:QQQ{i:06d}" for i in range(40)]
+        start = time.perf_counter()
+        for _ in range(2):
+            results = client.get_aggregates_many(tickers)
+        elapsed = time.perf_counter() - start
+        client.close()
+        self.assertTrue(all(results.values()))
+        self.assertEqual(self.stub.server.max_in_flight, 8)
+        self.assertLessEqual(len(self.stub.server.connections), 8)
+        self.assertLess(elapsed, 2.0)  # Serial: 8s
+
+    def test_cache_ttl_and_etag_revalidation(self):
+        cache_dir = self.temp_dir.name
+        client = self.stub.client(cache_dir=cache_dir, cache_ttl=60)
+        first = client.get_aggregates('O:QQQ000001', from_date='2026-01-02', to_date='2026-01-02')
+        self.assertEqual(client.get_aggregates('O:QQQ000001', from_date='2026-01-02', to_date='2026-01-02'), first)
+        self.assertEqual(client.stats['cache_hits'], 1)
+        self.assertEqual(len(self.stub.server.request_times), 1)
+
+        # A new client with an expired TTL revalidates and gets a 304
+        stale = self.stub.client(cache_dir=cache_dir, cache_ttl=0)
+        self.assertEqual(stale.get_aggregates('O:QQQ000001', from_date='2026-01-02', to_date='2026-01-02'), first)
+        self.assertEqual(stale.stats['not_modified'], 1)
+        self.assertEqual(self.stub.server.not_modified, 1)
+
+        stale.cache.store.flush()
+        with stale.cache.store.connection() as conn:
+            urls = [row[0] for row in conn.execute("SELECT url FROM polygon_responses")]
+        self.assertEqual(len(urls), 1)
+        self.assertNotIn('test-key', urls[0])
+        client.close()
+        stale.close()
+
+    def test_todays_aggregates_always_revalidated(self):
+        client = self.stub.client(cache_dir=self.temp_dir.name, cache_ttl=300)
+        first = client.get_aggregates('O:QQQ000001')  # Defaults to today
+        self.assertEqual(client.get_aggregates('O:QQQ000001'), first)
+        self.assertEqual(client.get_aggregates('O:QQQ000001', from_date='2026-01-02', to_date='2099-12-31'), first)
+        self.assertEqual(client.stats['cache_hits'], 0)
+        self.assertEqual(client.stats['not_modified'], 1)
+        self.assertEqual(len(self.stub.server.request_times), 3)
+        client.close()
+
+    def test_last_trade_never_cached(self):
+        client = self.stub.client(cache_dir=self.temp_dir.name, cache_ttl=300)
+        first = client.get_last_trade('O:QQQ000001')
+        second = client.get_last_trade('O:QQQ000001')
+        self.assertNotEqual(first['results']['p'], second['results']['p'])
+        self.assertEqual((client.stats['requests'], client.stats['cache_hits']), (2, 0))
+
+        client.cache.store.flush()
+        with client.cache.store.connection() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM polygon_responses").fetchone()[0], 0)
+        client.close()
+
+    def test_errors_and_retry_after(self):
+        client = self.stub.client()
+        self.stub.server.throttle_next = 1
+        self.assertEqual(client.get_aggregates('O:QQQ000002')['ticker'], 'O:QQQ000002')
+        self.assertEqual(client.stats['retries'], 1)
+
+        bad_key = PolygonAPIClient(api_key='wrong', requests_per_minute=None, cache_dir=None)
+        bad_key.base_url = self.stub.base_url
+        with self.assertRaises(Exception):
+            bad_key.get_aggregates('O:QQQ000002')
+        self.assertEqual(client.get_aggregates_many(['O:QQQ000003'])['O:QQQ000003']['resultsCount'], 1)
+        client.close()
+        bad_key.close()
+
+
+def run_benchmark(contracts: int = 100, latency: float = 0.2, requests_per_minute: int = 1200):
+    """Per-contract aggregates: one at a time vs pooled fan-out under the same rate limit"""
+    stub = StubPolygon(latency=latency)
+    tickers = [f"O:QQQ{i:06d}" for i in range(contracts)]
+    try:
+        serial = stub.client(requests_per_minute=requests_per_minute, max_workers=1)
+        start = time.perf_counter()
+        for ticker in tickers:
+            serial.get_aggregates(ticker)
+        serial_seconds = time.perf_counter() - start
+        serial_connections = len(stub.server.connections)
+        serial.close()
+
+        stub.reset()
+        pooled = stub.client(requests_per_minute=requests_per_minute, max_workers=8)
+        start = time.perf_counter()
+        pooled.get_aggregates_many(tickers)
+        pooled_seconds = time.perf_counter() - start
+        pooled.close()
+
+        print(f"  {contracts} contracts, {latency * 1000:.0f}ms server latency, limit {requests_per_minute}/min")
+        print(f"  One at a time:  {serial_seconds:6.2f}s  ({contracts / serial_seconds:5.1f} req/s)")
+        print(f"  Pooled fan-out: {pooled_seconds:6.2f}s  ({contracts / pooled_seconds:5.1f} req/s, "
+              f"{len(stub.server.connections)} connections, max {stub.server.max_in_flight} in flight)")
+        print(f"  Speedup: {serial_seconds / pooled_seconds:.1f}x")
+    finally:
+        stub.close()
+
+
+if __name__ == '__main__':
+    print("📈 Polygon API Client Benchmark")
+    run_benchmark()
+    unittest.main(verbosity=2)
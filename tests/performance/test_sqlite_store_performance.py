@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+SQLite Storage Layer Performance Tests
+
+Validates the shared connection-pooled SQLite store and reports inserts/sec
+for the old connect-per-call pattern versus pooled and batched writes.
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+import textwrap
+import subprocess
+import threading
+import unittest
+
+# Add necessary paths
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..', '..')
+sys.path.insert(0, project_root)
+
+from utils.sqlite_store import SQLiteStore, get_store
+
+CREATE_SQL = "CREATE TABLE IF NOT EXISTS measurements (id INTEGER PRIMARY KEY, component TEXT, latency_ms REAL)"
+INSERT_SQL = "INSERT INTO measurements (component, latency_ms) VALUES (?, ?)"
+
+# Exits with writes still queued; the writer has already committed once, so its connection is open
+EXIT_SCRIPT = textwrap.dedent("""
+    import sys
+    sys.path.insert(0, sys.argv[1])
+    from utils.sqlite_store import get_store
+    store = get_store(sys.argv[2], flush_interval=30)
+    with store.connection() as conn:
+        conn.execute({create!r})
+    store.execute_async({insert!r}, ("first", 0.0))
+    store.flush()
+    for i in range(100):
+        store.execute_async({insert!r}, ("queued", float(i)))
+""").format(create=CREATE_SQL, insert=INSERT_SQL)
+
+
+class TestSQLiteStore(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "store.db")
+        self.store = SQLiteStore(self.db_path, flush_interval=0.01)
+        with self.store.connection() as conn:
+            conn.execute(CREATE_SQL)
+
+    def tearDown(self):
+        self.store.close()
+        self.temp_dir.cleanup()
+
+    def _count(self):
+        with self.store.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM measurements").fetchone()[0]
+
+    def test_wal_mode_enabled(self):
+        with self.store.connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0].lower(), "wal")
+
+    def test_connection_reused_per_thread(self):
+        with self.store.connection() as first:
+            pass
+        with self.store.connection() as second:
+            pass
+        self.assertIs(first, second)
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(self.store._thread_connection()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], first)
+
+    def test_exited_threads_release_connections(self):
+        def read():
+            with self.store.connection() as conn:
+                conn.execute("SELECT COUNT(*) FROM measurements").fetchone()
+
+        for _ in range(4):
+            threads = [threading.Thread(target=read) for _ in range(50)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(self.store.stats["connections_opened"], 201)
+        self.assertEqual(self.store.stats["connections_closed"], 200)
+        self.assertEqual(len(self.store._connections), 1)  # This thread's
+        self.assertEqual(self._count(), 0)
+
+    def test_queued_writes_survive_interpreter_exit(self):
+        path = os.path.join(self.temp_dir.name, "exit.db")
+        result = subprocess.run([sys.executable, "-c", EXIT_SCRIPT, project_root, path],
+                                capture_output=True, text=True, timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertNotIn("Dropped write", result.stderr)
+        with sqlite3.connect(path) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM measurements").fetchone()[0], 101)
+
+    def test_rollback_on_error(self):
+        with self.assertRaises(ValueError):
+            with self.store.connection() as conn:
+                conn.execute(INSERT_SQL, ("x", 1.0))
+                raise ValueError("abort")
+        self.assertEqual(self._count(), 0)
+
+    def test_async_writes_visible_to_readers(self):
+        for i in range(250):
+            self.store.execute_async(INSERT_SQL, ("ifd", float(i)))
+        # connection() flushes pending writes before reading
+        self.assertEqual(self._count(), 250)
+        self.assertEqual(self.store.pending_writes, 0)
+
+    def test_unhurried_flush_waits_for_batch(self):
+        store = SQLiteStore(os.path.join(self.temp_dir.name, "batched.db"), flush_interval=0.2)
+        with store.connection() as conn:
+            conn.execute(CREATE_SQL)
+        started = time.perf_counter()
+        for i in range(10):
+            store.execute_async(INSERT_SQL, ("ifd", float(i)))
+            time.sleep(0.005)
+        self.assertTrue(store.flush(timeout=5, hurry=False))
+        self.assertGreaterEqual(time.perf_counter() - started, 0.2)  # Writer's own deadline
+        self.assertEqual(store.stats["batches_committed"], 1)
+        with store.connection(flush=False) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM measurements").fetchone()[0], 10)
+        store.close()
+
+    def test_bad_row_does_not_drop_batch(self):
+        self.store.execute_async(INSERT_SQL, ("ok", 1.0))
+        self.store.execute_async("INSERT INTO missing_table VALUES (?)", (1,))
+        self.store.execute_async(INSERT_SQL, ("ok", 2.0))
+        self.assertTrue(self.store.flush(timeout=5))
+        self.assertEqual(self._count(), 2)
+        self.assertEqual(self.store.stats["write_errors"], 1)
+
+    def test_close_flushes_queue(self):
+        self.store.executemany_async(INSERT_SQL, [("bulk", float(i)) for i in range(1000)])
+        self.store.close()
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM measurements").fetchone()[0], 1000)
+
+    def test_get_store_shared_by_path(self):
+        self.assertIs(get_store(self.db_path), get_store(os.path.join(self.temp_dir.name, ".", "store.db")))
+
+
+def run_benchmark(rows: int = 2000):
+    """Print inserts/sec for connect-per-insert, pooled and batched writers"""
+    results = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # Before: fresh connection + commit per insert (old *Database pattern)
+        path = os.path.join(temp_dir, "naive.db")
+        with sqlite3.connect(path) as conn:
+            conn.execute(CREATE_SQL)
+        start = time.perf_counter()
+        for i in range(rows):
+            with sqlite3.connect(path) as conn:
+                conn.execute(INSERT_SQL, ("naive", float(i)))
+                conn.commit()
+        results["connect_per_insert"] = rows / (time.perf_counter() - start)
+
+        # Pooled connection, still one commit per insert
+        store = SQLiteStore(os.path.join(temp_dir, "pooled.db"))
+        with store.connection() as conn:
+            conn.execute(CREATE_SQL)
+        start = time.perf_counter()
+        for i in range(rows):
+            with store.connection() as conn:
+                conn.execute(INSERT_SQL, ("pooled", float(i)))
+        results["pooled_sync"] = rows / (time.perf_counter() - start)
+        store.close()
+
+        # Fire-and-forget inserts through the batched writer
+        store = SQLiteStore(os.path.join(temp_dir, "batched.db"))
+        with store.connection() as conn:
+            conn.execute(CREATE_SQL)
+        start = time.perf_counter()
+        for i in range(rows * 10):
+            store.execute_async(INSERT_SQL, ("batched", float(i)))
+        store.flush()
+        results["batched_async"] = rows * 10 / (time.perf_counter() - start)
+        store.close()
+
+    baseline = results["connect_per_insert"]
+    print(f"\n{'mode':<22} {'inserts/sec':>12} {'speedup':>9}")
+    for mode, rate in results.items():
+        print(f"{mode:<22} {rate:12,.0f} {rate / baseline:8.1f}x")
+    return results
+
+
+if __name__ == '__main__':
+    print("🗄️  SQLite Storage Layer Benchmark")
+    run_benchmark()
+    unittest.main(verbosity=2)
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Cross-Strike Coordination Index Performance Tests
+
+Validates StrikeCoordinationIndex neighbor queries and agreement scores
+against a brute-force scan of every strike, checks the shared strike
+bound lookup used by SignalQualityEnhancer, and measures the per-event
+cost of PressureRatioAnalyzer's coordination score at 400 active strikes
+(budget: 100µs).
+"""
+
+import os
+import sys
+import time
+import random
+import logging
+import unittest
+from datetime import datetime, timedelta, timezone
+
+# Add necessary paths
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'tasks', 'options_trading_system', 'analysis_engine'))
+
+from institutional_flow_v3.strike_index import StrikeCoordinationIndex, strike_bounds, SIDE_SIGN
+from institutional_flow_v3.solution import PressureRatioAnalyzer, PressureMetrics
+
+logging.getLogger('institutional_flow_v3.solution').setLevel(logging.WARNING)
+
+EVENT_BUDGET_US = 100.0
+
+
+def make_events(strikes: int, count: int, seed: int = 5):
+    """Pressure windows over `strikes` listed strikes, a few seconds apart"""
+    rng = random.Random(seed)
+    start = datetime(2025, 6, 2, 14, 30, tzinfo=timezone.utc)
+    listed = [20000.0 + 25 * i for i in range(strikes)]
+    events = []
+    for i in range(count):
+        bid, ask = rng.randint(10, 500), rng.randint(10, 500)
+        events.append(PressureMetrics(
+            strike=rng.choice(listed), option_type=rng.choice(['C', 'P']),
+            time_window=start + timedelta(seconds=2 * i), bid_volume=bid, ask_volume=ask,
+            pressure_ratio=ask / bid, total_trades=10, avg_trade_size=10.0,
+            dominant_side=rng.choice(['BUY', 'SELL', 'NEUTRAL']), confidence=0.8
+        ))
+    return events
+
+
+def brute_force(latest, strike, option_type, timestamp, side, span, max_age):
+    """Scan every stored strike: (neighbors, active, agreement, weighted agreement)"""
+    strikes = sorted(k for (k, t) in latest if t == option_type)
+    if strike in strikes:
+        position = strikes.index(strike)
+        nearby = strikes[max(position - span, 0):position] + strikes[position + 1:position + 1 + span]
+    else:
+        position = sum(1 for k in strikes if k < strike)
+        nearby = strikes[max(position - span, 0):position + span]
+    direction = SIDE_SIGN.get(side, 0)
+    active = [latest[(k, option_type)] for k in nearby
+              if latest[(k, option_type)][0] >= timestamp - max_age and latest[(k, option_type)][1] != 0]
+    if not active or not direction:
+        return len(nearby), len(active), 0.0, 0.0
+    agreeing = sum(1 for _, sign, _ in active if sign == direction)
+    total = sum(volume for _, _, volume in active)
+    signed = sum(volume if sign == direction else -volume for _, sign, volume in active)
+    return len(nearby), len(active), agreeing / len(active), (signed / total + 1) / 2
+
+
+class TestStrikeCoordinationIndex(unittest.TestCase):
+
+    def test_strike_bounds(self):
+        strikes = [100.0, 125.0, 150.0, 150.0, 175.0, 200.0]
+        self.assertEqual(strike_bounds(strikes, 125, 175), (1, 5))
+        self.assertEqual(strike_bounds(strikes, 126, 149), (2, 2))
+        self.assertEqual(strike_bounds(strikes, 0, 1000), (0, 6))
+        self.assertEqual(strike_bounds([], 0, 1), (0, 0))
+
+    def test_matches_brute_force(self):
+        index = StrikeCoordinationIndex(span=3, max_age_seconds=60)
+        latest = {}
+        for pm in make_events(60, 3000):
+            timestamp = pm.time_window.timestamp()
+            volume = pm.bid_volume + pm.ask_volume
+            index.update(pm.strike, pm.option_type, timestamp, pm.dominant_side, volume)
+            latest[(pm.strike, pm.option_type)] = (timestamp, SIDE_SIGN.get(pm.dominant_side, 0), volume)
+
+            result = index.coordination(pm.strike, pm.option_type, timestamp, pm.dominant_side)
+            expected = brute_force(latest, pm.strike, pm.option_type, timestamp, pm.dominant_side, 3, 60)
+            self.assertEqual((result.neighbors, result.active_neighbors), expected[:2])
+            self.assertAlmostEqual(result.directional_agreement, expected[2])
+            self.assertAlmostEqual(result.volume_weighted_agreement, expected[3])
+
+    def test_expirations_are_separate_books(self):
+        index = StrikeCoordinationIndex(span=2)
+        index.update(21000.0, 'C', 0.0, 'BUY', 100, expiration='2025-06-20')
+        index.update(21025.0, 'C', 0.0, 'BUY', 100, expiration='2025-06-27')
+        self.assertEqual(index.neighbors(21025.0, 'C', expiration='2025-06-20'), [(21000.0, (0.0, 1, 100))])
+        self.assertEqual(index.neighbors(21025.0, 'C', expiration='2025-06-27'), [])
+        self.assertEqual(index.neighbors(21025.0, 'P', expiration='2025-06-27'), [])
+
+    def test_idle_and_expired_books_dropped(self):
+        index = StrikeCoordinationIndex(span=2, max_age_seconds=60)
+        for seconds in range(0, 40, 10):
+            index.update(21000.0, 'C', float(seconds), 'BUY', 100, expiration='2025-06-20')
+            index.update(21000.0, 'C', float(seconds), 'SELL', 100, expiration='2025-06-27')
+        self.assertEqual(len(index), 2)  # Only the latest window per strike
+        self.assertEqual(index.neighbors(21025.0, 'C', expiration='2025-06-20'), [(21000.0, (30.0, 1, 100))])
+
+        # Front month stops trading; its book ages out on a later sweep
+        for seconds in range(40, 200, 10):
+            index.update(21025.0, 'C', float(seconds), 'SELL', 100, expiration='2025-06-27')
+        self.assertEqual(index.neighbors(21025.0, 'C', expiration='2025-06-20'), [])
+        self.assertEqual(len(index), 2)
+
+        self.assertEqual(index.drop_expiration('2025-06-27'), 1)
+        self.assertEqual(len(index), 0)
+
+
+class TestAnalyzerCoordination(unittest.TestCase):
+
+    def _window(self, strike, side, seconds=0, volume=200):
+        return PressureMetrics(
+            strike=strike, option_type='C',
+            time_window=datetime(2025, 6, 2, 14, 30, tzinfo=timezone.utc) + timedelta(seconds=seconds),
+            bid_volume=volume // 4, ask_volume=volume - volume // 4, pressure_ratio=3.0, total_trades=5,
+            avg_trade_size=10.0, dominant_side=side, confidence=0.8)
+
+    def test_isolated_strike_is_neutral(self):
+        analyzer = PressureRatioAnalyzer({})
+        self.assertEqual(analyzer.analyze_pressure_signal(self._window(21500.0, 'BUY')).cluster_coordination, 0.6)
+
+    def test_agreeing_cluster_scores_higher(self):
+        aligned, opposed = PressureRatioAnalyzer({}), PressureRatioAnalyzer({})
+        for offset in (-100, -75, -50, -25, 25, 50, 75, 100):
+            aligned.analyze_pressure_signal(self._window(21500.0 + offset, 'BUY'))
+            opposed.analyze_pressure_signal(self._window(21500.0 + offset, 'SELL'))
+        self.assertEqual(aligned.analyze_pressure_signal(self._window(21500.0, 'BUY', 10)).cluster_coordination, 1.0)
+        self.assertEqual(opposed.analyze_pressure_signal(self._window(21500.0, 'BUY', 10)).cluster_coordination, 0.0)
+
+        stale = self._window(21500.0, 'BUY', seconds=3600)
+        self.assertEqual(aligned.analyze_pressure_signal(stale).cluster_coordination, 0.6)
+
+    def test_event_cost_within_budget(self):
+        per_event_us = measure_event_cost(400, 5000)
+        self.assertLess(per_event_us, EVENT_BUDGET_US)
+
+
+def measure_event_cost(strikes: int, events: int, span: int = 4) -> float:
+    """Mean µs per _calculate_cluster_coordination call with `strikes` strikes already active"""
+    analyzer = PressureRatioAnalyzer({'coordination_strikes': span})
+    warmup = make_events(strikes, strikes * 4, seed=1)
+    for pm in warmup:
+        analyzer._calculate_cluster_coordination(pm)
+    stream = make_events(strikes, events, seed=2)
+    offset = warmup[-1].time_window - stream[0].time_window
+    for pm in stream:
+        pm.time_window += offset
+
+    started = time.perf_counter()
+    for pm in stream:
+        analyzer._calculate_cluster_coordination(pm)
+    return (time.perf_counter() - started) / events * 1e6
+
+
+def run_benchmark(events: int = 20000):
+    """Print per-event coordination cost by active strike count and neighbor span"""
+    print(f"\n{'strikes':>8} {'span':>5} {'µs/event':>10} {'budget':>8}")
+    for strikes in (100, 400, 1600):
+        for span in (4, 10):
+            cost = measure_event_cost(strikes, events, span)
+            print(f"{strikes:>8} {span:>5} {cost:>10.1f} {EVENT_BUDGET_US:>7.0f}µs")
+
+
+if __name__ == '__main__':
+    print("🎯 Cross-Strike Coordination Benchmark")
+    run_benchmark()
+    unittest.main(verbosity=2)
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Uptime Health Check Scheduler Performance Tests
+
+Runs the single-thread asyncio scheduler behind UptimeMonitor against
+local stand-in HTTP and TCP servers: async probes must agree with the
+blocking HealthChecker, hundreds of components must be checked on one
+scheduler thread within the concurrency limit, results must reach SQLite
+in batches, and status changes must still open and resolve incidents.
+The benchmark reports checks/sec for a few hundred TCP components.
+"""
+
+import os
+import sys
+import time
+import socket
+import asyncio
+import logging
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add necessary paths
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'tasks', 'options_trading_system', 'analysis_engine'))
+
+from utils.sqlite_store import get_store
+from phase4.health_check_scheduler import TimingWheel
+from phase4.uptime_monitor import (
+    UptimeMonitor, ComponentConfig, ComponentType, ComponentStatus,
+    HealthChecker, AsyncHealthChecker
+)
+
+logging.getLogger('phase4.uptime_monitor').setLevel(logging.CRITICAL)
+logging.getLogger('phase4.health_check_scheduler').setLevel(logging.WARNING)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """/health answers 200, /fail 503, /slow 200 after a short delay"""
+
+    def do_GET(self):
+        if self.path == '/slow':
+            time.sleep(0.2)
+        status = 503 if self.path == '/fail' else 200
+        body = b'OK healthy' if status == 200 else b'unavailable'
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StandInServers:
+    """Local HTTP server, an open (accept-and-close) TCP port and a closed one"""
+
+    def __enter__(self):
+        self.http = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+        self.http.daemon_threads = True
+        self.http_thread = threading.Thread(target=self.http.serve_forever, daemon=True)
+        self.http_thread.start()
+        self.base_url = f"http://127.0.0.1:{self.http.server_address[1]}"
+
+        self.listener = socket.socket()
+        self.listener.bind(('127.0.0.1', 0))
+        self.listener.listen(1024)
+        self.open_port = self.listener.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+        closed = socket.socket()
+        closed.bind(('127.0.0.1', 0))
+        self.closed_port = closed.getsockname()[1]
+        closed.close()
+        return self
+
+    def _accept(self):
+        while True:
+            try:
+                connection, _ = self.listener.accept()
+            except OSError:
+                return
+            connection.close()
+
+    def __exit__(self, *exc):
+        self.http.shutdown()
+        self.http.server_close()
+        self.listener.close()
+
+
+def component(component_id, method, target, interval=1, **options):
+    return ComponentConfig(component_id=component_id, name=component_id,
+                           component_type=ComponentType.API_ENDPOINT, check_method=method,
+                           check_target=target, check_interval=interval, timeout=2, **options)
+
+
+class TestTimingWheel(unittest.TestCase):
+
+    def test_due_order_and_long_intervals(self):
+        wheel = TimingWheel(tick=0.5, slots=8, start=100.0)
+        wheel.schedule('late', 112.0)     # Beyond one rotation (4s)
+        wheel.schedule('b', 101.2)
+        wheel.schedule('a', 100.6)
+        wheel.schedule('past', 50.0)      # Fires on the next advance
+        self.assertEqual(len(wheel), 4)
+        self.assertEqual(wheel.advance(100.1), ['past'])
+        self.assertEqual(wheel.advance(101.6), ['a', 'b'])
+        self.assertEqual(wheel.advance(111.9), [])
+        self.assertEqual(wheel.advance(112.0), ['late'])
+        self.assertEqual(len(wheel), 0)
+
+
+class TestAsyncProbes(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.servers = StandInServers().__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.servers.__exit__(None, None, None)
+
+    def test_async_results_match_blocking_checker(self):
+        servers = self.servers
+        configs = [
+            component('ok', 'http', f"{servers.base_url}/health", expected_response_code=200,
+                      expected_response_text='healthy'),
+            component('wrong_text', 'http', f"{servers.base_url}/health", expected_response_text='ready'),
+            component('fail', 'http', f"{servers.base_url}/fail", expected_response_code=200),
+            component('slow', 'http', f"{servers.base_url}/slow", max_response_time=0.05),
+            component('tcp_open', 'tcp', f"127.0.0.1:{servers.open_port}"),
+            component('tcp_closed', 'tcp', f"127.0.0.1:{servers.closed_port}"),
+            component('file', 'file', __file__),
+            component('missing', 'file', __file__ + '.missing'),
+        ]
+        blocking = HealthChecker({})
+        expected = [blocking.check_component(config) for config in configs]
+
+        async def run_async():
+            checker = AsyncHealthChecker(blocking)
+            await checker.open()
+            try:
+                return await asyncio.gather(*(checker.check_component(config) for config in configs))
+            finally:
+                await checker.close()
+
+        for config, want, got in zip(configs, expected, asyncio.run(run_async())):
+            with self.subTest(component=config.component_id):
+                self.assertEqual(got.status, want.status)
+                self.assertEqual(got.success, want.success)
+                self.assertEqual(got.response_code, want.response_code)
+                self.assertEqual(got.response_size, want.response_size)
+                self.assertEqual(got.error_message is None, want.error_message is None)
+
+
+class TestScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.servers = StandInServers().__enter__()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'uptime.db')
+
+    def tearDown(self):
+        self.servers.__exit__(None, None, None)
+        get_store(self.db_path).close()
+        self.temp_dir.cleanup()
+
+    def _monitor(self, **scheduler):
+        scheduler.setdefault('tick', 0.05)
+        scheduler.setdefault('persist_interval', 0.5)
+        return UptimeMonitor({'db_path': self.db_path, 'scheduler': scheduler})
+
+    def _stored_checks(self, monitor):
+        monitor.database.store.flush()
+        with monitor.database.store.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM health_checks").fetchone()[0]
+
+    def test_hundreds_of_components_on_one_thread(self):
+        monitor = self._monitor(max_concurrent_checks=20, persist_batch_size=100)
+        targets = [('http', f"{self.servers.base_url}/health"),
+                   ('tcp', f"127.0.0.1:{self.servers.open_port}"),
+                   ('file', __file__)]
+        for i in range(300):
+            method, target = targets[i % 3]
+            monitor.add_component(component(f"c{i}", method, target))
+
+        monitor.start_monitoring()
+        try:
+            names = [thread.name for thread in threading.enumerate()]
+            self.assertEqual(names.count('UptimeScheduler'), 1)
+            self.assertFalse([name for name in names if name.startswith('UptimeMonitor-')])
+            time.sleep(2.6)
+        finally:
+            monitor.stop_monitoring()
+
+        stats = monitor.scheduler.get_stats()
+        self.assertGreaterEqual(stats['checks_completed'], 600)
+        self.assertLessEqual(stats['max_in_flight'], 20)
+        self.assertEqual(stats['check_errors'], 0)
+        self.assertEqual(stats['results_persisted'], stats['checks_completed'])
+        self.assertEqual(self._stored_checks(monitor), stats['checks_completed'])
+        self.assertEqual(set(monitor.component_status.values()), {ComponentStatus.UP})
+
+    def test_concurrency_limit_with_slow_endpoint(self):
+        monitor = self._monitor(max_concurrent_checks=5)
+        for i in range(20):  # Each wants a check every 0.1s, each check takes 0.2s
+            monitor.add_component(component(f"slow{i}", 'http', f"{self.servers.base_url}/slow", interval=0.1))
+        monitor.start_monitoring()
+        deadline = time.time() + 10
+        while monitor.scheduler.get_stats()['checks_completed'] < 40 and time.time() < deadline:
+            time.sleep(0.05)
+        monitor.stop_monitoring()
+        self.assertEqual(monitor.scheduler.get_stats()['max_in_flight'], 5)
+
+    def test_incidents_and_removal(self):
+        monitor = self._monitor()
+        created, resolved = [], []
+        monitor.on_incident_created = created.append
+        monitor.on_incident_resolved = resolved.append
+
+        failing = component('db', 'tcp', f"127.0.0.1:{self.servers.closed_port}", alert_after_failures=2)
+        monitor.add_component(failing)
+        monitor.add_component(component('api', 'http', f"{self.servers.base_url}/health"))
+        monitor.start_monitoring()
+        try:
+            deadline = time.time() + 10
+            while not created and time.time() < deadline:
+                time.sleep(0.05)
+            self.assertEqual([incident.component_id for incident in created], ['db'])
+
+            # Bring the component back on the open port: the incident resolves
+            failing.check_target = f"127.0.0.1:{self.servers.open_port}"
+            while not resolved and time.time() < deadline:
+                time.sleep(0.05)
+            self.assertEqual([incident.component_id for incident in resolved], ['db'])
+
+            monitor.remove_component('api')
+            time.sleep(0.2)
+            checks = monitor.scheduler.get_stats()['checks_completed']
+            time.sleep(2.5)
+            self.assertLessEqual(monitor.scheduler.get_stats()['checks_completed'] - checks, 3)  # db only
+            self.assertNotIn('api', monitor.scheduler.components)
+        finally:
+            monitor.stop_monitoring()
+
+
+def run_benchmark(components: int = 500, seconds: float = 5.0):
+    """Checks/sec for many TCP components on one scheduler thread"""
+    with StandInServers() as servers, tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'uptime.db')
+        monitor = UptimeMonitor({'db_path': db_path, 'scheduler': {'max_concurrent_checks': 100}})
+        for i in range(components):
+            monitor.add_component(component(f"c{i}", 'tcp', f"127.0.0.1:{servers.open_port}"))
+        threads_before = threading.active_count()
+        monitor.start_monitoring()
+        time.sleep(seconds)
+        threads_during = threading.active_count()
+        monitor.stop_monitoring()
+        stats = monitor.scheduler.get_stats()
+        print(f"  {components} components, {stats['checks_completed']:,} checks in {seconds:.0f}s "
+              f"({stats['checks_completed'] / seconds:,.0f} checks/sec)")
+        print(f"  Threads added: {threads_during - threads_before} (thread-per-component: {components})")
+        print(f"  Max in flight: {stats['max_in_flight']}, persisted: {stats['results_persisted']:,}")
+        get_store(db_path).close()
+
+
+if __name__ == '__main__':
+    print("🩺 Uptime Health Check Scheduler Benchmark")
+    run_benchmark()
+    unittest.main(verbosity=2)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Walk-Forward Optimizer Performance Tests
+
+Validates that process-parallel and successive-halving searches agree
+with the serial exhaustive grid, that memory-mapped frames round-trip
+exactly and that checkpointed windows are resumed, then reports
+wall-time speedup against worker count.
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+import dataclasses
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Add necessary paths
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..', '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'tasks', 'options_trading_system', 'analysis_engine'))
+
+from strategies.historical_backtester import HistoricalBacktester, HistoricalDataLoader, BacktestConfig
+from strategies.walk_forward_optimizer import WalkForwardOptimizer, SharedFrame, parameter_combinations
+
+GRID = {'stop_loss': [0.01, 0.02, 0.05], 'take_profit': [0.02, 0.05, 0.1]}
+
+
+class SeededDataLoader(HistoricalDataLoader):
+    """Synthetic loader that repeats per period and produces vol/OI signals"""
+
+    def load_options_data(self, symbol, start_date, end_date):
+        np.random.seed(int(start_date.timestamp()) % 2 ** 31)
+        df = super().load_options_data(symbol, start_date, end_date)
+        if df.empty:
+            return df
+        hot = np.random.default_rng(int(start_date.timestamp())).random(len(df)) < 0.01
+        df.loc[hot, 'volume'] = 8000
+        df.loc[hot, 'open_interest'] = 600
+        return df
+
+    def load_market_data(self, start_date, end_date):
+        np.random.seed(int(start_date.timestamp()) % 2 ** 31 + 1)
+        return super().load_market_data(start_date, end_date)
+
+
+def make_backtester(output_dir: str) -> HistoricalBacktester:
+    backtester = HistoricalBacktester(output_dir)
+    backtester.data_loader = SeededDataLoader()
+    return backtester
+
+
+class TestWalkForwardOptimizer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.output_dir = tempfile.mkdtemp()
+        cls.backtester = make_backtester(cls.output_dir)
+        cls.config = BacktestConfig(start_date=datetime(2024, 1, 1), end_date=datetime(2024, 1, 6))
+        cls.options = cls.backtester.data_loader.load_options_data(
+            "NQM25", cls.config.start_date, cls.config.end_date)
+        cls.market = cls.backtester.data_loader.load_market_data(cls.config.start_date, cls.config.end_date)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.output_dir, ignore_errors=True)
+
+    def exhaustive_scores(self):
+        return [self.backtester.simulate('v3.0', dataclasses.replace(self.config, **params),
+                                         self.options, self.market).sharpe_ratio
+                for params in parameter_combinations(GRID)]
+
+    def test_shared_frame_round_trip(self):
+        frame = self.options.head(500).copy()
+        frame['aware'] = frame['timestamp'].dt.tz_localize('US/Eastern')
+        directory = tempfile.mkdtemp()
+        try:
+            loaded = SharedFrame.export(frame, directory, 'options').load()
+        finally:
+            shutil.rmtree(directory)
+        pd.testing.assert_frame_equal(loaded, frame, check_dtype=False)
+
+    def test_parallel_matches_serial(self):
+        serial, _ = WalkForwardOptimizer(self.backtester, workers=1, eta=3).optimize(
+            'v3.0', self.config, GRID, self.options, self.market)
+        with WalkForwardOptimizer(self.backtester, workers=2, eta=3) as optimizer:
+            parallel, stats = optimizer.optimize('v3.0', self.config, GRID, self.options, self.market)
+
+        self.assertEqual(parallel, serial)
+        self.assertEqual(stats['workers'], 2)
+        self.assertLess(stats['work_fraction'], 1.0)
+
+    def test_halving_picks_competitive_combination(self):
+        scores = self.exhaustive_scores()
+        best, stats = WalkForwardOptimizer(self.backtester, workers=1, eta=3).optimize(
+            'v3.0', self.config, GRID, self.options, self.market)
+        exhaustive, _ = WalkForwardOptimizer(self.backtester, workers=1, eta=1).optimize(
+            'v3.0', self.config, GRID, self.options, self.market)
+
+        self.assertEqual(exhaustive, parameter_combinations(GRID)[int(np.argmax(scores))])
+        self.assertAlmostEqual(stats['best_score'], scores[parameter_combinations(GRID).index(best)])
+        self.assertEqual((stats['evaluations'], stats['pruned']), (9 + 3 + 1, 8))
+
+    def test_checkpoint_resume(self):
+        config = BacktestConfig(start_date=datetime(2024, 1, 1), end_date=datetime(2024, 1, 13),
+                                walk_forward_windows=3, optimization_workers=1)
+        grid = {'stop_loss': [0.01, 0.05]}
+        first = self.backtester.run_walk_forward_optimization('v3.0', config, grid)
+        self.assertTrue(os.path.exists(first['checkpoint']))
+
+        calls = []
+        original = self.backtester.simulate
+        self.backtester.simulate = lambda *args, **kwargs: calls.append(1) or original(*args, **kwargs)
+        try:
+            second = self.backtester.run_walk_forward_optimization('v3.0', config, grid)
+        finally:
+            del self.backtester.simulate
+
+        self.assertEqual(calls, [])
+        self.assertEqual(second['optimization_stats']['windows_resumed'], 2)
+        self.assertEqual(second['windows'], first['windows'])
+
+    def test_checkpoint_key_covers_config(self):
+        optimizer = WalkForwardOptimizer(self.backtester, workers=1)
+        grid = {'stop_loss': [0.01, 0.05]}
+        path = optimizer._checkpoint_path('v3.0', self.config, grid)
+
+        # Worker count does not change results, so it shares the checkpoint
+        workers = dataclasses.replace(self.config, optimization_workers=4)
+        self.assertEqual(optimizer._checkpoint_path('v3.0', workers, grid), path)
+        for change in ({'take_profit': 0.1}, {'position_sizing': 'kelly'}, {'commission_per_contract': 2.0},
+                       {'slippage_ticks': 2}, {'max_positions': 5}, {'lookback_days': 10},
+                       {'resample_frequency': '1T'}):
+            with self.subTest(**change):
+                changed = dataclasses.replace(self.config, **change)
+                self.assertNotEqual(optimizer._checkpoint_path('v3.0', changed, grid), path)
+
+
+def run_benchmark(worker_counts=(1, 2, 4)):
+    """Print wall time and speedup of one in-sample search per worker count"""
+    output_dir = tempfile.mkdtemp()
+    try:
+        backtester = make_backtester(output_dir)
+        config = BacktestConfig(start_date=datetime(2024, 1, 1), end_date=datetime(2024, 1, 13))
+        options = backtester.data_loader.load_options_data("NQM25", config.start_date, config.end_date)
+        market = backtester.data_loader.load_market_data(config.start_date, config.end_date)
+
+        print(f"\nCPU cores: {os.cpu_count()}, combinations: {len(parameter_combinations(GRID))}")
+        print(f"{'search':<22} {'evals':>6} {'wall s':>8} {'eval s':>8} {'speedup':>8}")
+        baseline = None
+        for label, workers, eta in [('exhaustive serial', 1, 1)] + \
+                [(f'halving x{w}', w, 3) for w in worker_counts]:
+            with WalkForwardOptimizer(backtester, workers=workers, eta=eta) as optimizer:
+                started = time.perf_counter()
+                _, stats = optimizer.optimize('v3.0', config, GRID, options, market)
+                wall = time.perf_counter() - started
+            baseline = baseline or wall
+            print(f"{label:<22} {stats['evaluations']:>6} {wall:>8.2f} {stats['eval_seconds']:>8.2f} "
+                  f"{baseline / wall:>7.2f}x")
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    print("🔧 Walk-Forward Optimizer Benchmark")
+    run_benchmark()
+    unittest.main(verbosity=2)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Shared Market Snapshot Test
+Verifies single-flight data ingestion and that one analysis cycle loads data once
+"""
+
+import os
+import sys
+import time
+import importlib.util
+import threading
+import unittest
+from unittest.mock import patch
+
+# Add project paths
+project_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'tasks', 'options_trading_system'))
+
+import data_ingestion.integration as ingestion
+from data_ingestion.market_snapshot import SingleFlight, config_key
+
+
+def _pipeline_result():
+    contracts = []
+    for i, strike in enumerate(range(21300, 21450, 25)):
+        for option_type in ("call", "put"):
+            contracts.append({
+                "strike": float(strike), "type": option_type, "volume": 200 + i * 50,
+                "open_interest": 1000 + i * 10, "last_price": 40.0 - i, "underlying_price": 21376.75
+            })
+    return {
+        "pipeline_status": "success",
+        "load_results": {},
+        "normalized_data": {"contracts": contracts, "summary": {"total_contracts": len(contracts)}},
+        "quality_metrics": {"volume_coverage": 1.0},
+        "summary": {},
+        "mbo_pressure_metrics": []
+    }
+
+
+class CountingPipeline:
+    """Stand-in pipeline that counts full loads"""
+    loads = 0
+    lock = threading.Lock()
+
+    def __init__(self, config):
+        self.config = config
+
+    def run_full_pipeline(self):
+        with CountingPipeline.lock:
+            CountingPipeline.loads += 1
+        time.sleep(0.05)
+        return _pipeline_result()
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def test_concurrent_callers_share_one_call(self):
+        flight = SingleFlight()
+        calls = []
+        barrier = threading.Barrier(8)
+
+        def slow_load():
+            calls.append(1)
+            time.sleep(0.1)
+            return {"value": 42}
+
+        results = []
+
+        def worker():
+            barrier.wait()
+            results.append(flight.do("same", slow_load))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(r is results[0] for r in results))
+        self.assertEqual(flight.stats["shared"], 7)
+
+    def test_errors_propagate_and_are_not_cached(self):
+        flight = SingleFlight()
+
+        def failing():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            flight.do("k", failing)
+        self.assertEqual(flight.do("k", lambda: 1), 1)
+
+    def test_config_key_is_order_independent(self):
+        self.assertEqual(config_key({"a": 1, "b": [1, 2]}), config_key({"b": [1, 2], "a": 1}))
+        self.assertNotEqual(config_key({"a": 1}), config_key({"a": 2}))
+
+
+class TestMarketSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        CountingPipeline.loads = 0
+
+    def test_snapshot_is_content_hashed_and_read_only(self):
+        with patch.object(ingestion, "create_data_ingestion_pipeline", CountingPipeline):
+            first = ingestion.load_market_snapshot({"source": "test"})
+            second = ingestion.load_market_snapshot({"source": "test"})
+
+        self.assertEqual(first.content_hash, second.content_hash)
+        self.assertEqual(first.underlying_price, 21376.75)
+        with self.assertRaises(TypeError):
+            first.pipeline_result["pipeline_status"] = "failed"
+
+    def test_full_analysis_loads_data_once(self):
+        # Load by path: several packages in this repo ship an integration.py
+        engine_path = os.path.join(project_root, 'tasks', 'options_trading_system', 'analysis_engine', 'integration.py')
+        spec = importlib.util.spec_from_file_location("analysis_engine_integration", engine_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        AnalysisEngine = module.AnalysisEngine
+
+        with patch.object(ingestion, "create_data_ingestion_pipeline", CountingPipeline):
+            engine = AnalysisEngine({"institutional_flow_v3": {"db_path": "/tmp/test_market_snapshot_ifd.db"}})
+            result = engine.run_full_analysis({"source": "test"})
+
+        self.assertEqual(CountingPipeline.loads, 1)
+        self.assertIsNotNone(result["data_snapshot"])
+        self.assertEqual(result["individual_results"]["expected_value"]["status"], "success")
+        self.assertEqual(result["individual_results"]["dead_simple"]["status"], "success")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
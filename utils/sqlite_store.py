@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Shared SQLite Storage Layer
+Connection-pooled, WAL-mode SQLite access used by all *Database classes:
+- One persistent connection per thread per database file, closed when
+  the thread exits
+- WAL journal mode with tuned pragmas
+- Prepared statement reuse through the per-connection statement cache
+- Background batched-commit writer for fire-and-forget inserts
+- Flush on shutdown so queued writes are not lost
+"""
+
+import os
+import time
+import atexit
+import sqlite3
+import logging
+import weakref
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Applied to every pooled connection
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    "cache_size": -16000,  # 16 MB page cache
+    "busy_timeout": 5000,
+}
+
+# sqlite3 keeps this many compiled statements per connection
+STATEMENT_CACHE_SIZE = 256
+
+
+class _ThreadConnection:
+    """Thread-local holder; when its thread exits, the holder is collected and the connection closed"""
+
+    __slots__ = ("conn", "__weakref__")
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+
+class SQLiteStore:
+    """Pooled access to one SQLite database file"""
+
+    def __init__(self, db_path: str, pragmas: Optional[Dict[str, Any]] = None,
+                 batch_size: int = 500, flush_interval: float = 0.25):
+        """
+        Args:
+            db_path: Database file path (":memory:" uses one shared connection)
+            pragmas: Overrides for DEFAULT_PRAGMAS
+            batch_size: Maximum queued writes committed in one transaction
+            flush_interval: Seconds the writer waits to fill a batch
+        """
+        self.db_path = db_path
+        self.pragmas = dict(DEFAULT_PRAGMAS, **(pragmas or {}))
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.in_memory = db_path == ":memory:"
+
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        # In-memory databases are per-connection, so all threads share one
+        self._shared_lock = threading.RLock() if self.in_memory else None
+
+        # Write-behind queue
+        self._queue = deque()
+        self._queue_cond = threading.Condition()
+        self._pending = 0
+        self._enqueued_seq = 0
+        self._committed_seq = 0
+        self._flush_seq = 0  # Highest sequence a flush() caller is waiting for
+        self._writer = None
+        self._closed = False
+
+        self.stats = {"connections_opened": 0, "connections_closed": 0, "async_writes": 0,
+                      "batches_committed": 0, "write_errors": 0}
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                               cached_statements=STATEMENT_CACHE_SIZE)
+        for name, value in self.pragmas.items():
+            if self.in_memory and name == "journal_mode":
+                continue
+            conn.execute(f"PRAGMA {name}={value}")
+        with self._connections_lock:
+            self._connections.append(conn)
+            self.stats["connections_opened"] += 1
+        return conn
+
+    def _thread_connection(self) -> sqlite3.Connection:
+        if self.in_memory:
+            if not self._connections:
+                self._open()
+            return self._connections[0]
+
+        holder = getattr(self._local, "holder", None)
+        if holder is None:
+            holder = _ThreadConnection(self._open())
+            # Not at exit: close_all_stores() still needs the connections to flush queued writes
+            weakref.finalize(holder, self._release, holder.conn).atexit = False
+            self._local.holder = holder
+        return holder.conn
+
+    def _release(self, conn: sqlite3.Connection):
+        """Close the connection of a thread that has exited"""
+        with self._connections_lock:
+            try:
+                self._connections.remove(conn)
+            except ValueError:
+                return  # Already closed by close()
+            self.stats["connections_closed"] += 1
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    @contextmanager
+    def connection(self, flush: bool = True) -> Iterator[sqlite3.Connection]:
+        """
+        Pooled connection for the calling thread
+
+        Behaves like ``with sqlite3.connect(path) as conn``: commits on
+        success and rolls back on error, but the connection stays open.
+        Queued async writes are flushed first so reads see them, unless
+        flush is False.
+        """
+        if flush and self._pending:
+            self.flush()
+
+        if self._shared_lock is not None:
+            self._shared_lock.acquire()
+        try:
+            conn = self._thread_connection()
+            with conn:
+                yield conn
+        finally:
+            if self._shared_lock is not None:
+                self._shared_lock.release()
+
+    def execute_async(self, sql: str, params: Sequence[Any] = ()):
+        """Queue a write for the background batched-commit writer"""
+        self._enqueue((sql, params, False))
+
+    def executemany_async(self, sql: str, rows: Iterable[Sequence[Any]]):
+        """Queue a bulk write for the background batched-commit writer"""
+        self._enqueue((sql, list(rows), True))
+
+    def _enqueue(self, item: Tuple[str, Any, bool]):
+        if self._closed:
+            raise RuntimeError(f"SQLiteStore for {self.db_path} is closed")
+
+        with self._queue_cond:
+            self._queue.append(item)
+            self._pending += 1
+            self._enqueued_seq += 1
+            self.stats["async_writes"] += 1
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._writer_loop, daemon=True,
+                                                name=f"sqlite-writer-{os.path.basename(self.db_path)}")
+                self._writer.start()
+            self._queue_cond.notify_all()
+
+    def _writer_loop(self):
+        while True:
+            with self._queue_cond:
+                while not self._queue and not self._closed:
+                    self._queue_cond.wait()
+                if not self._queue and self._closed:
+                    return
+                # Give producers a moment to fill the batch, unless a reader is waiting
+                # (each enqueue notifies, so keep waiting until the deadline)
+                deadline = time.monotonic() + self.flush_interval
+                while (len(self._queue) < self.batch_size and not self._closed and
+                       self._flush_seq <= self._committed_seq):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._queue_cond.wait(remaining)
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+
+            self._commit_batch(batch)
+
+            with self._queue_cond:
+                self._pending -= len(batch)
+                self._committed_seq += len(batch)
+                self._queue_cond.notify_all()
+
+    def _commit_batch(self, batch):
+        if self._shared_lock is not None:
+            self._shared_lock.acquire()
+        try:
+            conn = self._thread_connection()
+            with conn:
+                for sql, params, many in batch:
+                    if many:
+                        conn.executemany(sql, params)
+                    else:
+                        conn.execute(sql, params)
+            self.stats["batches_committed"] += 1
+        except sqlite3.Error as e:
+            # Retry item by item so one bad row does not drop the batch
+            logger.error(f"Batched write to {self.db_path} failed ({e}), retrying individually")
+            self._commit_individually(batch)
+        finally:
+            if self._shared_lock is not None:
+                self._shared_lock.release()
+
+    def _commit_individually(self, batch):
+        conn = self._thread_connection()
+        for sql, params, many in batch:
+            try:
+                with conn:
+                    if many:
+                        conn.executemany(sql, params)
+                    else:
+                        conn.execute(sql, params)
+            except sqlite3.Error as e:
+                self.stats["write_errors"] += 1
+                logger.error(f"Dropped write to {self.db_path}: {e}")
+
+    def flush(self, timeout: Optional[float] = None, hurry: bool = True) -> bool:
+        """
+        Block until every write queued before this call is committed
+
+        With hurry=False the writer is not asked to commit early; the caller
+        waits for its next size/time-bounded batch instead.
+        """
+        if threading.current_thread() is self._writer:
+            return self._pending == 0
+
+        with self._queue_cond:
+            target = self._enqueued_seq
+            if hurry:
+                self._flush_seq = max(self._flush_seq, target)
+                self._queue_cond.notify_all()
+            return self._queue_cond.wait_for(lambda: self._committed_seq >= target, timeout)
+
+    @property
+    def pending_writes(self) -> int:
+        return self._pending
+
+    def close(self):
+        """Flush queued writes, stop the writer and close all connections"""
+        if self._closed:
+            return
+        self.flush()
+        with self._queue_cond:
+            self._closed = True
+            self._queue_cond.notify_all()
+        if self._writer is not None:
+            self._writer.join(timeout=5)
+
+        with self._connections_lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self.stats["connections_closed"] += len(self._connections)
+            self._connections.clear()
+
+
+_stores: Dict[str, SQLiteStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(db_path: str, **kwargs) -> SQLiteStore:
+    """
+    Shared SQLiteStore for a database path
+
+    All *Database classes pointing at the same file share one pool and one
+    writer. A store whose file has been deleted is replaced.
+    """
+    key = db_path if db_path == ":memory:" else os.path.abspath(db_path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is not None and not store.in_memory and not os.path.exists(key):
+            store.close()
+            store = None
+        if store is None or store._closed:
+            store = SQLiteStore(db_path, **kwargs)
+            _stores[key] = store
+        return store
+
+
+def close_all_stores():
+    """Flush and close every shared store (registered with atexit)"""
+    with _stores_lock:
+        stores = list(_stores.values())
+        _stores.clear()
+    for store in stores:
+        try:
+            store.close()
+        except Exception as e:
+            logger.error(f"Failed to close SQLite store {store.db_path}: {e}")
+
+
+atexit.register(close_all_stores)